@@ -0,0 +1,92 @@
+"""
+Compare handling requests with new clients and with pooled clients.
+
+For each mode, the time per request and the peak of memory allocated while
+handling a batch of requests (measured with :mod:`tracemalloc`) are shown.
+
+Usage:
+    python benchmarks/bench_client_pool.py [REQUESTS]
+"""
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+from time import perf_counter
+from typing import Tuple
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'source'))
+
+from dialogflow_fulfillment import (  # noqa: E402
+    Dispatcher,
+    QuickReplies,
+    WebhookClient,
+)
+
+REQUEST = json.dumps({
+    'responseId': 'response-id',
+    'session': 'projects/PROJECT_ID/agent/sessions/SESSION_ID',
+    'queryResult': {
+        'queryText': 'Hi',
+        'parameters': {'number': '42', 'color': 'blue'},
+        'fulfillmentMessages': [{'text': {'text': ['Hello!']}}],
+        'outputContexts': [{
+            'name': 'projects/PROJECT_ID/agent/sessions/SESSION_ID/contexts/'
+                    f'context_{index}',
+            'lifespanCount': 2,
+            'parameters': {'number': '42'},
+        } for index in range(5)],
+        'intent': {'displayName': 'Default Welcome Intent'},
+        'languageCode': 'en',
+    },
+    'originalDetectIntentRequest': {'source': 'google', 'payload': {}},
+}).encode()
+
+
+def welcome_handler(agent: WebhookClient) -> None:
+    """Handle the welcome intent."""
+    agent.add(f'You said {agent.parameters.as_number("number")}.')
+    agent.add(QuickReplies(quick_replies=['Yes', 'No']))
+    agent.context.set('another_context', lifespan_count=1)
+
+
+def run(dispatcher: Dispatcher, requests: int) -> Tuple[float, int]:
+    """Get the time per request (in µs) and the peak of allocated memory."""
+    start = perf_counter()
+
+    for _ in range(requests):
+        dispatcher.handle(REQUEST)
+
+    elapsed = perf_counter() - start
+
+    tracemalloc.start()
+
+    for _ in range(requests):
+        dispatcher.handle(REQUEST)
+
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return elapsed / requests * 1e6, peak
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+
+    print(f'{"clients":>8} {"µs/request":>11} {"peak (bytes)":>13}')
+
+    for reuse_clients in (False, True):
+        dispatcher = Dispatcher(
+            {'Default Welcome Intent': welcome_handler},
+            reuse_clients=reuse_clients
+        )
+        dispatcher.handle(REQUEST)  # Warm up (e.g.: the pool, caches).
+
+        per_request, peak = run(dispatcher, requests)
+        label = 'pooled' if reuse_clients else 'new'
+
+        print(f'{label:>8} {per_request:>11.1f} {peak:>13}')
+
+
+if __name__ == '__main__':
+    main()
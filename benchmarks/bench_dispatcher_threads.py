@@ -0,0 +1,91 @@
+"""
+Measure how the throughput of a shared dispatcher scales with threads.
+
+On free-threaded CPython builds (e.g.: ``python3.13t``) the throughput
+should scale with the number of threads. On builds with the GIL, it's
+expected to stay roughly flat.
+
+Usage:
+    python benchmarks/bench_dispatcher_threads.py [MAX_THREADS]
+"""
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from time import perf_counter
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'source'))
+
+from dialogflow_fulfillment import (  # noqa: E402
+    Dispatcher,
+    QuickReplies,
+    WebhookClient,
+)
+
+REQUESTS_PER_THREAD = 5000
+
+REQUEST = json.dumps({
+    'responseId': 'response-id',
+    'session': 'projects/PROJECT_ID/agent/sessions/SESSION_ID',
+    'queryResult': {
+        'queryText': 'Hi',
+        'parameters': {'number': '42'},
+        'fulfillmentMessages': [{'text': {'text': ['Hello!']}}],
+        'outputContexts': [{
+            'name': 'projects/PROJECT_ID/agent/sessions/SESSION_ID/contexts/'
+                    'some_context',
+            'lifespanCount': 2,
+        }],
+        'intent': {'displayName': 'Default Welcome Intent'},
+        'languageCode': 'en',
+    },
+    'originalDetectIntentRequest': {'source': 'google', 'payload': {}},
+}).encode()
+
+
+def welcome_handler(agent: WebhookClient) -> None:
+    """Handle the welcome intent."""
+    agent.add(f'You said {agent.parameters.as_number("number")}.')
+    agent.add(QuickReplies(quick_replies=['Yes', 'No']))
+    agent.context.set('another_context', lifespan_count=1)
+
+
+def run(dispatcher: Dispatcher, threads: int) -> float:
+    """Get the throughput (requests per second) for a number of threads."""
+    def work(_: int) -> None:
+        for _ in range(REQUESTS_PER_THREAD):
+            dispatcher.handle(REQUEST)
+
+    with ThreadPoolExecutor(threads) as executor:
+        start = perf_counter()
+        list(executor.map(work, range(threads)))
+        elapsed = perf_counter() - start
+
+    return threads * REQUESTS_PER_THREAD / elapsed
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    max_threads = int(sys.argv[1]) if len(sys.argv) > 1 else os.cpu_count()
+    gil_enabled = getattr(sys, '_is_gil_enabled', lambda: True)()
+    dispatcher = Dispatcher({'Default Welcome Intent': welcome_handler})
+
+    print(f'Python {sys.version.split()[0]} (GIL enabled: {gil_enabled})')
+    print(f'{"threads":>8} {"requests/s":>12} {"speedup":>8}')
+
+    baseline = None
+    threads = 1
+
+    while threads <= max_threads:
+        throughput = run(dispatcher, threads)
+        baseline = baseline or throughput
+
+        print(f'{threads:>8} {throughput:>12.0f} '
+              f'{throughput / baseline:>7.2f}x')
+
+        threads *= 2
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,80 @@
+"""
+Compare full JSON decoding with selective decoding of webhook requests.
+
+Usage:
+    python benchmarks/bench_from_bytes.py
+"""
+import json
+import sys
+from pathlib import Path
+from timeit import repeat
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'source'))
+
+from dialogflow_fulfillment import WebhookClient  # noqa: E402
+
+PAYLOAD_SIZES_KB = (100, 300, 800)
+NUMBER = 50
+
+
+def make_request(payload_size_kb: int) -> bytes:
+    """Build an encoded webhook request with a payload of the given size."""
+    segment = {
+        'speaker': 'END_USER',
+        'transcript': 'I would like to check the status of my order please',
+        'confidence': 0.92,
+        'words': [{'word': 'order', 'start': 1.25, 'end': 1.5}] * 4,
+        'metadata': {'channel': 1, 'codec': 'LINEAR16', 'tags': ['a', 'b']},
+    }
+    segment_size = len(json.dumps(segment))
+    segments = [segment] * (payload_size_kb * 1024 // segment_size)
+
+    request = {
+        'responseId': 'response-id',
+        'session': 'projects/PROJECT_ID/agent/sessions/SESSION_ID',
+        'queryResult': {
+            'queryText': 'where is my order?',
+            'parameters': {'order-id': '12345'},
+            'fulfillmentMessages': [{'text': {'text': ['Let me check.']}}],
+            'intent': {'displayName': 'Order Status'},
+            'languageCode': 'en',
+        },
+        'originalDetectIntentRequest': {
+            'source': 'telephony',
+            'payload': {'telephony': {'caller_id': '+15555550100'},
+                        'transcript': segments},
+        },
+    }
+
+    return json.dumps(request).encode()
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    print(f'{"payload":>10} {"json.loads":>12} {"from_bytes":>12} '
+          f'{"speedup":>8}')
+
+    for size in PAYLOAD_SIZES_KB:
+        body = make_request(size)
+
+        full = min(repeat(
+            lambda: WebhookClient(json.loads(body)),
+            number=NUMBER,
+            repeat=5,
+        )) / NUMBER
+        selective = min(repeat(
+            lambda: WebhookClient.from_bytes(body),
+            number=NUMBER,
+            repeat=5,
+        )) / NUMBER
+
+        print(
+            f'{len(body) // 1024:>7} KB '
+            f'{full * 1e3:>9.3f} ms '
+            f'{selective * 1e3:>9.3f} ms '
+            f'{full / selective:>7.1f}x'
+        )
+
+
+if __name__ == '__main__':
+    main()
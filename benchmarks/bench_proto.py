@@ -0,0 +1,117 @@
+"""
+Compare the direct protobuf conversions with a round trip through dicts.
+
+The round trip converts the webhook request message with
+``json_format.MessageToDict`` and the webhook response object with
+``json_format.ParseDict``, while the direct conversions read and write the
+fields of the messages (see ``WebhookClient.from_proto`` and
+``WebhookClient.response_proto``). The protobuf package
+(``pip install protobuf``) is needed.
+
+Usage:
+    python benchmarks/bench_proto.py
+"""
+import sys
+from pathlib import Path
+from timeit import repeat
+from typing import Any, Callable, Dict
+
+from google.protobuf import json_format
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'source'))
+
+from dialogflow_fulfillment.proto import (  # noqa: E402
+    WebhookRequest,
+    WebhookResponse,
+)
+from dialogflow_fulfillment.webhook_client import WebhookClient  # noqa: E402
+
+CONTEXTS = (0, 5, 50)
+NUMBER = 2000
+
+
+def make_request(contexts: int) -> Dict[str, Any]:
+    """Build a webhook request object with some output contexts."""
+    session = 'projects/PROJECT_ID/agent/sessions/SESSION_ID'
+
+    return {
+        'responseId': 'response-id',
+        'session': session,
+        'queryResult': {
+            'queryText': 'where is my order?',
+            'parameters': {'order-id': '12345'},
+            'allRequiredParamsPresent': True,
+            'fulfillmentMessages': [{'text': {'text': ['Let me check.']}}],
+            'outputContexts': [
+                {
+                    'name': f'{session}/contexts/context-{number}',
+                    'lifespanCount': 2,
+                    'parameters': {'order-id': '12345'},
+                }
+                for number in range(contexts)
+            ],
+            'intent': {
+                'name': 'projects/PROJECT_ID/agent/intents/INTENT_ID',
+                'displayName': 'Order Status',
+            },
+            'intentDetectionConfidence': 0.92,
+            'languageCode': 'en',
+        },
+        'originalDetectIntentRequest': {'source': 'telephony', 'payload': {}},
+    }
+
+
+def handle(agent: WebhookClient) -> None:
+    """Handle a request (as a typical handler)."""
+    agent.add('Your order is on its way.')
+    agent.context.set('order', 5, {'order-id': '12345'})
+
+
+def round_trip(message: Any) -> Any:
+    """Handle a request message through dicts."""
+    agent = WebhookClient(json_format.MessageToDict(message))
+    handle(agent)
+
+    return json_format.ParseDict(agent.response, WebhookResponse())
+
+
+def direct(message: Any) -> Any:
+    """Handle a request message with the direct conversions."""
+    agent = WebhookClient.from_proto(message)
+    handle(agent)
+
+    return agent.response_proto()
+
+
+def measure(function: Callable[[Any], Any], message: Any) -> float:
+    """Measure how long (in seconds) a function takes for a message."""
+    return min(repeat(
+        lambda: function(message),
+        number=NUMBER,
+        repeat=5,
+    )) / NUMBER
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    print(f'{"contexts":>8} {"direct":>12} {"round trip":>12} '
+          f'{"speedup":>8}')
+
+    for contexts in CONTEXTS:
+        message = json_format.ParseDict(
+            make_request(contexts),
+            WebhookRequest()
+        )
+        fast = measure(direct, message)
+        slow = measure(round_trip, message)
+
+        print(
+            f'{contexts:>8} '
+            f'{fast * 1e6:>9.2f} us '
+            f'{slow * 1e6:>9.2f} us '
+            f'{slow / fast:>7.1f}x'
+        )
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Compare the compiled validator of webhook requests with jsonschema's.
+
+The jsonschema package (``pip install jsonschema``) is needed for the
+comparison. Without it, only the compiled validator is measured.
+
+Usage:
+    python benchmarks/bench_validation.py
+"""
+import sys
+from pathlib import Path
+from timeit import repeat
+from typing import Any, Callable, Dict
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / 'source'))
+
+from dialogflow_fulfillment.validation import (  # noqa: E402
+    WEBHOOK_REQUEST_SCHEMA,
+    validate_webhook_request,
+)
+
+CONTEXTS = (0, 5, 50)
+NUMBER = 10000
+
+
+def make_request(contexts: int) -> Dict[str, Any]:
+    """Build a webhook request object with some output contexts."""
+    session = 'projects/PROJECT_ID/agent/sessions/SESSION_ID'
+
+    return {
+        'responseId': 'response-id',
+        'session': session,
+        'queryResult': {
+            'queryText': 'where is my order?',
+            'parameters': {'order-id': '12345'},
+            'allRequiredParamsPresent': True,
+            'fulfillmentMessages': [{'text': {'text': ['Let me check.']}}],
+            'outputContexts': [
+                {
+                    'name': f'{session}/contexts/context-{number}',
+                    'lifespanCount': 2,
+                    'parameters': {'order-id': '12345'},
+                }
+                for number in range(contexts)
+            ],
+            'intent': {
+                'name': 'projects/PROJECT_ID/agent/intents/INTENT_ID',
+                'displayName': 'Order Status',
+            },
+            'intentDetectionConfidence': 0.92,
+            'languageCode': 'en',
+        },
+        'originalDetectIntentRequest': {'source': 'telephony', 'payload': {}},
+    }
+
+
+def measure(validate: Callable[[Any], Any], request: Dict[str, Any]) -> float:
+    """Measure how long (in seconds) a validator takes for a request."""
+    return min(repeat(
+        lambda: validate(request),
+        number=NUMBER,
+        repeat=5,
+    )) / NUMBER
+
+
+def main() -> None:
+    """Run the benchmark and print the results."""
+    try:
+        import jsonschema
+    except ImportError:
+        jsonschema = None
+        print('jsonschema is not installed (only the compiled validator is '
+              'measured)\n')
+
+    print(f'{"contexts":>8} {"compiled":>12} {"jsonschema":>12} '
+          f'{"speedup":>8}')
+
+    for contexts in CONTEXTS:
+        request = make_request(contexts)
+        compiled = measure(validate_webhook_request, request)
+
+        if jsonschema is None:
+            print(f'{contexts:>8} {compiled * 1e6:>9.2f} us')
+
+            continue
+
+        validator = jsonschema.Draft7Validator(WEBHOOK_REQUEST_SCHEMA)
+        generic = measure(validator.validate, request)
+
+        print(
+            f'{contexts:>8} '
+            f'{compiled * 1e6:>9.2f} us '
+            f'{generic * 1e6:>9.2f} us '
+            f'{generic / compiled:>7.1f}x'
+        )
+
+
+if __name__ == '__main__':
+    main()
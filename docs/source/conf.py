@@ -86,5 +86,17 @@ nitpicky = True
 nitpick_ignore = [
     ('py:class', 'any'),
     ('py:class', 'callable'),
+    ('py:class', 'collection'),
+    ('py:class', 'file-like'),
+    ('py:class', 'hashable'),
+    ('py:class', 'iterable'),
     ('py:class', 'optional'),
+    ('py:class', 'path-like'),
+    ('py:class', 'sequence'),
+    # The protobuf messages (which aren't documented Python classes).
+    ('py:class', 'EventInput'),
+    ('py:class', 'Intent.Message'),
+    ('py:class', 'Struct'),
+    ('py:class', 'google._upb._message.Message'),
+    ('py:class', 'google.protobuf.message.Message'),
 ]
@@ -0,0 +1,20 @@
+"""
+A webhook service served by the built-in pre-fork server.
+
+Run it with ``python -m dialogflow_fulfillment serve webhook:dispatcher`` and
+send SIGHUP to the server process for reloading the code (gracefully).
+"""
+from dialogflow_fulfillment import Dispatcher, QuickReplies, WebhookClient
+
+dispatcher = Dispatcher()
+
+
+@dispatcher.register('Default Welcome Intent')
+def welcome(agent: WebhookClient) -> None:
+    """Handle the welcome intent."""
+    agent.add('Hi! How are you feeling today?')
+    agent.add(QuickReplies(quick_replies=['Happy :)', 'Sad :(']))
+
+
+def warmup() -> None:
+    """Warm up the caches (before the workers are forked)."""
@@ -1,21 +1,64 @@
-from .contexts import Context
-from .rich_responses import (
-    Card,
-    Image,
-    Payload,
-    QuickReplies,
-    RichResponse,
-    Text,
-)
-from .webhook_client import WebhookClient
+from typing import TYPE_CHECKING, Any, List
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .agent_export import AgentExport
+    from .contexts import Context
+    from .dispatcher import Dispatcher
+    from .parameters import Parameters
+    from .rich_responses import (
+        Card,
+        Image,
+        Payload,
+        QuickReplies,
+        RichResponse,
+        Text,
+    )
+    from .webhook_client import WebhookClient
 
 __all__ = (
+    'AgentExport',
     'Context',
     'Card',
+    'Dispatcher',
     'Image',
+    'Parameters',
     'Payload',
     'QuickReplies',
     'RichResponse',
     'Text',
     'WebhookClient',
 )
+
+# The modules of the public names, which are imported on first access (so
+# only what is actually used is imported).
+_MODULES = {
+    'AgentExport': 'agent_export',
+    'Context': 'contexts',
+    'Card': 'rich_responses',
+    'Dispatcher': 'dispatcher',
+    'Image': 'rich_responses',
+    'Parameters': 'parameters',
+    'Payload': 'rich_responses',
+    'QuickReplies': 'rich_responses',
+    'RichResponse': 'rich_responses',
+    'Text': 'rich_responses',
+    'WebhookClient': 'webhook_client',
+}
+
+
+def __getattr__(name: str) -> Any:
+    """Import a public name (on first access)."""
+    if name not in _MODULES:
+        raise AttributeError(f'module {__name__!r} has no attribute {name!r}')
+
+    # Unlike importlib, the builtin import function is seen by -X importtime.
+    module = __import__(_MODULES[name], globals(), fromlist=(name,), level=1)
+    value = getattr(module, name)
+    globals()[name] = value
+
+    return value
+
+
+def __dir__() -> List[str]:
+    """List the names of the package (including the ones not imported)."""
+    return sorted({*globals(), *__all__})
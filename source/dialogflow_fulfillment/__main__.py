@@ -0,0 +1,152 @@
+import argparse
+import sys
+from typing import List, Optional
+
+from .batch import replay
+from .server import Server
+
+
+def create_parser() -> argparse.ArgumentParser:
+    """
+    Create the parser of the command line arguments.
+
+    Returns:
+        argparse.ArgumentParser: The parser.
+    """
+    parser = argparse.ArgumentParser(prog='python -m dialogflow_fulfillment')
+    commands = parser.add_subparsers(dest='command', metavar='command')
+    commands.required = True
+
+    serve = commands.add_parser(
+        'serve',
+        help='serve a dispatcher with a pre-fork HTTP server',
+        description='Serve a dispatcher (or a WSGI application) with a '
+                    'pre-fork HTTP server.'
+    )
+    serve.add_argument(
+        'target',
+        help='the dispatcher to be served (e.g.: myapp.webhook:dispatcher)'
+    )
+    serve.add_argument('--host', default='127.0.0.1', help='the host')
+    serve.add_argument('--port', type=int, default=8000, help='the port')
+    serve.add_argument(
+        '--workers',
+        type=int,
+        help='the number of worker processes (default: the number of CPUs)'
+    )
+    serve.add_argument(
+        '--backlog',
+        type=int,
+        default=1024,
+        help='the size of the queue of pending connections'
+    )
+    serve.add_argument(
+        '--affinity',
+        action='store_true',
+        help='route the requests of each session to the same worker'
+    )
+    serve.set_defaults(run=serve_command)
+
+    replay_parser = commands.add_parser(
+        'replay',
+        help='replay recorded requests and diff the responses',
+        description='Replay the recorded requests of a JSONL file (e.g.: '
+                    'from a Recorder) with a dispatcher, in a pool of '
+                    'processes, and diff the responses. Exits with 1 if '
+                    'any response differs (or any request fails).'
+    )
+    replay_parser.add_argument(
+        'target',
+        help='the dispatcher (e.g.: myapp.webhook:dispatcher)'
+    )
+    replay_parser.add_argument(
+        'file',
+        help='the (uncompressed) JSONL file of records (or requests)'
+    )
+    replay_parser.add_argument(
+        '--diffs',
+        default='diffs.jsonl',
+        help='the JSONL file where the diffs are written'
+    )
+    replay_parser.add_argument(
+        '--workers',
+        type=int,
+        help='the number of worker processes (default: the number of CPUs, '
+             '0 for none)'
+    )
+    replay_parser.add_argument(
+        '--chunk-size',
+        type=int,
+        default=8 * 1024 * 1024,
+        help='the size (in bytes) of the chunks of the file'
+    )
+    replay_parser.set_defaults(run=replay_command)
+
+    return parser
+
+
+def serve_command(args: argparse.Namespace) -> None:
+    """
+    Serve a dispatcher with a pre-fork HTTP server (see :class:`Server`).
+
+    Parameters:
+        args (argparse.Namespace): The arguments of the command.
+    """
+    # The target's modules are imported from the working directory.
+    sys.path.insert(0, '')
+
+    Server(
+        args.target,
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        backlog=args.backlog,
+        affinity=args.affinity
+    ).run()
+
+
+def replay_command(args: argparse.Namespace) -> int:
+    """
+    Replay recorded requests with a dispatcher (see :func:`replay`).
+
+    Parameters:
+        args (argparse.Namespace): The arguments of the command.
+
+    Returns:
+        int: The exit status (``1`` if any response differs).
+    """
+    # The target's modules are imported from the working directory.
+    sys.path.insert(0, '')
+
+    with open(args.diffs, 'w') as diffs_file:
+        report = replay(
+            args.target,
+            args.file,
+            diffs_file,
+            workers=args.workers,
+            chunk_size=args.chunk_size
+        )
+
+    print(report.format())
+
+    return 1 if report.diffs or report.errors else 0
+
+
+def main(argv: Optional[List[str]] = None) -> Optional[int]:
+    """
+    Run a command of the command line interface.
+
+    Parameters:
+        argv (list(str), optional): The command line arguments (the
+            arguments of the process by default).
+
+    Returns:
+        int, optional: The exit status of the command.
+    """
+    args = create_parser().parse_args(argv)
+
+    return args.run(args)
+
+
+if __name__ == '__main__':  # pragma: no cover
+    sys.exit(main())
@@ -0,0 +1,11 @@
+from .asgi import ASGIAdapter
+from .base import Adapter
+from .serverless import ServerlessAdapter
+from .wsgi import WSGIAdapter
+
+__all__ = (
+    'ASGIAdapter',
+    'Adapter',
+    'ServerlessAdapter',
+    'WSGIAdapter',
+)
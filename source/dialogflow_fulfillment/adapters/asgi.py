@@ -0,0 +1,162 @@
+import json
+from http import HTTPStatus
+from typing import Any, Awaitable, Callable, Dict, Iterable, Tuple, Union
+
+from ..dispatcher import RequestError
+from ..executors import PoolFullError
+from .base import Adapter
+
+Scope = Dict[str, Any]
+Receive = Callable[[], Awaitable[Dict[str, Any]]]
+Send = Callable[[Dict[str, Any]], Awaitable[None]]
+
+_ENCODER = json.JSONEncoder(separators=(',', ':'))
+
+
+class ASGIAdapter(Adapter):
+    """
+    An ASGI application that handles webhook requests with a dispatcher.
+
+    The body of ``POST`` requests (the encoded webhook request) is handed to
+    the dispatcher as is, and the handlers run in the executor pools of their
+    intents (see :meth:`~.Dispatcher.handle_async`), so the event loop is never
+    blocked by them. When the executor pool of a request is full, the
+    request gets a ``503`` response (and Dialogflow uses the responses
+    defined in its console).
+
+    The adapter starts and stops with the lifespan of the server (see
+    :meth:`startup` and :meth:`shutdown`), which also stops the threads of
+    the executor pools.
+
+    Examples:
+        Serving a dispatcher with Uvicorn:
+
+            >>> import uvicorn
+            >>> uvicorn.run(ASGIAdapter(dispatcher), port=8000)
+
+    Parameters:
+        dispatcher (Dispatcher): The dispatcher of the webhook requests.
+        http_pool (HTTPPool, optional): The pool of HTTP connections of the
+            handlers (see :class:`~.Adapter`).
+        shedder (LoadShedder, optional): The limiter of the requests handled
+            at the same time (see :class:`~.Adapter`). The requests wait for
+            their turn in the event loop (see
+            :meth:`~.LoadShedder.acquire_async`).
+    """
+
+    async def __call__(
+        self,
+        scope: Scope,
+        receive: Receive,
+        send: Send
+    ) -> None:
+        """Handle an ASGI connection (an HTTP request or the lifespan)."""
+        if scope['type'] == 'lifespan':
+            return await self._lifespan(receive, send)
+
+        if scope['type'] != 'http':
+            raise ValueError(f'unsupported scope type: {scope["type"]!r}')
+
+        if not self.started:
+            self.startup()
+
+        if scope['method'] != 'POST':
+            return await self._respond(
+                send,
+                HTTPStatus.METHOD_NOT_ALLOWED,
+                {'error': 'method not allowed'},
+                [(b'allow', b'POST')]
+            )
+
+        body = await self._read_body(receive)
+        shedder = self.shedder
+
+        if shedder is None:
+            return await self._handle(send, body)
+
+        if not await shedder.acquire_async(body):
+            return await self._respond(send, HTTPStatus.OK, shedder.fallback)
+
+        try:
+            await self._handle(send, body)
+        finally:
+            shedder.release()
+
+    def shutdown(self) -> None:
+        """Stop the adapter (and the threads of the executor pools)."""
+        super().shutdown()
+
+        self.dispatcher.executor_pools.shutdown()
+
+    async def _lifespan(self, receive: Receive, send: Send) -> None:
+        """Start and stop the adapter with the server."""
+        while True:
+            message = await receive()
+
+            if message['type'] == 'lifespan.startup':
+                self.startup()
+                await send({'type': 'lifespan.startup.complete'})
+            else:
+                self.shutdown()
+                await send({'type': 'lifespan.shutdown.complete'})
+
+                return
+
+    async def _handle(self, send: Send, body: bytes) -> None:
+        """Handle a webhook request (and send its HTTP response)."""
+        with self.dispatcher.span('http request', size=len(body)):
+            try:
+                response = await self.dispatcher.handle_async(body)
+            except PoolFullError as error:
+                return await self._respond(
+                    send,
+                    HTTPStatus.SERVICE_UNAVAILABLE,
+                    {'error': str(error)}
+                )
+            except RequestError as error:
+                return await self._respond(
+                    send,
+                    HTTPStatus.BAD_REQUEST,
+                    {'error': str(error)}
+                )
+
+            with self.dispatcher.span('serialize'):
+                content = _ENCODER.encode(response).encode()
+
+            await self._respond(send, HTTPStatus.OK, content)
+
+    @staticmethod
+    async def _read_body(receive: Receive) -> bytes:
+        """Read the body of an HTTP request."""
+        chunks = []
+
+        while True:
+            message = await receive()
+            chunks.append(message.get('body', b''))
+
+            if not message.get('more_body', False):
+                return b''.join(chunks)
+
+    @staticmethod
+    async def _respond(
+        send: Send,
+        status: HTTPStatus,
+        body: Union[Dict[str, Any], bytes],
+        headers: Iterable[Tuple[bytes, bytes]] = ()
+    ) -> None:
+        """Send an HTTP response with a JSON body (or an encoded one)."""
+        if isinstance(body, bytes):
+            content = body
+        else:
+            content = _ENCODER.encode(body).encode()
+
+        await send({
+            'type': 'http.response.start',
+            'status': status.value,
+            'headers': [
+                (b'content-type', b'application/json'),
+                (b'content-length', str(len(content)).encode()),
+                *headers,
+            ],
+        })
+        await send({'type': 'http.response.body', 'body': content})
@@ -0,0 +1,69 @@
+from threading import Lock
+from typing import Optional
+
+from ..dispatcher import Dispatcher
+from ..http_pool import HTTPPool
+from ..shedding import LoadShedder
+
+
+class Adapter:
+    """
+    The base class of the adapters of dispatchers (e.g.: to HTTP servers).
+
+    Adapters manage the lifecycle of the resources shared by the requests of
+    a process: when the adapter starts (see :meth:`startup`), it creates a
+    pool of HTTP connections for the handlers (see
+    :attr:`~.WebhookClient.http`), which it closes when it stops (see
+    :meth:`shutdown`). Adapters start on their first request if the server
+    didn't start them.
+
+    With a load shedder, the requests over its limits are answered right
+    away with its fallback response (see :class:`~.LoadShedder`).
+
+    Malformed (or invalid) webhook requests get a ``400`` response, with the
+    error (see :class:`~dialogflow_fulfillment.dispatcher.RequestError`).
+    Any other error (e.g.: of a handler) is left to the server, which
+    answers with a ``500`` response (without the error).
+
+    Parameters:
+        dispatcher (Dispatcher): The dispatcher of the webhook requests.
+        http_pool (HTTPPool, optional): The pool of HTTP connections (a new
+            pool by default). If the dispatcher already has a pool, it's
+            kept.
+        shedder (LoadShedder, optional): The limiter of the requests handled
+            at the same time.
+    """
+
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        http_pool: Optional[HTTPPool] = None,
+        shedder: Optional[LoadShedder] = None
+    ) -> None:
+        self.dispatcher = dispatcher
+        self.http_pool = http_pool
+        self.shedder = shedder
+        self.started = False
+        self._lock = Lock()
+
+    def startup(self) -> None:
+        """Start the adapter (e.g.: when a worker process starts)."""
+        with self._lock:
+            if self.started:
+                return
+
+            if self.dispatcher.http_pool is None:
+                if self.http_pool is None:
+                    self.http_pool = HTTPPool()
+
+                self.dispatcher.http_pool = self.http_pool
+
+            self.started = True
+
+    def shutdown(self) -> None:
+        """Stop the adapter (e.g.: when a worker process stops)."""
+        with self._lock:
+            if self.http_pool is not None:
+                self.http_pool.close()
+
+            self.started = False
@@ -0,0 +1,190 @@
+import json
+from http import HTTPStatus
+from typing import Any, Dict, Mapping, Optional, Tuple, Union
+
+from ..dispatcher import Dispatcher, RequestError
+from ..http_pool import HTTPPool
+from ..shedding import LoadShedder
+from .base import Adapter
+
+Response = Tuple[bytes, int, Dict[str, str]]
+
+_ENCODER = json.JSONEncoder(separators=(',', ':'))
+
+# The methods of keep-alive requests (e.g.: from Cloud Scheduler).
+_PING_METHODS = frozenset(('GET', 'HEAD'))
+
+_PING_RESPONSE: Response = (b'', HTTPStatus.NO_CONTENT.value, {})
+
+
+class ServerlessAdapter(Adapter):
+    """
+    A serverless function that handles webhook requests with a dispatcher.
+
+    It follows the calling convention of the `Functions Framework`_ (e.g.:
+    Cloud Functions and Cloud Run): it's called with the HTTP request (an
+    object with the ``method`` attribute and the ``get_data`` method) and it
+    returns the body, the status and the headers of the HTTP response.
+
+    ``GET`` and ``HEAD`` requests are keep-alive pings: they are answered
+    right away (with an empty response), without creating a client.
+
+    Examples:
+        Creating the function (and warming it up when the instance starts):
+
+            >>> dispatcher = Dispatcher({'Default Welcome Intent': welcome})
+            >>> webhook = ServerlessAdapter(dispatcher)
+            >>> webhook.warmup()
+
+    Parameters:
+        dispatcher (Dispatcher): The dispatcher of the webhook requests.
+        warmup_requests (dict(str, dict), optional): A mapping of intents to
+            the webhook requests used for warming up their handlers (e.g.:
+            requests with parameters and console messages). The intents
+            without a request get a synthetic one.
+        http_pool (HTTPPool, optional): The pool of HTTP connections of the
+            handlers (see :class:`~.Adapter`).
+        shedder (LoadShedder, optional): The limiter of the requests handled
+            at the same time (see :class:`~.Adapter`).
+
+    .. _Functions Framework: https://github.com/GoogleCloudPlatform/functions-framework-python
+    """  # noqa: E501
+
+    # The session of the synthetic requests (handlers can skip side effects
+    # for it).
+    WARMUP_SESSION = 'projects/warmup/agent/sessions/warmup'
+
+    def __init__(
+        self,
+        dispatcher: Dispatcher,
+        warmup_requests: Optional[Mapping[str, Dict[str, Any]]] = None,
+        http_pool: Optional[HTTPPool] = None,
+        shedder: Optional[LoadShedder] = None
+    ) -> None:
+        super().__init__(dispatcher, http_pool, shedder)
+
+        self.warmup_requests = dict(warmup_requests or {})
+
+    def __call__(self, request: Any) -> Response:
+        """
+        Handle an HTTP request.
+
+        Parameters:
+            request (flask.Request): The HTTP request.
+
+        Returns:
+            tuple(bytes, int, dict(str, str)): The body, the status and the
+            headers of the HTTP response.
+        """
+        if request.method in _PING_METHODS:
+            return _PING_RESPONSE
+
+        if not self.started:
+            self.startup()
+
+        if request.method != 'POST':
+            return self._respond(
+                HTTPStatus.METHOD_NOT_ALLOWED,
+                {'error': 'method not allowed'}
+            )
+
+        body = request.get_data()
+        shedder = self.shedder
+
+        if shedder is None:
+            return self._handle(body)
+
+        if not shedder.acquire(body):
+            return self._respond(HTTPStatus.OK, shedder.fallback)
+
+        try:
+            return self._handle(body)
+        finally:
+            shedder.release()
+
+    def _handle(self, body: bytes) -> Response:
+        """Handle a webhook request."""
+        with self.dispatcher.span('http request'):
+            try:
+                response = self.dispatcher.handle(body)
+            except RequestError as error:
+                return self._respond(
+                    HTTPStatus.BAD_REQUEST,
+                    {'error': str(error)}
+                )
+
+            with self.dispatcher.span('serialize'):
+                return self._respond(HTTPStatus.OK, response)
+
+    def warmup(self, language_code: str = 'en') -> Dict[str, Exception]:
+        """
+        Start and warm up the function (e.g.: when the instance starts).
+
+        A webhook request is handled for each intent with a handler, so the
+        modules used by the handlers are imported and their caches (e.g.: of
+        number parsers) are filled before the first request from a user. The
+        console messages are cached only for the warm-up requests with the
+        intent's ID and messages (see the ``warmup_requests`` argument).
+
+        The requests are handled by the handlers alone: they aren't recorded,
+        profiled nor counted by the circuit breakers of the dispatcher. The
+        handlers can skip their side effects for the synthetic requests (of
+        the ``WARMUP_SESSION`` session).
+
+        Parameters:
+            language_code (str): The language of the synthetic requests.
+
+        Returns:
+            dict(str, Exception): A mapping of intents to the errors raised by
+            their handlers (which don't stop the warm-up).
+        """
+        self.startup()
+
+        errors = {}
+
+        for intent, handler in self.dispatcher.handlers.items():
+            request = self.warmup_requests.get(intent)
+
+            if request is None:
+                request = self._synthetic_request(intent, language_code)
+
+            try:
+                agent = self.dispatcher.create_client(
+                    _ENCODER.encode(request).encode()
+                )
+                agent.handle_request(handler)
+                # The response is built too (e.g.: sizing the messages).
+                agent.response
+            except Exception as error:
+                errors[intent] = error
+
+        return errors
+
+    @classmethod
+    def _synthetic_request(
+        cls,
+        intent: str,
+        language_code: str
+    ) -> Dict[str, Any]:
+        """Create a webhook request for an intent (for warming it up)."""
+        return {
+            'responseId': 'warmup',
+            'session': cls.WARMUP_SESSION,
+            'queryResult': {
+                'queryText': '',
+                'parameters': {},
+                'intent': {'displayName': intent},
+                'languageCode': language_code,
+            },
+        }
+
+    @staticmethod
+    def _respond(
+        status: HTTPStatus,
+        body: Union[Dict[str, Any], bytes]
+    ) -> Response:
+        """Create an HTTP response with a JSON body (or an encoded one)."""
+        if not isinstance(body, bytes):
+            body = _ENCODER.encode(body).encode()
+
+        return (body, status.value, {'Content-Type': 'application/json'})
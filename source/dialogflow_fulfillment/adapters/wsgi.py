@@ -0,0 +1,106 @@
+import json
+from http import HTTPStatus
+from typing import Any, Callable, Dict, Iterable, List, Tuple, Union
+
+from ..dispatcher import RequestError
+from .base import Adapter
+
+StartResponse = Callable[[str, List[Tuple[str, str]]], Any]
+
+_ENCODER = json.JSONEncoder(separators=(',', ':'))
+
+
+class WSGIAdapter(Adapter):
+    """
+    A WSGI application that handles webhook requests with a dispatcher.
+
+    The body of ``POST`` requests (the encoded webhook request) is handed to
+    the dispatcher as is (see :meth:`~.WebhookClient.from_bytes`) and the
+    webhook response is sent back as JSON.
+
+    Examples:
+        Serving a dispatcher with the reference WSGI server:
+
+            >>> from wsgiref.simple_server import make_server
+            >>> make_server('', 8000, WSGIAdapter(dispatcher)).serve_forever()
+
+    Parameters:
+        dispatcher (Dispatcher): The dispatcher of the webhook requests.
+        http_pool (HTTPPool, optional): The pool of HTTP connections of the
+            handlers (see :class:`~.Adapter`).
+        shedder (LoadShedder, optional): The limiter of the requests handled
+            at the same time (see :class:`~.Adapter`).
+    """
+
+    def __call__(
+        self,
+        environ: Dict[str, Any],
+        start_response: StartResponse
+    ) -> Iterable[bytes]:
+        """Handle an HTTP request (see :pep:`3333`)."""
+        if not self.started:
+            self.startup()
+
+        if environ['REQUEST_METHOD'] != 'POST':
+            return self._respond(
+                start_response,
+                HTTPStatus.METHOD_NOT_ALLOWED,
+                {'error': 'method not allowed'},
+                [('Allow', 'POST')]
+            )
+
+        length = int(environ.get('CONTENT_LENGTH') or 0)
+        body = environ['wsgi.input'].read(length)
+        shedder = self.shedder
+
+        if shedder is None:
+            return self._handle(start_response, body)
+
+        if not shedder.acquire(body):
+            return self._respond(start_response, HTTPStatus.OK,
+                                 shedder.fallback)
+
+        try:
+            return self._handle(start_response, body)
+        finally:
+            shedder.release()
+
+    def _handle(
+        self,
+        start_response: StartResponse,
+        body: bytes
+    ) -> List[bytes]:
+        """Handle a webhook request (and start its HTTP response)."""
+        with self.dispatcher.span('http request', size=len(body)):
+            try:
+                response = self.dispatcher.handle(body)
+            except RequestError as error:
+                return self._respond(
+                    start_response,
+                    HTTPStatus.BAD_REQUEST,
+                    {'error': str(error)}
+                )
+
+            with self.dispatcher.span('serialize'):
+                return self._respond(start_response, HTTPStatus.OK, response)
+
+    @staticmethod
+    def _respond(
+        start_response: StartResponse,
+        status: HTTPStatus,
+        body: Union[Dict[str, Any], bytes],
+        headers: Iterable[Tuple[str, str]] = ()
+    ) -> List[bytes]:
+        """Start an HTTP response with a JSON body (or an encoded one)."""
+        if isinstance(body, bytes):
+            content = body
+        else:
+            content = _ENCODER.encode(body).encode()
+
+        start_response(f'{status.value} {status.phrase}', [
+            ('Content-Type', 'application/json'),
+            ('Content-Length', str(len(content))),
+            *headers,
+        ])
+
+        return [content]
@@ -0,0 +1,575 @@
+import array
+import itertools
+import selectors
+import socket
+import struct
+import time
+from collections import deque
+from typing import Deque, Dict, NamedTuple, Optional, Tuple
+
+from .hashring import HashRing
+from .raw_json import BytesLike, select_fields
+
+# The prefix of the requests sent to the workers (the size of the request).
+_LENGTH = struct.Struct('!I')
+
+# The maximum size of the head (the request line and the headers) of a
+# request.
+_MAX_HEAD_SIZE = 64 * 1024
+
+_HEAD_END = b'\r\n\r\n'
+
+# The acknowledgement of a connection (sent by the workers to the router).
+_ACK = b'\x00'
+
+_BAD_REQUEST = 400
+_PAYLOAD_TOO_LARGE = 413
+_SERVICE_UNAVAILABLE = 503
+
+_REASONS = {
+    _BAD_REQUEST: 'Bad Request',
+    _PAYLOAD_TOO_LARGE: 'Payload Too Large',
+    _SERVICE_UNAVAILABLE: 'Service Unavailable',
+}
+
+
+def request_length(buf: BytesLike) -> Optional[int]:
+    """
+    Get the length of the HTTP request at the start of a buffer.
+
+    Parameters:
+        buf (bytes, bytearray, memoryview): The bytes received so far.
+
+    Returns:
+        int, optional: The length of the request (the head and the body), if
+        it was received completely.
+
+    Raises:
+        ValueError: If the request is invalid (e.g.: its head is too large or
+            its body is chunked).
+    """
+    end = bytes(buf[:_MAX_HEAD_SIZE + len(_HEAD_END)]).find(_HEAD_END)
+
+    if end < 0:
+        if len(buf) > _MAX_HEAD_SIZE:
+            raise ValueError('the head of the request is too large')
+
+        return None
+
+    length = 0
+    lines = bytes(buf[:end]).decode('latin-1').split('\r\n')
+
+    for line in lines[1:]:
+        name, _, value = line.partition(':')
+        name = name.strip().lower()
+
+        if name == 'content-length':
+            length = int(value)
+
+            if length < 0:
+                raise ValueError(f'invalid content length: {length}')
+        elif name == 'transfer-encoding':
+            raise ValueError('chunked requests are not supported')
+
+    length += end + len(_HEAD_END)
+
+    return length if len(buf) >= length else None
+
+
+def session_key(request: BytesLike) -> Optional[str]:
+    """
+    Get the session of the webhook request of an HTTP request.
+
+    Only the ``session`` field of the body is decoded.
+
+    Parameters:
+        request (bytes, bytearray, memoryview): The HTTP request.
+
+    Returns:
+        str, optional: The session (if the body is a webhook request).
+    """
+    view = memoryview(request)
+    start = bytes(view[:_MAX_HEAD_SIZE + len(_HEAD_END)]).find(_HEAD_END)
+
+    try:
+        session = select_fields(
+            view[start + len(_HEAD_END):],
+            ('session',)
+        )['session'].decode()
+    except (KeyError, ValueError):
+        return None
+
+    return session if isinstance(session, str) else None
+
+
+def send_connection(
+    channel: socket.socket,
+    connection: socket.socket,
+    request: bytes
+) -> None:
+    """
+    Send a connection (and its request) to a worker over a Unix socket.
+
+    Parameters:
+        channel (socket.socket): The (blocking) Unix socket of the worker.
+        connection (socket.socket): The connection of the client.
+        request (bytes): The request read from the connection.
+
+    Raises:
+        OSError: If the worker's socket is closed.
+    """
+    message = _encode(request)
+    sent = _send_with_connection(channel, connection, message)
+
+    if sent < len(message):
+        channel.sendall(message[sent:])
+
+
+def _encode(request: bytes) -> bytes:
+    """Prefix a request with its size."""
+    return _LENGTH.pack(len(request)) + request
+
+
+def _send_with_connection(
+    channel: socket.socket,
+    connection: socket.socket,
+    data: BytesLike
+) -> int:
+    """Send (the start of) a message and the connection it carries."""
+    return channel.sendmsg(
+        [data],
+        [(
+            socket.SOL_SOCKET,
+            socket.SCM_RIGHTS,
+            array.array('i', (connection.fileno(),))
+        )]
+    )
+
+
+def receive_connection(
+    channel: socket.socket
+) -> Optional[Tuple[socket.socket, bytes]]:
+    """
+    Receive a connection (and its request) from the router.
+
+    The connection is acknowledged, so the router closes its copy (until
+    then, the router sends the connection to another worker if this one
+    stops).
+
+    Parameters:
+        channel (socket.socket): The (blocking) Unix socket of the worker.
+
+    Returns:
+        tuple(socket.socket, bytes), optional: The connection of the client
+        and its request (or nothing, if the router closed the socket).
+
+    Raises:
+        OSError: If the message doesn't carry a connection.
+    """
+    fds = array.array('i')
+
+    try:
+        prefix, ancillary_data, _, _ = channel.recvmsg(
+            _LENGTH.size,
+            socket.CMSG_SPACE(2 * fds.itemsize)
+        )
+    except ConnectionResetError:
+        # The router closed the socket before reading the acknowledgements.
+        return None
+
+    # Unix sockets only carry file descriptors (SCM_RIGHTS).
+    for _, _, data in ancillary_data:
+        fds.frombytes(data[:len(data) - len(data) % fds.itemsize])
+
+    if not prefix:
+        return None
+
+    if len(fds) != 1:
+        for fd in fds:
+            socket.close(fd)
+
+        raise OSError('the message does not carry a connection')
+
+    try:
+        prefix += _receive_exactly(channel, _LENGTH.size - len(prefix))
+        request = _receive_exactly(channel, _LENGTH.unpack(prefix)[0])
+    except OSError:
+        socket.close(fds[0])
+
+        raise
+
+    try:
+        channel.send(_ACK)
+    except OSError:
+        # The router replaced the worker (its socket was closed).
+        pass
+
+    return socket.socket(fileno=fds[0]), request
+
+
+def _receive_exactly(channel: socket.socket, size: int) -> bytes:
+    """Receive a number of bytes from a socket."""
+    buffer = bytearray()
+
+    while len(buffer) < size:
+        chunk = channel.recv(size - len(buffer))
+
+        if not chunk:
+            raise OSError('the socket was closed')
+
+        buffer += chunk
+
+    return bytes(buffer)
+
+
+class _Forward(NamedTuple):
+    """A connection to send to a worker (and its encoded request)."""
+
+    connection: socket.socket
+    message: bytes
+    session: Optional[str]
+
+
+class _Worker:
+    """The socket of a worker (and the connections sent or to send to it)."""
+
+    def __init__(self, number: int, channel: socket.socket) -> None:
+        self.number = number
+        self.channel = channel
+        # The connections to send (the first one may be partially sent).
+        self.queue: Deque[_Forward] = deque()
+        self.offset = 0
+        # The connections sent, but not acknowledged yet.
+        self.sent: Deque[_Forward] = deque()
+
+
+class Router:
+    """
+    A front router, which sends each session's requests to the same worker.
+
+    The router accepts the connections of a listening socket, reads each
+    request (without blocking on slow clients) and sends the connection to
+    a worker over a Unix socket (see :func:`send_connection`), which writes
+    the response directly to the client. Each worker has a queue of
+    connections to send, so a slow worker doesn't block the others. Webhook
+    requests are routed by their session on a consistent hash ring (see
+    :class:`~.HashRing`), so a worker's per-process caches (e.g.: of session
+    state) serve all the turns of a conversation. Requests without a
+    session are spread round-robin.
+
+    When a worker stops, only its sessions move to the remaining workers,
+    and they move back when it's replaced (with the same number). The
+    router keeps its copy of each connection until the worker acknowledges
+    it (see :func:`receive_connection`), so the connections sent to a worker
+    that stops without acknowledging them are sent to the others.
+
+    Examples:
+        Routing the requests of a listening socket to two workers:
+
+            >>> router = Router(listener)
+            >>> router.add_worker(0, channel_0)
+            >>> router.add_worker(1, channel_1)
+            >>> while True:
+            ...     router.poll(0.5)
+
+    Parameters:
+        listener (socket.socket): The listening socket (which the router
+            closes).
+        request_timeout (float): How long (in seconds) clients have to send
+            a request.
+        max_request_size (int): The maximum size (in bytes) of a request.
+    """
+
+    def __init__(
+        self,
+        listener: socket.socket,
+        request_timeout: float = 10.0,
+        max_request_size: int = 16 * 1024 * 1024
+    ) -> None:
+        self.listener = listener
+        self.request_timeout = request_timeout
+        self.max_request_size = max_request_size
+        self.ring = HashRing()
+
+        self._workers: Dict[int, _Worker] = {}
+        self._selector = selectors.DefaultSelector()
+        self._counter = itertools.count()
+
+        listener.setblocking(False)
+        self._selector.register(listener, selectors.EVENT_READ)
+
+    def add_worker(self, worker: int, channel: socket.socket) -> None:
+        """
+        Add (or replace) a worker.
+
+        The previous worker handles the connections already sent to it, and
+        the ones still to be sent go to the new worker.
+
+        Parameters:
+            worker (int): The number of the worker.
+            channel (socket.socket): The worker's Unix socket (which the
+                router closes). The previous socket of the worker is closed.
+        """
+        previous = self._workers.get(worker)
+
+        if previous is not None:
+            self._detach(previous)
+
+            for forward in previous.sent:
+                forward.connection.close()
+
+        channel.setblocking(False)
+        self._workers[worker] = _Worker(worker, channel)
+        self._selector.register(channel, selectors.EVENT_READ,
+                                self._workers[worker])
+        self.ring.add(worker)
+
+        if previous is not None:
+            for forward in previous.queue:
+                self._assign(forward)
+
+    def remove_worker(self, worker: int) -> None:
+        """
+        Remove a worker (e.g.: when it stops), if it wasn't removed.
+
+        The connections the worker didn't acknowledge are sent to the others.
+
+        Parameters:
+            worker (int): The number of the worker.
+        """
+        if worker in self._workers:
+            self._stop(self._workers[worker])
+
+    def poll(self, timeout: Optional[float] = None) -> None:
+        """
+        Accept connections and route the requests received.
+
+        Parameters:
+            timeout (float, optional): How long (in seconds) to wait for
+                connections or requests (forever by default).
+        """
+        for key, events in self._selector.select(timeout):
+            if key.fileobj is self.listener:
+                self._accept()
+            elif isinstance(key.data, _Worker):
+                self._serve_worker(key.data, events)
+            else:
+                self._receive(key.fileobj, key.data)  # type: ignore
+
+        self._expire()
+
+    def close(self) -> None:
+        """Close the listening socket, the connections and the channels."""
+        for worker in list(self._workers.values()):
+            self._detach(worker)
+
+            for forward in (*worker.sent, *worker.queue):
+                forward.connection.close()
+
+        for key in list(self._selector.get_map().values()):
+            key.fileobj.close()  # type: ignore
+
+        self._selector.close()
+
+    def _accept(self) -> None:
+        """Accept the pending connections."""
+        while True:
+            try:
+                connection, _ = self.listener.accept()
+            except BlockingIOError:
+                return
+
+            connection.setblocking(False)
+            self._selector.register(
+                connection,
+                selectors.EVENT_READ,
+                (bytearray(), time.monotonic() + self.request_timeout)
+            )
+
+    def _receive(
+        self,
+        connection: socket.socket,
+        data: Tuple[bytearray, float]
+    ) -> None:
+        """Receive (a part of) the request of a connection."""
+        buffer, _ = data
+
+        try:
+            chunk = connection.recv(65536)
+        except BlockingIOError:
+            return
+        except OSError:
+            chunk = b''
+
+        if not chunk:
+            self._selector.unregister(connection)
+            connection.close()
+
+            return
+
+        buffer += chunk
+
+        if len(buffer) > self.max_request_size:
+            self._reject(connection, _PAYLOAD_TOO_LARGE)
+
+            return
+
+        try:
+            length = request_length(buffer)
+        except ValueError:
+            self._reject(connection, _BAD_REQUEST)
+
+            return
+
+        if length is None:
+            return
+
+        self._selector.unregister(connection)
+        self._route(connection, bytes(buffer[:length]))
+
+    def _route(self, connection: socket.socket, request: bytes) -> None:
+        """Send a connection to the worker of its session."""
+        # The worker's copy of the connection shares its blocking mode.
+        connection.setblocking(True)
+        self._assign(
+            _Forward(connection, _encode(request), session_key(request))
+        )
+
+    def _assign(self, forward: _Forward) -> None:
+        """Queue a connection for the worker of its session."""
+        if not self._workers:
+            try:
+                self._respond(forward.connection, _SERVICE_UNAVAILABLE)
+            finally:
+                forward.connection.close()
+
+            return
+
+        if forward.session is None:
+            workers = sorted(self._workers)
+            number = workers[next(self._counter) % len(workers)]
+        else:
+            number = self.ring.get_node(forward.session)
+
+        worker = self._workers[number]
+        worker.queue.append(forward)
+        self._flush(worker)
+
+    def _flush(self, worker: _Worker) -> None:
+        """Send the queue of a worker (until its socket is full)."""
+        while worker.queue:
+            forward = worker.queue[0]
+            data = memoryview(forward.message)[worker.offset:]
+
+            try:
+                if worker.offset:
+                    sent = worker.channel.send(data)
+                else:
+                    sent = _send_with_connection(worker.channel,
+                                                 forward.connection, data)
+            except BlockingIOError:
+                break
+            except OSError:
+                # The worker stopped (its sessions move to the others).
+                self._stop(worker)
+
+                return
+
+            worker.offset += sent
+
+            if worker.offset == len(forward.message):
+                worker.sent.append(worker.queue.popleft())
+                worker.offset = 0
+
+        events = selectors.EVENT_READ
+
+        if worker.queue:
+            events |= selectors.EVENT_WRITE
+
+        self._selector.modify(worker.channel, events, worker)
+
+    def _serve_worker(self, worker: _Worker, events: int) -> None:
+        """Receive the acknowledgements of a worker and send its queue."""
+        if self._workers.get(worker.number) is not worker:
+            # The worker was removed (while handling an earlier event).
+            return
+
+        if events & selectors.EVENT_READ and not self._read_acks(worker):
+            # The worker stopped (its sessions move to the others).
+            self._stop(worker)
+
+            return
+
+        if events & selectors.EVENT_WRITE:
+            self._flush(worker)
+
+    def _read_acks(self, worker: _Worker) -> bool:
+        """
+        Close the connections a worker acknowledged.
+
+        Returns:
+            bool: Whether the worker is still running (i.e.: its socket
+            isn't closed).
+        """
+        while True:
+            try:
+                acks = worker.channel.recv(4096)
+            except BlockingIOError:
+                return True
+            except OSError:
+                return False
+
+            if not acks:
+                return False
+
+            for _ in range(min(len(acks), len(worker.sent))):
+                worker.sent.popleft().connection.close()
+
+    def _stop(self, worker: _Worker) -> None:
+        """Remove a worker and send its connections to the others."""
+        # The connections the worker acknowledged before it stopped may have
+        # been handled already, so they aren't sent again.
+        self._read_acks(worker)
+        self._detach(worker)
+
+        for forward in (*worker.sent, *worker.queue):
+            self._assign(forward)
+
+    def _detach(self, worker: _Worker) -> None:
+        """Remove a worker (and close its socket)."""
+        del self._workers[worker.number]
+        self.ring.remove(worker.number)
+        self._selector.unregister(worker.channel)
+        worker.channel.close()
+
+    def _reject(self, connection: socket.socket, status: int) -> None:
+        """Respond to an invalid request (and close its connection)."""
+        self._selector.unregister(connection)
+
+        try:
+            self._respond(connection, status)
+        finally:
+            connection.close()
+
+    def _expire(self) -> None:
+        """Close the connections whose requests took too long."""
+        now = time.monotonic()
+
+        for key in list(self._selector.get_map().values()):
+            if isinstance(key.data, tuple) and key.data[1] <= now:
+                self._selector.unregister(key.fileobj)
+                key.fileobj.close()  # type: ignore
+
+    @staticmethod
+    def _respond(connection: socket.socket, status: int) -> None:
+        """Send an error response (without a body)."""
+        response = (
+            f'HTTP/1.0 {status} {_REASONS[status]}\r\n'
+            'Content-Length: 0\r\n'
+            'Connection: close\r\n\r\n'
+        ).encode()
+
+        try:
+            connection.send(response)
+        except OSError:
+            pass
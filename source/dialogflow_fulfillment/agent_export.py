@@ -0,0 +1,331 @@
+import json
+import re
+from os import PathLike
+from typing import (
+    IO,
+    Any,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from .entities import EntityIndex
+from .webhook_client import WebhookClient
+
+_INTENT_FILE = re.compile(r'(?:^|/)intents/(?!.*_usersays_)[^/]+\.json$')
+_ENTITY_FILE = re.compile(r'(?:^|/)entities/(?!.*_entries_)([^/]+)\.json$')
+_ENTRIES_FILE = re.compile(r'(?:^|/)entities/([^/]+)_entries_([^/]+)\.json$')
+_EVENT_PARAMETER = re.compile(r'#([^.]+)\.(.+)')
+
+# The fields of each type of message (by its type in the agent export). Other
+# types (e.g.: Actions on Google's ``simple_response``) aren't supported.
+_MESSAGE_TYPES = {
+    '0': 'text',
+    '1': 'card',
+    '2': 'quickReplies',
+    '3': 'image',
+    '4': 'payload',
+}
+
+
+class Intent(NamedTuple):
+    """An intent of an exported Dialogflow agent."""
+
+    #: str: The (display) name of the intent.
+    name: str
+    #: str, optional: The action of the intent.
+    action: Optional[str]
+    #: tuple(str): The names of the events that trigger the intent.
+    events: Tuple[str, ...]
+    #: bool: Whether the intent is fulfilled by the webhook.
+    webhook_used: bool
+    #: tuple(str): The names of the input contexts.
+    input_contexts: Tuple[str, ...]
+    #: tuple(str): The names of the output contexts.
+    affected_contexts: Tuple[str, ...]
+    #: bool: Whether the intent clears the contexts.
+    reset_contexts: bool
+    #: tuple(dict): The parameters of the intent (as they are in the agent
+    #: export).
+    parameters: Tuple[Dict[str, Any], ...]
+    #: dict(str, tuple(dict)): A mapping of language codes to the response
+    #: message objects of the intent.
+    messages: Dict[str, Tuple[Dict[str, Any], ...]]
+
+    @property
+    def is_local(self) -> bool:
+        """
+        bool: Whether the intent can be matched without Dialogflow.
+
+        That is, the intent is fulfilled by the webhook, it doesn't depend on
+        (nor change) contexts and it doesn't have required parameters.
+        """
+        return self.webhook_used and not any((
+            self.input_contexts,
+            self.affected_contexts,
+            self.reset_contexts,
+            any(parameter.get('required') for parameter in self.parameters),
+        ))
+
+    def get_parameters(self, event: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Get the values of the parameters when the intent is triggered.
+
+        Parameters that reference the event's parameters (e.g.:
+        ``#EVENT_NAME.parameter``) get their values. The remaining parameters
+        are empty (as if Dialogflow couldn't extract them).
+
+        Parameters:
+            event (dict): The event object that triggers the intent.
+
+        Returns:
+            dict: The parameters of the intent.
+        """
+        event_parameters = event.get('parameters', {})
+        parameters = {}
+
+        for parameter in self.parameters:
+            value = ''
+
+            for reference in (parameter.get('value'),
+                              parameter.get('defaultValue')):
+                match = _EVENT_PARAMETER.fullmatch(reference or '')
+
+                if match and match.group(1) == event.get('name'):
+                    value = event_parameters.get(match.group(2), '')
+                    break
+
+            parameters[parameter['name']] = value
+
+        return parameters
+
+    def get_messages(self, locale: Optional[str]) -> List[Dict[str, Any]]:
+        """
+        Get the response message objects of the intent for a language.
+
+        Parameters:
+            locale (str, optional): The language code (e.g.: ``en-US``).
+
+        Returns:
+            list(dict): The response message objects.
+        """
+        locale = (locale or '').lower()
+
+        for language in (locale, locale.split('-', 1)[0]):
+            if language in self.messages:
+                return list(self.messages[language])
+
+        return []
+
+    @classmethod
+    def _from_dict(cls, intent: Dict[str, Any]) -> 'Intent':
+        """Convert an intent object (from an agent export) to an intent."""
+        response = next(iter(intent.get('responses', [])), {})
+        messages: Dict[str, List[Dict[str, Any]]] = {}
+
+        for message in response.get('messages', []):
+            converted = _convert_message(message)
+
+            if converted is not None:
+                language = message.get('lang', '').lower()
+                messages.setdefault(language, []).append(converted)
+
+        return cls(
+            name=intent['name'],
+            action=response.get('action') or None,
+            events=tuple(event['name'] for event in intent.get('events', [])),
+            webhook_used=bool(intent.get('webhookUsed')),
+            input_contexts=tuple(intent.get('contexts', [])),
+            affected_contexts=tuple(
+                context['name']
+                for context in response.get('affectedContexts', [])
+            ),
+            reset_contexts=bool(response.get('resetContexts')),
+            parameters=tuple(response.get('parameters', [])),
+            messages={
+                language: tuple(language_messages)
+                for language, language_messages in messages.items()
+            }
+        )
+
+
+class EntityType(NamedTuple):
+    """A (custom) entity type of an exported Dialogflow agent."""
+
+    #: str: The name of the entity type.
+    name: str
+    #: dict(str, tuple(tuple(str, tuple(str)))): A mapping of language codes to
+    #: the entries of the entity type (each entry is a reference value and its
+    #: synonyms).
+    entries: Dict[str, Tuple[Tuple[str, Tuple[str, ...]], ...]]
+    #: bool: Whether the entries are regular expressions.
+    is_regexp: bool = False
+
+    @classmethod
+    def _from_dict(
+        cls,
+        entity: Dict[str, Any],
+        entries: Dict[str, List[Dict[str, Any]]]
+    ) -> 'EntityType':
+        """Convert an entity object (and its entries) to an entity type."""
+        return cls(
+            name=entity['name'],
+            entries={
+                language.lower(): tuple(
+                    (entry['value'], tuple(entry.get('synonyms', [])))
+                    for entry in language_entries
+                )
+                for language, language_entries in entries.items()
+            },
+            is_regexp=bool(entity.get('isRegexp'))
+        )
+
+
+class AgentExport:
+    """
+    The intents of an exported Dialogflow agent, indexed by name and event.
+
+    Examples:
+        Loading the intents from an agent export (a ZIP file):
+
+            >>> export = AgentExport.from_zip('agent.zip')
+            >>> export.get_event_intent('WELCOME')
+            Intent(name='Default Welcome Intent', ...)
+
+    Parameters:
+        intents (iterable(Intent)): The intents of the agent.
+        entity_types (iterable(EntityType)): The entity types of the agent.
+
+    Attributes:
+        intents (dict(str, Intent)): A mapping of intent names to intents.
+        entity_types (dict(str, EntityType)): A mapping of names to entity
+            types.
+    """
+
+    def __init__(
+        self,
+        intents: Iterable[Intent],
+        entity_types: Iterable[EntityType] = ()
+    ) -> None:
+        self.intents = {intent.name: intent for intent in intents}
+        self.entity_types = {
+            entity_type.name: entity_type for entity_type in entity_types
+        }
+        self._entity_index: Optional[EntityIndex] = None
+        self._event_intents = {
+            event: intent
+            for intent in self.intents.values()
+            for event in intent.events
+        }
+
+    @classmethod
+    def from_zip(cls, file: Union[str, PathLike, IO[bytes]]) -> 'AgentExport':
+        """
+        Load the intents (and the entity types) from an agent export.
+
+        Parameters:
+            file (str, path-like, file-like): The ZIP file exported from
+                Dialogflow's console (or by the ``ExportAgent`` method).
+
+        Returns:
+            :class:`AgentExport`: The intents of the agent.
+        """
+        # The zipfile module is slow to import (and rarely needed).
+        from zipfile import ZipFile
+
+        intents = []
+        entities = {}
+        entries: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+
+        with ZipFile(file) as archive:
+            for name in archive.namelist():
+                entity_match = _ENTITY_FILE.search(name)
+                entries_match = _ENTRIES_FILE.search(name)
+
+                if _INTENT_FILE.search(name):
+                    intents.append(
+                        Intent._from_dict(json.loads(archive.read(name)))
+                    )
+                elif entity_match:
+                    entities[entity_match.group(1)] = json.loads(
+                        archive.read(name)
+                    )
+                elif entries_match:
+                    file_name, language = entries_match.groups()
+                    entries.setdefault(file_name, {})[language] = json.loads(
+                        archive.read(name)
+                    )
+
+        return cls(intents, [
+            EntityType._from_dict(entity, entries.get(file_name, {}))
+            for file_name, entity in entities.items()
+        ])
+
+    @property
+    def entity_index(self) -> EntityIndex:
+        """
+        EntityIndex: The index of the synonyms of the entity types.
+
+        It's built on first access (and shared by the clients, see
+        :meth:`~.Parameters.as_entity`).
+        """  # noqa: D401
+        if self._entity_index is None:
+            self._entity_index = EntityIndex(self.entity_types.values())
+
+        return self._entity_index
+
+    def get_event_intent(self, event: str) -> Optional[Intent]:
+        """
+        Get the intent triggered by an event.
+
+        Parameters:
+            event (str): The name of the event.
+
+        Returns:
+            :class:`Intent`, optional: The intent (if any).
+        """
+        return self._event_intents.get(event)
+
+
+def _convert_message(message: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Convert a message from an agent export to a response message object."""
+    field = _MESSAGE_TYPES.get(str(message.get('type', 0)))
+
+    if field == 'text':
+        speech = message.get('speech', [])
+        content: Dict[str, Any] = {
+            'text': [speech] if isinstance(speech, str) else speech[:1]
+        }
+    elif field == 'card':
+        content = {
+            'title': message.get('title'),
+            'subtitle': message.get('subtitle'),
+            'imageUri': message.get('imageUrl'),
+            'buttons': message.get('buttons'),
+        }
+    elif field == 'quickReplies':
+        content = {
+            'title': message.get('title'),
+            'quickReplies': message.get('replies'),
+        }
+    elif field == 'image':
+        content = {'imageUri': message.get('imageUrl')}
+    elif field == 'payload':
+        content = message.get('payload', {})
+    else:
+        return None
+
+    converted = {field: content}
+
+    # The platforms are named as the sources of the requests (e.g.: google
+    # for ACTIONS_ON_GOOGLE).
+    platform = WebhookClient._get_platform(message.get('platform') or None)
+
+    if platform is not None:
+        converted['platform'] = platform
+
+    return converted
@@ -0,0 +1,343 @@
+import importlib
+import json
+import mmap
+import os
+import time
+from multiprocessing import Pool
+from typing import (
+    IO,
+    Any,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from .dispatcher import Dispatcher
+
+PathLike = Union[str, 'os.PathLike[str]']
+
+_ENCODER = json.JSONEncoder(separators=(',', ':'))
+
+# The dispatcher of the worker processes (see _initialize_worker).
+_dispatcher: Optional[Dispatcher] = None
+
+
+class Timing(NamedTuple):
+    """The timing of the requests of an intent."""
+
+    #: int: The number of requests.
+    count: int = 0
+    #: float: The total time (in seconds) to handle the requests.
+    total: float = 0.0
+    #: float: The longest time (in seconds) to handle a request.
+    max: float = 0.0
+
+    @property
+    def mean(self) -> float:
+        """float: The mean time (in seconds) to handle a request."""
+        return self.total / self.count if self.count else 0.0
+
+    def add(self, elapsed: float) -> 'Timing':
+        """Get the timing with another request."""
+        return Timing(self.count + 1, self.total + elapsed,
+                      max(self.max, elapsed))
+
+    def merge(self, other: 'Timing') -> 'Timing':
+        """Get the timing with the requests of another timing."""
+        return Timing(self.count + other.count, self.total + other.total,
+                      max(self.max, other.max))
+
+
+class ChunkResult(NamedTuple):
+    """The result of replaying the records of a chunk of a file."""
+
+    #: int: The number of replayed records.
+    records: int
+    #: list(dict): The records whose responses differ (or whose requests
+    #: failed).
+    diffs: List[Dict[str, Any]]
+    #: dict(str, Timing): A mapping of intents to timings.
+    timings: Dict[str, Timing]
+
+
+class ReplayReport:
+    """
+    The report of a replay (see :func:`replay`).
+
+    Attributes:
+        records (int): The number of replayed records.
+        diffs (int): The number of records whose responses differ.
+        errors (int): The number of records that couldn't be replayed.
+        timings (dict(str, Timing)): A mapping of intents to timings.
+    """
+
+    def __init__(self) -> None:
+        self.records = 0
+        self.diffs = 0
+        self.errors = 0
+        self.timings: Dict[str, Timing] = {}
+
+    def add(self, result: ChunkResult) -> None:
+        """
+        Add the result of a chunk to the report.
+
+        Parameters:
+            result (ChunkResult): The result of the chunk.
+        """
+        self.records += result.records
+
+        for diff in result.diffs:
+            if 'error' in diff:
+                self.errors += 1
+            else:
+                self.diffs += 1
+
+        for intent, timing in result.timings.items():
+            self.timings[intent] = self.timings.get(intent, Timing()).merge(
+                timing
+            )
+
+    def format(self) -> str:
+        """
+        Format the report as a table of timings by intent.
+
+        Returns:
+            str: The formatted report.
+        """
+        lines = [
+            f'records: {self.records}, diffs: {self.diffs}, '
+            f'errors: {self.errors}',
+            '',
+            f'{"intent":<40} {"count":>8} {"mean (ms)":>10} {"max (ms)":>10}',
+        ]
+        timings = sorted(self.timings.items(), key=lambda item: -item[1].total)
+
+        for intent, timing in timings:
+            lines.append(
+                f'{intent:<40.40} {timing.count:>8} '
+                f'{timing.mean * 1000:>10.3f} {timing.max * 1000:>10.3f}'
+            )
+
+        return '\n'.join(lines)
+
+
+def load_dispatcher(target: str) -> Dispatcher:
+    """
+    Import a dispatcher from a module.
+
+    Parameters:
+        target (str): The module and the name of the dispatcher, separated by
+            a colon (e.g.: ``myapp.webhook:dispatcher``).
+
+    Returns:
+        :class:`~.Dispatcher`: The dispatcher.
+
+    Raises:
+        ValueError: If the target isn't in the ``module:name`` format or the
+            object isn't a dispatcher.
+    """
+    module_name, _, name = target.partition(':')
+
+    if not module_name or not name:
+        raise ValueError(f'invalid target (expected module:name): {target}')
+
+    dispatcher = getattr(importlib.import_module(module_name), name)
+
+    if not isinstance(dispatcher, Dispatcher):
+        raise ValueError(f'{target} is not a dispatcher')
+
+    return dispatcher
+
+
+def split_file(path: PathLike, chunk_size: int) -> List[Tuple[int, int]]:
+    """
+    Split a file in byte ranges.
+
+    The ranges don't take lines into account: each line belongs to the range
+    in which it starts (see :func:`replay_chunk`).
+
+    Parameters:
+        path (str, path-like): The path of the file.
+        chunk_size (int): The size (in bytes) of the ranges.
+
+    Returns:
+        list(tuple(int, int)): The start and the end of each range.
+    """
+    size = os.path.getsize(path)
+
+    return [(start, min(start + chunk_size, size))
+            for start in range(0, size, chunk_size)]
+
+
+def replay_chunk(
+    path: PathLike,
+    start: int,
+    end: int,
+    dispatcher: Optional[Dispatcher] = None
+) -> ChunkResult:
+    """
+    Replay the records (lines) that start within a byte range of a file.
+
+    Each line is either a record (an object with the ``request`` and the
+    ``response`` fields, see :class:`~.Recorder`) or a webhook request (which
+    is replayed without comparing the response).
+
+    Parameters:
+        path (str, path-like): The path of the (JSONL) file.
+        start (int): The start of the byte range.
+        end (int): The end of the byte range.
+        dispatcher (Dispatcher, optional): The dispatcher (the worker's by
+            default).
+
+    Returns:
+        :class:`ChunkResult`: The result of the chunk.
+    """
+    dispatcher = dispatcher or _dispatcher
+    records = 0
+    diffs = []
+    timings: Dict[str, Timing] = {}
+
+    with open(path, 'rb') as file, \
+            mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+        for offset, line in _iter_lines(buf, start, end):
+            records += 1
+
+            try:
+                record = json.loads(line)
+
+                if 'request' in record:
+                    request, expected = record['request'], record['response']
+                else:
+                    request, expected = record, None
+
+                # The recorder (and the pool) of the dispatcher are skipped:
+                # replayed requests must not be recorded again.
+                started = time.perf_counter()
+                agent = dispatcher.create_client(request)
+                response = dispatcher._handle(agent)
+                elapsed = time.perf_counter() - started
+            except Exception as error:
+                diffs.append({'offset': offset, 'error': repr(error)})
+
+                continue
+
+            intent = agent.intent or ''
+            timings[intent] = timings.get(intent, Timing()).add(elapsed)
+
+            if expected is not None and response != expected:
+                diffs.append({
+                    'offset': offset,
+                    'intent': agent.intent,
+                    'expected': expected,
+                    'actual': response,
+                })
+
+    return ChunkResult(records, diffs, timings)
+
+
+def replay(
+    target: str,
+    path: PathLike,
+    diffs_file: IO[str],
+    workers: Optional[int] = None,
+    chunk_size: int = 8 * 1024 * 1024
+) -> ReplayReport:
+    """
+    Replay the recorded requests of a JSONL file with a dispatcher.
+
+    The file is memory-mapped and split in chunks, which are replayed by a
+    pool of processes. Only the results of the chunks being processed are
+    kept in memory: the diffs are written as the chunks are done.
+
+    Parameters:
+        target (str): The dispatcher (``module:name``, see
+            :func:`load_dispatcher`).
+        path (str, path-like): The path of the (uncompressed) JSONL file.
+        diffs_file (file-like): The (text) file where the diffs are written
+            (as JSONL).
+        workers (int, optional): The number of processes (the number of CPUs
+            by default). If it's ``0``, the chunks are replayed in the
+            current process.
+        chunk_size (int): The size (in bytes) of the chunks.
+
+    Returns:
+        :class:`ReplayReport`: The report of the replay.
+
+    Raises:
+        ValueError: If the file is compressed (it can't be memory-mapped).
+    """
+    if str(path).endswith('.gz'):
+        raise ValueError(f'{path} is compressed (decompress it first)')
+
+    report = ReplayReport()
+    chunks = split_file(path, chunk_size)
+
+    for result in _replay_chunks(target, path, chunks, workers):
+        report.add(result)
+
+        for diff in result.diffs:
+            diffs_file.write(_ENCODER.encode(diff) + '\n')
+
+    return report
+
+
+def _replay_chunks(
+    target: str,
+    path: PathLike,
+    chunks: List[Tuple[int, int]],
+    workers: Optional[int]
+) -> Iterator[ChunkResult]:
+    """Replay chunks (in a pool of processes or in the current process)."""
+    if workers == 0:
+        dispatcher = load_dispatcher(target)
+
+        for start, end in chunks:
+            yield replay_chunk(path, start, end, dispatcher)
+
+        return
+
+    with Pool(workers, _initialize_worker, (target,)) as pool:
+        yield from pool.imap_unordered(
+            _replay_chunk_range,
+            [(path, start, end) for start, end in chunks]
+        )
+
+
+def _initialize_worker(target: str) -> None:  # pragma: no cover (workers)
+    """Load the dispatcher of a worker process."""
+    global _dispatcher
+
+    _dispatcher = load_dispatcher(target)
+
+
+def _replay_chunk_range(
+    chunk: Tuple[PathLike, int, int]
+) -> ChunkResult:  # pragma: no cover (runs in the workers)
+    """Replay a chunk (in a worker process)."""
+    return replay_chunk(*chunk)
+
+
+def _iter_lines(
+    buf: mmap.mmap,
+    start: int,
+    end: int
+) -> Iterator[Tuple[int, bytes]]:
+    """Iterate over the (non-blank) lines that start within a byte range."""
+    if start > 0:
+        # The line that contains the start belongs to the previous range.
+        newline = buf.find(b'\n', start - 1)
+        start = newline + 1 if newline >= 0 else len(buf)
+
+    while start < end:
+        newline = buf.find(b'\n', start)
+        line_end = newline if newline >= 0 else len(buf)
+        line = buf[start:line_end]
+
+        if line.strip():
+            yield start, line
+
+        start = line_end + 1
@@ -0,0 +1,365 @@
+import time
+from collections import deque
+from threading import Lock
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .webhook_client import WebhookClient
+
+Handler = Callable[['WebhookClient'], Optional[Any]]
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+
+class CircuitBreaker:
+    """
+    A circuit breaker of the calls to a handler (e.g.: of an intent).
+
+    The outcomes of the calls (whether they failed and whether they were
+    slow) are counted over a rolling window. When the window has enough
+    calls and the rate of failed (or slow) calls reaches its threshold, the
+    breaker opens: the calls are rejected (see :meth:`allow`) for
+    ``open_duration`` seconds. Then, the breaker is half-open: a few
+    calls are let through as probes, and the breaker closes if they all
+    succeed in time (or opens again if one doesn't).
+
+    Examples:
+        Protecting a call to a backend:
+
+            >>> breaker = CircuitBreaker(slow_call_duration=1.0)
+            >>> if breaker.allow():
+            ...     start = time.monotonic()
+            ...     try:
+            ...         get_orders(user_id)
+            ...     except Exception:
+            ...         breaker.record(time.monotonic() - start, failed=True)
+            ...         raise
+            ...     breaker.record(time.monotonic() - start)
+
+    Parameters:
+        failure_rate_threshold (float): The rate of failed calls (between 0
+            and 1) that opens the breaker.
+        slow_call_rate_threshold (float): The rate of slow calls (between 0
+            and 1) that opens the breaker.
+        slow_call_duration (float): How long (in seconds) a call takes to be
+            slow.
+        window (float): The duration (in seconds) of the rolling window.
+        min_calls (int): The minimum number of calls in the window for the
+            breaker to open.
+        open_duration (float): How long (in seconds) the breaker stays open
+            (before it's half-open).
+        half_open_calls (int): The number of calls let through (as probes)
+            while the breaker is half-open.
+        buckets (int): The number of buckets of the rolling window (the
+            window moves a bucket at a time).
+
+    Raises:
+        ValueError: If a threshold isn't between 0 and 1 (or a count isn't
+            positive).
+    """
+
+    def __init__(
+        self,
+        failure_rate_threshold: float = 0.5,
+        slow_call_rate_threshold: float = 0.5,
+        slow_call_duration: float = 3.0,
+        window: float = 60.0,
+        min_calls: int = 10,
+        open_duration: float = 30.0,
+        half_open_calls: int = 3,
+        buckets: int = 10
+    ) -> None:
+        for name, rate in (
+            ('failure_rate_threshold', failure_rate_threshold),
+            ('slow_call_rate_threshold', slow_call_rate_threshold),
+        ):
+            if not 0 < rate <= 1:
+                raise ValueError(f'{name} argument must be between 0 and 1')
+
+        for name, number in (
+            ('min_calls', min_calls),
+            ('half_open_calls', half_open_calls),
+            ('buckets', buckets),
+        ):
+            if number < 1:
+                raise ValueError(f'{name} argument must be positive')
+
+        self.failure_rate_threshold = failure_rate_threshold
+        self.slow_call_rate_threshold = slow_call_rate_threshold
+        self.slow_call_duration = slow_call_duration
+        self.window = window
+        self.min_calls = min_calls
+        self.open_duration = open_duration
+        self.half_open_calls = half_open_calls
+
+        self._bucket_width = window / buckets
+        self._lock = Lock()
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._probes = 0
+        self._probe_successes = 0
+        # The start, the calls, the failed calls and the slow calls of each
+        # bucket of the window (from the oldest to the newest).
+        self._buckets: Deque[List[float]] = deque()
+
+    @property
+    def state(self) -> str:
+        """str: The current state, ``closed``, ``open`` or ``half-open``."""
+        with self._lock:
+            self._update(time.monotonic())
+
+            return self._state
+
+    @property
+    def failure_rate(self) -> float:
+        """float: The rate of failed calls in the window."""
+        return self._rate(2)
+
+    @property
+    def slow_call_rate(self) -> float:
+        """float: The rate of slow calls in the window."""
+        return self._rate(3)
+
+    def allow(self) -> bool:
+        """
+        Decide whether a call is let through.
+
+        A call that is let through must be recorded (see :meth:`record`).
+
+        Returns:
+            bool: Whether the call is let through (if not, its fallback
+            should be used).
+        """
+        with self._lock:
+            self._update(time.monotonic())
+
+            if self._state == CLOSED:
+                return True
+
+            if self._state == OPEN or self._probes >= self.half_open_calls:
+                return False
+
+            self._probes += 1
+
+            return True
+
+    def record(self, duration: float, failed: bool = False) -> None:
+        """
+        Record the outcome of a call.
+
+        Parameters:
+            duration (float): How long (in seconds) the call took.
+            failed (bool): Whether the call failed.
+        """
+        slow = duration >= self.slow_call_duration
+
+        with self._lock:
+            now = time.monotonic()
+            self._update(now)
+
+            if self._state == HALF_OPEN:
+                if failed or slow:
+                    self._open(now)
+                else:
+                    self._probe_successes += 1
+
+                    if self._probe_successes >= self.half_open_calls:
+                        self._close()
+
+                return
+
+            if self._state == OPEN:
+                # A call that started before the breaker opened.
+                return
+
+            calls, failures, slow_calls = self._add(now, failed, slow)
+
+            if calls < self.min_calls:
+                return
+
+            if failures >= self.failure_rate_threshold * calls or \
+                    slow_calls >= self.slow_call_rate_threshold * calls:
+                self._open(now)
+
+    def reset(self) -> None:
+        """Close the breaker (and clear the window)."""
+        with self._lock:
+            self._close()
+
+    def _update(self, now: float) -> None:
+        """Let an open breaker be half-open (after its open duration)."""
+        if self._state == OPEN and now >= self._opened_at + self.open_duration:
+            self._state = HALF_OPEN
+            self._probes = 0
+            self._probe_successes = 0
+
+    def _open(self, now: float) -> None:
+        """Open the breaker."""
+        self._state = OPEN
+        self._opened_at = now
+        self._buckets.clear()
+
+    def _close(self) -> None:
+        """Close the breaker."""
+        self._state = CLOSED
+        self._buckets.clear()
+
+    def _add(
+        self,
+        now: float,
+        failed: bool,
+        slow: bool
+    ) -> List[float]:
+        """Add a call to the window (and get its totals)."""
+        buckets = self._buckets
+
+        while buckets and buckets[0][0] <= now - self.window:
+            buckets.popleft()
+
+        if not buckets or buckets[-1][0] + self._bucket_width <= now:
+            buckets.append([now, 0, 0, 0])
+
+        bucket = buckets[-1]
+        bucket[1] += 1
+        bucket[2] += failed
+        bucket[3] += slow
+
+        return [sum(bucket[index] for bucket in buckets)
+                for index in (1, 2, 3)]
+
+    def _rate(self, index: int) -> float:
+        """Get the rate of a kind of calls (e.g.: failed) in the window."""
+        with self._lock:
+            now = time.monotonic()
+            buckets = [
+                bucket for bucket in self._buckets
+                if bucket[0] > now - self.window
+            ]
+            calls = sum(bucket[1] for bucket in buckets)
+
+            if not calls:
+                return 0.0
+
+            return sum(bucket[index] for bucket in buckets) / calls
+
+
+class CircuitBreakers:
+    """
+    The circuit breakers of the handlers of the intents (of a dispatcher).
+
+    Each intent has its own breaker (see :class:`CircuitBreaker`), so an
+    intent whose dependency fails (or slows down) doesn't tie up the workers
+    that the other intents need: while its breaker is open, the intent's
+    fallback handler is called instead (right away), and intents without a
+    fallback get an empty response (so Dialogflow uses the responses
+    defined in its console).
+
+    Examples:
+        Falling back to a message while the orders backend is down:
+
+            >>> def orders_unavailable(agent):
+            ...     agent.add('Orders are unavailable, try again later.')
+            >>> breakers = CircuitBreakers(
+            ...     fallbacks={'Order Status': orders_unavailable},
+            ...     slow_call_duration=2.0,
+            ... )
+            >>> dispatcher = Dispatcher(handlers, circuit_breakers=breakers)
+
+    Parameters:
+        fallbacks (dict(str, callable), optional): A mapping of intents to
+            their fallback handlers.
+        default_fallback (callable, optional): The fallback handler of the
+            intents without one.
+        **breaker_options: The options of the breakers (see
+            :class:`CircuitBreaker`).
+    """
+
+    def __init__(
+        self,
+        fallbacks: Optional[Mapping[str, Handler]] = None,
+        default_fallback: Optional[Handler] = None,
+        **breaker_options: Any
+    ) -> None:
+        # The options are checked before the first breaker is needed.
+        CircuitBreaker(**breaker_options)
+
+        self.fallbacks = dict(fallbacks or {})
+        self.default_fallback = default_fallback
+        self.breaker_options = breaker_options
+
+        self._lock = Lock()
+        self._breakers: Dict[str, CircuitBreaker] = {}
+
+    @property
+    def states(self) -> Dict[str, str]:
+        """dict(str, str): A mapping of intents to their breakers' states."""
+        with self._lock:
+            breakers = dict(self._breakers)
+
+        return {intent: breaker.state for intent, breaker in breakers.items()}
+
+    def get(self, intent: Optional[str]) -> CircuitBreaker:
+        """
+        Get the breaker of an intent (which is created on first use).
+
+        Parameters:
+            intent (str, optional): The intent.
+
+        Returns:
+            :class:`CircuitBreaker`: The breaker.
+        """
+        key = intent or ''
+        breaker = self._breakers.get(key)
+
+        if breaker is None:
+            with self._lock:
+                # Another thread may have created the breaker in the meantime.
+                breaker = self._breakers.setdefault(
+                    key,
+                    CircuitBreaker(**self.breaker_options)
+                )
+
+        return breaker
+
+    def call(self, agent: 'WebhookClient', handler: Handler) -> None:
+        """
+        Handle a request with a handler (or its fallback).
+
+        Parameters:
+            agent (WebhookClient): The client of the request.
+            handler (callable): The handler of the request's intent.
+
+        Raises:
+            Exception: The exception raised by the handler (which is
+                recorded as a failure).
+        """
+        breaker = self.get(agent.intent)
+
+        if not breaker.allow():
+            fallback = self.fallbacks.get(agent.intent or '',
+                                          self.default_fallback)
+
+            if fallback is not None:
+                agent.handle_request(fallback)
+
+            return
+
+        failed = True
+        start = time.monotonic()
+
+        try:
+            agent.handle_request(handler)
+            failed = False
+        finally:
+            breaker.record(time.monotonic() - start, failed)
@@ -0,0 +1,182 @@
+import json
+from typing import Any, Callable, List, Sequence
+
+from .rich_responses import Card, QuickReplies, RichResponse, Text
+
+CompactionStep = Callable[[List[RichResponse], int], List[RichResponse]]
+
+_ENCODER = json.JSONEncoder(separators=(',', ':'))
+
+_ELLIPSIS = '...'
+
+
+def json_size(obj: Any) -> int:
+    """
+    Get the size (in bytes) of an object serialized as (compact) JSON.
+
+    Parameters:
+        obj (any): A JSON serializable object.
+
+    Returns:
+        int: The size of the serialized object.
+    """
+    return len(_ENCODER.encode(obj))
+
+
+def merge_texts(
+    messages: List[RichResponse],
+    excess: int
+) -> List[RichResponse]:
+    """
+    Merge consecutive text responses (for the same platform) into one.
+
+    Parameters:
+        messages (list(RichResponse)): The response messages.
+        excess (int): How many bytes the response exceeds the budget by.
+
+    Returns:
+        list(RichResponse): The compacted response messages.
+    """
+    compacted: List[RichResponse] = []
+
+    for message in messages:
+        previous = compacted[-1] if compacted else None
+
+        if _are_mergeable(previous, message):
+            compacted[-1] = Text(
+                '\n'.join(text for text in (previous.text, message.text)
+                          if text),
+                platform=message.platform
+            )
+        else:
+            compacted.append(message)
+
+    return compacted
+
+
+def _are_mergeable(previous: Any, message: RichResponse) -> bool:
+    """Check if two consecutive messages are text responses to be merged."""
+    if not isinstance(message, Text) or not isinstance(previous, Text):
+        return False
+
+    return message.platform == previous.platform
+
+
+def deduplicate(
+    messages: List[RichResponse],
+    excess: int
+) -> List[RichResponse]:
+    """
+    Remove the response messages that are identical to previous ones.
+
+    Parameters:
+        messages (list(RichResponse)): The response messages.
+        excess (int): How many bytes the response exceeds the budget by.
+
+    Returns:
+        list(RichResponse): The compacted response messages.
+    """
+    compacted = []
+    seen = set()
+
+    for message in messages:
+        key = json.dumps(message._as_dict(), sort_keys=True)
+
+        if key not in seen:
+            seen.add(key)
+            compacted.append(message)
+
+    return compacted
+
+
+def drop_optional_fields(
+    messages: List[RichResponse],
+    excess: int
+) -> List[RichResponse]:
+    """
+    Remove the optional fields of rich responses.
+
+    The subtitle and the image of cards and the title of quick replies are
+    removed (the original rich responses aren't modified).
+
+    Parameters:
+        messages (list(RichResponse)): The response messages.
+        excess (int): How many bytes the response exceeds the budget by.
+
+    Returns:
+        list(RichResponse): The compacted response messages.
+    """
+    compacted: List[RichResponse] = []
+
+    for message in messages:
+        has_optional_fields = isinstance(message, Card) and any(
+            (message.subtitle, message.image_url)
+        )
+
+        if has_optional_fields:
+            message = Card(
+                title=message.title,
+                buttons=message.buttons,
+                platform=message.platform
+            )
+        elif isinstance(message, QuickReplies) and message.title:
+            message = QuickReplies(
+                quick_replies=message.quick_replies,
+                platform=message.platform
+            )
+
+        compacted.append(message)
+
+    return compacted
+
+
+def truncate(
+    messages: List[RichResponse],
+    excess: int
+) -> List[RichResponse]:
+    """
+    Remove the last response messages until the response fits the budget.
+
+    If the first response message is a text response, it's shortened instead
+    of removed.
+
+    Parameters:
+        messages (list(RichResponse)): The response messages.
+        excess (int): How many bytes the response exceeds the budget by.
+
+    Returns:
+        list(RichResponse): The compacted response messages.
+    """
+    compacted = list(messages)
+
+    while compacted and excess > 0:
+        message = compacted.pop()
+
+        if not compacted and isinstance(message, Text):
+            text = _shorten(message.text or '', excess)
+
+            if text:
+                compacted.append(Text(text, platform=message.platform))
+
+            break
+
+        # The message and the separator between messages.
+        excess -= json_size(message._as_dict()) + 1
+
+    return compacted
+
+
+def _shorten(text: str, excess: int) -> str:
+    """Remove (at least) an amount of bytes from a (serialized) text."""
+    # Every character takes at least one byte once serialized.
+    cut = excess + len(_ELLIPSIS)
+
+    return text[:-cut] + _ELLIPSIS if cut < len(text) else ''
+
+
+DEFAULT_POLICY: Sequence[CompactionStep] = (
+    merge_texts,
+    deduplicate,
+    drop_optional_fields,
+    truncate,
+)
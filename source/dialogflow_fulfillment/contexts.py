@@ -1,4 +1,6 @@
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional
+
+from .compaction import json_size
 
 
 class Context:
@@ -29,6 +31,22 @@ class Context:
         self.input_contexts = self._process_input_contexts(input_contexts)
         self.session = session
         self.contexts = {**self.input_contexts}
+        self._sizes: Dict[str, int] = {}
+
+    def _reset(
+        self,
+        input_contexts: List[Dict[str, Any]],
+        session: str
+    ) -> None:
+        """Replace the input contexts (reusing the containers)."""
+        contexts = self._process_input_contexts(input_contexts)
+
+        self.input_contexts.clear()
+        self.input_contexts.update(contexts)
+        self.session = session
+        self.contexts.clear()
+        self.contexts.update(self.input_contexts)
+        self._sizes.clear()
 
     @staticmethod
     def _process_input_contexts(
@@ -70,6 +88,8 @@ class Context:
         if name not in self.contexts:
             self.contexts[name] = {'name': name}
 
+        self._sizes.pop(name, None)
+
         if lifespan_count is not None:
             self.contexts[name]['lifespanCount'] = lifespan_count
 
@@ -97,6 +117,20 @@ class Context:
         """
         self.set(name, lifespan_count=0)
 
+    @property
+    def size(self) -> int:
+        """
+        int: The size of the output contexts array serialized as JSON.
+
+        Each context is serialized once (until it's set again).
+        """
+        for name, context in self.contexts.items():
+            if name not in self._sizes:
+                self._sizes[name] = json_size(context)
+
+        # The brackets and the separators between contexts.
+        return sum(self._sizes.values()) + max(len(self._sizes) + 1, 2)
+
     def get_output_contexts_array(self) -> List[Dict[str, Any]]:
         """
         Get the output contexts as an array.
@@ -106,20 +140,6 @@ class Context:
         """
         return [*self]
 
-    def __iter__(self) -> 'Context':
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
         """Implement iter(self)."""
-        self._index = 0
-        self._context_array = list(self.contexts.values())
-
-        return self
-
-    def __next__(self) -> Dict[str, Any]:
-        """Implement next(self)."""
-        if self._index >= len(self._context_array):
-            raise StopIteration
-
-        context = self._context_array[self._index]
-
-        self._index += 1
-
-        return context
+        return iter(list(self.contexts.values()))
@@ -0,0 +1,408 @@
+import json
+from threading import Lock
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any, Callable, Dict, Mapping, Optional, Union
+
+from .executors import ExecutorPools
+from .pool import ClientPool
+from .raw_json import BytesLike
+from .tracing import NULL_SPAN
+from .webhook_client import WebhookClient
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .agent_export import AgentExport, Intent
+    from .circuit_breaker import CircuitBreakers
+    from .http_pool import HTTPPool
+    from .profiling import AllocationProfiler, AllocationSample
+    from .recorder import Recorder
+    from .tracing import Span, Tracer
+
+Handler = Callable[[WebhookClient], Optional[Any]]
+
+_ENCODER = json.JSONEncoder(separators=(',', ':'))
+
+
+class RequestError(ValueError):
+    """The error raised when a webhook request is malformed (or invalid)."""
+
+
+class Dispatcher:
+    """
+    A thread-safe object for dispatching webhook requests to handlers.
+
+    A single dispatcher holds the handler functions (and the options for the
+    clients) of an application and can be shared by many threads. Each
+    request is handled by a new, isolated, instance of
+    :class:`~.WebhookClient`.
+
+    Note:
+        The mapping of handlers is never modified in place: registering a
+        handler replaces it with a new mapping (under a lock). Hence,
+        dispatching requests doesn't require any locking.
+
+    Examples:
+        Creating a dispatcher and registering handlers for intents:
+
+            >>> dispatcher = Dispatcher()
+            >>> @dispatcher.register('Default Welcome Intent')
+            ... def welcome_handler(agent):
+            ...     agent.add('Hi!')
+            ...
+
+        Handling a webhook request:
+
+            >>> dispatcher.handle(request)
+            {'fulfillmentMessages': [{'text': {'text': ['Hi!']}}]}
+
+        Handling a webhook request in an event loop (see
+        :meth:`handle_async`):
+
+            >>> await dispatcher.handle_async(request)
+            {'fulfillmentMessages': [{'text': {'text': ['Hi!']}}]}
+
+    Parameters:
+        handlers (dict(str, callable), optional): A mapping of intents to
+            handler functions.
+        default_handler (callable, optional): The handler function for
+            intents without a handler.
+        reuse_clients (bool): Whether to reuse clients (and their objects)
+            across requests of the same thread (see :class:`~.ClientPool`).
+        agent_export (AgentExport, optional): The intents of the agent, for
+            resolving followup events locally (see :meth:`handle`). The
+            index of its entity types is given to the clients (see
+            :meth:`~.Parameters.as_entity`).
+        max_followups (int): The maximum number of followup events resolved
+            locally for a single request.
+        recorder (Recorder, optional): The recorder of the requests and
+            their responses.
+        http_pool (HTTPPool, optional): The pool of HTTP connections of the
+            clients (see :attr:`~.WebhookClient.http`). Adapters create one
+            when they start (if the dispatcher doesn't have one).
+        profiler (AllocationProfiler, optional): The profiler of the memory
+            allocated by the requests (of each intent).
+        tracer (Tracer, optional): The tracer of the requests (and of the
+            handlers, see :meth:`~.WebhookClient.span`).
+        circuit_breakers (CircuitBreakers, optional): The circuit breakers of
+            the handlers of the intents (which call their fallbacks while
+            their breakers are open).
+        executor_pools (ExecutorPools, optional): The executor pools of the
+            intents, in which :meth:`handle_async` runs the handlers (a
+            single pool with the default limits by default).
+        **client_options: The options for the clients (see
+            :class:`~.WebhookClient`).
+    """
+
+    def __init__(
+        self,
+        handlers: Optional[Dict[str, Handler]] = None,
+        default_handler: Optional[Handler] = None,
+        reuse_clients: bool = False,
+        agent_export: Optional['AgentExport'] = None,
+        max_followups: int = 10,
+        recorder: Optional['Recorder'] = None,
+        http_pool: Optional['HTTPPool'] = None,
+        profiler: Optional['AllocationProfiler'] = None,
+        tracer: Optional['Tracer'] = None,
+        circuit_breakers: Optional['CircuitBreakers'] = None,
+        executor_pools: Optional[ExecutorPools] = None,
+        **client_options: Any
+    ) -> None:
+        if agent_export is not None and agent_export.entity_types:
+            client_options.setdefault(
+                'entity_index',
+                agent_export.entity_index
+            )
+
+        self._lock = Lock()
+        self._handlers: Mapping[str, Handler] = MappingProxyType({})
+        self.default_handler = default_handler
+        self.client_options = MappingProxyType(client_options)
+        self._pool = ClientPool(**client_options) if reuse_clients else None
+        self.agent_export = agent_export
+        self.max_followups = max_followups
+        self.recorder = recorder
+        self.http_pool = http_pool
+        self.profiler = profiler
+        self.tracer = tracer
+        self.circuit_breakers = circuit_breakers
+        self.executor_pools = executor_pools or ExecutorPools()
+
+        for intent, handler in (handlers or {}).items():
+            self.register(intent, handler)
+
+    @property
+    def handlers(self) -> Mapping[str, Handler]:
+        """dict(str, callable): A read-only mapping of intents to handlers."""
+        return self._handlers
+
+    def register(
+        self,
+        intent: str,
+        handler: Optional[Handler] = None,
+        pool: Optional[str] = None
+    ) -> Callable[[Handler], Handler]:
+        """
+        Register a handler function for an intent.
+
+        It can be used as a decorator (if the handler isn't given).
+
+        Parameters:
+            intent (str): The name of the intent (exactly as it is in
+                Dialogflow).
+            handler (callable, optional): The handler function.
+            pool (str, optional): The name of the executor pool of the
+                intent (see ``executor_pools``).
+
+        Raises:
+            TypeError: If the handler is not a function.
+            ValueError: If the executor pool is unknown.
+
+        Returns:
+            callable: A decorator that registers the decorated function.
+        """
+        def decorator(handler: Handler) -> Handler:
+            if not callable(handler):
+                raise TypeError('handler argument must be a function')
+
+            if pool is not None:
+                self.executor_pools.assign(intent, pool)
+
+            with self._lock:
+                self._handlers = MappingProxyType(
+                    {**self._handlers, intent: handler}
+                )
+
+            return handler
+
+        if handler is not None:
+            decorator(handler)
+
+        return decorator
+
+    def get_handler(self, intent: Optional[str]) -> Optional[Handler]:
+        """
+        Get the handler function for an intent.
+
+        Parameters:
+            intent (str, optional): The name of the intent.
+
+        Returns:
+            callable, optional: The handler for the intent (or the default
+            handler).
+        """
+        return self._handlers.get(intent, self.default_handler)
+
+    def create_client(
+        self,
+        request: Union[Dict[str, Any], BytesLike]
+    ) -> WebhookClient:
+        """
+        Create a client for a webhook request.
+
+        Parameters:
+            request (dict, bytes, bytearray, memoryview): The webhook request
+                object (or the encoded webhook request object).
+
+        Returns:
+            :class:`~.WebhookClient`: The client for the request.
+        """
+        if isinstance(request, (bytes, bytearray, memoryview)):
+            return WebhookClient.from_bytes(
+                request,
+                http_pool=self.http_pool,
+                tracer=self.tracer,
+                **self.client_options
+            )
+
+        return WebhookClient(
+            request,
+            http_pool=self.http_pool,
+            tracer=self.tracer,
+            **self.client_options
+        )
+
+    def span(
+        self,
+        name: str,
+        **attributes: Any
+    ) -> Union['Span', Any]:
+        """
+        Get a span of a part of a request (e.g.: for adapters).
+
+        Parameters:
+            name (str): The name of the operation.
+            **attributes: The attributes of the operation.
+
+        Returns:
+            :class:`~.Span`: The span (which isn't recorded if the dispatcher
+            doesn't have a ``tracer``).
+        """
+        if self.tracer is None:
+            return NULL_SPAN
+
+        return self.tracer.span(name, **attributes)
+
+    def handle(
+        self,
+        request: Union[Dict[str, Any], BytesLike]
+    ) -> Dict[str, Any]:
+        """
+        Handle a webhook request and get the webhook response.
+
+        If there's no handler for the request's intent, the response is
+        empty (and Dialogflow uses the responses defined in its console).
+
+        If the handler sets a followup event that triggers (according to the
+        agent export) an intent with a handler that doesn't need Dialogflow
+        (see :attr:`~.Intent.is_local`), the intent is handled right away (by
+        the same client) instead of in another webhook request. Hence, the
+        response has the messages of the last intent of the chain.
+
+        Parameters:
+            request (dict, bytes, bytearray, memoryview): The webhook request
+                object (or the encoded webhook request object).
+
+        Returns:
+            dict: The webhook response object.
+
+        Raises:
+            RequestError: If the webhook request is malformed (or invalid).
+                The errors of the handlers are raised as they are.
+        """
+        recorder = self.recorder
+
+        if recorder is None or not recorder.sample():
+            return self._handle_request(request)
+
+        # The request is kept as it is (handlers may change its objects).
+        if isinstance(request, dict):
+            snapshot: Union[str, bytes] = _ENCODER.encode(request)
+        else:
+            snapshot = bytes(request)
+
+        response = self._handle_request(request)
+        recorder.record(snapshot, response)
+
+        return response
+
+    async def handle_async(
+        self,
+        request: Union[Dict[str, Any], BytesLike]
+    ) -> Dict[str, Any]:
+        """
+        Handle a webhook request in an executor pool (see :meth:`handle`).
+
+        The handlers are synchronous, so they run in the executor pool of
+        the request's intent (see ``executor_pools``) without blocking
+        the event loop. The local followups run in the same pool.
+
+        Parameters:
+            request (dict, bytes, bytearray, memoryview): The webhook request
+                object (or the encoded webhook request object).
+
+        Returns:
+            dict: The webhook response object.
+
+        Raises:
+            PoolFullError: If the executor pool can't take more requests.
+            RequestError: If the webhook request is malformed (or invalid).
+        """
+        return await self.executor_pools.select(request).run(
+            self.handle,
+            request
+        )
+
+    def _handle_request(
+        self,
+        request: Union[Dict[str, Any], BytesLike]
+    ) -> Dict[str, Any]:
+        """Handle a webhook request (and profile it, if it's sampled)."""
+        profiler = self.profiler
+
+        if profiler is None or not profiler.sample():
+            return self._handle_with_client(request)
+
+        with profiler.profile() as sample:
+            return self._handle_with_client(request, sample)
+
+    def _handle_with_client(
+        self,
+        request: Union[Dict[str, Any], BytesLike],
+        sample: Optional['AllocationSample'] = None
+    ) -> Dict[str, Any]:
+        """Handle a webhook request with a new (or reused) client."""
+        pool = self._pool
+
+        with self.span('dispatch') as span:
+            with self.span('parse'):
+                try:
+                    if pool is None:
+                        agent = self.create_client(request)
+                    else:
+                        agent = pool.acquire(request)
+                        agent.http_pool = self.http_pool
+                        agent.tracer = self.tracer
+                except (TypeError, ValueError) as error:
+                    raise RequestError(str(error)) from error
+
+            span.set_attribute('intent', agent.intent)
+            span.set_attribute('session', agent.session)
+
+            try:
+                return self._handle(agent, sample)
+            finally:
+                if pool is not None:
+                    pool.release(agent)
+
+    def _handle(
+        self,
+        agent: WebhookClient,
+        sample: Optional['AllocationSample'] = None
+    ) -> Dict[str, Any]:
+        """Handle a webhook request (and its local followups) with a client."""
+        if sample is not None:
+            sample.intent = agent.intent
+
+        followups = 0
+
+        while True:
+            handler = self.get_handler(agent.intent)
+
+            if handler is not None:
+                if self.circuit_breakers is None:
+                    agent.handle_request(handler)
+                else:
+                    self.circuit_breakers.call(agent, handler)
+
+            intent = self._get_followup_intent(agent)
+
+            if intent is None or followups == self.max_followups:
+                with self.span('response'):
+                    return agent.response
+
+            followups += 1
+            agent._follow_up(
+                intent.name,
+                intent.action,
+                intent.get_parameters(agent.followup_event),
+                intent.get_messages(agent.followup_event['languageCode'])
+            )
+
+    def _get_followup_intent(
+        self,
+        agent: WebhookClient
+    ) -> Optional['Intent']:
+        """Get the intent of the followup event (if it's resolved locally)."""
+        if self.agent_export is None or agent.followup_event is None:
+            return None
+
+        intent = self.agent_export.get_event_intent(
+            agent.followup_event['name']
+        )
+
+        if intent is None or not intent.is_local:
+            return None
+
+        return intent if self.get_handler(intent.name) is not None else None
+
+    __call__ = handle
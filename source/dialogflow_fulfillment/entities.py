@@ -0,0 +1,185 @@
+from collections import deque
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple
+
+if TYPE_CHECKING:  # pragma: no cover
+    from .agent_export import EntityType
+
+# A node of a trie: a mapping of characters to nodes (the reference value of
+# the synonym that ends at the node is kept under the empty key).
+TrieNode = Dict[str, Any]
+
+# The key of the reference value in the nodes of a trie.
+_VALUE = ''
+
+
+def normalize_synonym(text: str) -> str:
+    """
+    Normalize a synonym (or a value) for matching.
+
+    Matching is case-insensitive and ignores repeated whitespace (as
+    Dialogflow's matching of entities).
+
+    Parameters:
+        text (str): The text.
+
+    Returns:
+        str: The normalized text.
+    """
+    return ' '.join(text.casefold().split())
+
+
+class EntityIndex:
+    """
+    An index of the synonyms of entity types (e.g.: from an agent export).
+
+    The synonyms of each entity type (and language) are kept in a hash table
+    (for normalizing values in constant time) and in a trie (for matching
+    prefixes). The index is read-only, so it's shared by all clients (and,
+    if it's built before forking, by the worker processes).
+
+    Examples:
+        Normalizing a value of the ``size`` entity type:
+
+            >>> index = AgentExport.from_zip('agent.zip').entity_index
+            >>> index.normalize('size', 'LG', 'en')
+            'large'
+            >>> index.complete('size', 'la', 'en')
+            ['large']
+
+    Parameters:
+        entity_types (iterable(EntityType)): The entity types (the ones with
+            regular expressions are skipped).
+    """
+
+    def __init__(self, entity_types: Iterable['EntityType']) -> None:
+        self._synonyms: Dict[Tuple[str, str], Dict[str, str]] = {}
+        self._tries: Dict[Tuple[str, str], TrieNode] = {}
+
+        for entity_type in entity_types:
+            if entity_type.is_regexp:
+                continue
+
+            for language, entries in entity_type.entries.items():
+                key = (entity_type.name, language)
+                self._synonyms[key], self._tries[key] = self._index(entries)
+
+        self.entity_types = frozenset(name for name, _ in self._synonyms)
+
+    def normalize(
+        self,
+        entity_type: str,
+        text: str,
+        language: Optional[str] = None
+    ) -> Optional[str]:
+        """
+        Get the reference value of a synonym.
+
+        Parameters:
+            entity_type (str): The name of the entity type (with or without
+                the ``@`` prefix).
+            text (str): The synonym (e.g.: the original value of a
+                parameter).
+            language (str, optional): The language code (e.g.: ``en-US``).
+
+        Returns:
+            str, optional: The reference value (if the text is a synonym).
+
+        Raises:
+            ValueError: If there isn't an entity type with the name.
+        """
+        synonyms = self._get(self._synonyms, entity_type, language)
+
+        return synonyms.get(normalize_synonym(text))
+
+    def complete(
+        self,
+        entity_type: str,
+        prefix: str,
+        language: Optional[str] = None,
+        limit: int = 10
+    ) -> List[str]:
+        """
+        Get the reference values of the synonyms that start with a prefix.
+
+        The values of shorter synonyms come first.
+
+        Parameters:
+            entity_type (str): The name of the entity type (with or without
+                the ``@`` prefix).
+            prefix (str): The prefix (e.g.: a partial user input).
+            language (str, optional): The language code (e.g.: ``en-US``).
+            limit (int): The maximum number of reference values.
+
+        Returns:
+            list(str): The reference values.
+
+        Raises:
+            ValueError: If there isn't an entity type with the name.
+        """
+        node = self._get(self._tries, entity_type, language)
+
+        for character in normalize_synonym(prefix):
+            node = node.get(character)
+
+            if node is None:
+                return []
+
+        values: List[str] = []
+        nodes = deque([node])
+
+        while nodes and len(values) < limit:
+            node = nodes.popleft()
+
+            for key, child in node.items():
+                if key != _VALUE:
+                    nodes.append(child)
+                elif child not in values:
+                    values.append(child)
+
+        return values[:limit]
+
+    def _get(
+        self,
+        tables: Dict[Tuple[str, str], Any],
+        entity_type: str,
+        language: Optional[str]
+    ) -> Any:
+        """Get the table (or trie) of an entity type for a language."""
+        name = entity_type[1:] if entity_type.startswith('@') else entity_type
+
+        if name not in self.entity_types:
+            raise ValueError(f'unknown entity type: {entity_type}')
+
+        locale = (language or '').lower()
+
+        for key in ((name, locale), (name, locale.split('-', 1)[0])):
+            if key in tables:
+                return tables[key]
+
+        return {}
+
+    @staticmethod
+    def _index(
+        entries: Iterable[Tuple[str, Tuple[str, ...]]]
+    ) -> Tuple[Dict[str, str], TrieNode]:
+        """Build the hash table and the trie of the entries of a language."""
+        synonyms: Dict[str, str] = {}
+        trie: TrieNode = {}
+
+        for value, entry_synonyms in entries:
+            for synonym in (value, *entry_synonyms):
+                text = normalize_synonym(synonym)
+
+                # The first entry with a synonym wins.
+                if not text or text in synonyms:
+                    continue
+
+                synonyms[text] = value
+                node = trie
+
+                for character in text:
+                    node = node.setdefault(character, {})
+
+                node[_VALUE] = value
+
+        return synonyms, trie
@@ -0,0 +1,285 @@
+import os
+from contextvars import copy_context
+from threading import Lock
+from types import MappingProxyType
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Mapping,
+    Optional,
+    TypeVar,
+    Union,
+)
+
+from .raw_json import BytesLike, get_intent
+
+if TYPE_CHECKING:  # pragma: no cover
+    from concurrent.futures import Future, ThreadPoolExecutor
+
+T = TypeVar('T')
+
+
+class PoolFullError(RuntimeError):
+    """The error raised when an executor pool can't take more calls."""
+
+
+class ExecutorPool:
+    """
+    A pool of threads (with a limited queue) for running handlers.
+
+    Up to ``max_workers`` calls run at the same time and up to
+    ``max_queue`` calls wait for a thread. The threads are started on
+    first use (and again in forked processes).
+
+    Parameters:
+        max_workers (int, optional): The maximum number of threads (by
+            default, as in :class:`concurrent.futures.ThreadPoolExecutor`,
+            the number of CPUs plus 4, up to 32).
+        max_queue (int, optional): The maximum number of calls waiting for a
+            thread (unlimited by default).
+        name (str): The name of the pool, for its errors and the names of its
+            threads (:class:`ExecutorPools` names its pools after their
+            keys).
+
+    Raises:
+        ValueError: If the limits are invalid.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        name: str = 'default'
+    ) -> None:
+        if max_workers is not None and max_workers < 1:
+            raise ValueError('max_workers argument must be positive')
+
+        if max_queue is not None and max_queue < 0:
+            raise ValueError('max_queue argument must not be negative')
+
+        self.max_workers = max_workers or min(32, (os.cpu_count() or 1) + 4)
+        self.max_queue = max_queue
+        self.name = name
+
+        self._lock = Lock()
+        self._executor: Optional['ThreadPoolExecutor'] = None
+        self._pid: Optional[int] = None
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        """int: The number of calls running (or waiting for a thread)."""
+        return self._pending
+
+    def submit(self, function: Callable[..., T], *args: Any) -> 'Future[T]':
+        """
+        Run a function in a thread of the pool.
+
+        The function runs in a copy of the caller's context (e.g.: with its
+        context variables and the current span).
+
+        Parameters:
+            function (callable): The function.
+            *args: The arguments of the function.
+
+        Returns:
+            :class:`concurrent.futures.Future`: The future of the result.
+
+        Raises:
+            PoolFullError: If the threads are busy and the queue is full.
+        """
+        with self._lock:
+            executor = self._get_executor()
+
+            if self.max_queue is not None and \
+                    self._pending >= self.max_workers + self.max_queue:
+                raise PoolFullError(f'executor pool {self.name!r} is full')
+
+            self._pending += 1
+
+        try:
+            future = executor.submit(copy_context().run, function, *args)
+        except RuntimeError:
+            # The pool was shut down (concurrently) after the check.
+            with self._lock:
+                self._pending -= 1
+
+            raise
+
+        future.add_done_callback(self._done)
+
+        return future
+
+    async def run(self, function: Callable[..., T], *args: Any) -> T:
+        """
+        Run a function in a thread of the pool and wait for its result.
+
+        Parameters:
+            function (callable): The function.
+            *args: The arguments of the function.
+
+        Returns:
+            any: The result of the function.
+
+        Raises:
+            PoolFullError: If the threads are busy and the queue is full.
+        """
+        import asyncio
+
+        return await asyncio.wrap_future(self.submit(function, *args))
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop the threads of the pool (which start again on the next call).
+
+        Parameters:
+            wait (bool): Whether to wait for the pending calls.
+        """
+        with self._lock:
+            executor = self._executor
+            self._executor = None
+
+        if executor is not None:
+            executor.shutdown(wait)
+
+    def _get_executor(self) -> 'ThreadPoolExecutor':
+        """Get the threads of the pool (of the current process)."""
+        if self._pid != os.getpid():
+            # The threads (and the calls) of the parent process aren't
+            # inherited by a forked one.
+            self._executor = None
+            self._pending = 0
+            self._pid = os.getpid()
+
+        if self._executor is None:
+            # The concurrent.futures module is slow to import (and it's only
+            # needed by the asynchronous handling).
+            from concurrent.futures import ThreadPoolExecutor
+
+            self._executor = ThreadPoolExecutor(
+                self.max_workers,
+                thread_name_prefix=f'dialogflow-fulfillment-{self.name}'
+            )
+
+        return self._executor
+
+    def _done(self, future: 'Future[Any]') -> None:
+        """Count a call as done."""
+        with self._lock:
+            self._pending -= 1
+
+
+class ExecutorPools:
+    """
+    The executor pools of the intents (of a dispatcher).
+
+    The intents are assigned to named pools (e.g.: a small pool for slow
+    reports), so the calls of an intent can only tie up the threads of its
+    own pool, and the latency of the other intents is isolated from them.
+    The intents without a pool run in the ``default`` pool.
+
+    Examples:
+        Running the reports in a pool of their own:
+
+            >>> pools = ExecutorPools(
+            ...     {'reports': ExecutorPool(max_workers=2, max_queue=8)},
+            ...     intents={'Monthly Report': 'reports'},
+            ... )
+            >>> dispatcher = Dispatcher(handlers, executor_pools=pools)
+
+    Parameters:
+        pools (dict(str, ExecutorPool), optional): A mapping of names to
+            pools.
+        intents (dict(str, str), optional): A mapping of intents to the
+            names of their pools.
+        default (str): The name of the pool of the intents without one (a
+            pool with the default limits is created if there's none).
+
+    Raises:
+        ValueError: If an intent is assigned to an unknown pool.
+    """
+
+    def __init__(
+        self,
+        pools: Optional[Mapping[str, ExecutorPool]] = None,
+        intents: Optional[Mapping[str, str]] = None,
+        default: str = 'default'
+    ) -> None:
+        self.pools = dict(pools or {})
+        self.pools.setdefault(default, ExecutorPool())
+        self.default = default
+
+        for name, pool in self.pools.items():
+            pool.name = name
+
+        self._lock = Lock()
+        self._intents: Mapping[str, str] = MappingProxyType({})
+
+        for intent, name in (intents or {}).items():
+            self.assign(intent, name)
+
+    @property
+    def intents(self) -> Mapping[str, str]:
+        """dict(str, str): A read-only mapping of intents to pool names."""
+        return self._intents
+
+    def assign(self, intent: str, name: str) -> None:
+        """
+        Assign an intent to a pool.
+
+        Parameters:
+            intent (str): The name of the intent.
+            name (str): The name of the pool.
+
+        Raises:
+            ValueError: If there's no pool with the name.
+        """
+        if name not in self.pools:
+            raise ValueError(f'unknown executor pool: {name!r}')
+
+        with self._lock:
+            self._intents = MappingProxyType({**self._intents, intent: name})
+
+    def get(self, intent: Optional[str]) -> ExecutorPool:
+        """
+        Get the pool of an intent.
+
+        Parameters:
+            intent (str, optional): The name of the intent.
+
+        Returns:
+            :class:`ExecutorPool`: The pool of the intent (or the default
+            pool).
+        """
+        return self.pools[self._intents.get(intent or '', self.default)]
+
+    def select(
+        self,
+        request: Union[Dict[str, Any], BytesLike]
+    ) -> ExecutorPool:
+        """
+        Get the pool of a webhook request (decoding only its intent).
+
+        Parameters:
+            request (dict, bytes, bytearray, memoryview): The webhook request
+                object (or the encoded webhook request object).
+
+        Returns:
+            :class:`ExecutorPool`: The pool of the request's intent.
+        """
+        if not self._intents:
+            return self.pools[self.default]
+
+        return self.get(get_intent(request))
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop the threads of the pools.
+
+        Parameters:
+            wait (bool): Whether to wait for the pending calls.
+        """
+        for pool in self.pools.values():
+            pool.shutdown(wait)
@@ -0,0 +1,124 @@
+from bisect import bisect_right
+from hashlib import blake2b
+from typing import Dict, Hashable, Iterable, List
+
+
+def stable_hash(key: str) -> int:
+    """
+    Hash a key (the same way in every process, unlike :func:`hash`).
+
+    Parameters:
+        key (str): The key.
+
+    Returns:
+        int: The 64-bit hash of the key.
+    """
+    return int.from_bytes(
+        blake2b(key.encode(), digest_size=8).digest(),
+        'big'
+    )
+
+
+class HashRing:
+    """
+    A consistent hash ring, which maps keys (e.g.: sessions) to nodes.
+
+    Each node owns many points of the ring (its replicas) and a key belongs
+    to the node of the first point after the key's hash. When a node is
+    removed, only its keys move (to the remaining nodes), and they move back
+    when the node is added again.
+
+    Examples:
+        Mapping sessions to workers:
+
+            >>> ring = HashRing(range(4))
+            >>> ring.get_node('projects/p/agent/sessions/1')
+            2
+
+    Parameters:
+        nodes (iterable(hashable)): The nodes (their string representations
+            must be unique).
+        replicas (int): The number of points of each node.
+    """
+
+    def __init__(self, nodes: Iterable[Hashable] = (), replicas: int = 100):
+        self.replicas = replicas
+        self._nodes: Dict[Hashable, List[int]] = {}
+        self._points: List[int] = []
+        self._owners: List[Hashable] = []
+
+        for node in nodes:
+            self._nodes[node] = self._hash_node(node)
+
+        self._build()
+
+    @property
+    def nodes(self) -> List[Hashable]:
+        """list(hashable): The nodes of the ring."""
+        return list(self._nodes)
+
+    def add(self, node: Hashable) -> None:
+        """
+        Add a node to the ring (if it isn't in the ring).
+
+        Parameters:
+            node (hashable): The node.
+        """
+        if node not in self._nodes:
+            self._nodes[node] = self._hash_node(node)
+            self._build()
+
+    def remove(self, node: Hashable) -> None:
+        """
+        Remove a node from the ring (if it's in the ring).
+
+        Parameters:
+            node (hashable): The node.
+        """
+        if self._nodes.pop(node, None) is not None:
+            self._build()
+
+    def get_node(self, key: str) -> Hashable:
+        """
+        Get the node of a key.
+
+        Parameters:
+            key (str): The key.
+
+        Returns:
+            hashable: The node.
+
+        Raises:
+            LookupError: If the ring is empty.
+        """
+        if not self._points:
+            raise LookupError('the ring has no nodes')
+
+        index = bisect_right(self._points, stable_hash(key))
+
+        return self._owners[index % len(self._owners)]
+
+    def __contains__(self, node: object) -> bool:
+        """Check whether a node is in the ring."""
+        return node in self._nodes
+
+    def __len__(self) -> int:
+        """Get the number of nodes of the ring."""
+        return len(self._nodes)
+
+    def _hash_node(self, node: Hashable) -> List[int]:
+        """Get the points of a node."""
+        return [
+            stable_hash(f'{node}#{replica}')
+            for replica in range(self.replicas)
+        ]
+
+    def _build(self) -> None:
+        """Sort the points of the nodes (after a node is added or removed)."""
+        points = sorted((
+            (point, node)
+            for node, node_points in self._nodes.items()
+            for point in node_points
+        ), key=lambda item: item[0])
+        self._points = [point for point, _ in points]
+        self._owners = [node for _, node in points]
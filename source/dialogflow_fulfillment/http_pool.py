@@ -0,0 +1,448 @@
+import json
+import os
+import socket
+import time
+from collections import deque
+from http.client import (
+    HTTPConnection,
+    HTTPMessage,
+    HTTPSConnection,
+    RemoteDisconnected,
+)
+from threading import BoundedSemaphore, Lock
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Deque,
+    Dict,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+from urllib.parse import urlsplit
+
+if TYPE_CHECKING:  # pragma: no cover
+    from ssl import SSLContext
+
+HostKey = Tuple[str, str, int]
+
+_ENCODER = json.JSONEncoder(separators=(',', ':'))
+
+_DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+# The methods that can be retried on a new connection (when a kept-alive
+# connection was closed by the server).
+_IDEMPOTENT_METHODS = frozenset(
+    ('GET', 'HEAD', 'PUT', 'DELETE', 'OPTIONS', 'TRACE')
+)
+
+# The errors of kept-alive connections closed by the server.
+_STALE_CONNECTION_ERRORS = (
+    RemoteDisconnected,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+
+
+class Response(NamedTuple):
+    """An HTTP response (whose body was read)."""
+
+    #: int: The status code.
+    status: int
+    #: http.client.HTTPMessage: The (case-insensitive) headers.
+    headers: HTTPMessage
+    #: bytes: The body.
+    body: bytes
+
+    def json(self) -> Any:
+        """
+        Decode the body (as JSON).
+
+        Returns:
+            any: The decoded body.
+        """
+        return json.loads(self.body)
+
+
+class HTTPPoolMetrics(NamedTuple):
+    """The metrics of a pool of HTTP connections."""
+
+    #: int: The number of requests.
+    requests: int
+    #: int: The number of requests that failed (including the timeouts).
+    errors: int
+    #: int: The number of requests that timed out.
+    timeouts: int
+    #: int: The number of connections opened.
+    connections_opened: int
+    #: int: The number of requests sent on kept-alive connections.
+    connections_reused: int
+    #: int: The number of connections kept alive.
+    idle_connections: int
+
+
+class _Host:
+    """The connections to a host (and the limit of concurrent requests)."""
+
+    def __init__(self, max_connections: int) -> None:
+        self.slots = BoundedSemaphore(max_connections)
+        self.idle: Deque[Tuple[HTTPConnection, float]] = deque()
+
+
+class HTTPPool:
+    """
+    A thread-safe pool of kept-alive HTTP connections (e.g.: for handlers).
+
+    Connections are kept alive and reused by the next requests to the same
+    host, so the requests don't pay for a new TCP (and TLS) handshake. The
+    number of concurrent requests to each host is limited (the requests
+    wait for a free connection, without going beyond their timeouts).
+
+    Examples:
+        Getting a JSON object from an internal API:
+
+            >>> pool = HTTPPool(max_connections_per_host=4)
+            >>> pool.request('GET', 'http://orders.internal/orders/1').json()
+            {'id': 1, 'status': 'shipped'}
+
+    Parameters:
+        max_connections_per_host (int): The maximum number of concurrent
+            requests (and of connections) to each host.
+        timeout (float): The default timeout (in seconds) of the requests.
+        max_idle_time (float): How long (in seconds) an idle connection is
+            kept alive (it should be shorter than the servers' keep-alive
+            timeouts).
+        ssl_context (ssl.SSLContext, optional): The context of the HTTPS
+            connections (the default context by default).
+    """
+
+    def __init__(
+        self,
+        max_connections_per_host: int = 10,
+        timeout: float = 5.0,
+        max_idle_time: float = 4.0,
+        ssl_context: Optional['SSLContext'] = None
+    ) -> None:
+        self.max_connections_per_host = max_connections_per_host
+        self.timeout = timeout
+        self.max_idle_time = max_idle_time
+        self.ssl_context = ssl_context
+
+        self._lock = Lock()
+        self._hosts: Dict[HostKey, _Host] = {}
+        self._pid = os.getpid()
+        self._requests = 0
+        self._errors = 0
+        self._timeouts = 0
+        self._connections_opened = 0
+        self._connections_reused = 0
+
+    @property
+    def metrics(self) -> HTTPPoolMetrics:
+        """HTTPPoolMetrics: A snapshot of the metrics of the pool."""
+        with self._lock:
+            return HTTPPoolMetrics(
+                requests=self._requests,
+                errors=self._errors,
+                timeouts=self._timeouts,
+                connections_opened=self._connections_opened,
+                connections_reused=self._connections_reused,
+                idle_connections=sum(
+                    len(host.idle) for host in self._hosts.values()
+                )
+            )
+
+    def session(self, deadline: Optional[float] = None) -> 'HTTPSession':
+        """
+        Get a session whose requests don't go beyond a deadline.
+
+        Parameters:
+            deadline (float, optional): The deadline (according to
+                :func:`time.monotonic`) of the requests.
+
+        Returns:
+            :class:`HTTPSession`: The session.
+        """
+        return HTTPSession(self, deadline)
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        body: Optional[Union[bytes, str]] = None,
+        headers: Optional[Dict[str, str]] = None,
+        json: Any = None,
+        timeout: Optional[float] = None,
+        deadline: Optional[float] = None
+    ) -> Response:
+        """
+        Send an HTTP request on a kept-alive connection (if possible).
+
+        Parameters:
+            method (str): The method (e.g.: ``GET``).
+            url (str): The URL (``http`` or ``https``).
+            body (bytes, str, optional): The body.
+            headers (dict(str, str), optional): The headers.
+            json (any, optional): An object to be sent as a JSON body
+                (instead of the body).
+            timeout (float, optional): The timeout (in seconds) of the
+                request (the pool's timeout by default).
+            deadline (float, optional): When (according to
+                :func:`time.monotonic`) the request times out, if it's
+                earlier than the timeout.
+
+        Returns:
+            :class:`Response`: The response.
+
+        Raises:
+            ValueError: If the URL isn't an HTTP(S) URL.
+            TimeoutError: If the request times out (e.g.: waiting for a free
+                connection to the host).
+            OSError: If the connection fails.
+        """
+        parts = urlsplit(url)
+        scheme = parts.scheme.lower()
+
+        if scheme not in _DEFAULT_PORTS or not parts.hostname:
+            raise ValueError(f'invalid URL (expected http or https): {url}')
+
+        key = (scheme, parts.hostname, parts.port or _DEFAULT_PORTS[scheme])
+        path = parts.path or '/'
+
+        if parts.query:
+            path = f'{path}?{parts.query}'
+
+        headers = dict(headers or {})
+
+        if json is not None:
+            body = _ENCODER.encode(json).encode()
+            headers.setdefault('Content-Type', 'application/json')
+
+        expires = time.monotonic() + (
+            self.timeout if timeout is None else timeout
+        )
+
+        if deadline is not None:
+            expires = min(expires, deadline)
+
+        with self._lock:
+            self._requests += 1
+
+        try:
+            return self._send(key, method.upper(), path, body, headers,
+                              expires)
+        except TimeoutError:
+            with self._lock:
+                self._errors += 1
+                self._timeouts += 1
+
+            raise
+        except Exception:
+            with self._lock:
+                self._errors += 1
+
+            raise
+
+    def close(self) -> None:
+        """
+        Close the idle connections.
+
+        The pool can still be used (e.g.: by the requests being handled),
+        but it should be closed when the application stops.
+        """
+        with self._lock:
+            hosts = list(self._hosts.values())
+
+        for host in hosts:
+            while True:
+                try:
+                    connection, _ = host.idle.popleft()
+                except IndexError:
+                    break
+
+                connection.close()
+
+    def __enter__(self) -> 'HTTPPool':
+        """Use the pool as a context manager (that closes it)."""
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Close the pool."""
+        self.close()
+
+    def _get_host(self, key: HostKey) -> _Host:
+        """Get the connections to a host."""
+        with self._lock:
+            if self._pid != os.getpid():
+                # The process was forked: the connections (and the locks)
+                # belong to the parent.
+                self._hosts = {}
+                self._pid = os.getpid()
+
+            host = self._hosts.get(key)
+
+            if host is None:
+                host = self._hosts[key] = _Host(self.max_connections_per_host)
+
+            return host
+
+    def _send(
+        self,
+        key: HostKey,
+        method: str,
+        path: str,
+        body: Optional[Union[bytes, str]],
+        headers: Dict[str, str],
+        expires: float
+    ) -> Response:
+        """Send a request on a connection to a host."""
+        host = self._get_host(key)
+        timeout = expires - time.monotonic()
+
+        if timeout <= 0 or not host.slots.acquire(timeout=timeout):
+            raise TimeoutError(f'no free connection to {key[1]}:{key[2]}')
+
+        try:
+            while True:
+                connection, reused = self._get_connection(key, host)
+
+                try:
+                    return self._exchange(connection, host, method, path,
+                                          body, headers, expires)
+                except _STALE_CONNECTION_ERRORS:
+                    connection.close()
+
+                    # The server closed the kept-alive connection (before
+                    # reading the request, if it's retried).
+                    if not reused or method not in _IDEMPOTENT_METHODS:
+                        raise
+                except BaseException:
+                    connection.close()
+
+                    raise
+        finally:
+            host.slots.release()
+
+    def _get_connection(
+        self,
+        key: HostKey,
+        host: _Host
+    ) -> Tuple[HTTPConnection, bool]:
+        """Get an idle connection to a host (or a new one)."""
+        now = time.monotonic()
+
+        while True:
+            try:
+                connection, idle_since = host.idle.pop()
+            except IndexError:
+                break
+
+            if now - idle_since < self.max_idle_time:
+                with self._lock:
+                    self._connections_reused += 1
+
+                return connection, True
+
+            connection.close()
+
+        scheme, hostname, port = key
+
+        if scheme == 'https':
+            connection = HTTPSConnection(
+                hostname,
+                port,
+                context=self.ssl_context
+            )
+        else:
+            connection = HTTPConnection(hostname, port)
+
+        with self._lock:
+            self._connections_opened += 1
+
+        return connection, False
+
+    def _exchange(
+        self,
+        connection: HTTPConnection,
+        host: _Host,
+        method: str,
+        path: str,
+        body: Optional[Union[bytes, str]],
+        headers: Dict[str, str],
+        expires: float
+    ) -> Response:
+        """Send a request and read its response (and keep the connection)."""
+        timeout = expires - time.monotonic()
+
+        if timeout <= 0:
+            raise TimeoutError('the request timed out')
+
+        connection.timeout = timeout
+
+        if connection.sock is not None:
+            connection.sock.settimeout(timeout)
+
+        try:
+            connection.request(method, path, body, headers)
+            response = connection.getresponse()
+            content = response.read()
+        except socket.timeout as error:
+            raise TimeoutError('the request timed out') from error
+
+        if response.will_close:
+            connection.close()
+        else:
+            host.idle.append((connection, time.monotonic()))
+
+        return Response(response.status, response.headers, content)
+
+
+class HTTPSession:
+    """
+    The requests of a pool of HTTP connections with a deadline.
+
+    Examples:
+        Calling an internal API from a handler (see
+        :attr:`~.WebhookClient.http`):
+
+            >>> def handler(agent):
+            ...     order = agent.http.get(f'{ORDERS_API}/orders/1').json()
+
+    Parameters:
+        pool (HTTPPool): The pool of HTTP connections.
+        deadline (float, optional): When (according to
+            :func:`time.monotonic`) the requests time out.
+    """
+
+    def __init__(
+        self,
+        pool: HTTPPool,
+        deadline: Optional[float] = None
+    ) -> None:
+        self.pool = pool
+        self.deadline = deadline
+
+    def request(self, method: str, url: str, **kwargs: Any) -> Response:
+        """
+        Send an HTTP request with the pool (see :meth:`HTTPPool.request`).
+
+        Parameters:
+            method (str): The method (e.g.: ``GET``).
+            url (str): The URL.
+            **kwargs: The remaining arguments of the request (e.g.:
+                ``json`` and ``timeout``).
+
+        Returns:
+            :class:`Response`: The response.
+        """
+        return self.pool.request(method, url, deadline=self.deadline,
+                                 **kwargs)
+
+    def get(self, url: str, **kwargs: Any) -> Response:
+        """Send a ``GET`` request (see :meth:`request`)."""
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> Response:
+        """Send a ``POST`` request (see :meth:`request`)."""
+        return self.request('POST', url, **kwargs)
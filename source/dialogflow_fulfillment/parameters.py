@@ -0,0 +1,418 @@
+import re
+from functools import lru_cache
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from datetime import date, datetime, time
+
+    from .entities import EntityIndex
+
+Number = Union[int, float]
+
+# Languages that use a comma as the decimal separator.
+_DECIMAL_COMMA_LANGUAGES = frozenset((
+    'ca', 'cs', 'da', 'de', 'el', 'es', 'fi', 'fr', 'id', 'it', 'nl', 'no',
+    'pl', 'pt', 'ro', 'ru', 'sv', 'tr', 'uk', 'vi',
+))
+
+_DATE_TIME_KEYS = ('date_time', 'dateTime')
+_PERIOD_KEYS = (
+    ('startDateTime', 'endDateTime'),
+    ('startDate', 'endDate'),
+    ('startTime', 'endTime'),
+)
+
+
+class Quantity(NamedTuple):
+    """An amount with a unit (e.g.: from ``sys.unit-currency`` parameters)."""
+
+    #: int, float: The amount.
+    amount: Number
+    #: str: The unit (or the currency code) of the amount.
+    unit: Optional[str]
+
+
+class Parameters(dict):
+    """
+    A mapping of parameter names to values with typed accessors.
+
+    It behaves exactly as the dictionary of parameters extracted by Dialogflow
+    but it also provides methods for converting the (raw) values of system
+    entities to Python types. Each conversion is done on first access and the
+    result is kept for later accesses (as long as the raw value isn't
+    replaced).
+
+    Examples:
+        Accessing a ``sys.number`` parameter:
+
+            >>> agent.parameters['quantity']
+            '1.5'
+            >>> agent.parameters.as_number('quantity')
+            1.5
+
+        Accessing a ``sys.date-time`` parameter:
+
+            >>> agent.parameters.as_datetime('when')
+            datetime.datetime(2023, 1, 19, 12, 0, tzinfo=datetime.timezone(datetime.timedelta(days=-1, seconds=75600)))
+
+        Normalizing the original value of a custom entity parameter:
+
+            >>> agent.parameters['size.original']
+            'LG'
+            >>> agent.parameters.as_entity('size.original', '@size')
+            'large'
+
+    Parameters:
+        parameters (dict, optional): The parameters extracted by Dialogflow.
+        locale (str, optional): The language code of the request (used for
+            parsing numbers written as text).
+        entity_index (EntityIndex, optional): The index of the synonyms of
+            the custom entity types (see :meth:`as_entity`).
+    """  # noqa: E501
+
+    def __init__(
+        self,
+        parameters: Optional[Dict[str, Any]] = None,
+        locale: Optional[str] = None,
+        entity_index: Optional['EntityIndex'] = None
+    ) -> None:
+        super().__init__()
+
+        self.entity_index = entity_index
+        self._converted: Dict[Tuple[str, str], Tuple[Any, Any]] = {}
+        self._reset(parameters or {}, locale)
+
+    def _reset(
+        self,
+        parameters: Dict[str, Any],
+        locale: Optional[str]
+    ) -> None:
+        """Replace the parameters (and forget the converted values)."""
+        self.clear()
+        self.update(parameters)
+        self._converted.clear()
+
+        self.locale = locale
+        self._parse_number = _number_parser(locale)
+
+    def as_number(
+        self,
+        name: str,
+        default: Optional[Number] = None
+    ) -> Optional[Number]:
+        """
+        Get a parameter as a number (e.g.: ``sys.number``).
+
+        Parameters:
+            name (str): The name of the parameter.
+            default (int, float, optional): The value to return if the
+                parameter is missing or empty.
+
+        Returns:
+            int, float, optional: The value of the parameter.
+
+        Raises:
+            ValueError: If the value can't be converted to a number.
+        """
+        return self._convert('number', name, self._parse_number, default)
+
+    def as_datetime(
+        self,
+        name: str,
+        default: Optional['datetime'] = None
+    ) -> Optional['datetime']:
+        """
+        Get a parameter as a datetime (e.g.: ``sys.date-time``).
+
+        Parameters:
+            name (str): The name of the parameter.
+            default (datetime.datetime, optional): The value to return if
+                the parameter is missing or empty.
+
+        Returns:
+            datetime.datetime, optional: The value of the parameter.
+
+        Raises:
+            ValueError: If the value can't be converted to a datetime.
+        """
+        return self._convert('datetime', name, _parse_datetime, default)
+
+    def as_date(
+        self,
+        name: str,
+        default: Optional['date'] = None
+    ) -> Optional['date']:
+        """
+        Get a parameter as a date (e.g.: ``sys.date``).
+
+        Parameters:
+            name (str): The name of the parameter.
+            default (datetime.date, optional): The value to return if the
+                parameter is missing or empty.
+
+        Returns:
+            datetime.date, optional: The value of the parameter.
+
+        Raises:
+            ValueError: If the value can't be converted to a date.
+        """
+        return self._convert('date', name, _parse_date, default)
+
+    def as_time(
+        self,
+        name: str,
+        default: Optional['time'] = None
+    ) -> Optional['time']:
+        """
+        Get a parameter as a time (e.g.: ``sys.time``).
+
+        Parameters:
+            name (str): The name of the parameter.
+            default (datetime.time, optional): The value to return if the
+                parameter is missing or empty.
+
+        Returns:
+            datetime.time, optional: The value of the parameter.
+
+        Raises:
+            ValueError: If the value can't be converted to a time.
+        """
+        return self._convert('time', name, _parse_time, default)
+
+    def as_period(
+        self,
+        name: str,
+        default: Optional[Tuple['datetime', 'datetime']] = None
+    ) -> Optional[Tuple['datetime', 'datetime']]:
+        """
+        Get a parameter as a pair of datetimes (e.g.: ``sys.date-period``).
+
+        Parameters:
+            name (str): The name of the parameter.
+            default (tuple(datetime.datetime, datetime.datetime), optional):
+                The value to return if the parameter is missing or empty.
+
+        Returns:
+            tuple(datetime.datetime, datetime.datetime), optional: The start
+            and the end of the period.
+
+        Raises:
+            ValueError: If the value can't be converted to a period.
+        """
+        return self._convert('period', name, _parse_period, default)
+
+    def as_quantity(
+        self,
+        name: str,
+        default: Optional[Quantity] = None
+    ) -> Optional[Quantity]:
+        """
+        Get a parameter as an amount with a unit (e.g.: ``sys.unit-currency``).
+
+        Parameters:
+            name (str): The name of the parameter.
+            default (Quantity, optional): The value to return if the
+                parameter is missing or empty.
+
+        Returns:
+            :class:`Quantity`, optional: The value of the parameter.
+
+        Raises:
+            ValueError: If the value can't be converted to a quantity.
+        """
+        return self._convert('quantity', name, self._parse_quantity, default)
+
+    def as_list(
+        self,
+        name: str,
+        default: Optional[List[Any]] = None
+    ) -> Optional[List[Any]]:
+        """
+        Get a parameter as a list (e.g.: parameters that can be lists).
+
+        A single value is wrapped in a list.
+
+        Parameters:
+            name (str): The name of the parameter.
+            default (list, optional): The value to return if the parameter is
+                missing or empty.
+
+        Returns:
+            list, optional: The value of the parameter.
+        """
+        return self._convert('list', name, _to_list, default)
+
+    def as_entity(
+        self,
+        name: str,
+        entity_type: str,
+        default: Optional[Union[str, List[str]]] = None
+    ) -> Optional[Union[str, List[str]]]:
+        """
+        Get a parameter as the reference value of a custom entity type.
+
+        The value (e.g.: a synonym or the original value of the parameter)
+        is looked up in the ``entity_index`` (in constant time). The
+        values of list parameters are normalized one by one.
+
+        Parameters:
+            name (str): The name of the parameter (e.g.: ``size.original``).
+            entity_type (str): The name of the entity type (e.g.:
+                ``@size``).
+            default (str, list(str), optional): The value to return if the
+                parameter is missing or empty.
+
+        Returns:
+            str, list(str), optional: The reference value (or values) of the
+            parameter.
+
+        Raises:
+            RuntimeError: If there isn't an index of entity types.
+            ValueError: If the value isn't a synonym of the entity type (or
+                the entity type doesn't exist).
+        """
+        if self.entity_index is None:
+            raise RuntimeError('the parameters have no index of entity types')
+
+        index = self.entity_index
+        locale = self.locale
+
+        def normalize(value: Any) -> str:
+            reference_value = index.normalize(entity_type, str(value), locale)
+
+            if reference_value is None:
+                raise ValueError(f'invalid {entity_type} value: {value!r}')
+
+            return reference_value
+
+        def convert(value: Any) -> Union[str, List[str]]:
+            if isinstance(value, list):
+                return [normalize(item) for item in value]
+
+            return normalize(value)
+
+        return self._convert(f'entity:{entity_type}', name, convert, default)
+
+    def _convert(
+        self,
+        kind: str,
+        name: str,
+        converter: Callable[[Any], Any],
+        default: Any
+    ) -> Any:
+        """Convert a parameter (or get the already converted value)."""
+        raw_value = self.get(name)
+
+        if raw_value is None or raw_value == '' or raw_value == []:
+            return default
+
+        cached = self._converted.get((kind, name))
+
+        if cached is not None and cached[0] is raw_value:
+            return cached[1]
+
+        value = converter(raw_value)
+        self._converted[(kind, name)] = (raw_value, value)
+
+        return value
+
+    def _parse_quantity(self, value: Any) -> Quantity:
+        """Convert a ``sys.unit-*`` value to a quantity."""
+        if not isinstance(value, dict) or 'amount' not in value:
+            raise ValueError(f'invalid quantity: {value!r}')
+
+        return Quantity(
+            self._parse_number(value['amount']),
+            value.get('unit', value.get('currency'))
+        )
+
+
+@lru_cache(maxsize=None)
+def _number_parser(locale: Optional[str]) -> Callable[[Any], Number]:
+    """Build (once per locale) a function that converts values to numbers."""
+    language = (locale or '').split('-', 1)[0].lower()
+
+    if language in _DECIMAL_COMMA_LANGUAGES:
+        group, decimal = '.', ','
+    else:
+        group, decimal = ',', '.'
+
+    pattern = re.compile(
+        rf'[+-]?(?:\d{{1,3}}(?:\{group}\d{{3}})+|\d+)(?:\{decimal}\d+)?'
+    )
+
+    def parse_number(value: Any) -> Number:
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return value
+
+        text = str(value).strip()
+
+        if not pattern.fullmatch(text):
+            raise ValueError(f'invalid number: {value!r}')
+
+        text = text.replace(group, '')
+
+        if decimal not in text:
+            return int(text)
+
+        return float(text.replace(decimal, '.'))
+
+    return parse_number
+
+
+def _parse_datetime(value: Any) -> 'datetime':
+    """Convert a ``sys.date-time`` value to a datetime."""
+    if isinstance(value, dict):
+        value = next(
+            (value[key] for key in _DATE_TIME_KEYS if key in value),
+            value
+        )
+
+    if not isinstance(value, str):
+        raise ValueError(f'invalid datetime: {value!r}')
+
+    if value.endswith('Z'):
+        value = value[:-1] + '+00:00'
+
+    # The datetime module is only needed for these parameters.
+    from datetime import datetime
+
+    return datetime.fromisoformat(value)
+
+
+def _parse_date(value: Any) -> 'date':
+    """Convert a ``sys.date`` value to a date."""
+    return _parse_datetime(value).date()
+
+
+def _parse_time(value: Any) -> 'time':
+    """Convert a ``sys.time`` value to a time."""
+    return _parse_datetime(value).timetz()
+
+
+def _parse_period(value: Any) -> Tuple['datetime', 'datetime']:
+    """Convert a ``sys.*-period`` value to a pair of datetimes."""
+    if isinstance(value, dict):
+        for start_key, end_key in _PERIOD_KEYS:
+            if start_key in value and end_key in value:
+                return (
+                    _parse_datetime(value[start_key]),
+                    _parse_datetime(value[end_key]),
+                )
+
+    raise ValueError(f'invalid period: {value!r}')
+
+
+def _to_list(value: Any) -> List[Any]:
+    """Wrap a single value in a list."""
+    return value if isinstance(value, list) else [value]
@@ -0,0 +1,108 @@
+from contextlib import contextmanager
+from threading import local
+from typing import Any, Dict, Iterator, List, Union
+
+from .raw_json import BytesLike
+from .webhook_client import WebhookClient
+
+
+class ClientPool:
+    """
+    A pool of reusable clients (kept separately for each thread).
+
+    Acquiring a client from the pool resets one of the current thread's free
+    clients (see :meth:`~.WebhookClient.reset`) instead of creating a new one,
+    so the client's objects and containers are reused across requests.
+
+    Examples:
+        Handling a webhook request with a client from the pool:
+
+            >>> pool = ClientPool()
+            >>> with pool.client(request) as agent:
+            ...     agent.handle_request(handler)
+            ...     response = agent.response
+
+    Parameters:
+        size (int): The maximum number of free clients kept for each thread.
+        **client_options: The options for the clients (see
+            :class:`~.WebhookClient`).
+    """
+
+    def __init__(self, size: int = 1, **client_options: Any) -> None:
+        self.size = size
+        self.client_options = client_options
+        self._local = local()
+
+    @property
+    def _free_clients(self) -> List[WebhookClient]:
+        """list(WebhookClient): The current thread's free clients."""
+        try:
+            return self._local.free_clients
+        except AttributeError:
+            self._local.free_clients = []
+
+            return self._local.free_clients
+
+    def acquire(
+        self,
+        request: Union[Dict[str, Any], BytesLike]
+    ) -> WebhookClient:
+        """
+        Get a client for a webhook request.
+
+        Parameters:
+            request (dict, bytes, bytearray, memoryview): The webhook request
+                object (or the encoded webhook request object).
+
+        Returns:
+            :class:`~.WebhookClient`: A client (reused, if possible) for the
+            request.
+        """
+        free_clients = self._free_clients
+
+        if free_clients:
+            client = free_clients.pop()
+            client.reset(request)
+
+            return client
+
+        if isinstance(request, (bytes, bytearray, memoryview)):
+            return WebhookClient.from_bytes(request, **self.client_options)
+
+        return WebhookClient(request, **self.client_options)
+
+    def release(self, client: WebhookClient) -> None:
+        """
+        Give a client back to the pool.
+
+        The client (and its objects) must not be used after it's released.
+
+        Parameters:
+            client (WebhookClient): A client acquired from the pool.
+        """
+        free_clients = self._free_clients
+
+        if len(free_clients) < self.size:
+            free_clients.append(client)
+
+    @contextmanager
+    def client(
+        self,
+        request: Union[Dict[str, Any], BytesLike]
+    ) -> Iterator[WebhookClient]:
+        """
+        Get a client that is given back to the pool after it's used.
+
+        Parameters:
+            request (dict, bytes, bytearray, memoryview): The webhook request
+                object (or the encoded webhook request object).
+
+        Yields:
+            :class:`~.WebhookClient`: A client for the request.
+        """
+        client = self.acquire(request)
+
+        try:
+            yield client
+        finally:
+            self.release(client)
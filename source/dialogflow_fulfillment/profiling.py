@@ -0,0 +1,393 @@
+import random
+import tracemalloc
+from contextlib import contextmanager
+from threading import Lock
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+SiteKey = Tuple[str, int]
+
+# The samples, the total net, the maximum peak and the sizes and counts of
+# the sites of an intent.
+_IntentStats = Tuple[int, int, int, Dict[SiteKey, List[int]]]
+
+# Whether the peak of the traced memory can be reset (Python 3.9+), which is
+# needed when the tracing was started by someone else.
+_RESETS_PEAK = hasattr(tracemalloc, 'reset_peak')
+
+# The allocations of the profiler itself (and of tracemalloc) are ignored.
+_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, __file__),
+)
+
+
+class AllocationSite(NamedTuple):
+    """The memory allocated by a line of code."""
+
+    #: str: The file of the line.
+    filename: str
+    #: int: The number of the line.
+    lineno: int
+    #: int: The size (in bytes) of the memory still allocated.
+    size: int
+    #: int: The number of the blocks still allocated.
+    count: int
+
+    def __str__(self) -> str:
+        """Format the site (e.g.: for a report)."""
+        return (f'{self.filename}:{self.lineno}: '
+                f'{_format_size(self.size)} in {self.count} blocks')
+
+
+class IntentAllocations(NamedTuple):
+    """The allocations of the profiled requests of an intent."""
+
+    #: int: The number of profiled requests.
+    samples: int = 0
+    #: int: The memory (in bytes) still allocated after the requests (summed).
+    total_net: int = 0
+    #: int: The largest peak of memory (in bytes) allocated by a request.
+    max_peak: int = 0
+    #: tuple(AllocationSite): The sites that allocated the most memory (summed
+    #: over the requests).
+    sites: Tuple[AllocationSite, ...] = ()
+
+    @property
+    def mean_net(self) -> float:
+        """float: The mean memory (in bytes) still allocated by a request."""
+        return self.total_net / self.samples if self.samples else 0.0
+
+
+class AllocationSample:
+    """
+    The allocations of a request (see :meth:`AllocationProfiler.profile`).
+
+    Attributes:
+        intent (str, optional): The intent of the request.
+        peak (int): The peak of memory (in bytes) allocated by the request.
+        net (int): The memory (in bytes) still allocated after the request.
+        sites (list(AllocationSite)): The sites that allocated the most
+            memory still allocated after the request.
+        profiled (bool): Whether the request was profiled (only a request is
+            profiled at a time).
+    """
+
+    def __init__(self, intent: Optional[str] = None) -> None:
+        self.intent = intent
+        self.peak = 0
+        self.net = 0
+        self.sites: List[AllocationSite] = []
+        self.profiled = False
+
+    def check(
+        self,
+        max_peak: Optional[int] = None,
+        max_net: Optional[int] = None
+    ) -> None:
+        """
+        Check whether the request's allocations are within a budget.
+
+        Parameters:
+            max_peak (int, optional): The maximum peak (in bytes).
+            max_net (int, optional): The maximum memory (in bytes) still
+                allocated after the request.
+
+        Raises:
+            AssertionError: If the allocations exceed the budget (the
+                message has the top allocation sites).
+        """
+        errors = []
+
+        if max_peak is not None and self.peak > max_peak:
+            errors.append(f'peak of {_format_size(self.peak)} exceeds '
+                          f'{_format_size(max_peak)}')
+
+        if max_net is not None and self.net > max_net:
+            errors.append(f'net of {_format_size(self.net)} exceeds '
+                          f'{_format_size(max_net)}')
+
+        if errors:
+            raise AssertionError('\n'.join([
+                f'allocation budget exceeded: {", ".join(errors)}',
+                *(f'  {site}' for site in self.sites),
+            ]))
+
+
+class AllocationProfiler:
+    """
+    A profiler of the memory allocated by (a sample of) the requests.
+
+    Profiled requests are traced with :mod:`tracemalloc`, from the creation
+    of the client to the response, and their allocations are attributed to
+    their intents: the peak, the memory still allocated after the request
+    (e.g.: caches and leaks) and the lines that allocated it. Tracing only
+    runs during the profiled requests, so the requests that aren't sampled
+    don't pay for it.
+
+    Note:
+        Only a request is profiled at a time (the others aren't, even if
+        they're sampled) and the allocations of other threads are traced
+        too, so the results are exact for single-threaded workers (e.g.: of
+        :class:`~.server.Server`).
+
+    Examples:
+        Profiling 1% of the requests handled by a dispatcher:
+
+            >>> profiler = AllocationProfiler(sample_rate=0.01)
+            >>> dispatcher = Dispatcher(handlers, profiler=profiler)
+            >>> print(profiler.format())
+
+    Parameters:
+        sample_rate (float): The fraction of the requests to be profiled.
+        top (int): The number of allocation sites kept for each request (and
+            for each intent).
+        frames (int): The number of frames of the traced allocations (when
+            the profiler starts the tracing).
+
+    Raises:
+        ValueError: If the sample rate isn't between 0 and 1.
+    """
+
+    def __init__(
+        self,
+        sample_rate: float = 1.0,
+        top: int = 10,
+        frames: int = 1
+    ) -> None:
+        if not 0 <= sample_rate <= 1:
+            raise ValueError('sample_rate argument must be between 0 and 1')
+
+        self.sample_rate = sample_rate
+        self.top = top
+        self.frames = frames
+
+        self._tracing_lock = Lock()
+        self._lock = Lock()
+        self._random = random.Random()
+        self._stats: Dict[str, _IntentStats] = {}
+
+    @property
+    def stats(self) -> Dict[str, IntentAllocations]:
+        """dict(str, IntentAllocations): The allocations of each intent."""
+        with self._lock:
+            return {
+                intent: IntentAllocations(
+                    samples,
+                    total_net,
+                    max_peak,
+                    self._top_sites(sites)
+                )
+                for intent, (samples, total_net, max_peak, sites)
+                in self._stats.items()
+            }
+
+    def sample(self) -> bool:
+        """
+        Decide whether a request is profiled (see ``sample_rate``).
+
+        Returns:
+            bool: Whether the request is profiled.
+        """
+        return self._random.random() < self.sample_rate
+
+    @contextmanager
+    def profile(
+        self,
+        intent: Optional[str] = None
+    ) -> Iterator[AllocationSample]:
+        """
+        Profile the allocations of a block of code (e.g.: of a request).
+
+        The sample is added to the stats of its intent (which can be set
+        inside the block).
+
+        Examples:
+            Profiling a handler:
+
+                >>> with profiler.profile('Order Status') as sample:
+                ...     handler(agent)
+                >>> sample.peak
+                18232
+
+        Parameters:
+            intent (str, optional): The intent of the request.
+
+        Yields:
+            :class:`AllocationSample`: The sample (whose allocations are set
+            at the end of the block).
+        """
+        sample = AllocationSample(intent)
+
+        # Tracing is global, so only a block is profiled at a time.
+        if not self._tracing_lock.acquire(blocking=False):
+            yield sample
+
+            return
+
+        try:
+            with self._trace(sample):
+                yield sample
+
+            self._add(sample)
+        finally:
+            self._tracing_lock.release()
+
+    def reset(self) -> None:
+        """Clear the stats."""
+        with self._lock:
+            self._stats = {}
+
+    def format(self) -> str:
+        """
+        Format the stats as a table of allocations by intent.
+
+        Returns:
+            str: The formatted stats (with the top sites of each intent).
+        """
+        lines = [
+            f'{"intent":<40} {"samples":>8} {"max peak":>10} '
+            f'{"mean net":>10}',
+        ]
+        stats = sorted(self.stats.items(), key=lambda item: -item[1].max_peak)
+
+        for intent, allocations in stats:
+            lines.append(
+                f'{intent:<40.40} {allocations.samples:>8} '
+                f'{_format_size(allocations.max_peak):>10} '
+                f'{_format_size(allocations.mean_net):>10}'
+            )
+            lines.extend(f'  {site}' for site in allocations.sites)
+
+        return '\n'.join(lines)
+
+    @contextmanager
+    def _trace(self, sample: AllocationSample) -> Iterator[None]:
+        """Trace the allocations of a block of code."""
+        started = not tracemalloc.is_tracing()
+
+        if started:
+            tracemalloc.start(self.frames)
+            before = None
+        else:
+            before = tracemalloc.take_snapshot().filter_traces(_FILTERS)
+
+            if _RESETS_PEAK:
+                tracemalloc.reset_peak()  # type: ignore
+
+        start, _ = tracemalloc.get_traced_memory()
+
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot().filter_traces(_FILTERS)
+
+            if started:
+                tracemalloc.stop()
+
+        sample.net = current - start
+        sample.peak = max(peak - start, sample.net) \
+            if started or _RESETS_PEAK else sample.net
+        sample.profiled = True
+
+        if before is None:
+            statistics = [
+                (stat.traceback[0], stat.size, stat.count)
+                for stat in snapshot.statistics('lineno')
+            ]
+        else:
+            statistics = [
+                (stat.traceback[0], stat.size_diff, stat.count_diff)
+                for stat in snapshot.compare_to(before, 'lineno')
+            ]
+
+        sites = sorted(
+            (
+                AllocationSite(frame.filename, frame.lineno, size, count)
+                for frame, size, count in statistics if size > 0
+            ),
+            key=lambda site: -site.size
+        )
+        sample.sites = sites[:self.top]
+
+    def _add(self, sample: AllocationSample) -> None:
+        """Add a sample to the stats of its intent."""
+        intent = sample.intent or ''
+
+        with self._lock:
+            samples, total_net, max_peak, sites = self._stats.get(
+                intent,
+                (0, 0, 0, {})
+            )
+
+            for site in sample.sites:
+                totals = sites.setdefault((site.filename, site.lineno),
+                                          [0, 0])
+                totals[0] += site.size
+                totals[1] += site.count
+
+            self._stats[intent] = (
+                samples + 1,
+                total_net + sample.net,
+                max(max_peak, sample.peak),
+                sites
+            )
+
+    def _top_sites(
+        self,
+        sites: Dict[SiteKey, List[int]]
+    ) -> Tuple[AllocationSite, ...]:
+        """Get the sites that allocated the most memory."""
+        top = sorted(sites.items(), key=lambda item: -item[1][0])[:self.top]
+
+        return tuple(
+            AllocationSite(filename, lineno, size, count)
+            for (filename, lineno), (size, count) in top
+        )
+
+
+@contextmanager
+def allocation_budget(
+    max_peak: Optional[int] = None,
+    max_net: Optional[int] = None,
+    top: int = 5
+) -> Iterator[AllocationSample]:
+    """
+    Check that a block of code (e.g.: a handler) allocates within a budget.
+
+    Examples:
+        Testing the allocations of a handler:
+
+            >>> with allocation_budget(max_peak=64 * 1024):
+            ...     dispatcher.handle(request)
+
+    Parameters:
+        max_peak (int, optional): The maximum peak (in bytes).
+        max_net (int, optional): The maximum memory (in bytes) still
+            allocated after the block.
+        top (int): The number of allocation sites in the error message.
+
+    Yields:
+        :class:`AllocationSample`: The sample of the block.
+
+    Raises:
+        AssertionError: If the block exceeds the budget.
+    """
+    with AllocationProfiler(top=top).profile() as sample:
+        yield sample
+
+    sample.check(max_peak, max_net)
+
+
+def _format_size(size: float) -> str:
+    """Format a size (in bytes) for humans."""
+    if abs(size) < 1024:
+        return f'{size:.0f} B'
+
+    for unit in ('KiB', 'MiB'):
+        size /= 1024
+
+        if abs(size) < 1024:
+            return f'{size:.1f} {unit}'
+
+    return f'{size / 1024:.1f} GiB'
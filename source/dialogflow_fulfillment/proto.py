@@ -0,0 +1,443 @@
+from typing import Any, Dict, Sequence, Tuple, Union
+
+from google.protobuf import (
+    descriptor_pb2,
+    descriptor_pool,
+    message_factory,
+    struct_pb2,
+)
+from google.protobuf.message import Message
+
+_FieldType = descriptor_pb2.FieldDescriptorProto
+
+# The messages are a subset of the messages of Dialogflow's API (with the
+# same names and field numbers), so they're compatible with the messages of
+# Dialogflow's client library (e.g.: their serializations can be exchanged),
+# while only the protobuf package is needed. The fields that aren't defined
+# here are kept (as unknown fields) when a message is parsed.
+PACKAGE = 'google.cloud.dialogflow.v2'
+
+# The fields of the messages (and of their nested messages): the name, the
+# number, the type (a scalar type or the name of a message or an enum) and
+# whether it's repeated.
+_Fields = Sequence[Tuple[str, int, Union[int, str], bool]]
+
+_STRING = _FieldType.TYPE_STRING
+_INT32 = _FieldType.TYPE_INT32
+_FLOAT = _FieldType.TYPE_FLOAT
+_BOOL = _FieldType.TYPE_BOOL
+_STRUCT = '.google.protobuf.Struct'
+
+_PLATFORMS = (
+    ('PLATFORM_UNSPECIFIED', 0),
+    ('FACEBOOK', 1),
+    ('SLACK', 2),
+    ('TELEGRAM', 3),
+    ('KIK', 4),
+    ('SKYPE', 5),
+    ('LINE', 6),
+    ('VIBER', 7),
+    ('ACTIONS_ON_GOOGLE', 8),
+    ('GOOGLE_HANGOUTS', 11),
+)
+
+# The fields of the oneof message field of Intent.Message.
+_MESSAGE_ONEOF: _Fields = (
+    ('text', 1, '.Intent.Message.Text', False),
+    ('image', 2, '.Intent.Message.Image', False),
+    ('quick_replies', 3, '.Intent.Message.QuickReplies', False),
+    ('card', 4, '.Intent.Message.Card', False),
+    ('payload', 5, _STRUCT, False),
+)
+
+_INTENT_MESSAGES: Dict[str, _Fields] = {
+    'Text': (('text', 1, _STRING, True),),
+    'Image': (
+        ('image_uri', 1, _STRING, False),
+        ('accessibility_text', 2, _STRING, False),
+    ),
+    'QuickReplies': (
+        ('title', 1, _STRING, False),
+        ('quick_replies', 2, _STRING, True),
+    ),
+    'Card': (
+        ('title', 1, _STRING, False),
+        ('subtitle', 2, _STRING, False),
+        ('image_uri', 3, _STRING, False),
+        ('buttons', 4, '.Intent.Message.Card.Button', True),
+    ),
+}
+
+_CARD_BUTTON: _Fields = (
+    ('text', 1, _STRING, False),
+    ('postback', 2, _STRING, False),
+)
+
+_MESSAGES: Dict[str, _Fields] = {
+    'Context': (
+        ('name', 1, _STRING, False),
+        ('lifespan_count', 2, _INT32, False),
+        ('parameters', 3, _STRUCT, False),
+    ),
+    'EventInput': (
+        ('name', 1, _STRING, False),
+        ('parameters', 2, _STRUCT, False),
+        ('language_code', 3, _STRING, False),
+    ),
+    'Intent': (
+        ('name', 1, _STRING, False),
+        ('display_name', 2, _STRING, False),
+    ),
+    'QueryResult': (
+        ('query_text', 1, _STRING, False),
+        ('speech_recognition_confidence', 2, _FLOAT, False),
+        ('action', 3, _STRING, False),
+        ('parameters', 4, _STRUCT, False),
+        ('all_required_params_present', 5, _BOOL, False),
+        ('fulfillment_text', 6, _STRING, False),
+        ('fulfillment_messages', 7, '.Intent.Message', True),
+        ('webhook_source', 8, _STRING, False),
+        ('webhook_payload', 9, _STRUCT, False),
+        ('output_contexts', 10, '.Context', True),
+        ('intent', 11, '.Intent', False),
+        ('intent_detection_confidence', 12, _FLOAT, False),
+        ('diagnostic_info', 14, _STRUCT, False),
+        ('language_code', 15, _STRING, False),
+    ),
+    'OriginalDetectIntentRequest': (
+        ('source', 1, _STRING, False),
+        ('version', 2, _STRING, False),
+        ('payload', 3, _STRUCT, False),
+    ),
+    'WebhookRequest': (
+        ('response_id', 1, _STRING, False),
+        ('query_result', 2, '.QueryResult', False),
+        ('original_detect_intent_request', 3,
+         '.OriginalDetectIntentRequest', False),
+        ('session', 4, _STRING, False),
+    ),
+    'WebhookResponse': (
+        ('fulfillment_text', 1, _STRING, False),
+        ('fulfillment_messages', 2, '.Intent.Message', True),
+        ('source', 3, _STRING, False),
+        ('payload', 4, _STRUCT, False),
+        ('output_contexts', 5, '.Context', True),
+        ('followup_event_input', 6, '.EventInput', False),
+    ),
+}
+
+
+def _add_fields(
+    message: descriptor_pb2.DescriptorProto,
+    fields: _Fields,
+    oneof_index: Union[int, None] = None
+) -> None:
+    """Add fields to a message descriptor."""
+    for name, number, type_, repeated in fields:
+        field = message.field.add(
+            name=name,
+            number=number,
+            label=_FieldType.LABEL_REPEATED if repeated
+            else _FieldType.LABEL_OPTIONAL
+        )
+
+        if isinstance(type_, int):
+            field.type = type_
+        else:
+            field.type = _FieldType.TYPE_MESSAGE
+            # The types of the package are relative to it.
+            field.type_name = type_ if type_ == _STRUCT \
+                else f'.{PACKAGE}{type_}'
+
+        if oneof_index is not None:
+            field.oneof_index = oneof_index
+
+
+def _build_file() -> descriptor_pb2.FileDescriptorProto:
+    """Build the descriptor of the messages."""
+    file_proto = descriptor_pb2.FileDescriptorProto(
+        name='dialogflow_fulfillment/webhook.proto',
+        package=PACKAGE,
+        syntax='proto3',
+        dependency=['google/protobuf/struct.proto']
+    )
+
+    for name, fields in _MESSAGES.items():
+        _add_fields(file_proto.message_type.add(name=name), fields)
+
+    intent = next(message for message in file_proto.message_type
+                  if message.name == 'Intent')
+    intent_message = intent.nested_type.add(name='Message')
+    intent_message.oneof_decl.add(name='message')
+    _add_fields(intent_message, _MESSAGE_ONEOF, oneof_index=0)
+    intent_message.field.add(
+        name='platform',
+        number=6,
+        label=_FieldType.LABEL_OPTIONAL,
+        type=_FieldType.TYPE_ENUM,
+        type_name=f'.{PACKAGE}.Intent.Message.Platform'
+    )
+
+    platform = intent_message.enum_type.add(name='Platform')
+
+    for name, number in _PLATFORMS:
+        platform.value.add(name=name, number=number)
+
+    for name, fields in _INTENT_MESSAGES.items():
+        _add_fields(intent_message.nested_type.add(name=name), fields)
+
+    card = next(message for message in intent_message.nested_type
+                if message.name == 'Card')
+    _add_fields(card.nested_type.add(name='Button'), _CARD_BUTTON)
+
+    return file_proto
+
+
+def _build_classes() -> Dict[str, Any]:
+    """Build the classes of the messages (in a pool of their own)."""
+    # A pool of their own doesn't clash with the client library's messages
+    # (which have the same names).
+    pool = descriptor_pool.DescriptorPool()
+    pool.AddSerializedFile(struct_pb2.DESCRIPTOR.serialized_pb)
+    pool.AddSerializedFile(_build_file().SerializeToString())
+
+    return {
+        name: message_factory.GetMessageClass(
+            pool.FindMessageTypeByName(f'{PACKAGE}.{name}')
+        )
+        for name in _MESSAGES
+    }
+
+
+_CLASSES = _build_classes()
+
+#: The class of the ``WebhookRequest`` messages.
+WebhookRequest = _CLASSES['WebhookRequest']
+
+#: The class of the ``WebhookResponse`` messages.
+WebhookResponse = _CLASSES['WebhookResponse']
+
+#: The class of the ``Intent`` messages (and of the response messages, see
+#: ``Intent.Message``).
+Intent = _CLASSES['Intent']
+
+
+def struct_to_dict(struct: Message) -> Dict[str, Any]:
+    """
+    Convert a ``Struct`` message to a dictionary.
+
+    As in the JSON webhook requests, the whole numbers are integers.
+
+    Parameters:
+        struct (Struct): The message.
+
+    Returns:
+        dict: The dictionary.
+    """
+    return {
+        key: _value_to_python(value)
+        for key, value in struct.fields.items()
+    }
+
+
+def _value_to_python(value: Message) -> Any:
+    """Convert a ``Value`` message to a Python object."""
+    kind = value.WhichOneof('kind')
+
+    if kind == 'struct_value':
+        return struct_to_dict(value.struct_value)
+
+    if kind == 'list_value':
+        return [_value_to_python(item) for item in value.list_value.values]
+
+    if kind == 'number_value':
+        number = value.number_value
+
+        return int(number) if number.is_integer() else number
+
+    if kind in ('string_value', 'bool_value'):
+        return getattr(value, kind)
+
+    return None
+
+
+def request_to_dict(message: Message) -> Dict[str, Any]:
+    """
+    Convert the fields of a webhook request message used by the clients.
+
+    The fields are read directly (unlike with ``json_format``, nothing else
+    is converted) into the webhook request object (as it's decoded by
+    :meth:`~.WebhookClient.from_bytes`).
+
+    Parameters:
+        message (WebhookRequest): The webhook request message.
+
+    Returns:
+        dict: The webhook request object.
+
+    Raises:
+        TypeError: If a response message isn't of a supported type.
+    """
+    request: Dict[str, Any] = {
+        'responseId': message.response_id,
+        'session': message.session,
+    }
+
+    if message.HasField('query_result'):
+        request['queryResult'] = _query_result_to_dict(message.query_result)
+
+    if message.HasField('original_detect_intent_request'):
+        original_request = message.original_detect_intent_request
+        request['originalDetectIntentRequest'] = _without_empty({
+            'source': original_request.source,
+            'version': original_request.version,
+        })
+
+        if original_request.HasField('payload'):
+            request['originalDetectIntentRequest']['payload'] = \
+                struct_to_dict(original_request.payload)
+
+    return request
+
+
+def _query_result_to_dict(query_result: Message) -> Dict[str, Any]:
+    """Convert the fields of a query result used by the clients."""
+    result = _without_empty({
+        'queryText': query_result.query_text,
+        'action': query_result.action,
+        'languageCode': query_result.language_code,
+        'parameters': struct_to_dict(query_result.parameters),
+        'outputContexts': [
+            context_to_dict(context)
+            for context in query_result.output_contexts
+        ],
+        'fulfillmentMessages': [
+            message_to_dict(message)
+            for message in query_result.fulfillment_messages
+        ],
+    })
+
+    if query_result.HasField('intent'):
+        result['intent'] = _without_empty({
+            'name': query_result.intent.name,
+            'displayName': query_result.intent.display_name,
+        })
+
+    return result
+
+
+def context_to_dict(context: Message) -> Dict[str, Any]:
+    """
+    Convert a ``Context`` message to a context object.
+
+    Parameters:
+        context (Context): The message.
+
+    Returns:
+        dict: The context object.
+    """
+    fields = _without_empty({
+        'name': context.name,
+        'lifespanCount': context.lifespan_count,
+    })
+
+    if context.HasField('parameters'):
+        fields['parameters'] = struct_to_dict(context.parameters)
+
+    return fields
+
+
+def context_to_proto(context: Dict[str, Any], message: Message) -> None:
+    """
+    Fill a ``Context`` message with a context object.
+
+    Parameters:
+        context (dict): The context object.
+        message (Context): The message.
+    """
+    message.name = context['name']
+    message.lifespan_count = context.get('lifespanCount', 0)
+
+    if 'parameters' in context:
+        message.parameters.update(context['parameters'])
+
+
+def event_to_proto(event: Dict[str, Any], message: Message) -> None:
+    """
+    Fill an ``EventInput`` message with an event object.
+
+    Parameters:
+        event (dict): The event object (e.g.: a followup event).
+        message (EventInput): The message.
+    """
+    message.name = event['name']
+    message.language_code = event.get('languageCode') or ''
+
+    if 'parameters' in event:
+        message.parameters.update(event['parameters'])
+
+
+def message_to_dict(message: Message) -> Dict[str, Any]:
+    """
+    Convert an ``Intent.Message`` message to a response message object.
+
+    Parameters:
+        message (Intent.Message): The message.
+
+    Returns:
+        dict: The response message object (which can be converted to a
+        :class:`~.RichResponse`).
+
+    Raises:
+        TypeError: If the message isn't of a supported type.
+    """
+    kind = message.WhichOneof('message')
+
+    if kind == 'text':
+        fields: Dict[str, Any] = {'text': {'text': list(message.text.text)}}
+    elif kind == 'image':
+        fields = {'image': _without_empty({
+            'imageUri': message.image.image_uri,
+            'accessibilityText': message.image.accessibility_text,
+        })}
+    elif kind == 'quick_replies':
+        fields = {'quickReplies': _without_empty({
+            'title': message.quick_replies.title,
+            'quickReplies': list(message.quick_replies.quick_replies),
+        })}
+    elif kind == 'card':
+        fields = {'card': _without_empty({
+            'title': message.card.title,
+            'subtitle': message.card.subtitle,
+            'imageUri': message.card.image_uri,
+            'buttons': [
+                _without_empty({
+                    'text': button.text,
+                    'postback': button.postback,
+                })
+                for button in message.card.buttons
+            ],
+        })}
+    elif kind == 'payload':
+        fields = {'payload': struct_to_dict(message.payload)}
+    else:
+        raise TypeError('unsupported type of message')
+
+    if message.platform:
+        fields['platform'] = _platform_name(message)
+
+    return fields
+
+
+def _platform_name(message: Message) -> str:
+    """Get the name of the platform of an ``Intent.Message`` message."""
+    platforms = message.DESCRIPTOR.fields_by_name['platform'].enum_type
+    platform = platforms.values_by_number.get(message.platform)
+
+    # The platforms added to the API after these messages are kept by number.
+    return platform.name if platform is not None else str(message.platform)
+
+
+def _without_empty(fields: Dict[str, Any]) -> Dict[str, Any]:
+    """Remove the fields with empty values (which aren't set in proto3)."""
+    return {key: value for key, value in fields.items() if value}
@@ -0,0 +1,43 @@
+from typing import Callable, ContextManager
+
+import pytest
+
+from .profiling import AllocationSample
+from .profiling import allocation_budget as _allocation_budget
+
+
+@pytest.fixture
+def allocation_budget() -> Callable[..., ContextManager[AllocationSample]]:
+    """
+    Check that blocks of code (e.g.: handlers) allocate within a budget.
+
+    The plugin is enabled in a ``conftest.py`` file (with
+    ``pytest_plugins = ['dialogflow_fulfillment.pytest_plugin']``).
+
+    Examples:
+        Testing the allocations of a handler (with a sample webhook
+        request):
+
+            >>> @pytest.fixture
+            ... def webhook_request():
+            ...     return {
+            ...         'responseId': 'response-id',
+            ...         'session': 'projects/PROJECT_ID/agent/sessions/ID',
+            ...         'queryResult': {
+            ...             'queryText': 'Hi',
+            ...             'intent': {
+            ...                 'displayName': 'Default Welcome Intent',
+            ...             },
+            ...             'languageCode': 'en',
+            ...         },
+            ...     }
+            >>> def test_welcome(allocation_budget, webhook_request):
+            ...     with allocation_budget(max_peak=64 * 1024):
+            ...         dispatcher.handle(webhook_request)
+
+    Returns:
+        callable: A function that gets a context manager that fails the test
+        if its block exceeds the budget (see
+        :func:`~.profiling.allocation_budget`).
+    """
+    return _allocation_budget
@@ -0,0 +1,423 @@
+import json
+import re
+from typing import Any, Collection, Dict, FrozenSet, Optional, Tuple, Union
+
+BytesLike = Union[bytes, bytearray, memoryview]
+
+_DECODER = json.JSONDecoder()
+
+_WHITESPACE = re.compile(rb'[ \t\n\r]*')
+_STRING = re.compile(rb'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+_SCALAR = re.compile(rb'[^,:}\]\s]+')
+_NEXT_BRACKET = re.compile(
+    rb'[^"{}\[\]]*(?:"[^"\\]*(?:\\.[^"\\]*)*"[^"{}\[\]]*)*([{}\[\]])',
+    re.DOTALL
+)
+
+_WHITESPACE_BYTES = b' \t\n\r'
+_SCALAR_BYTES = frozenset(b'-+.0123456789Eaeflnrstu')
+_OPEN_BRACKETS = frozenset(b'{[')
+_CLOSE_BRACKETS = frozenset(b'}]')
+_BACKSLASH = ord('\\')
+_QUOTE = ord('"')
+_COLON = ord(':')
+_COMMA = ord(',')
+_OPEN_BRACE = ord('{')
+_CLOSE_BRACE = ord('}')
+
+# How many bytes at the end of an object are searched for trailing fields.
+_TAIL_WINDOW = 4096
+
+
+class RawJSON:
+    """
+    A JSON value kept as a raw byte slice until it's actually needed.
+
+    The slice is a :class:`memoryview` of the original buffer, so holding a
+    :class:`RawJSON` doesn't copy the underlying bytes. The value is decoded
+    (once) when :meth:`decode` is called.
+
+    Parameters:
+        buf (bytes, bytearray, memoryview): The encoded JSON value.
+        exact (bool): Whether the slice ends exactly where the value ends. If
+            not, the value is decoded from the start of the slice and anything
+            after it is ignored.
+    """
+
+    __slots__ = ('_view', '_exact', '_value', '_decoded')
+
+    def __init__(self, buf: BytesLike, exact: bool = True) -> None:
+        self._view: Optional[memoryview] = _as_view(buf)
+        self._exact = exact
+        self._value: Any = None
+        self._decoded = False
+
+    def decode(self) -> Any:
+        """
+        Decode the JSON value.
+
+        Returns:
+            any: The decoded value (the result is cached).
+
+        Raises:
+            ValueError: If the slice doesn't start with a valid JSON value.
+        """
+        if not self._decoded:
+            if self._exact:
+                self._value = json.loads(bytes(self._view))
+            else:
+                self._value = _DECODER.raw_decode(
+                    bytes(self._view).decode('utf-8')
+                )[0]
+
+            self._decoded = True
+            self._view = None
+
+        return self._value
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        Decode a single field of a JSON object.
+
+        Only the requested field is decoded: the remaining fields are skipped
+        over, without building any Python objects for them.
+
+        Parameters:
+            key (str): The name of the field.
+            default (any, optional): The value to return if the field doesn't
+                exist.
+
+        Returns:
+            any: The decoded value of the field (or the default value).
+
+        Raises:
+            ValueError: If the slice isn't a JSON object.
+        """
+        if self._decoded:
+            return self._value.get(key, default)
+
+        field = _select_fields(
+            self._view,
+            frozenset((key,)),
+            frozenset(),
+            self._exact
+        ).get(key)
+
+        return field.decode() if field is not None else default
+
+
+def select_fields(
+    buf: BytesLike,
+    keys: Collection[str],
+    lazy: Collection[str] = ()
+) -> Dict[str, RawJSON]:
+    """
+    Find some top-level fields of a JSON object without decoding anything.
+
+    Fields that aren't requested are skipped over. Large unrequested objects
+    or arrays aren't even scanned when the remaining requested fields can be
+    found at the end of the buffer.
+
+    Parameters:
+        buf (bytes, bytearray, memoryview): The encoded JSON object.
+        keys (collection(str)): The names of the fields to find.
+        lazy (collection(str)): The names of (requested) fields that may be
+            expensive to scan. Their raw values may extend past the end of
+            the value (see :class:`RawJSON`).
+
+    Returns:
+        dict(str, RawJSON): A mapping of the found field names to raw values.
+
+    Raises:
+        ValueError: If the buffer isn't a JSON object.
+    """
+    return _select_fields(
+        _as_view(buf),
+        frozenset(keys),
+        frozenset(lazy),
+        True
+    )
+
+
+def get_intent(request: Union[Dict[str, Any], BytesLike]) -> Optional[str]:
+    """
+    Get the intent of a webhook request (decoding as little as possible).
+
+    Only the ``queryResult`` field of an encoded webhook request is decoded
+    (see :func:`select_fields`).
+
+    Parameters:
+        request (dict, bytes, bytearray, memoryview): The webhook request
+            object (or the encoded webhook request object).
+
+    Returns:
+        str, optional: The display name of the intent (or ``None``, if the
+        request has no intent or it's invalid).
+    """
+    try:
+        if isinstance(request, dict):
+            query_result = request.get('queryResult', {})
+        else:
+            query_result = select_fields(
+                request,
+                ('queryResult',),
+                lazy=('queryResult',)
+            )['queryResult']
+
+        intent = query_result.get('intent', {}).get('displayName')
+    except (AttributeError, KeyError, ValueError):
+        return None
+
+    return intent if isinstance(intent, str) else None
+
+
+def _select_fields(
+    view: memoryview,
+    keys: FrozenSet[str],
+    lazy: FrozenSet[str],
+    exact: bool
+) -> Dict[str, RawJSON]:
+    """Find fields of a JSON object (see :func:`select_fields`)."""
+    fields: Dict[str, RawJSON] = {}
+
+    position = _skip_whitespace(view, 0)
+    _expect(view, position, _OPEN_BRACE)
+    position = _skip_whitespace(view, position + 1)
+
+    if _at(view, position) == _CLOSE_BRACE:
+        _expect_end(view, position + 1, exact)
+
+        return fields
+
+    while True:
+        key, start = _read_key(view, position)
+
+        if key in lazy or (
+            key not in keys and _at(view, start) in _OPEN_BRACKETS
+        ):
+            found = _find_remaining(view, start, keys - fields.keys() - {key},
+                                    exact)
+
+            if found is not None:
+                remaining, end = found
+
+                if key in keys:
+                    fields[key] = RawJSON(view[start:end], exact=False)
+
+                fields.update(remaining)
+
+                return fields
+
+        end = _skip_value(view, start)
+
+        if key in keys:
+            fields[key] = RawJSON(view[start:end])
+
+        position = _skip_whitespace(view, end)
+
+        if _at(view, position) == _CLOSE_BRACE:
+            _expect_end(view, position + 1, exact)
+
+            return fields
+
+        _expect(view, position, _COMMA)
+        position = _skip_whitespace(view, position + 1)
+
+
+def _find_remaining(
+    view: memoryview,
+    start: int,
+    missing: FrozenSet[str],
+    exact: bool
+) -> Optional[Tuple[Dict[str, RawJSON], int]]:
+    """
+    Find the missing fields without scanning the value starting at a position.
+
+    Returns:
+        tuple(dict(str, RawJSON), int), optional: The missing fields and the
+        position where the (unscanned) value ends at most, or nothing if the
+        fields couldn't be found at the end of the object.
+    """
+    if not missing:
+        return {}, len(view)
+
+    if not exact:
+        return None
+
+    trailing = _read_trailing_fields(view, start)
+
+    if trailing is None or not missing <= trailing[0].keys():
+        return None
+
+    fields, end = trailing
+
+    return {key: fields[key] for key in missing}, end
+
+
+def _read_trailing_fields(
+    view: memoryview,
+    lower: int
+) -> Optional[Tuple[Dict[str, RawJSON], int]]:
+    """
+    Read the fields at the end of an object, backwards, up to an array/object.
+
+    Only string and scalar values are read, within the last bytes of the
+    buffer (and after a lower bound position).
+
+    Returns:
+        tuple(dict(str, RawJSON), int), optional: The trailing fields and the
+        position right after the last object or array, or nothing if the end
+        of the buffer couldn't be read.
+    """
+    offset = max(lower, len(view) - _TAIL_WINDOW)
+    tail = bytes(view[offset:]).rstrip(_WHITESPACE_BYTES)
+    fields: Dict[str, RawJSON] = {}
+
+    if not tail or tail[-1] != _CLOSE_BRACE:
+        return None
+
+    position = len(tail) - 1
+
+    while True:
+        position = len(tail[:position].rstrip(_WHITESPACE_BYTES))
+        last = tail[position - 1] if position else None
+
+        if last in _CLOSE_BRACKETS:
+            return fields, offset + position
+        elif last == _QUOTE:
+            value_start = _find_string_start(tail, position)
+        elif last in _SCALAR_BYTES:
+            value_start = position - 1
+
+            while value_start and tail[value_start - 1] in _SCALAR_BYTES:
+                value_start -= 1
+        else:
+            return None
+
+        if value_start is None:
+            return None
+
+        value_end = position
+        position = len(tail[:value_start].rstrip(_WHITESPACE_BYTES))
+
+        if not position or tail[position - 1] != _COLON:
+            return None
+
+        position = len(tail[:position - 1].rstrip(_WHITESPACE_BYTES))
+
+        if not position or tail[position - 1] != _QUOTE:
+            return None
+
+        key_start = _find_string_start(tail, position)
+
+        if key_start is None:
+            return None
+
+        key = json.loads(tail[key_start:position])
+        fields.setdefault(
+            key,
+            RawJSON(view[offset + value_start:offset + value_end])
+        )
+        position = len(tail[:key_start].rstrip(_WHITESPACE_BYTES))
+
+        if not position or tail[position - 1] != _COMMA:
+            return None
+
+        position -= 1
+
+
+def _find_string_start(buf: bytes, end: int) -> Optional[int]:
+    """Find where the string that ends (with a quote) at a position starts."""
+    position = end - 1
+
+    while True:
+        position = buf.rfind(b'"', 0, position)
+
+        if position < 0:
+            return None
+
+        backslashes = len(buf[:position]) - len(buf[:position].rstrip(b'\\'))
+
+        if not backslashes % 2:
+            return position
+
+
+def _as_view(buf: BytesLike) -> memoryview:
+    """Get a flat, byte-formatted, memoryview of a buffer."""
+    view = memoryview(buf)
+
+    if view.format != 'B' or view.ndim != 1:
+        view = view.cast('B')
+
+    return view
+
+
+def _at(view: memoryview, position: int) -> Optional[int]:
+    """Get the byte at a position (if the position is within the buffer)."""
+    return view[position] if position < len(view) else None
+
+
+def _expect(view: memoryview, position: int, byte: int) -> None:
+    """Check that the byte at a position is the expected one."""
+    if _at(view, position) != byte:
+        raise ValueError(f'expected {chr(byte)!r} at position {position}')
+
+
+def _expect_end(view: memoryview, position: int, exact: bool) -> None:
+    """Check that only whitespace follows a position (of an exact slice)."""
+    if exact:
+        position = _skip_whitespace(view, position)
+
+        if position < len(view):
+            raise ValueError(f'unexpected data at position {position}')
+
+
+def _skip_whitespace(view: memoryview, position: int) -> int:
+    """Get the position of the next non-whitespace byte."""
+    return _WHITESPACE.match(view, position).end()
+
+
+def _read_key(view: memoryview, position: int) -> Tuple[str, int]:
+    """Read a field name and get the position where its value starts."""
+    match = _STRING.match(view, position)
+
+    if match is None:
+        raise ValueError(f'expected a field name at position {position}')
+
+    position = _skip_whitespace(view, match.end())
+    _expect(view, position, _COLON)
+
+    return json.loads(match.group()), _skip_whitespace(view, position + 1)
+
+
+def _skip_value(view: memoryview, position: int) -> int:
+    """Get the position right after the JSON value starting at a position."""
+    first = _at(view, position)
+
+    if first == _QUOTE:
+        match = _STRING.match(view, position)
+    elif first in _OPEN_BRACKETS:
+        return _skip_container(view, position + 1)
+    else:
+        match = _SCALAR.match(view, position)
+
+    if match is None:
+        raise ValueError(f'expected a value at position {position}')
+
+    return match.end()
+
+
+def _skip_container(view: memoryview, position: int) -> int:
+    """Get the position right after the end of an object or array."""
+    depth = 1
+
+    while depth:
+        match = _NEXT_BRACKET.match(view, position)
+
+        if match is None:
+            raise ValueError('unterminated object or array')
+
+        depth += 1 if view[match.start(1)] in _OPEN_BRACKETS else -1
+        position = match.end()
+
+    return position
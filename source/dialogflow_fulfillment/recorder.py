@@ -0,0 +1,286 @@
+import atexit
+import gzip
+import json
+import os
+import random
+import time
+import weakref
+from pathlib import Path
+from queue import Empty, Full, Queue
+from threading import Lock, Thread
+from typing import IO, Any, Dict, List, Optional, Tuple, Union
+
+Record = Tuple[float, Union[str, bytes, Dict[str, Any]], Dict[str, Any]]
+
+_ENCODER = json.JSONEncoder(separators=(',', ':'))
+
+# Tells the writer thread to stop (after writing the queued records).
+_STOP = None
+
+
+class Recorder:
+    """
+    A recorder of webhook requests and responses (e.g.: for replaying them).
+
+    Recording a request only puts it in a queue: a background thread writes
+    the records, in batches, to JSONL files (one JSON object per line, with
+    the ``timestamp``, the ``request`` and the ``response`` fields), which
+    are compressed (with gzip) and rotated by size. If the queue is full,
+    the records are dropped (and counted) instead of blocking the requests.
+    The queued records are written when the recorder is closed (at the
+    latest, when the interpreter exits).
+
+    Examples:
+        Recording a tenth of the requests handled by a dispatcher:
+
+            >>> recorder = Recorder('records', sample_rate=0.1)
+            >>> dispatcher = Dispatcher(handlers, recorder=recorder)
+
+    Parameters:
+        directory (str, path-like): The directory of the files.
+        sample_rate (float): The fraction of the requests to be recorded.
+        max_queue_size (int): The maximum number of records waiting to be
+            written.
+        batch_size (int): The maximum number of records written at once.
+        flush_interval (float): How long (in seconds) a record may wait for
+            the batch to be complete.
+        max_file_size (int): The (uncompressed) size of the files (in bytes)
+            after which a new file is started.
+        compress (bool): Whether the files are compressed (``.jsonl.gz``).
+        prefix (str): The prefix of the names of the files.
+
+    Raises:
+        ValueError: If the sample rate isn't between 0 and 1.
+    """
+
+    def __init__(
+        self,
+        directory: Union[str, 'os.PathLike[str]'],
+        sample_rate: float = 1.0,
+        max_queue_size: int = 10000,
+        batch_size: int = 100,
+        flush_interval: float = 1.0,
+        max_file_size: int = 64 * 1024 * 1024,
+        compress: bool = True,
+        prefix: str = 'records'
+    ) -> None:
+        if not 0 <= sample_rate <= 1:
+            raise ValueError('sample_rate argument must be between 0 and 1')
+
+        self.directory = Path(directory)
+        self.sample_rate = sample_rate
+        self.max_queue_size = max_queue_size
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_file_size = max_file_size
+        self.compress = compress
+        self.prefix = prefix
+
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+        self._lock = Lock()
+        self._random = random.Random()
+        self._dropped = 0
+        self._written = 0
+        self._files = 0
+        self._pid: Optional[int] = None
+        self._start()
+
+        # The writer thread doesn't keep the process running (it's a daemon),
+        # so it's stopped (and the files are completed) on exit.
+        atexit.register(_close_at_exit, weakref.ref(self))
+
+    @property
+    def dropped(self) -> int:
+        """int: The number of dropped records (because the queue was full)."""
+        return self._dropped
+
+    @property
+    def written(self) -> int:
+        """int: The number of records written to the files."""
+        return self._written
+
+    def sample(self) -> bool:
+        """
+        Decide whether a request is recorded (see ``sample_rate``).
+
+        Returns:
+            bool: Whether the request is recorded.
+        """
+        return self._random.random() < self.sample_rate
+
+    def record(
+        self,
+        request: Union[str, bytes, Dict[str, Any]],
+        response: Dict[str, Any]
+    ) -> bool:
+        """
+        Queue a request and its response to be written (without blocking).
+
+        The request and the response must not be modified afterwards (e.g.:
+        requests that handlers may change should be given already encoded).
+
+        Parameters:
+            request (str, bytes, dict): The webhook request object (or the
+                encoded webhook request object).
+            response (dict): The webhook response object.
+
+        Returns:
+            bool: Whether the record was queued (or dropped).
+        """
+        if self._pid != os.getpid():
+            # The process was forked (and the writer thread wasn't).
+            self._start()
+
+        try:
+            self._queue.put_nowait((time.time(), request, response))
+        except Full:
+            with self._lock:
+                self._dropped += 1
+
+            return False
+
+        return True
+
+    def close(self) -> None:
+        """Write the queued records and stop the writer thread."""
+        if self._pid == os.getpid() and self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+
+    def __enter__(self) -> 'Recorder':
+        """Use the recorder as a context manager (that closes it)."""
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Close the recorder."""
+        self.close()
+
+    def _start(self) -> None:
+        """Start the writer thread (of the current process)."""
+        self._pid = os.getpid()
+        self._queue: 'Queue[Optional[Record]]' = Queue(self.max_queue_size)
+        self._thread = Thread(
+            target=self._write,
+            name='dialogflow-fulfillment-recorder',
+            daemon=True
+        )
+        self._thread.start()
+
+    def _write(self) -> None:
+        """Write the queued records (in the writer thread)."""
+        file: Optional[IO[bytes]] = None
+        file_size = 0
+        stopping = False
+
+        try:
+            while not stopping:
+                batch, stopping = self._get_batch()
+
+                if not batch:
+                    continue
+
+                content = b''.join(self._encode_batch(batch))
+
+                if file is None or file_size >= self.max_file_size:
+                    if file is not None:
+                        file.close()
+
+                    file = self._open()
+                    file_size = 0
+
+                file.write(content)
+                file.flush()
+                file_size += len(content)
+
+                with self._lock:
+                    self._written += content.count(b'\n')
+        finally:
+            if file is not None:
+                file.close()
+
+    def _get_batch(self) -> Tuple[List[Record], bool]:
+        """Wait for a batch of records (and whether the writer must stop)."""
+        batch: List[Record] = []
+        deadline = time.monotonic() + self.flush_interval
+
+        while len(batch) < self.batch_size:
+            timeout = deadline - time.monotonic()
+
+            try:
+                record = self._queue.get(timeout=max(timeout, 0))
+            except Empty:
+                break
+
+            if record is _STOP:
+                return batch, True
+
+            batch.append(record)
+
+        return batch, False
+
+    def _encode_batch(self, batch: List[Record]) -> List[bytes]:
+        """Encode records as lines of JSON (dropping the invalid ones)."""
+        lines = []
+
+        for timestamp, request, response in batch:
+            try:
+                line = b''.join((
+                    b'{"timestamp":',
+                    repr(timestamp).encode(),
+                    b',"request":',
+                    self._encode_request(request),
+                    b',"response":',
+                    _ENCODER.encode(response).encode(),
+                    b'}\n',
+                ))
+            except (TypeError, ValueError):
+                with self._lock:
+                    self._dropped += 1
+
+                continue
+
+            lines.append(line)
+
+        return lines
+
+    @staticmethod
+    def _encode_request(request: Union[str, bytes, Dict[str, Any]]) -> bytes:
+        """Encode a request as JSON in a single line."""
+        if isinstance(request, dict):
+            request = _ENCODER.encode(request)
+
+        if isinstance(request, str):
+            request = request.encode()
+
+        # Line breaks can only be whitespace in JSON (they're escaped within
+        # strings), so encoded requests don't need to be decoded.
+        request = request.translate(None, b'\r\n').strip()
+
+        if not request.startswith(b'{') or not request.endswith(b'}'):
+            raise ValueError('request is not a JSON object')
+
+        return request
+
+    def _open(self) -> IO[bytes]:
+        """Open a new file for the records."""
+        self._files += 1
+        name = '{}-{}-{}-{}.jsonl'.format(
+            self.prefix,
+            time.strftime('%Y%m%d-%H%M%S'),
+            os.getpid(),
+            self._files
+        )
+
+        if self.compress:
+            return gzip.open(self.directory / f'{name}.gz', 'wb')
+
+        return open(self.directory / name, 'wb')
+
+
+def _close_at_exit(reference: 'weakref.ref[Recorder]') -> None:
+    """Close a recorder (if it still exists) when the interpreter exits."""
+    recorder = reference()
+
+    if recorder is not None:
+        recorder.close()
@@ -1,11 +1,16 @@
 from abc import ABCMeta, abstractmethod
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
 
 class RichResponse(metaclass=ABCMeta):
     """
     The base (abstract) class for the different types of rich responses.
 
+    Parameters:
+        platform (str, optional): The platform of the rich response (e.g.:
+            ``FACEBOOK`` or ``SLACK``). Rich responses without a platform are
+            sent to any platform.
+
     See Also:
         For more information about the :class:`RichResponse`, see the
         `Rich response messages`_ section in Dialogflow's documentation.
@@ -13,17 +18,127 @@ class RichResponse(metaclass=ABCMeta):
     .. _Rich response messages: https://cloud.google.com/dialogflow/docs/intents-rich-messages
     """  # noqa: E501
 
-    @abstractmethod
+    def __init__(self, platform: Optional[str] = None) -> None:
+        self.platform = platform
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        """Set an attribute (unless the rich response is immutable)."""
+        if self.frozen:
+            raise AttributeError(
+                f'{type(self).__name__} object is immutable'
+            )
+
+        # Any change (e.g.: by a property setter) invalidates the cached
+        # response message object.
+        self.__dict__.pop('_cached_dict', None)
+
+        super().__setattr__(name, value)
+
+    @property
+    def frozen(self) -> bool:
+        """
+        bool: Whether the rich response is immutable.
+
+        Rich responses that are shared (e.g.: the console messages, which are
+        cached for all requests) are immutable.
+        """  # noqa: D401
+        return self.__dict__.get('_frozen', False)
+
+    def _freeze(self) -> 'RichResponse':
+        """Make the rich response immutable (and get it)."""
+        self.__dict__['_frozen'] = True
+
+        return self
+
+    @property
+    def platform(self) -> Optional[str]:
+        """
+        str, optional: The platform of the rich response.
+
+        Examples:
+            Accessing the :attr:`platform` attribute:
+
+                >>> text.platform
+                None
+
+            Assigning a value to the :attr:`platform` attribute:
+
+                >>> text.platform = 'SLACK'
+                >>> text.platform
+                'SLACK'
+
+        Raises:
+            TypeError: If the value to be assigned is not a string.
+        """
+        return self._platform
+
+    @platform.setter
+    def platform(self, platform: Optional[str]) -> None:
+        if platform is not None and not isinstance(platform, str):
+            raise TypeError('platform argument must be a string')
+
+        self._platform = platform
+
+    def _with_platform(self, message: Dict[str, Any]) -> Dict[str, Any]:
+        """Add the platform field (if any) to a response message object."""
+        if self.platform is not None:
+            message['platform'] = self.platform
+
+        return message
+
     def _as_dict(self) -> Dict[str, Any]:
         """
         Convert the rich response object to a dictionary.
 
+        The dictionary is built once (see :meth:`_build_dict`) and cached
+        until an attribute of the rich response changes, so it must not be
+        modified.
+
         See Also:
             For more information about the fields for the different types of
             messages, see the Message_ section in Dialogflow's documentation.
 
         .. _Message: https://cloud.google.com/dialogflow/es/docs/reference/rest/v2/projects.agent.intents#message
         """  # noqa: E501
+        message = self.__dict__.get('_cached_dict')
+
+        if message is None:
+            message = self.__dict__['_cached_dict'] = self._build_dict()
+
+        return message
+
+    @abstractmethod
+    def _build_dict(self) -> Dict[str, Any]:
+        """Build the response message object of the rich response."""
+
+    def _to_proto(self, message: Any) -> None:
+        """
+        Fill a response message (``Intent.Message``) with the rich response.
+
+        Parameters:
+            message (Intent.Message): An empty response message (e.g.: of a
+                webhook response, see :meth:`WebhookClient.response_proto`).
+
+        Raises:
+            TypeError: If the type of rich response can't be converted.
+            ValueError: If the platform of the rich response is unknown.
+        """
+        self._build_proto(message)
+
+        if self.platform is None:
+            return
+
+        platforms = message.DESCRIPTOR.fields_by_name['platform'].enum_type
+        platform = platforms.values_by_name.get(self.platform)
+
+        if platform is None:
+            raise ValueError(f'unknown platform: {self.platform!r}')
+
+        message.platform = platform.number
+
+    def _build_proto(self, message: Any) -> None:
+        """Fill the fields of a response message (``Intent.Message``)."""
+        raise TypeError('unsupported type of message')
 
     @classmethod
     @abstractmethod
@@ -22,6 +22,7 @@ class Card(RichResponse):
         image_url (str, optional): The URL of the card response's image.
         buttons (list(dict(str, str)), optional): The buttons of the card
             response.
+        platform (str, optional): The platform of the card response.
 
     See Also:
         For more information about the :class:`Card` response, see the
@@ -35,9 +36,10 @@ class Card(RichResponse):
         title: Optional[str] = None,
         subtitle: Optional[str] = None,
         image_url: Optional[str] = None,
-        buttons: Optional[List[Dict[str, str]]] = None
+        buttons: Optional[List[Dict[str, str]]] = None,
+        platform: Optional[str] = None
     ) -> None:
-        super().__init__()
+        super().__init__(platform)
 
         self.title = title
         self.subtitle = subtitle
@@ -200,15 +202,17 @@ class Card(RichResponse):
         subtitle = message['card'].get('subtitle')
         image_url = message['card'].get('imageUri')
         buttons = message['card'].get('buttons')
+        platform = message.get('platform')
 
         return cls(
             title=title,
             subtitle=subtitle,
             image_url=image_url,
-            buttons=buttons
+            buttons=buttons,
+            platform=platform
         )
 
-    def _as_dict(self) -> Dict[str, Any]:
+    def _build_dict(self) -> Dict[str, Any]:
         fields = {}
 
         if self.title is not None:
@@ -223,4 +227,20 @@ class Card(RichResponse):
         if self.buttons is not None:
             fields['buttons'] = self.buttons
 
-        return {'card': fields}
+        return self._with_platform({'card': fields})
+
+    def _build_proto(self, message: Any) -> None:
+        card = message.card
+        card.SetInParent()
+
+        if self.title is not None:
+            card.title = self.title
+
+        if self.subtitle is not None:
+            card.subtitle = self.subtitle
+
+        if self.image_url is not None:
+            card.image_uri = self.image_url
+
+        for button in self.buttons or ():
+            card.buttons.add(**button)
@@ -14,6 +14,7 @@ class Image(RichResponse):
 
     Parameters:
         image_url (str, optional): The URL of the image response.
+        platform (str, optional): The platform of the image response.
 
     See Also:
         For more information about the :class:`Image` response, see the
@@ -22,8 +23,12 @@ class Image(RichResponse):
     .. _Image responses: https://cloud.google.com/dialogflow/docs/intents-rich-messages#image
     """  # noqa: E501
 
-    def __init__(self, image_url: Optional[str] = None) -> None:
-        super().__init__()
+    def __init__(
+        self,
+        image_url: Optional[str] = None,
+        platform: Optional[str] = None
+    ) -> None:
+        super().__init__(platform)
 
         self.image_url = image_url
 
@@ -59,13 +64,20 @@ class Image(RichResponse):
     @classmethod
     def _from_dict(cls, message: Dict[str, Any]) -> 'Image':
         image_url = message['image'].get('imageUri')
+        platform = message.get('platform')
 
-        return cls(image_url=image_url)
+        return cls(image_url=image_url, platform=platform)
 
-    def _as_dict(self) -> Dict[str, Any]:
+    def _build_dict(self) -> Dict[str, Any]:
         fields = {}
 
         if self.image_url is not None:
             fields['imageUri'] = self.image_url
 
-        return {'image': fields}
+        return self._with_platform({'image': fields})
+
+    def _build_proto(self, message: Any) -> None:
+        message.image.SetInParent()
+
+        if self.image_url is not None:
+            message.image.image_uri = self.image_url
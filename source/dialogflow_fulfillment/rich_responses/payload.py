@@ -18,8 +18,17 @@ class Payload(RichResponse):
         ... }
         >>> payload = Payload(payload_data)
 
+        Constructing an immutable :class:`Payload` response (e.g.: for a
+        payload that is shared by every request):
+
+        >>> payload = Payload(payload_data, immutable=True)
+
     Parameters:
         payload (dict, optional): The content of the custom payload response.
+        platform (str, optional): The platform of the custom payload response.
+        immutable (bool): Whether the custom payload response is immutable.
+            The content of immutable payloads is sent without being copied,
+            so it must not be modified afterwards.
 
     See Also:
         For more information about the :class:`Payload` response, see the
@@ -28,11 +37,19 @@ class Payload(RichResponse):
     .. _Custom payload responses: https://cloud.google.com/dialogflow/docs/intents-rich-messages#custom
     """  # noqa: E501
 
-    def __init__(self, payload: Optional[Dict[Any, Any]] = None) -> None:
-        super().__init__()
+    def __init__(
+        self,
+        payload: Optional[Dict[Any, Any]] = None,
+        platform: Optional[str] = None,
+        immutable: bool = False
+    ) -> None:
+        super().__init__(platform)
 
         self.payload = payload
 
+        if immutable:
+            self._freeze()
+
     @property
     def payload(self) -> Optional[Dict[Any, Any]]:
         """
@@ -68,13 +85,30 @@ class Payload(RichResponse):
     @classmethod
     def _from_dict(cls, message: Dict[str, Any]) -> 'Payload':
         payload = message['payload']
+        platform = message.get('platform')
 
-        return cls(payload=payload)
+        return cls(payload=payload, platform=platform)
 
     def _as_dict(self) -> Dict[str, Any]:
-        fields = {}
+        if self.frozen:
+            return super()._as_dict()
 
-        if self.payload is not None:
-            fields.update(self.payload)
+        # The content of mutable payloads may be modified in place (which
+        # doesn't invalidate the cache), so it's copied every time.
+        return self._build_dict()
 
-        return {'payload': fields}
+    def _build_dict(self) -> Dict[str, Any]:
+        if self.payload is None:
+            fields: Dict[Any, Any] = {}
+        elif self.frozen:
+            fields = self.payload
+        else:
+            fields = dict(self.payload)
+
+        return self._with_platform({'payload': fields})
+
+    def _build_proto(self, message: Any) -> None:
+        message.payload.SetInParent()
+
+        if self.payload is not None:
+            message.payload.update(self.payload)
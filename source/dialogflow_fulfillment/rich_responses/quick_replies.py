@@ -19,6 +19,7 @@ class QuickReplies(RichResponse):
         title (str, optional): The title of the quick reply buttons.
         quick_replies (list, tuple(str), optional): The texts for the quick
             reply buttons.
+        platform (str, optional): The platform of the quick reply buttons.
 
     See Also:
         For more information about the :class:`QuickReplies` response, see the
@@ -30,9 +31,10 @@ class QuickReplies(RichResponse):
     def __init__(
         self,
         title: Optional[str] = None,
-        quick_replies: Optional[Union[List[str], Tuple[str]]] = None
+        quick_replies: Optional[Union[List[str], Tuple[str]]] = None,
+        platform: Optional[str] = None
     ) -> None:
-        super().__init__()
+        super().__init__(platform)
 
         self.title = title
         self.quick_replies = quick_replies
@@ -104,10 +106,15 @@ class QuickReplies(RichResponse):
     def _from_dict(cls, message: Dict[str, Any]) -> 'QuickReplies':
         title = message['quickReplies'].get('title')
         quick_replies = message['quickReplies'].get('quickReplies')
+        platform = message.get('platform')
 
-        return cls(title=title, quick_replies=quick_replies)
+        return cls(
+            title=title,
+            quick_replies=quick_replies,
+            platform=platform
+        )
 
-    def _as_dict(self) -> Dict[str, Any]:
+    def _build_dict(self) -> Dict[str, Any]:
         fields = {}
 
         if self.title is not None:
@@ -116,4 +123,13 @@ class QuickReplies(RichResponse):
         if self.quick_replies is not None:
             fields['quickReplies'] = self.quick_replies
 
-        return {'quickReplies': fields}
+        return self._with_platform({'quickReplies': fields})
+
+    def _build_proto(self, message: Any) -> None:
+        message.quick_replies.SetInParent()
+
+        if self.title is not None:
+            message.quick_replies.title = self.title
+
+        if self.quick_replies is not None:
+            message.quick_replies.quick_replies.extend(self.quick_replies)
@@ -14,6 +14,7 @@ class Text(RichResponse):
 
     Parameters:
         text (str, optional): The content of the text response.
+        platform (str, optional): The platform of the text response.
 
     See Also:
         For more information about the :class:`Text` response, see the
@@ -22,8 +23,12 @@ class Text(RichResponse):
     .. _Text responses: https://cloud.google.com/dialogflow/docs/intents-rich-messages#text
     """  # noqa: E501
 
-    def __init__(self, text: Optional[str] = None) -> None:
-        super().__init__()
+    def __init__(
+        self,
+        text: Optional[str] = None,
+        platform: Optional[str] = None
+    ) -> None:
+        super().__init__(platform)
 
         self.text = text
 
@@ -60,10 +65,18 @@ class Text(RichResponse):
     def _from_dict(cls, message: Dict[str, Any]) -> 'Text':
         texts = message['text'].get('text', [])
         text = texts[0] if texts else None
+        platform = message.get('platform')
 
-        return cls(text=text)
+        return cls(text=text, platform=platform)
 
-    def _as_dict(self) -> Dict[str, Any]:
+    def _build_dict(self) -> Dict[str, Any]:
         text = self.text
 
-        return {'text': {'text': [text if text is not None else '']}}
+        return self._with_platform(
+            {'text': {'text': [text if text is not None else '']}}
+        )
+
+    def _build_proto(self, message: Any) -> None:
+        text = self.text
+
+        message.text.text.append(text if text is not None else '')
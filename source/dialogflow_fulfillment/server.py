@@ -0,0 +1,474 @@
+import gc
+import importlib
+import io
+import os
+import selectors
+import signal
+import socket
+import sys
+import time
+import traceback
+from typing import Any, Callable, Dict, List, Optional, Set
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+
+from .adapters import Adapter, WSGIAdapter
+from .affinity import Router, receive_connection
+from .dispatcher import Dispatcher
+
+WSGIApplication = Callable[..., Any]
+
+# Whether the kernel balances connections between sockets bound (with
+# SO_REUSEPORT) to the same address.
+_BALANCES_REUSED_PORTS = sys.platform.startswith('linux')
+
+# How long (in seconds) processes wait between checks for signals.
+_POLL_INTERVAL = 0.5
+
+
+def load_app(target: str) -> WSGIApplication:
+    """
+    Import a dispatcher (or a WSGI application) from a module.
+
+    Parameters:
+        target (str): The module and the name of the object, separated by a
+            colon (e.g.: ``myapp.webhook:dispatcher``).
+
+    Returns:
+        callable: The WSGI application (dispatchers are wrapped in a
+        :class:`~.WSGIAdapter`).
+
+    Raises:
+        ValueError: If the target isn't in the ``module:name`` format or the
+            object isn't callable.
+    """
+    module_name, _, name = target.partition(':')
+
+    if not module_name or not name:
+        raise ValueError(f'invalid target (expected module:name): {target}')
+
+    app = getattr(importlib.import_module(module_name), name)
+
+    if isinstance(app, Dispatcher):
+        return WSGIAdapter(app)
+
+    if not callable(app):
+        raise ValueError(f'{target} is not a dispatcher nor an application')
+
+    return app
+
+
+def create_socket(
+    host: str,
+    port: int,
+    reuse_port: bool = False,
+    backlog: Optional[int] = None
+) -> socket.socket:
+    """
+    Create a TCP socket bound to an address.
+
+    Parameters:
+        host (str): The host of the address.
+        port (int): The port of the address (``0`` for any free port).
+        reuse_port (bool): Whether other sockets may be bound to the same
+            address (with ``SO_REUSEPORT``).
+        backlog (int, optional): The size of the queue of pending
+            connections. If it's not given, the socket doesn't listen.
+
+    Returns:
+        socket.socket: The bound socket.
+    """
+    family = socket.AF_INET6 if ':' in host else socket.AF_INET
+    sock = socket.socket(family, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+
+    sock.bind((host, port))
+
+    if backlog is not None:
+        sock.listen(backlog)
+
+    return sock
+
+
+class _RequestHandler(WSGIRequestHandler):
+    """A WSGI request handler that doesn't log every request."""
+
+    def log_message(self, format: str, *args: Any) -> None:
+        """Skip logging (an access log costs more than most handlers)."""
+
+
+class _ForwardedRequestHandler(_RequestHandler):
+    """A WSGI request handler of a connection whose request was read."""
+
+    def setup(self) -> None:
+        """Read the request from the router's buffer."""
+        self.request, request = self.request
+        super().setup()
+        self.rfile = io.BytesIO(request)
+
+
+def handle_forwarded(server: WSGIServer, channel: socket.socket) -> bool:
+    """
+    Handle a request forwarded by a :class:`~.affinity.Router`.
+
+    The response is written directly to the client's connection.
+
+    Parameters:
+        server (wsgiref.simple_server.WSGIServer): The server of the WSGI
+            application.
+        channel (socket.socket): The worker's Unix socket.
+
+    Returns:
+        bool: Whether a request was handled (if not, the router closed the
+        socket).
+    """
+    received = receive_connection(channel)
+
+    if received is None:
+        return False
+
+    connection, request = received
+
+    try:
+        address = connection.getpeername()
+        _ForwardedRequestHandler((connection, request), address, server)
+    except OSError:
+        # The client went away.
+        pass
+    finally:
+        connection.close()
+
+    return True
+
+
+class Server:
+    """
+    A pre-fork HTTP server for dispatchers (or WSGI applications).
+
+    The parent process imports the application (and calls the ``warmup``
+    function of its module, if any) and then freezes the garbage collector
+    (see :func:`gc.freeze`), so the memory of the preloaded objects stays
+    shared by the forked workers (the collector doesn't touch them).
+
+    On Linux, each worker binds its own listening socket to the address
+    (with ``SO_REUSEPORT``) and the kernel balances the connections between
+    them. On other POSIX systems, the workers share the parent's socket.
+
+    With session affinity, the parent accepts the connections instead and
+    routes each request by its session (see :class:`~.affinity.Router`), so
+    all the turns of a conversation are handled by the same worker (and its
+    per-process caches). A restarted worker takes back its sessions.
+
+    Signals:
+        * ``SIGHUP``: Reload the application (its modules are imported
+          again), start new workers and stop the old ones gracefully (after
+          they handle the connections already accepted).
+        * ``SIGTERM``/``SIGINT``: Stop the workers gracefully and exit.
+
+    Examples:
+        Serving a dispatcher with a worker for each CPU:
+
+            >>> Server('myapp.webhook:dispatcher', port=8000).run()
+
+    Parameters:
+        target (str): The application (``module:name``, see
+            :func:`load_app`).
+        host (str): The host to listen on.
+        port (int): The port to listen on.
+        workers (int, optional): The number of workers (the number of CPUs
+            by default).
+        backlog (int): The size of the queue of pending connections.
+        affinity (bool): Whether the requests of each session are routed to
+            the same worker.
+    """
+
+    def __init__(
+        self,
+        target: str,
+        host: str = '127.0.0.1',
+        port: int = 8000,
+        workers: Optional[int] = None,
+        backlog: int = 1024,
+        affinity: bool = False
+    ) -> None:
+        self.target = target
+        self.host = host
+        self.port = port
+        self.workers = workers or os.cpu_count() or 1
+        self.backlog = backlog
+        self.affinity = affinity
+        self.app: Optional[WSGIApplication] = None
+        self._base_modules: Optional[Set[str]] = None
+        self._router: Optional[Router] = None
+        self._pids: Dict[int, int] = {}
+        self._slots: Dict[int, int] = {}
+        self._generation = 0
+        self._signals: Set[int] = set()
+
+    def preload(self) -> WSGIApplication:
+        """
+        Import (or import again) the application and freeze the heap.
+
+        Returns:
+            callable: The WSGI application.
+        """
+        if self._base_modules is None:
+            self._base_modules = set(sys.modules)
+        else:
+            for name in set(sys.modules) - self._base_modules:
+                del sys.modules[name]
+
+            importlib.invalidate_caches()
+
+        gc.unfreeze()
+
+        self.app = load_app(self.target)
+        warmup = getattr(
+            sys.modules[self.target.partition(':')[0]],
+            'warmup',
+            None
+        )
+
+        if callable(warmup):
+            warmup()
+
+        gc.collect()
+        gc.freeze()
+
+        return self.app
+
+    def run(self) -> None:  # pragma: no cover (forks processes)
+        """Preload the application, start the workers and supervise them."""
+        if not hasattr(os, 'fork'):
+            raise RuntimeError('the server requires a POSIX system')
+
+        self.preload()
+
+        if self.affinity:
+            self._socket = create_socket(self.host, self.port,
+                                         backlog=self.backlog)
+            self._router = Router(self._socket)
+        else:
+            self._socket = create_socket(
+                self.host,
+                self.port,
+                reuse_port=_BALANCES_REUSED_PORTS,
+                backlog=None if _BALANCES_REUSED_PORTS else self.backlog
+            )
+
+        self.port = self._socket.getsockname()[1]
+
+        for signum in (signal.SIGHUP, signal.SIGTERM, signal.SIGINT):
+            signal.signal(signum, lambda signum, _: self._signals.add(signum))
+
+        self._spawn_workers()
+
+        try:
+            while not self._signals & {signal.SIGTERM, signal.SIGINT}:
+                if signal.SIGHUP in self._signals:
+                    self._signals.discard(signal.SIGHUP)
+                    self._reload()
+
+                self._reap_workers()
+
+                if self._router is not None:
+                    self._router.poll(_POLL_INTERVAL)
+                else:
+                    time.sleep(_POLL_INTERVAL)
+        finally:
+            if self._router is not None:
+                # The workers see the end of their sockets.
+                self._router.close()
+
+            self._stop_workers(list(self._pids))
+            self._socket.close()
+
+    def _spawn_workers(self) -> None:  # pragma: no cover (forks processes)
+        """Start workers until the current generation is complete."""
+        running = {
+            self._slots[pid]
+            for pid, generation in self._pids.items()
+            if generation == self._generation
+        }
+
+        for slot in range(self.workers):
+            if slot in running:
+                continue
+
+            channel = worker_channel = None
+
+            if self._router is not None:
+                channel, worker_channel = socket.socketpair()
+
+            pid = os.fork()
+
+            if pid == 0:
+                code = 0
+
+                try:
+                    if channel is not None:
+                        channel.close()
+
+                    self._work(worker_channel)
+                except BaseException:
+                    traceback.print_exc()
+                    code = 1
+                finally:
+                    os._exit(code)
+
+            self._pids[pid] = self._generation
+            self._slots[pid] = slot
+
+            if self._router is not None:
+                # The worker takes (back) the sessions of its slot.
+                worker_channel.close()
+                self._router.add_worker(slot, channel)
+
+    def _reload(self) -> None:  # pragma: no cover (forks processes)
+        """Start workers with the application reloaded, then stop the old."""
+        old_pids = list(self._pids)
+
+        try:
+            self.preload()
+        except Exception as error:
+            print(f'reload failed: {error!r}', file=sys.stderr)
+
+            return
+
+        self._generation += 1
+        self._spawn_workers()
+        self._stop_workers(old_pids)
+
+    def _reap_workers(self) -> None:  # pragma: no cover (forks processes)
+        """Collect the exited workers (and replace them)."""
+        while self._pids:
+            pid, _ = os.waitpid(-1, os.WNOHANG)
+
+            if pid == 0:
+                break
+
+            generation = self._pids.pop(pid, None)
+            slot = self._slots.pop(pid, None)
+
+            if self._router is not None and generation == self._generation:
+                # Its sessions move to the other workers until it's replaced.
+                self._router.remove_worker(slot)
+
+        self._spawn_workers()
+
+    def _stop_workers(self, pids: Any) -> None:  # pragma: no cover (forks)
+        """Stop workers gracefully (and wait for them)."""
+        for pid in pids:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+        for pid in pids:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+
+            self._pids.pop(pid, None)
+            self._slots.pop(pid, None)
+
+    def _work(
+        self,
+        channel: Optional[socket.socket] = None
+    ) -> None:  # pragma: no cover (runs in the workers)
+        """Serve requests until the worker is stopped."""
+        stopping = []
+
+        signal.signal(signal.SIGTERM, lambda *_: stopping.append(True))
+        signal.signal(signal.SIGINT, signal.SIG_IGN)
+        signal.signal(signal.SIGHUP, signal.SIG_IGN)
+
+        if self._router is not None:
+            # The router's sockets belong to the parent.
+            self._router.close()
+        elif _BALANCES_REUSED_PORTS:
+            self._socket.close()
+            self._socket = create_socket(
+                self.host,
+                self.port,
+                reuse_port=True,
+                backlog=self.backlog
+            )
+
+        server = WSGIServer(
+            (self.host, self.port),
+            _RequestHandler,
+            bind_and_activate=False
+        )
+        server.socket.close()
+        server.socket = self._socket
+        server.server_address = (self.host, self.port)
+        server.server_name = self.host
+        server.server_port = self.port
+        server.setup_environ()
+        server.set_app(self.app)
+        server.timeout = 0
+
+        # Adapters create their resources (e.g.: the pool of HTTP
+        # connections) in each worker, after the fork.
+        if isinstance(self.app, Adapter):
+            self.app.startup()
+
+        if channel is not None:
+            self._serve_channel(server, channel, stopping)
+        else:
+            self._serve_socket(server, stopping)
+
+        if isinstance(self.app, Adapter):
+            self.app.shutdown()
+
+    def _serve_socket(
+        self,
+        server: WSGIServer,
+        stopping: List[bool]
+    ) -> None:  # pragma: no cover (runs in the workers)
+        """Accept connections until the worker is stopped."""
+        # Another worker may accept the connection first (when the socket is
+        # shared), so accepting must not block.
+        self._socket.setblocking(False)
+
+        with selectors.DefaultSelector() as selector:
+            selector.register(self._socket, selectors.EVENT_READ)
+
+            while not stopping:
+                if selector.select(_POLL_INTERVAL):
+                    server.handle_request()
+
+            if _BALANCES_REUSED_PORTS:
+                # Handle the connections queued in this worker's socket
+                # (which are dropped when it's closed).
+                while selector.select(0):
+                    server.handle_request()
+
+        self._socket.close()
+
+    @staticmethod
+    def _serve_channel(
+        server: WSGIServer,
+        channel: socket.socket,
+        stopping: List[bool]
+    ) -> None:  # pragma: no cover (runs in the workers)
+        """Handle the router's requests until the worker is stopped."""
+        with selectors.DefaultSelector() as selector:
+            selector.register(channel, selectors.EVENT_READ)
+
+            while not stopping:
+                if not selector.select(_POLL_INTERVAL):
+                    continue
+
+                if not handle_forwarded(server, channel):
+                    break
+
+            # Handle the requests already routed to this worker.
+            while selector.select(0) and handle_forwarded(server, channel):
+                pass
+
+        channel.close()
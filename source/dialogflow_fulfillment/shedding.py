@@ -0,0 +1,371 @@
+import heapq
+import itertools
+import json
+from threading import Event, Lock
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    List,
+    NamedTuple,
+    Optional,
+    Union,
+)
+
+from .raw_json import BytesLike, get_intent
+from .rich_responses import Text
+
+if TYPE_CHECKING:  # pragma: no cover
+    import asyncio
+
+_ENCODER = json.JSONEncoder(separators=(',', ':'))
+
+
+class SheddingStats(NamedTuple):
+    """The counts of a load shedder."""
+
+    #: int: The number of admitted requests.
+    admitted: int
+    #: int: The number of shed requests.
+    shed: int
+    #: dict(str, int): The number of shed requests of each intent (requests
+    #: without an intent are counted under an empty string).
+    shed_by_intent: Dict[str, int]
+    #: int: The number of requests being handled.
+    in_flight: int
+    #: int: The number of requests waiting to be handled.
+    queued: int
+
+
+class _Waiter:
+    """A request waiting (in the queue) to be handled."""
+
+    __slots__ = ('priority', 'sequence', 'intent', 'wake', 'settled',
+                 'admitted')
+
+    def __init__(
+        self,
+        priority: int,
+        sequence: int,
+        intent: Optional[str],
+        wake: Callable[[], None]
+    ) -> None:
+        self.priority = priority
+        self.sequence = sequence
+        self.intent = intent
+        self.wake = wake
+        self.settled = False
+        self.admitted = False
+
+    def settle(self, admitted: bool) -> None:
+        """Admit (or shed) the request and wake it up."""
+        self.settled = True
+        self.admitted = admitted
+        self.wake()
+
+    def __lt__(self, other: '_Waiter') -> bool:
+        """Order the waiters by priority (and then by arrival)."""
+        return (-self.priority, self.sequence) \
+            < (-other.priority, other.sequence)
+
+
+class LoadShedder:
+    """
+    A limiter of the requests handled at the same time (by an adapter).
+
+    Up to ``max_concurrency`` requests are handled at the same time and
+    up to ``max_queue`` requests wait for their turn (for at most
+    ``queue_timeout`` seconds). The remaining requests are shed: they're
+    answered right away with a fallback webhook response, which is
+    serialized once (no client is created for them), instead of piling up
+    until they all time out at Dialogflow when a backend slows down.
+
+    Waiting requests are handled by priority (see ``priorities``), and
+    when the queue is full a request evicts (sheds) the waiting request with
+    the lowest priority, if it's lower than its own. The intent of a request
+    is only decoded when the request has to wait. Requests wait in their
+    thread (see :meth:`acquire`) or in the event loop (see
+    :meth:`acquire_async`).
+
+    Examples:
+        Handling up to 8 requests at the same time (and queueing 16), with a
+        fallback text and a higher priority for checkouts:
+
+            >>> shedder = LoadShedder(
+            ...     max_concurrency=8,
+            ...     max_queue=16,
+            ...     text='We are busy right now, please try again.',
+            ...     priorities={'Checkout': 10},
+            ... )
+            >>> app = WSGIAdapter(dispatcher, shedder=shedder)
+
+    Parameters:
+        max_concurrency (int): The maximum number of requests handled at the
+            same time.
+        max_queue (int): The maximum number of requests waiting to be
+            handled.
+        queue_timeout (float): How long (in seconds) a request waits to be
+            handled before it's shed.
+        text (str, optional): The text of the fallback response.
+        followup_event (str or dict, optional): The followup event of the
+            fallback response (an event name or a ``followupEventInput``
+            object). Without a text nor an event, the fallback response is
+            empty (and Dialogflow uses the responses defined in its
+            console).
+        language_code (str): The language of the followup event (if it's
+            given by name).
+        priorities (dict(str, int), optional): The priorities of the intents
+            (``0`` by default, higher priorities are handled first).
+
+    Raises:
+        ValueError: If the limits are invalid.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int,
+        max_queue: int = 0,
+        queue_timeout: float = 1.0,
+        text: Optional[str] = None,
+        followup_event: Optional[Union[str, Dict[str, Any]]] = None,
+        language_code: str = 'en',
+        priorities: Optional[Dict[str, int]] = None
+    ) -> None:
+        if max_concurrency < 1:
+            raise ValueError('max_concurrency argument must be positive')
+
+        if max_queue < 0:
+            raise ValueError('max_queue argument must not be negative')
+
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.priorities = dict(priorities or {})
+        self.fallback = self._serialize_fallback(
+            text,
+            followup_event,
+            language_code
+        )
+
+        self._lock = Lock()
+        self._in_flight = 0
+        self._queue: List[_Waiter] = []
+        self._sequence = itertools.count()
+        self._admitted = 0
+        self._shed_by_intent: Dict[str, int] = {}
+
+    @property
+    def stats(self) -> SheddingStats:
+        """SheddingStats: The counts of the admitted and shed requests."""
+        with self._lock:
+            return SheddingStats(
+                self._admitted,
+                sum(self._shed_by_intent.values()),
+                dict(self._shed_by_intent),
+                self._in_flight,
+                len(self._queue)
+            )
+
+    def acquire(self, request: Union[Dict[str, Any], BytesLike]) -> bool:
+        """
+        Admit a request (waiting in the queue if it's needed).
+
+        An admitted request must be released (see :meth:`release`) after
+        it's handled.
+
+        Parameters:
+            request (dict, bytes, bytearray, memoryview): The webhook request
+                object (or the encoded webhook request object).
+
+        Returns:
+            bool: Whether the request was admitted (if not, it must be
+            answered with the ``fallback`` response).
+        """
+        with self._lock:
+            if self._admit_now():
+                return True
+
+        event = Event()
+        waiter = self._enqueue(request, event.set)
+
+        if not waiter.settled:
+            event.wait(self.queue_timeout)
+
+        return self._settle(waiter)
+
+    async def acquire_async(
+        self,
+        request: Union[Dict[str, Any], BytesLike]
+    ) -> bool:
+        """
+        Admit a request, waiting in the event loop (if it's needed).
+
+        The request waits for its turn without holding a thread, and if the
+        waiting task is cancelled, the request leaves the queue (or releases
+        its turn, if it was admitted in the meantime). An admitted request
+        must be released (see :meth:`release`) after it's handled.
+
+        Parameters:
+            request (dict, bytes, bytearray, memoryview): The webhook request
+                object (or the encoded webhook request object).
+
+        Returns:
+            bool: Whether the request was admitted (if not, it must be
+            answered with the ``fallback`` response).
+        """
+        with self._lock:
+            if self._admit_now():
+                return True
+
+        import asyncio
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def wake() -> None:
+            loop.call_soon_threadsafe(_resolve, future)
+
+        waiter = self._enqueue(request, wake)
+
+        try:
+            if not waiter.settled:
+                await asyncio.wait_for(future, self.queue_timeout)
+        except asyncio.TimeoutError:
+            pass
+        except asyncio.CancelledError:
+            self._abandon(waiter)
+
+            raise
+
+        return self._settle(waiter)
+
+    def release(self) -> None:
+        """Release an admitted request (handing its turn to the next one)."""
+        with self._lock:
+            if self._queue:
+                waiter = heapq.heappop(self._queue)
+                self._admitted += 1
+                waiter.settle(True)
+            else:
+                self._in_flight -= 1
+
+    def reset(self) -> None:
+        """Clear the counts of the admitted and shed requests."""
+        with self._lock:
+            self._admitted = 0
+            self._shed_by_intent = {}
+
+    def _enqueue(
+        self,
+        request: Union[Dict[str, Any], BytesLike],
+        wake: Callable[[], None]
+    ) -> _Waiter:
+        """
+        Queue a request that can't be admitted right away.
+
+        The request is settled right away (without being woken up) if it's
+        admitted or shed without waiting.
+        """
+        # The intent is decoded (only) when the request can't be handled
+        # right away, outside of the lock.
+        intent = get_intent(request)
+        priority = self.priorities.get(intent or '', 0)
+        waiter = _Waiter(priority, next(self._sequence), intent, wake)
+
+        with self._lock:
+            if self._admit_now():
+                waiter.settled = waiter.admitted = True
+
+                return waiter
+
+            if len(self._queue) >= self.max_queue:
+                lowest = max(self._queue) if self._queue else None
+
+                if lowest is None or not waiter < lowest:
+                    self._count_shed(intent)
+                    waiter.settled = True
+
+                    return waiter
+
+                # The request takes the place of a less important one.
+                self._remove(lowest)
+                self._count_shed(lowest.intent)
+                lowest.settle(False)
+
+            heapq.heappush(self._queue, waiter)
+
+        return waiter
+
+    def _settle(self, waiter: _Waiter) -> bool:
+        """Get whether a request was admitted (shedding it if it wasn't)."""
+        with self._lock:
+            if not waiter.settled:
+                # The request waited too long.
+                self._remove(waiter)
+                self._count_shed(waiter.intent)
+                waiter.settled = True
+
+            return waiter.admitted
+
+    def _abandon(self, waiter: _Waiter) -> None:
+        """Remove a request (whose task was cancelled) from the queue."""
+        with self._lock:
+            if not waiter.settled:
+                self._remove(waiter)
+                waiter.settled = True
+
+                return
+
+        if waiter.admitted:
+            # The request was admitted in the meantime.
+            self.release()
+
+    def _admit_now(self) -> bool:
+        """Admit a request if there's a free slot (and nobody waiting)."""
+        if self._in_flight < self.max_concurrency and not self._queue:
+            self._in_flight += 1
+            self._admitted += 1
+
+            return True
+
+        return False
+
+    def _remove(self, waiter: _Waiter) -> None:
+        """Remove a waiter from the queue."""
+        self._queue.remove(waiter)
+        heapq.heapify(self._queue)
+
+    def _count_shed(self, intent: Optional[str]) -> None:
+        """Count a shed request."""
+        key = intent or ''
+        self._shed_by_intent[key] = self._shed_by_intent.get(key, 0) + 1
+
+    @staticmethod
+    def _serialize_fallback(
+        text: Optional[str],
+        followup_event: Optional[Union[str, Dict[str, Any]]],
+        language_code: str
+    ) -> bytes:
+        """Serialize the fallback webhook response."""
+        response: Dict[str, Any] = {}
+
+        if text is not None:
+            response['fulfillmentMessages'] = [Text(text)._as_dict()]
+
+        if isinstance(followup_event, str):
+            followup_event = {'name': followup_event}
+
+        if followup_event is not None:
+            response['followupEventInput'] = {
+                'languageCode': language_code,
+                **followup_event,
+            }
+
+        return _ENCODER.encode(response).encode()
+
+
+def _resolve(future: 'asyncio.Future[None]') -> None:
+    """Wake up a request waiting in an event loop (unless it's gone)."""
+    if not future.done():
+        future.set_result(None)
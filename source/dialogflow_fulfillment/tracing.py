@@ -0,0 +1,399 @@
+import json
+import os
+import time
+import weakref
+from collections import deque
+from contextvars import ContextVar, copy_context
+from threading import Event, Lock, Thread
+from typing import (
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    List,
+    Optional,
+    Type,
+    TypeVar,
+    Union,
+)
+
+T = TypeVar('T')
+
+_ENCODER = json.JSONEncoder(separators=(',', ':'))
+
+# The span of the current context (e.g.: of the current request).
+_CURRENT_SPAN: ContextVar[Optional['Span']] = ContextVar(
+    'dialogflow_fulfillment_span',
+    default=None
+)
+
+# The kind of the spans (SPAN_KIND_INTERNAL) and the code of the status of
+# the failed spans (STATUS_CODE_ERROR), according to OTLP.
+_SPAN_KIND = 1
+_ERROR_STATUS_CODE = 2
+
+
+def current_span() -> Optional['Span']:
+    """
+    Get the span of the current context.
+
+    Returns:
+        :class:`Span`, optional: The span (if any).
+    """
+    return _CURRENT_SPAN.get()
+
+
+def propagate(function: Callable[..., T]) -> Callable[..., T]:
+    """
+    Bind a function to (a copy of) the current context.
+
+    The function runs in the current span (and with the other context
+    variables) even if it's called in another thread (e.g.: of an
+    executor). :meth:`~.WebhookClient.gather` does it for its functions.
+
+    Examples:
+        Calling a backend in an executor, in the current span:
+
+            >>> future = executor.submit(propagate(get_orders), user_id)
+
+    Parameters:
+        function (callable): The function.
+
+    Returns:
+        callable: The function bound to the context.
+    """
+    context = copy_context()
+
+    def run(*args: Any, **kwargs: Any) -> T:
+        return context.run(function, *args, **kwargs)
+
+    return run
+
+
+class Span:
+    """
+    A timed operation (e.g.: a part of a request) of a trace.
+
+    Spans are context managers: the span starts when the block is entered
+    (as a child of the current span, if any) and it ends when the block is
+    exited (with an error status, if the block raised an exception).
+    """
+
+    __slots__ = {
+        'tracer': 'Tracer: The tracer of the span.',
+        'name': 'str: The name of the operation.',
+        'trace_id': 'int: The (128-bit) identifier of the trace.',
+        'span_id': 'int: The (64-bit) identifier of the span.',
+        'parent_id': 'int, optional: The identifier of the parent span.',
+        'start_time': 'int: When the span started (in nanoseconds since the '
+                      'epoch).',
+        'end_time': 'int: When the span ended (in nanoseconds since the '
+                    'epoch).',
+        'attributes': 'dict(str, any): The attributes of the operation.',
+        'error': 'str, optional: The error that ended the span.',
+        '_token': 'The token to restore the current span.',
+    }
+
+    def __init__(
+        self,
+        tracer: 'Tracer',
+        name: str,
+        attributes: Dict[str, Any]
+    ) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.attributes = attributes
+        self.trace_id = 0
+        self.span_id = 0
+        self.parent_id: Optional[int] = None
+        self.start_time = 0
+        self.end_time = 0
+        self.error: Optional[str] = None
+
+    @property
+    def duration(self) -> float:
+        """float: How long (in seconds) the span took."""
+        return (self.end_time - self.start_time) / 1e9
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """
+        Set an attribute of the span.
+
+        Parameters:
+            key (str): The name of the attribute.
+            value (str, bool, int, float): The value of the attribute.
+        """
+        self.attributes[key] = value
+
+    def __enter__(self) -> 'Span':
+        """Start the span (in the current context)."""
+        parent = _CURRENT_SPAN.get()
+        getrandbits = self.tracer._getrandbits
+
+        if parent is None:
+            self.trace_id = getrandbits(128)
+        else:
+            self.trace_id = parent.trace_id
+            self.parent_id = parent.span_id
+
+        self.span_id = getrandbits(64)
+        self._token = _CURRENT_SPAN.set(self)
+        self.start_time = time.time_ns()
+
+        return self
+
+    def __exit__(
+        self,
+        exc_type: Optional[Type[BaseException]],
+        exc: Optional[BaseException],
+        traceback: Any
+    ) -> None:
+        """End the span (and give it to its tracer)."""
+        self.end_time = time.time_ns()
+
+        if exc_type is not None:
+            self.error = f'{exc_type.__name__}: {exc}'
+
+        _CURRENT_SPAN.reset(self._token)
+        self.tracer.spans.append(self)
+
+    def _to_otlp(self) -> Dict[str, Any]:
+        """Convert the span to an OTLP (JSON) span object."""
+        span = {
+            'traceId': f'{self.trace_id:032x}',
+            'spanId': f'{self.span_id:016x}',
+            'name': self.name,
+            'kind': _SPAN_KIND,
+            'startTimeUnixNano': str(self.start_time),
+            'endTimeUnixNano': str(self.end_time),
+            'attributes': _to_otlp_attributes(self.attributes),
+        }
+
+        if self.parent_id is not None:
+            span['parentSpanId'] = f'{self.parent_id:016x}'
+
+        if self.error is not None:
+            span['status'] = {
+                'code': _ERROR_STATUS_CODE,
+                'message': self.error,
+            }
+
+        return span
+
+
+class _NullSpan:
+    """A span that isn't recorded (e.g.: of a client without a tracer)."""
+
+    __slots__ = ()
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Ignore an attribute."""
+
+    def __enter__(self) -> '_NullSpan':
+        """Do nothing."""
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Do nothing."""
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """
+    A tracer of the time spent in (the parts of) the requests.
+
+    Ended spans are appended to a ring buffer (a bounded deque, so the
+    oldest spans are dropped if the buffer is full), which is the only work
+    done on the path of the requests. If a file is given, a background
+    thread drains the buffer periodically and appends the spans to the file
+    in the OTLP JSON format (a line per batch, as an
+    ``ExportTraceServiceRequest`` object), which OpenTelemetry tools can
+    ingest (e.g.: the collector's ``otlpjsonfile`` receiver).
+
+    Examples:
+        Tracing the requests handled by a dispatcher (each worker process
+        writes its own file):
+
+            >>> tracer = Tracer('traces-{pid}.jsonl')
+            >>> dispatcher = Dispatcher(handlers, tracer=tracer)
+
+        Tracing a part of a handler:
+
+            >>> def handler(agent):
+            ...     with agent.span('get orders', user=user_id):
+            ...         orders = get_orders(user_id)
+
+    Parameters:
+        path (str, path-like, optional): The file of the spans. A ``{pid}``
+            placeholder is replaced with the process ID.
+        capacity (int): The maximum number of spans in the ring buffer.
+        export_interval (float): How often (in seconds) the spans are
+            written to the file.
+        service_name (str): The name of the service (the ``service.name``
+            attribute of the spans' resource).
+    """
+
+    def __init__(
+        self,
+        path: Optional[Union[str, 'os.PathLike[str]']] = None,
+        capacity: int = 8192,
+        export_interval: float = 1.0,
+        service_name: str = 'dialogflow-fulfillment'
+    ) -> None:
+        # The random module is slow to import (and only needed for tracing).
+        import random
+
+        self.path = path
+        self.capacity = capacity
+        self.export_interval = export_interval
+        self.service_name = service_name
+        self.spans: Deque[Span] = deque(maxlen=capacity)
+
+        self._getrandbits = random.getrandbits
+        self._export_lock = Lock()
+        self._stopping = Event()
+        self._thread: Optional[Thread] = None
+
+        if path is not None:
+            self._start()
+
+            if hasattr(os, 'register_at_fork'):
+                # The export thread isn't forked (but the tracer is).
+                reference = weakref.ref(self)
+                os.register_at_fork(
+                    after_in_child=lambda: _restart_export(reference)
+                )
+
+    def span(self, name: str, **attributes: Any) -> Span:
+        """
+        Get a span, which starts when its ``with`` block is entered.
+
+        Parameters:
+            name (str): The name of the operation.
+            **attributes: The attributes of the operation.
+
+        Returns:
+            :class:`Span`: The span.
+        """
+        return Span(self, name, attributes)
+
+    def drain(self) -> List[Span]:
+        """
+        Take the ended spans out of the ring buffer.
+
+        Returns:
+            list(Span): The spans (from the oldest to the newest).
+        """
+        spans = []
+
+        while True:
+            try:
+                spans.append(self.spans.popleft())
+            except IndexError:
+                return spans
+
+    def export(self) -> int:
+        """
+        Write the ended spans to the file (without waiting for the thread).
+
+        Returns:
+            int: The number of written spans.
+        """
+        with self._export_lock:
+            spans = self.drain()
+
+            if not spans or self.path is None:
+                return 0
+
+            line = _ENCODER.encode(self._to_otlp(spans)) + '\n'
+            path = os.fspath(self.path).replace('{pid}', str(os.getpid()))
+
+            with open(path, 'a', encoding='utf-8') as file:
+                file.write(line)
+
+            return len(spans)
+
+    def close(self) -> None:
+        """Stop the export thread (and write the remaining spans)."""
+        self._stopping.set()
+
+        if self._thread is not None and self._thread.is_alive():
+            self._thread.join()
+
+        self.export()
+
+    def __enter__(self) -> 'Tracer':
+        """Use the tracer as a context manager (that closes it)."""
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        """Close the tracer."""
+        self.close()
+
+    def _start(self) -> None:
+        """Start the export thread (of the current process)."""
+        self._stopping = Event()
+        self._thread = Thread(
+            target=self._export_periodically,
+            name='dialogflow-fulfillment-tracer',
+            daemon=True
+        )
+        self._thread.start()
+
+    def _export_periodically(self) -> None:
+        """Write the spans to the file (in the export thread)."""
+        while not self._stopping.wait(self.export_interval):
+            self.export()
+
+    def _to_otlp(self, spans: List[Span]) -> Dict[str, Any]:
+        """Convert spans to an OTLP (JSON) export request object."""
+        resource = {
+            'service.name': self.service_name,
+            'process.pid': os.getpid(),
+        }
+
+        return {
+            'resourceSpans': [{
+                'resource': {'attributes': _to_otlp_attributes(resource)},
+                'scopeSpans': [{
+                    'scope': {'name': __package__},
+                    'spans': [span._to_otlp() for span in spans],
+                }],
+            }],
+        }
+
+
+def _restart_export(reference: 'weakref.ref[Tracer]') -> None:
+    """Restart the export thread of a tracer in a forked process."""
+    tracer = reference()
+
+    if tracer is not None and not tracer._stopping.is_set():
+        # The spans of the parent were (or will be) exported by the parent.
+        tracer.spans.clear()
+        tracer._export_lock = Lock()
+        tracer._start()
+
+
+def _to_otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Convert attributes to OTLP (JSON) key-value objects."""
+    key_values = []
+
+    for key, value in attributes.items():
+        if value is None:
+            continue
+
+        if isinstance(value, bool):
+            otlp_value: Dict[str, Any] = {'boolValue': value}
+        elif isinstance(value, int):
+            # 64-bit integers are encoded as strings (in OTLP JSON).
+            otlp_value = {'intValue': str(value)}
+        elif isinstance(value, float):
+            otlp_value = {'doubleValue': value}
+        else:
+            otlp_value = {'stringValue': str(value)}
+
+        key_values.append({'key': key, 'value': otlp_value})
+
+    return key_values
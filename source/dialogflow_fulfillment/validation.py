@@ -0,0 +1,376 @@
+from itertools import count
+from typing import Any, Callable, Dict, List, Sequence, Tuple, Union
+
+from .raw_json import RawJSON
+
+PathPart = Union[str, int]
+Schema = Dict[str, Any]
+Validator = Callable[[Any], None]
+
+# The keywords of the schemas that are checked by the validators and the ones
+# that are ignored (they're only documentation).
+_KEYWORDS = frozenset(('type', 'properties', 'required', 'items', 'enum'))
+_ANNOTATIONS = frozenset(('$schema', 'title', 'description'))
+
+# The checks of the types (formatted with the name of the value).
+_TYPE_CHECKS = {
+    'object': 'isinstance({0}, dict)',
+    'array': 'isinstance({0}, list)',
+    'string': 'isinstance({0}, str)',
+    'integer': '(isinstance({0}, int) and not isinstance({0}, bool))',
+    'number': '(isinstance({0}, (int, float)) and not isinstance({0}, bool))',
+    'boolean': 'isinstance({0}, bool)',
+    'null': '{0} is None',
+}
+
+_ARTICLES = {'object': 'an', 'array': 'an', 'integer': 'an'}
+
+_MISSING = object()
+
+_CONTEXT_SCHEMA: Schema = {
+    'type': 'object',
+    'required': ['name'],
+    'properties': {
+        'name': {'type': 'string'},
+        'lifespanCount': {'type': 'integer'},
+        'parameters': {'type': 'object'},
+    },
+}
+
+_MESSAGE_SCHEMA: Schema = {
+    'type': 'object',
+    'properties': {
+        'platform': {'type': 'string'},
+    },
+}
+
+#: The schema (a subset of JSON Schema) of the webhook request objects
+#: (``WebhookRequest``) from Dialogflow.
+WEBHOOK_REQUEST_SCHEMA: Schema = {
+    '$schema': 'http://json-schema.org/draft-07/schema#',
+    'title': 'WebhookRequest',
+    'type': 'object',
+    'required': ['responseId', 'session', 'queryResult'],
+    'properties': {
+        'responseId': {'type': 'string'},
+        'session': {'type': 'string'},
+        'queryResult': {
+            'type': 'object',
+            'properties': {
+                'queryText': {'type': 'string'},
+                'languageCode': {'type': 'string'},
+                'speechRecognitionConfidence': {'type': 'number'},
+                'action': {'type': 'string'},
+                'parameters': {'type': 'object'},
+                'allRequiredParamsPresent': {'type': 'boolean'},
+                'cancelsSlotFilling': {'type': 'boolean'},
+                'fulfillmentText': {'type': 'string'},
+                'fulfillmentMessages': {
+                    'type': 'array',
+                    'items': _MESSAGE_SCHEMA,
+                },
+                'webhookSource': {'type': 'string'},
+                'webhookPayload': {'type': 'object'},
+                'outputContexts': {
+                    'type': 'array',
+                    'items': _CONTEXT_SCHEMA,
+                },
+                'intent': {
+                    'type': 'object',
+                    'properties': {
+                        'name': {'type': 'string'},
+                        'displayName': {'type': 'string'},
+                        'isFallback': {'type': 'boolean'},
+                        'endInteraction': {'type': 'boolean'},
+                    },
+                },
+                'intentDetectionConfidence': {'type': 'number'},
+                'diagnosticInfo': {'type': 'object'},
+                'sentimentAnalysisResult': {'type': 'object'},
+            },
+        },
+        'originalDetectIntentRequest': {
+            'type': 'object',
+            'properties': {
+                'source': {'type': 'string'},
+                'version': {'type': 'string'},
+                'payload': {'type': 'object'},
+            },
+        },
+    },
+}
+
+
+class ValidationError(ValueError):
+    """
+    An error raised when a value doesn't match a schema.
+
+    Attributes:
+        path (tuple(str or int)): The keys (and the indexes) of the invalid
+            value (e.g.: ``('queryResult', 'outputContexts', 0, 'name')``).
+        message (str): What is wrong with the value.
+    """
+
+    def __init__(self, path: Sequence[PathPart], message: str) -> None:
+        super().__init__(f'{format_path(path)}: {message}')
+
+        self.path = tuple(path)
+        self.message = message
+
+
+def format_path(path: Sequence[PathPart]) -> str:
+    """
+    Format the path of a value (as a JSONPath expression).
+
+    Examples:
+        >>> format_path(('queryResult', 'outputContexts', 0, 'name'))
+        '$.queryResult.outputContexts[0].name'
+
+    Parameters:
+        path (sequence(str or int)): The keys (and the indexes) of the value.
+
+    Returns:
+        str: The formatted path.
+    """
+    return '$' + ''.join(
+        f'[{part}]' if isinstance(part, int) else f'.{part}'
+        for part in path
+    )
+
+
+def compile_validator(schema: Schema, name: str = 'validate') -> Validator:
+    """
+    Compile a schema into a validator function.
+
+    The schema is turned into the source code of a function that checks a
+    value with straight-line code (only the arrays are iterated over), which
+    is compiled once. The validators only support the ``type``,
+    ``properties``, ``required``, ``items`` and ``enum`` keywords of JSON
+    Schema, which are enough for the webhook requests.
+
+    Objects that are decoded lazily (see :class:`~.RawJSON`) are accepted as
+    objects, without checking their fields.
+
+    Examples:
+        >>> validate = compile_validator({
+        ...     'type': 'object',
+        ...     'required': ['name'],
+        ...     'properties': {'name': {'type': 'string'}},
+        ... })
+        >>> validate({'name': 1})
+        Traceback (most recent call last):
+            ...
+        ValidationError: $.name: must be a string
+
+    Parameters:
+        schema (dict): The schema.
+        name (str): The name of the validator (e.g.: for tracebacks).
+
+    Returns:
+        callable: The validator, which raises :class:`ValidationError` if a
+        value doesn't match the schema.
+
+    Raises:
+        ValueError: If the schema has keywords (or types) that aren't
+            supported.
+    """
+    compiler = _Compiler()
+    body = compiler.compile(schema, 'value', (), 1)
+    source = '\n'.join([f'def {name}(value):', *(body or ['    pass'])])
+    namespace = {
+        '_MISSING': _MISSING,
+        '_RawJSON': RawJSON,
+        '_fail': _fail,
+        **compiler.constants,
+    }
+
+    exec(compile(source, f'<validator {name}>', 'exec'), namespace)
+
+    validator = namespace[name]
+    validator.source = source  # type: ignore
+
+    return validator  # type: ignore
+
+
+class _Compiler:
+    """A compiler of schemas into the source code of validators."""
+
+    def __init__(self) -> None:
+        self.constants: Dict[str, Any] = {}
+        self._names = count()
+
+    def compile(
+        self,
+        schema: Schema,
+        value: str,
+        path: Tuple[str, ...],
+        indent: int
+    ) -> List[str]:
+        """Get the lines that check a value (named in the source code)."""
+        unknown = set(schema) - _KEYWORDS - _ANNOTATIONS
+
+        if unknown:
+            raise ValueError(
+                f'unsupported schema keywords: {", ".join(sorted(unknown))}'
+            )
+
+        types = schema.get('type', [])
+
+        if isinstance(types, str):
+            types = [types]
+
+        for type_ in types:
+            if type_ not in _TYPE_CHECKS:
+                raise ValueError(f'unsupported schema type: {type_}')
+
+        prefix = '    ' * indent
+        lines = []
+        object_lines = self._compile_object(schema, value, path, indent + 1)
+        array_lines = self._compile_array(schema, value, path, indent + 1)
+        fail = f'{prefix}    {self._fail(path, _describe(types))}'
+
+        if 'enum' in schema:
+            name = self._constant(tuple(schema['enum']))
+            lines += [
+                f'{prefix}if {value} not in {name}:',
+                f'{prefix}    {self._fail(path, "has an unexpected value")}',
+            ]
+
+        if types == ['object'] and object_lines:
+            # The common case: a single check of the type (and the fields).
+            lines += [
+                f'{prefix}if isinstance({value}, dict):',
+                *object_lines,
+                f'{prefix}elif not isinstance({value}, _RawJSON):',
+                fail,
+            ]
+        elif types == ['array'] and array_lines:
+            lines += [
+                f'{prefix}if isinstance({value}, list):',
+                *array_lines,
+                f'{prefix}else:',
+                fail,
+            ]
+        else:
+            if types:
+                checks = [_TYPE_CHECKS[type_].format(value) for type_ in types]
+
+                if 'object' in types:
+                    checks.append(f'isinstance({value}, _RawJSON)')
+
+                lines += [f'{prefix}if not ({" or ".join(checks)}):', fail]
+
+            if object_lines:
+                lines += [f'{prefix}if isinstance({value}, dict):',
+                          *object_lines]
+
+            if array_lines:
+                lines += [f'{prefix}if isinstance({value}, list):',
+                          *array_lines]
+
+        return lines
+
+    def _compile_object(
+        self,
+        schema: Schema,
+        value: str,
+        path: Tuple[str, ...],
+        indent: int
+    ) -> List[str]:
+        """Get the lines that check the fields of an object."""
+        prefix = '    ' * indent
+        properties = schema.get('properties', {})
+        required = schema.get('required', [])
+        lines = []
+
+        for key in required:
+            if key not in properties:
+                fail = self._fail((*path, repr(key)), 'is missing')
+                lines += [f'{prefix}if {key!r} not in {value}:',
+                          f'{prefix}    {fail}']
+
+        for key, property_schema in properties.items():
+            field = self._name('field')
+            field_path = (*path, repr(key))
+            field_lines = self.compile(property_schema, field, field_path,
+                                       indent + 1)
+
+            if key in required:
+                lines += [
+                    f'{prefix}{field} = {value}.get({key!r}, _MISSING)',
+                    f'{prefix}if {field} is _MISSING:',
+                    f'{prefix}    {self._fail(field_path, "is missing")}',
+                ]
+
+                if field_lines:
+                    lines += [f'{prefix}else:', *field_lines]
+            elif field_lines:
+                lines += [
+                    f'{prefix}{field} = {value}.get({key!r}, _MISSING)',
+                    f'{prefix}if {field} is not _MISSING:',
+                    *field_lines,
+                ]
+
+        return lines
+
+    def _compile_array(
+        self,
+        schema: Schema,
+        value: str,
+        path: Tuple[str, ...],
+        indent: int
+    ) -> List[str]:
+        """Get the lines that check the items of an array."""
+        if 'items' not in schema:
+            return []
+
+        index = self._name('index')
+        item = self._name('item')
+        item_lines = self.compile(schema['items'], item, (*path, index),
+                                  indent + 1)
+
+        if not item_lines:
+            return []
+
+        return [
+            f'{"    " * indent}for {index}, {item} in enumerate({value}):',
+            *item_lines,
+        ]
+
+    def _fail(self, path: Tuple[str, ...], message: str) -> str:
+        """Get the statement that raises an error (for a value)."""
+        return f'_fail(({", ".join(path)}{"," if path else ""}), {message!r})'
+
+    def _name(self, kind: str) -> str:
+        """Get a new name (e.g.: for a field in the source code)."""
+        return f'_{kind}_{next(self._names)}'
+
+    def _constant(self, value: Any) -> str:
+        """Get the name of a constant (in the namespace of the validator)."""
+        name = self._name('constant')
+        self.constants[name] = value
+
+        return name
+
+
+def _describe(types: Sequence[str]) -> str:
+    """Describe the expected types of a value (for an error message)."""
+    return 'must be ' + ' or '.join(
+        f'{_ARTICLES.get(type_, "a")} {type_}' if type_ != 'null' else 'null'
+        for type_ in types
+    )
+
+
+def _fail(path: Tuple[PathPart, ...], message: str) -> None:
+    """Raise a validation error (from a validator)."""
+    raise ValidationError(path, message)
+
+
+#: Validate a webhook request object (see :data:`WEBHOOK_REQUEST_SCHEMA`).
+#:
+#: Raises:
+#:     ValidationError: If the request is invalid.
+validate_webhook_request = compile_validator(
+    WEBHOOK_REQUEST_SCHEMA,
+    'validate_webhook_request'
+)
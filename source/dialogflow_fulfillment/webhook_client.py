@@ -1,7 +1,33 @@
-from typing import Any, Callable, Dict, List, Optional, Union
-
+import os
+import time
+from _thread import allocate_lock
+from collections import OrderedDict
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from .compaction import DEFAULT_POLICY, CompactionStep, json_size
 from .contexts import Context
-from .rich_responses import RichResponse, Text
+from .parameters import Parameters
+from .rich_responses import Payload, RichResponse, Text
+
+if TYPE_CHECKING:  # pragma: no cover
+    from concurrent.futures import ThreadPoolExecutor
+
+    from google.protobuf.message import Message
+
+    from .entities import EntityIndex
+    from .http_pool import HTTPPool, HTTPSession
+    from .raw_json import BytesLike
+    from .tracing import Span, Tracer
 
 
 class WebhookClient:
@@ -15,9 +41,28 @@ class WebhookClient:
     Parameters:
         request (dict): The webhook request object (``WebhookRequest``) from
             Dialogflow.
+        max_response_size (int, optional): The size budget (in bytes) of the
+            webhook response (see :attr:`response_size`).
+        compaction_policy (list(callable)): The steps (see
+            :mod:`~dialogflow_fulfillment.compaction`) to be applied, in
+            order, to the response messages while the webhook response
+            exceeds the size budget.
+        request_timeout (float): How long (in seconds) Dialogflow waits for
+            the webhook response (see :attr:`deadline`).
+        http_pool (HTTPPool, optional): The pool of HTTP connections of the
+            handlers (see :attr:`http`).
+        entity_index (EntityIndex, optional): The index of the synonyms of
+            the custom entity types (see :meth:`~.Parameters.as_entity`).
+        tracer (Tracer, optional): The tracer of the handlers (see
+            :meth:`span`).
+        validate_request (bool): Whether the requests are checked against
+            the schema of the webhook requests (see
+            :data:`~dialogflow_fulfillment.validation.WEBHOOK_REQUEST_SCHEMA`)
+            before they're processed.
 
     Raises:
         TypeError: If the request is not a dictionary.
+        ValidationError: If the request is invalid (and it's validated).
 
     See Also:
         For more information about the webhook request object, see the
@@ -29,27 +74,250 @@ class WebhookClient:
         action (str): The action defined for the intent.
         context (Context): An API class for handling input and output contexts.
         contexts (list(dict)): The array of input contexts.
-        parameters (dict): The intent parameters extracted by Dialogflow.
-        console_messages (list(RichResponse)): The response messages defined
-            for the intent.
-        original_request (str): The original request object from
-            `detectIntent/query`.
+        parameters (Parameters): The intent parameters extracted by
+            Dialogflow.
+        console_messages (tuple(RichResponse)): The (immutable) response
+            messages defined for the intent.
         request_source (str): The source of the request.
+        platform (str): The platform of the request (e.g.: ``FACEBOOK`` for
+            requests from the Facebook Messenger integration), which is used
+            for choosing the response messages to be sent back.
         locale (str): The language code or locale of the original request.
         session (str): The session id of the conversation.
+        max_response_size (int, optional): The size budget (in bytes) of the
+            webhook response.
+        compaction_policy (list(callable)): The steps to be applied to the
+            response messages while the response exceeds the size budget.
+        request_timeout (float): How long (in seconds) Dialogflow waits for
+            the webhook response.
+        deadline (float): When (according to :func:`time.monotonic`)
+            Dialogflow stops waiting for the webhook response.
+        http_pool (HTTPPool, optional): The pool of HTTP connections of the
+            handlers.
+        tracer (Tracer, optional): The tracer of the handlers.
 
     .. _WebhookRequest: https://cloud.google.com/dialogflow/docs/reference/rpc/google.cloud.dialogflow.v2#webhookrequest
     """  # noqa: E501
 
-    def __init__(self, request: Dict[str, Any]) -> None:
+    _DECODED_FIELDS = ('responseId', 'session', 'queryResult')
+
+    _SOURCE_PLATFORMS = {
+        'facebook': 'FACEBOOK',
+        'slack': 'SLACK',
+        'telegram': 'TELEGRAM',
+        'kik': 'KIK',
+        'skype': 'SKYPE',
+        'line': 'LINE',
+        'viber': 'VIBER',
+        'google': 'ACTIONS_ON_GOOGLE',
+        'hangouts': 'GOOGLE_HANGOUTS',
+    }
+
+    _DEFAULT_PLATFORMS = (None, 'PLATFORM_UNSPECIFIED')
+
+    # The sizes of the (serialized) names of the response fields.
+    _FIELD_SIZES = {
+        field: json_size(field) + 1
+        for field in (
+            'fulfillmentMessages',
+            'followupEventInput',
+            'outputContexts',
+            'source',
+        )
+    }
+
+    # The maximum number of intents with cached console messages.
+    console_messages_cache_size = 256
+
+    # A mapping of intent IDs to (copies of) the message objects and the
+    # parsed console messages (shared by all clients), from the least to the
+    # most recently used.
+    _console_messages_cache: 'OrderedDict[str, Tuple[List[Dict[str, Any]], Tuple[RichResponse, ...]]]' = OrderedDict()  # noqa: E501
+    _console_messages_lock = allocate_lock()
+
+    # The maximum number of threads (shared by all clients) that run the
+    # functions given to gather.
+    gather_max_workers = 32
+
+    # The thread pool of gather (created on first use) and the process that
+    # created it (the threads of a pool don't survive a fork).
+    _gather_executor: Optional['ThreadPoolExecutor'] = None
+    _gather_pid: Optional[int] = None
+    _gather_lock = allocate_lock()
+
+    def __init__(
+        self,
+        request: Dict[str, Any],
+        max_response_size: Optional[int] = None,
+        compaction_policy: Sequence[CompactionStep] = DEFAULT_POLICY,
+        request_timeout: float = 5.0,
+        http_pool: Optional['HTTPPool'] = None,
+        entity_index: Optional['EntityIndex'] = None,
+        tracer: Optional['Tracer'] = None,
+        validate_request: bool = False
+    ) -> None:
         if not isinstance(request, dict):
             raise TypeError('request argument must be a dictionary')
 
+        self._validator: Optional[Callable[[Any], None]] = None
+
+        if validate_request:
+            # The validator is compiled on import (only if it's needed).
+            from .validation import validate_webhook_request
+
+            self._validator = validate_webhook_request
+            self._validator(request)
+
+        self.max_response_size = max_response_size
+        self.compaction_policy = compaction_policy
+        self.request_timeout = request_timeout
+        self.http_pool = http_pool
+        self.tracer = tracer
+
         self._response_messages: List[RichResponse] = []
+        self._response_sizes: List[int] = []
+        # The number and the total size of the response messages (by their
+        # platform).
+        self._platform_sizes: Dict[Optional[str], Tuple[int, int]] = {}
         self._followup_event: Optional[Dict[str, Any]] = None
 
+        self.parameters = Parameters(entity_index=entity_index)
+        self.context = Context([], '')
+
+        self._process_request(request)
+
+    def reset(self, request: Union[Dict[str, Any], 'BytesLike']) -> None:
+        """
+        Reset the client for handling another webhook request.
+
+        The client's objects and containers (e.g.: :attr:`context` and
+        :attr:`parameters`) are reused, so the client must not be used for
+        the previous request (nor its objects) anymore. The options of the
+        client (e.g.: the size budget) are kept.
+
+        Examples:
+            Reusing the same client for handling many requests:
+
+                >>> agent = WebhookClient(request)
+                >>> agent.handle_request(handler)
+                >>> agent.reset(another_request)
+                >>> agent.handle_request(handler)
+
+        Parameters:
+            request (dict, bytes, bytearray, memoryview): The webhook request
+                object (or the encoded webhook request object, see
+                :meth:`from_bytes`).
+
+        Raises:
+            TypeError: If the request is not a dictionary (nor a bytes-like
+                object).
+            ValidationError: If the request is invalid (and the client
+                validates the requests).
+        """
+        if isinstance(request, (bytes, bytearray, memoryview)):
+            request = self._decode_request(request)
+
+        if not isinstance(request, dict):
+            raise TypeError('request argument must be a dictionary')
+
+        if self._validator is not None:
+            self._validator(request)
+
+        self._response_messages.clear()
+        self._response_sizes.clear()
+        self._platform_sizes.clear()
+        self._followup_event = None
+
         self._process_request(request)
 
+    @classmethod
+    def from_bytes(cls, buf: 'BytesLike', **kwargs: Any) -> 'WebhookClient':
+        """
+        Create a client from an encoded (JSON) webhook request.
+
+        Only the fields needed by the client (e.g.: ``queryResult`` and
+        ``session``) are decoded. The original detect intent request, which
+        may carry large integration payloads, is kept as a slice of the
+        buffer and decoded only if :attr:`original_request` is accessed.
+
+        Examples:
+            Creating a client from the body of an HTTP request:
+
+                >>> agent = WebhookClient.from_bytes(request.body)
+
+        Parameters:
+            buf (bytes, bytearray, memoryview): The encoded webhook request
+                object (``WebhookRequest``) from Dialogflow.
+            **kwargs: The remaining arguments for the client (see
+                :class:`WebhookClient`).
+
+        Raises:
+            TypeError: If the request is not a bytes-like object.
+            ValueError: If the request is not a JSON object.
+
+        Returns:
+            :class:`WebhookClient`: The client for the webhook request.
+        """
+        if not isinstance(buf, (bytes, bytearray, memoryview)):
+            raise TypeError('buf argument must be a bytes-like object')
+
+        return cls(cls._decode_request(buf), **kwargs)
+
+    @classmethod
+    def from_proto(cls, message: 'Message', **kwargs: Any) -> 'WebhookClient':
+        """
+        Create a client from a webhook request message (protocol buffer).
+
+        Only the fields needed by the client are read, directly from the
+        message (without converting it to JSON). The message can be of
+        :data:`~dialogflow_fulfillment.proto.WebhookRequest` or of the
+        ``WebhookRequest`` protobuf class of Dialogflow's client library
+        (e.g.: ``WebhookRequest.pb(request)``).
+
+        Examples:
+            Creating a client from a webhook request message:
+
+                >>> agent = WebhookClient.from_proto(message)
+
+        Parameters:
+            message (WebhookRequest): The webhook request message from
+                Dialogflow.
+            **kwargs: The remaining arguments for the client (see
+                :class:`WebhookClient`).
+
+        Raises:
+            TypeError: If a console message isn't of a supported type.
+
+        Returns:
+            :class:`WebhookClient`: The client for the webhook request.
+        """
+        # The protobuf package is only needed by the clients of messages.
+        from .proto import request_to_dict
+
+        return cls(request_to_dict(message), **kwargs)
+
+    @classmethod
+    def _decode_request(cls, buf: 'BytesLike') -> Dict[str, Any]:
+        """Decode (only) the fields of the webhook request that are used."""
+        # The module is only needed for clients of encoded requests.
+        from .raw_json import select_fields
+
+        fields = select_fields(
+            buf,
+            (*cls._DECODED_FIELDS, 'originalDetectIntentRequest'),
+            lazy=('originalDetectIntentRequest',)
+        )
+        request = {
+            key: fields[key].decode()
+            for key in cls._DECODED_FIELDS if key in fields
+        }
+
+        if 'originalDetectIntentRequest' in fields:
+            request['originalDetectIntentRequest'] = \
+                fields['originalDetectIntentRequest']
+
+        return request
+
     def _process_request(self, request: Dict[str, Any]) -> None:
         """
         Set instance attributes from the webhook request.
@@ -61,15 +329,75 @@ class WebhookClient:
 
         self.intent = query_result.get('intent', {}).get('displayName')
         self.action = query_result.get('action')
-        self.parameters = query_result.get('parameters', {})
+        self.locale = query_result.get('languageCode')
+        self.parameters._reset(query_result.get('parameters', {}), self.locale)
         self.contexts = query_result.get('outputContexts', [])
-        self.original_request = request.get('originalDetectIntentRequest', {})
-        self.request_source = self.original_request.get('source')
+        self._original_request = request.get(
+            'originalDetectIntentRequest',
+            {}
+        )
+        self.request_source = self._original_request.get('source')
+        self.platform = self._get_platform(self.request_source)
         self.query = query_result.get('queryText')
-        self.locale = query_result.get('languageCode')
         self.session = request.get('session', '')
-        self.context = Context(self.contexts, self.session)
+        self.context._reset(self.contexts, self.session)
         self.console_messages = self._process_console_messages(request)
+        self.deadline = time.monotonic() + self.request_timeout
+
+    def _follow_up(
+        self,
+        intent: str,
+        action: Optional[str],
+        parameters: Dict[str, Any],
+        console_messages: List[Dict[str, Any]]
+    ) -> None:
+        """
+        Replace the request with the one that the followup event triggers.
+
+        As in Dialogflow, the response messages are discarded, while the
+        output contexts are kept (and seen by the triggered intent).
+        """
+        self.locale = self._followup_event['languageCode']
+        self._response_messages.clear()
+        self._response_sizes.clear()
+        self._platform_sizes.clear()
+        self._followup_event = None
+
+        self.intent = intent
+        self.action = action
+        self.parameters._reset(parameters, self.locale)
+        self.console_messages = self._parse_console_messages(
+            console_messages
+        )
+
+    @classmethod
+    def _get_platform(cls, source: Optional[str]) -> Optional[str]:
+        """Get the platform that corresponds to the source of the request."""
+        if source is None:
+            return None
+
+        platform = cls._SOURCE_PLATFORMS.get(source.lower(), source.upper())
+
+        return platform if platform not in cls._DEFAULT_PLATFORMS else None
+
+    @property
+    def original_request(self) -> Dict[str, Any]:
+        """
+        dict: The original request object from `detectIntent/query`.
+
+        Note:
+            For clients created with :meth:`from_bytes`, the object is decoded
+            on first access.
+        """  # noqa: D401
+        # The object is kept as a RawJSON by clients of encoded requests.
+        if not isinstance(self._original_request, dict):
+            self._original_request = self._original_request.decode()
+
+        return self._original_request
+
+    @original_request.setter
+    def original_request(self, original_request: Dict[str, Any]) -> None:
+        self._original_request = original_request
 
     @property
     def followup_event(self) -> Optional[Dict[str, Any]]:
@@ -108,27 +436,70 @@ class WebhookClient:
         if not isinstance(event, dict):
             raise TypeError('event argument must be a string or a dictionary')
 
-        event['languageCode'] = event.get('languageCode', self.locale)
-
-        self._followup_event = event
+        self._followup_event = {
+            **event,
+            'languageCode': event.get('languageCode', self.locale),
+        }
 
     @classmethod
     def _process_console_messages(
         cls,
         request: Dict[str, Any]
-    ) -> List[RichResponse]:
-        """Get messages defined in Dialogflow's console for matched intent."""
-        fulfillment_messages = request.get('queryResult', {}).get(
-            'fulfillmentMessages',
-            []
-        )
+    ) -> Tuple[RichResponse, ...]:
+        """
+        Get messages defined in Dialogflow's console for matched intent.
+
+        The parsed messages are cached by intent ID, along with a copy of the
+        message objects (that invalidates them when the intent changes), and
+        shared by all clients. Comparing the message objects is much cheaper
+        than parsing (or serializing) them.
+        """
+        query_result = request.get('queryResult', {})
+        fulfillment_messages = query_result.get('fulfillmentMessages', [])
+        intent_id = query_result.get('intent', {}).get('name')
+
+        if not fulfillment_messages or intent_id is None:
+            return cls._parse_console_messages(fulfillment_messages)
+
+        cache = cls._console_messages_cache
+
+        with cls._console_messages_lock:
+            cached = cache.get(intent_id)
+
+            if cached is not None and cached[0] == fulfillment_messages:
+                cache.move_to_end(intent_id)
+
+                return cached[1]
+
+        console_messages = cls._parse_console_messages(fulfillment_messages)
+
+        with cls._console_messages_lock:
+            cache[intent_id] = (
+                _copy_json(fulfillment_messages),
+                console_messages
+            )
+            cache.move_to_end(intent_id)
 
-        return [RichResponse._from_dict(message)
-                for message in fulfillment_messages]
+            while len(cache) > cls.console_messages_cache_size:
+                cache.popitem(last=False)
+
+        return console_messages
+
+    @staticmethod
+    def _parse_console_messages(
+        messages: List[Dict[str, Any]]
+    ) -> Tuple[RichResponse, ...]:
+        """Convert response message objects to immutable rich responses."""
+        return tuple(RichResponse._from_dict(message)._freeze()
+                     for message in messages)
 
     def add(
         self,
-        responses: Union[str, RichResponse, List[Union[str, RichResponse]]]
+        responses: Union[
+            str,
+            RichResponse,
+            Sequence[Union[str, RichResponse]]
+        ]
     ) -> None:
         """
         Add response messages to be sent back to Dialogflow.
@@ -151,11 +522,16 @@ class WebhookClient:
                 ... ]
                 >>> agent.add(responses)
 
+            Adding the messages defined in Dialogflow's console:
+
+                >>> agent.add(agent.console_messages)
+
         Parameters:
             responses (str, RichResponse, list(str, RichResponse)):
-                A single response message or a list of response messages.
+                A single response message or a list (or tuple) of response
+                messages.
         """  # noqa: E501
-        if not isinstance(responses, list):
+        if not isinstance(responses, (list, tuple)):
             responses = [responses]
 
         for response in responses:
@@ -171,7 +547,74 @@ class WebhookClient:
                 'response argument must be a string or a RichResponse'
             )
 
+        size = json_size(response._as_dict())
+
         self._response_messages.append(response)
+        self._response_sizes.append(size)
+        self._count_response_size(response.platform, size)
+
+        self._enforce_size_budget()
+
+    def _count_response_size(self, platform: Optional[str], size: int) -> None:
+        """Add the size of a response message to its platform's total."""
+        count, total = self._platform_sizes.get(platform, (0, 0))
+        self._platform_sizes[platform] = (count + 1, total + size)
+
+    def _enforce_size_budget(self) -> None:
+        """
+        Compact the response messages until the response fits the budget.
+
+        Only the messages to be sent back (see
+        :meth:`_select_platform_messages`) are compacted.
+
+        Raises:
+            ValueError: If the response doesn't fit the budget after all the
+                compaction steps.
+        """
+        if self.max_response_size is None:
+            return
+
+        steps = iter(self.compaction_policy)
+        excess = self.response_size - self.max_response_size
+
+        while excess > 0:
+            step = next(steps, None)
+
+            if step is None:
+                raise ValueError(
+                    'webhook response exceeds the size budget by '
+                    f'{excess} bytes'
+                )
+
+            selected = self._select_platform_messages()
+            selected_ids = set(map(id, selected))
+            self._replace_response_messages([
+                *(message for message in self._response_messages
+                  if id(message) not in selected_ids),
+                *step(selected, excess),
+            ])
+            excess = self.response_size - self.max_response_size
+
+    def _replace_response_messages(self, messages: List[RichResponse]) -> None:
+        """Replace the response messages (keeping the known sizes)."""
+        sizes = self._response_message_sizes
+
+        self._response_messages = messages
+        self._response_sizes = [
+            sizes[id(message)] if id(message) in sizes
+            else json_size(message._as_dict())
+            for message in messages
+        ]
+        self._platform_sizes.clear()
+
+        for message, size in zip(messages, self._response_sizes):
+            self._count_response_size(message.platform, size)
+
+    @property
+    def _response_message_sizes(self) -> Dict[int, int]:
+        """dict(int, int): The sizes of the response messages (by id)."""
+        return dict(zip(map(id, self._response_messages),
+                        self._response_sizes))
 
     def handle_request(
         self,
@@ -244,12 +687,266 @@ class WebhookClient:
                 'handler argument must be a function or a map of functions'
             )
 
-        return handler_function(self)
+        if self.tracer is None:
+            return handler_function(self)
+
+        with self.tracer.span('handler', intent=self.intent):
+            return handler_function(self)
+
+    def span(
+        self,
+        name: str,
+        **attributes: Any
+    ) -> Union['Span', Any]:
+        """
+        Get a span of a part of a handler (see :class:`~.Tracer`).
+
+        If the client doesn't have a :attr:`tracer`, the span isn't recorded
+        (so handlers don't need to check).
+
+        Examples:
+            Tracing a call to a backend:
+
+                >>> def handler(agent):
+                ...     with agent.span('get orders', user=user_id) as span:
+                ...         orders = get_orders(user_id)
+                ...         span.set_attribute('orders', len(orders))
+
+        Parameters:
+            name (str): The name of the operation.
+            **attributes: The attributes of the operation.
+
+        Returns:
+            :class:`~.Span`: The span (to be started with a ``with``
+            statement).
+        """
+        if self.tracer is None:
+            # The tracing module is only needed (e.g.: for its threads) by
+            # the clients with a tracer.
+            from .tracing import NULL_SPAN
+
+            return NULL_SPAN
+
+        return self.tracer.span(name, **attributes)
+
+    @property
+    def remaining_time(self) -> float:
+        """
+        float: How long (in seconds) until the :attr:`deadline`.
+
+        Examples:
+            Limiting the time of a call to a backend:
+
+                >>> requests.get(url, timeout=agent.remaining_time)
+        """  # noqa: D401
+        return max(self.deadline - time.monotonic(), 0.0)
+
+    @property
+    def http(self) -> 'HTTPSession':
+        """
+        HTTPSession: An HTTP client whose requests don't exceed the deadline.
+
+        The requests are sent on the kept-alive connections of the
+        :attr:`http_pool` (e.g.: the pool of the adapter, see
+        :class:`~.WSGIAdapter`).
+
+        Examples:
+            Calling an internal API from a handler:
+
+                >>> def handler(agent):
+                ...     order = agent.http.get(f'{ORDERS_API}/orders/1').json()
+
+        Raises:
+            RuntimeError: If the client doesn't have a pool of HTTP
+                connections.
+        """  # noqa: D401
+        if self.http_pool is None:
+            raise RuntimeError('the client has no pool of HTTP connections')
+
+        return self.http_pool.session(self.deadline)
+
+    def gather(
+        self,
+        *functions: Callable[[], Any],
+        timeout: Optional[float] = None,
+        return_exceptions: bool = False
+    ) -> List[Any]:
+        """
+        Call functions concurrently (e.g.: independent calls to backends).
+
+        The functions are called in a thread pool that is shared by all
+        clients (with at most :attr:`gather_max_workers` threads), so the
+        handlers that wait for I/O don't need to be asynchronous. Functions
+        that take arguments can be given with :func:`functools.partial`.
+
+        Examples:
+            Getting the user's profile and orders at the same time:
+
+                >>> def handler(agent):
+                ...     profile, orders = agent.gather(
+                ...         partial(get_profile, user_id),
+                ...         partial(get_orders, user_id)
+                ...     )
+
+        Parameters:
+            *functions (callable): The functions (without arguments).
+            timeout (float, optional): How long (in seconds) to wait for the
+                functions. The wait never goes beyond the :attr:`deadline`.
+            return_exceptions (bool): Whether the exceptions (including the
+                timeouts) are returned as results (instead of raised).
+
+        Returns:
+            list: The results of the functions (in the same order).
+
+        Raises:
+            TimeoutError: If the functions don't return in time (and the
+                exceptions aren't returned). Functions that didn't start yet
+                are cancelled, while the running ones can't be interrupted.
+            Exception: The exception raised by a function (the first in the
+                order of the functions, if there's more than one).
+        """
+        from concurrent.futures import ALL_COMPLETED, FIRST_EXCEPTION, wait
+        from contextvars import copy_context
+
+        executor = self._get_gather_executor()
+
+        with self.span('gather', functions=len(functions)):
+            # Each function runs in a copy of the caller's context (e.g.:
+            # with its context variables and the current span).
+            futures = [executor.submit(copy_context().run, function)
+                       for function in functions]
+
+            if timeout is None or timeout > self.remaining_time:
+                timeout = self.remaining_time
+
+            done, pending = wait(
+                futures,
+                timeout,
+                ALL_COMPLETED if return_exceptions else FIRST_EXCEPTION
+            )
+
+        for future in pending:
+            future.cancel()
+
+        if return_exceptions:
+            return [
+                future.exception() or future.result() if future in done
+                else TimeoutError('function did not return in time')
+                for future in futures
+            ]
+
+        for future in futures:
+            if future in done and future.exception() is not None:
+                raise future.exception()
+
+        if pending:
+            raise TimeoutError('functions did not return in time')
+
+        return [future.result() for future in futures]
+
+    @classmethod
+    def _get_gather_executor(cls) -> 'ThreadPoolExecutor':
+        """Get the thread pool of gather (of the current process)."""
+        with cls._gather_lock:
+            if cls._gather_pid != os.getpid():
+                # The concurrent.futures module is slow to import (and it's
+                # only needed by the handlers that gather).
+                from concurrent.futures import ThreadPoolExecutor
+
+                cls._gather_executor = ThreadPoolExecutor(
+                    cls.gather_max_workers,
+                    thread_name_prefix='dialogflow-fulfillment-gather'
+                )
+                cls._gather_pid = os.getpid()
+
+            return cls._gather_executor
+
+    def _select_platform_messages(self) -> List[RichResponse]:
+        """
+        Select the response messages to be sent to the request's platform.
+
+        The messages for the request's platform are selected if there's any.
+        Otherwise (e.g.: the request has no platform or it's an unknown one),
+        the messages without a platform are selected.
+        """
+        if self.platform is not None:
+            platform_messages = [
+                response for response in self._response_messages
+                if response.platform == self.platform
+            ]
+
+            if platform_messages:
+                return platform_messages
+
+        return [
+            response for response in self._response_messages
+            if response.platform in self._DEFAULT_PLATFORMS
+        ]
+
+    def _selected_message_sizes(self) -> Tuple[int, int]:
+        """Get the number and the total size of the selected messages."""
+        if self.platform is not None and self.platform in self._platform_sizes:
+            return self._platform_sizes[self.platform]
+
+        count = size = 0
+
+        for platform in self._DEFAULT_PLATFORMS:
+            platform_count, platform_size = self._platform_sizes.get(
+                platform,
+                (0, 0)
+            )
+            count += platform_count
+            size += platform_size
+
+        return count, size
 
     @property
     def _response_messages_as_dicts(self) -> List[Dict[str, Any]]:
         """list of dict: The list of response messages."""  # noqa: D403
-        return [response._as_dict() for response in self._response_messages]
+        return [
+            _response_message_as_dict(response)
+            for response in self._select_platform_messages()
+        ]
+
+    @property
+    def response_size(self) -> int:
+        """
+        int: The size (in bytes) of the webhook response serialized as JSON.
+
+        The size is the length of the compact (i.e.: without whitespace) JSON
+        serialization of :attr:`response`. It's tracked incrementally: each
+        response message is serialized (only) when it's added and each output
+        context when it's set.
+
+        Note:
+            Changes made to rich responses after they are added aren't
+            tracked.
+        """
+        count, size = self._selected_message_sizes()
+        fields = []
+
+        if count:
+            # The field name, the brackets and the separators between
+            # messages.
+            fields.append(
+                self._FIELD_SIZES['fulfillmentMessages'] + size + count + 1
+            )
+
+        if self.followup_event is not None:
+            event_size = json_size(self.followup_event)
+            fields.append(self._FIELD_SIZES['followupEventInput'] + event_size)
+
+        if self.context.contexts:
+            fields.append(
+                self._FIELD_SIZES['outputContexts'] + self.context.size
+            )
+
+        if self.request_source is not None:
+            source_size = json_size(self.request_source)
+            fields.append(self._FIELD_SIZES['source'] + source_size)
+
+        # The braces and the separators between fields.
+        return sum(fields) + max(len(fields) + 1, 2)
 
     @property
     def response(self) -> Dict[str, Any]:
@@ -260,12 +957,20 @@ class WebhookClient:
             For more information about the webhook response object, see the
             WebhookResponse_ section in Dialogflow's API reference.
 
+        Raises:
+            ValueError: If there's a size budget and the response doesn't fit
+                in it (even after compacting the response messages).
+
         .. _WebhookResponse: https://cloud.google.com/dialogflow/docs/reference/rpc/google.cloud.dialogflow.v2#webhookresponse
         """  # noqa: D401, E501
+        self._enforce_size_budget()
+
         response = {}
 
-        if self._response_messages:
-            response['fulfillmentMessages'] = self._response_messages_as_dicts
+        messages = self._response_messages_as_dicts
+
+        if messages:
+            response['fulfillmentMessages'] = messages
 
         if self.followup_event is not None:
             response['followupEventInput'] = self.followup_event
@@ -278,3 +983,83 @@ class WebhookClient:
             response['source'] = self.request_source
 
         return response
+
+    def response_proto(self, message: Optional['Message'] = None) -> 'Message':
+        """
+        Get the webhook response message (protocol buffer).
+
+        The message has the same fields as :attr:`response`, written
+        directly to it (without converting it from JSON).
+
+        Examples:
+            Getting the webhook response message:
+
+                >>> agent.response_proto()
+                fulfillment_messages {
+                  text {
+                    text: "Hi!"
+                  }
+                }
+
+            Filling a message of Dialogflow's client library:
+
+                >>> agent.response_proto(WebhookResponse.pb()())
+
+        Parameters:
+            message (WebhookResponse, optional): An empty webhook response
+                message to fill (a new
+                :data:`~dialogflow_fulfillment.proto.WebhookResponse` by
+                default).
+
+        Returns:
+            WebhookResponse: The webhook response message.
+
+        Raises:
+            ValueError: If there's a size budget and the response doesn't fit
+                in it (or a response message is of an unknown platform).
+        """
+        from .proto import WebhookResponse, context_to_proto, event_to_proto
+
+        self._enforce_size_budget()
+
+        if message is None:
+            message = WebhookResponse()
+
+        for response in self._select_platform_messages():
+            response._to_proto(message.fulfillment_messages.add())
+
+        if self.followup_event is not None:
+            event_to_proto(self.followup_event, message.followup_event_input)
+
+        for context in self.context:
+            context_to_proto(context, message.output_contexts.add())
+
+        if self.request_source is not None:
+            message.source = self.request_source
+
+        return message
+
+
+def _response_message_as_dict(response: RichResponse) -> Dict[str, Any]:
+    """Get the response message object of a rich response for a response."""
+    message = response._as_dict()
+
+    # The response message objects of immutable rich responses are cached and
+    # may be shared (e.g.: the console messages), so changes to the response
+    # mustn't reach them. The content of immutable payloads is sent as it is
+    # (mutable payloads build a new response message object every time).
+    if not response.frozen or isinstance(response, Payload):
+        return message
+
+    return _copy_json(message)
+
+
+def _copy_json(obj: Any) -> Any:
+    """Copy the objects and the arrays of a JSON value."""
+    if isinstance(obj, dict):
+        return {key: _copy_json(value) for key, value in obj.items()}
+
+    if isinstance(obj, list):
+        return [_copy_json(value) for value in obj]
+
+    return obj
@@ -2,6 +2,8 @@ from uuid import uuid4
 
 import pytest
 
+pytest_plugins = ['dialogflow_fulfillment.pytest_plugin']
+
 
 @pytest.fixture()
 def session():
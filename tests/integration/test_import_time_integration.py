@@ -0,0 +1,72 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+SOURCE = str(Path(__file__).resolve().parents[2] / 'source')
+
+# Modules that mustn't be imported for using only the webhook client (which
+# is on the path of the cold start of serverless functions).
+UNNEEDED_MODULES = (
+    'asyncio',
+    'concurrent.futures',
+    'contextvars',
+    'datetime',
+    'dialogflow_fulfillment.agent_export',
+    'dialogflow_fulfillment.dispatcher',
+    'dialogflow_fulfillment.raw_json',
+    'dialogflow_fulfillment.server',
+    'dialogflow_fulfillment.tracing',
+    'email',
+    'http.client',
+    'socket',
+    'ssl',
+    'threading',
+    'urllib.request',
+    'zipfile',
+)
+
+
+def import_times(code):
+    """Get the (self) import time of each module imported by some code."""
+    # The imports aren't measured under coverage (of subprocesses).
+    env = {
+        name: value for name, value in os.environ.items()
+        if not name.startswith(('COV_CORE_', 'COVERAGE_'))
+    }
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        env={**env, 'PYTHONPATH': SOURCE},
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True
+    )
+    times = {}
+
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'self [us]' in line:
+            continue
+
+        self_time, _, name = line[len('import time:'):].split('|')
+        times[name.strip()] = int(self_time) / 1e6
+
+    return times
+
+
+def test_lazy_package():
+    startup_modules = import_times('pass').keys()
+    modules = import_times('import dialogflow_fulfillment').keys()
+
+    # The classes of the package are imported on first access.
+    assert {name for name in modules
+            if name.startswith('dialogflow_fulfillment')} \
+        == {'dialogflow_fulfillment'}
+    assert not (modules - startup_modules) & set(UNNEEDED_MODULES)
+
+
+def test_unneeded_modules():
+    startup_modules = import_times('pass').keys()
+    modules = import_times('from dialogflow_fulfillment import WebhookClient')
+
+    assert 'dialogflow_fulfillment.webhook_client' in modules
+    assert not (modules.keys() - startup_modules) & set(UNNEEDED_MODULES)
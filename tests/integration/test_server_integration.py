@@ -0,0 +1,153 @@
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from http.client import HTTPConnection
+from pathlib import Path
+
+import pytest
+
+from dialogflow_fulfillment.server import create_socket
+
+pytestmark = pytest.mark.skipif(
+    not hasattr(os, 'fork'),
+    reason='the server requires a POSIX system'
+)
+
+SOURCE = str(Path(__file__).resolve().parents[2] / 'source')
+
+APP_MODULE = '''
+import os
+
+from dialogflow_fulfillment import Dispatcher
+
+dispatcher = Dispatcher()
+
+
+@dispatcher.register('Default Welcome Intent')
+def welcome(agent):
+    agent.add({text!r})
+    agent.add(str(os.getpid()))
+'''
+
+
+def post(port, body):
+    """Send a webhook request to the server and get the response messages."""
+    connection = HTTPConnection('127.0.0.1', port, timeout=5)
+
+    try:
+        connection.request('POST', '/', body)
+        response = json.loads(connection.getresponse().read())
+    finally:
+        connection.close()
+
+    return [message['text']['text'][0]
+            for message in response['fulfillmentMessages']]
+
+
+def wait_for(port, body, text, timeout=10):
+    """Wait until the server responds with a text."""
+    deadline = time.monotonic() + timeout
+
+    while True:
+        try:
+            messages = post(port, body)
+
+            if messages[0] == text:
+                return messages
+        except (ConnectionError, OSError, ValueError):
+            pass
+
+        if time.monotonic() > deadline:
+            raise TimeoutError(f'the server did not respond with {text!r}')
+
+        time.sleep(0.1)
+
+
+@pytest.fixture
+def port():
+    """Get a free port."""
+    with create_socket('127.0.0.1', 0) as sock:
+        return sock.getsockname()[1]
+
+
+def test_serve(tmp_path, port, webhook_request):
+    module = tmp_path / 'webhook_app.py'
+    module.write_text(APP_MODULE.format(text='Hello!'))
+    body = json.dumps(webhook_request).encode()
+
+    server = subprocess.Popen(
+        [
+            sys.executable, '-m', 'dialogflow_fulfillment', 'serve',
+            'webhook_app:dispatcher', '--port', str(port), '--workers', '2',
+        ],
+        cwd=tmp_path,
+        env={**os.environ, 'PYTHONPATH': SOURCE}
+    )
+
+    try:
+        _, pid = wait_for(port, body, 'Hello!')
+
+        module.write_text(APP_MODULE.format(text='Hi!'))
+        server.send_signal(signal.SIGHUP)
+        _, reloaded_pid = wait_for(port, body, 'Hi!')
+
+        assert pid != reloaded_pid
+        assert int(pid) != server.pid
+
+        server.send_signal(signal.SIGTERM)
+        assert server.wait(timeout=10) == 0
+    finally:
+        server.kill()
+        server.wait()
+
+
+def test_serve_with_affinity(tmp_path, port, webhook_request):
+    (tmp_path / 'webhook_app.py').write_text(APP_MODULE.format(text='Hi!'))
+
+    def body(session):
+        return json.dumps({**webhook_request, 'session': session}).encode()
+
+    server = subprocess.Popen(
+        [
+            sys.executable, '-m', 'dialogflow_fulfillment', 'serve',
+            'webhook_app:dispatcher', '--port', str(port), '--workers', '3',
+            '--affinity',
+        ],
+        cwd=tmp_path,
+        env={**os.environ, 'PYTHONPATH': SOURCE}
+    )
+
+    try:
+        wait_for(port, body('sessions/0'), 'Hi!')
+        sessions = [f'sessions/{number}' for number in range(30)]
+        pids = {session: post(port, body(session))[1] for session in sessions}
+
+        assert len(set(pids.values())) == 3
+        assert all(post(port, body(session))[1] == pid
+                   for session, pid in pids.items())
+
+        # The sessions of a stopped worker move to its replacement.
+        stopped_pid = pids['sessions/0']
+        os.kill(int(stopped_pid), signal.SIGKILL)
+        deadline = time.monotonic() + 10
+
+        while post(port, body('sessions/0'))[1] in pids.values():
+            assert time.monotonic() < deadline
+
+            time.sleep(0.1)
+
+        new_pid = post(port, body('sessions/0'))[1]
+
+        for session, pid in pids.items():
+            expected = new_pid if pid == stopped_pid else pid
+
+            assert post(port, body(session))[1] == expected
+
+        server.send_signal(signal.SIGTERM)
+        assert server.wait(timeout=10) == 0
+    finally:
+        server.kill()
+        server.wait()
@@ -1,5 +1,9 @@
+import json
+
 import pytest
 
+from dialogflow_fulfillment.raw_json import RawJSON
+from dialogflow_fulfillment.rich_responses import Card, QuickReplies, Text
 from dialogflow_fulfillment.webhook_client import WebhookClient
 
 
@@ -135,3 +139,189 @@ def test_set_followup_event_non_string_or_dict(webhook_request):
 
     with pytest.raises(TypeError):
         agent.followup_event = ['this', 'is', 'not', 'an', 'event']
+
+
+def test_from_bytes(webhook_request):
+    webhook_request['originalDetectIntentRequest']['source'] = 'google'
+
+    agent = WebhookClient.from_bytes(json.dumps(webhook_request).encode())
+    expected_agent = WebhookClient(webhook_request)
+
+    assert isinstance(agent._original_request, RawJSON)
+    assert agent.request_source == 'google'
+    assert agent.session == expected_agent.session
+    assert agent.parameters == expected_agent.parameters
+    assert agent.original_request == webhook_request[
+        'originalDetectIntentRequest'
+    ]
+    assert agent.response == expected_agent.response
+
+
+def test_from_bytes_memoryview():
+    agent = WebhookClient.from_bytes(memoryview(b'{"session": "s"}'))
+
+    assert agent.session == 's'
+    assert agent.original_request == {}
+
+
+def test_assign_original_request(webhook_request):
+    agent = WebhookClient.from_bytes(json.dumps(webhook_request).encode())
+
+    agent.original_request = {'source': 'google'}
+
+    assert agent.original_request == {'source': 'google'}
+
+
+def test_typed_parameters(webhook_request):
+    webhook_request['queryResult']['parameters'] = {'number': '1.5'}
+
+    agent = WebhookClient(webhook_request)
+
+    assert agent.parameters == {'number': '1.5'}
+    assert agent.parameters.as_number('number') == 1.5
+
+
+@pytest.mark.parametrize('source, expected_texts', [
+    (None, ['default']),
+    ('PLATFORM_UNSPECIFIED', ['default']),
+    ('facebook', ['facebook']),
+    ('SLACK', ['slack']),
+    ('telegram', ['default']),
+    ('mastodon', ['default']),
+])
+def test_platform_messages(webhook_request, source, expected_texts):
+    webhook_request['originalDetectIntentRequest']['source'] = source
+
+    agent = WebhookClient(webhook_request)
+
+    def handler(agent):
+        agent.add(Text('default'))
+        agent.add(Text('facebook', platform='FACEBOOK'))
+        agent.add(Text('slack', platform='SLACK'))
+
+    agent.handle_request(handler)
+
+    assert agent.response['fulfillmentMessages'] == [
+        {'text': {'text': [text]}, 'platform': text.upper()}
+        if text != 'default' else {'text': {'text': [text]}}
+        for text in expected_texts
+    ]
+
+
+def test_platform_without_messages(webhook_request):
+    webhook_request['originalDetectIntentRequest']['source'] = 'facebook'
+
+    agent = WebhookClient(webhook_request)
+
+    agent.add(Text('slack', platform='SLACK'))
+
+    assert 'fulfillmentMessages' not in agent.response
+
+
+def compact_size(response):
+    return len(json.dumps(response, separators=(',', ':')))
+
+
+def test_response_size(webhook_request):
+    webhook_request['originalDetectIntentRequest']['source'] = 'facebook'
+
+    agent = WebhookClient(webhook_request)
+
+    assert agent.response_size == compact_size(agent.response)
+
+    agent.add(['a', 'b'])
+    agent.add(Text('c', platform='SLACK'))
+    agent.add(QuickReplies('d', ['e'], platform='FACEBOOK'))
+    agent.followup_event = 'f'
+    agent.context.set('g', lifespan_count=1)
+
+    assert agent.response_size == compact_size(agent.response)
+
+
+def test_empty_response_size():
+    agent = WebhookClient({})
+
+    assert agent.response_size == compact_size(agent.response) == 2
+
+
+def test_size_budget(webhook_request):
+    expected_agent = WebhookClient(webhook_request)
+    expected_agent.add('this is a text\nthis is another text')
+
+    agent = WebhookClient(
+        webhook_request,
+        max_response_size=expected_agent.response_size
+    )
+
+    agent.add(['this is a text', 'this is another text'])
+
+    assert agent.response == expected_agent.response
+
+
+def test_size_budget_with_truncation(webhook_request):
+    agent = WebhookClient(webhook_request)
+    agent.max_response_size = agent.response_size + 100
+
+    agent.add('this is a text' * 100)
+
+    assert agent.response_size <= agent.max_response_size
+    assert agent.response_size == compact_size(agent.response)
+
+
+def test_size_budget_with_platforms(webhook_request):
+    webhook_request['originalDetectIntentRequest']['source'] = 'facebook'
+
+    agent = WebhookClient(webhook_request)
+    agent.add([
+        Text('a', platform='FACEBOOK'),
+        Card('x' * 100, platform='FACEBOOK'),
+        Text('s' * 60, platform='SLACK'),
+    ])
+    agent.max_response_size = agent.response_size - 20
+
+    # The messages for other platforms (which aren't sent back) are neither
+    # counted nor removed.
+    assert agent.response['fulfillmentMessages'] == [
+        {'text': {'text': ['a']}, 'platform': 'FACEBOOK'},
+    ]
+    assert agent.response_size <= agent.max_response_size
+    assert agent.response_size == compact_size(agent.response)
+
+
+def test_size_budget_without_compaction(webhook_request):
+    agent = WebhookClient(webhook_request, compaction_policy=())
+    agent.max_response_size = agent.response_size
+
+    with pytest.raises(ValueError):
+        agent.add('this is a text')
+
+
+def test_size_budget_exceeded_by_contexts(webhook_request):
+    agent = WebhookClient(webhook_request)
+    agent.max_response_size = agent.response_size
+
+    agent.context.set('a', lifespan_count=1)
+
+    with pytest.raises(ValueError):
+        agent.response
+
+
+def test_reset(webhook_request):
+    agent = WebhookClient(webhook_request)
+    parameters = agent.parameters
+    context = agent.context
+
+    agent.add('this is a text')
+    agent.followup_event = 'event'
+    agent.context.set('new_context', lifespan_count=1)
+
+    webhook_request['queryResult']['parameters'] = {'number': '1'}
+    webhook_request['queryResult']['outputContexts'] = []
+    webhook_request['queryResult']['fulfillmentMessages'] = []
+    agent.reset(webhook_request)
+
+    assert agent.parameters is parameters
+    assert agent.context is context
+    assert agent.parameters.as_number('number') == 1
+    assert agent.console_messages == ()
+    assert agent.response == WebhookClient(webhook_request).response
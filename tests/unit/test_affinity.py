@@ -0,0 +1,615 @@
+import array
+import json
+import selectors
+import socket
+import struct
+import threading
+import time
+
+import pytest
+
+from dialogflow_fulfillment.affinity import (
+    Router,
+    receive_connection,
+    request_length,
+    send_connection,
+    session_key,
+)
+from dialogflow_fulfillment.server import create_socket
+
+requires_unix_sockets = pytest.mark.skipif(
+    not hasattr(socket.socket, 'sendmsg') or not hasattr(socket, 'AF_UNIX'),
+    reason='passing connections requires Unix sockets'
+)
+
+
+def http_request(body=b'', **headers):
+    """Encode an HTTP request."""
+    head = ''.join(f'{name}: {value}\r\n' for name, value in headers.items())
+
+    return f'POST / HTTP/1.1\r\n{head}\r\n'.encode() + body
+
+
+def webhook_http_request(session):
+    """Encode an HTTP request with a webhook request of a session."""
+    body = json.dumps({'responseId': '1', 'session': session}).encode()
+
+    return http_request(body, **{'Content-Length': len(body)})
+
+
+@pytest.mark.parametrize('request_, expected', [
+    (http_request(b'{}', **{'Content-Length': 2}), 40),
+    (http_request(b'{}', **{'content-length': ' 2 '}), 42),
+    (http_request(b'{', **{'Content-Length': 2}), None),
+    (http_request(), 19),
+    (http_request(b'{}', Host='x', **{'Content-Length': 2}), 49),
+    (b'POST / HTTP/1.1\r\nHost: x', None),
+])
+def test_request_length(request_, expected):
+    assert request_length(request_) == expected
+
+
+@pytest.mark.parametrize('request_', [
+    http_request(**{'Content-Length': 'two'}),
+    http_request(**{'Content-Length': -1}),
+    http_request(**{'Transfer-Encoding': 'chunked'}),
+    b'POST / HTTP/1.1\r\nHost: ' + b'x' * 70000,
+])
+def test_invalid_request_length(request_):
+    with pytest.raises(ValueError):
+        request_length(request_)
+
+
+@pytest.mark.parametrize('request_, expected', [
+    (webhook_http_request('projects/p/sessions/1'), 'projects/p/sessions/1'),
+    (webhook_http_request(1), None),
+    (http_request(b'{"responseId": "1"}'), None),
+    (http_request(b'[]'), None),
+    (http_request(), None),
+])
+def test_session_key(request_, expected):
+    assert session_key(request_) == expected
+
+
+@pytest.fixture
+def listener():
+    """Create a listening socket (on a free port)."""
+    with create_socket('127.0.0.1', 0, backlog=16) as listener:
+        yield listener
+
+
+@pytest.fixture
+def connection(listener):
+    """Connect a client and accept its connection."""
+    client = socket.create_connection(listener.getsockname())
+    connection, _ = listener.accept()
+
+    with client, connection:
+        yield client, connection
+
+
+@pytest.fixture
+def channels():
+    """Create the Unix sockets of two workers (the router's ends first)."""
+    pairs = [socket.socketpair() for _ in range(2)]
+
+    yield pairs
+
+    for pair in pairs:
+        for channel in pair:
+            channel.close()
+
+
+@pytest.fixture
+def router(listener, channels):
+    """Create a router with two workers."""
+    router = Router(listener)
+
+    for worker, (channel, _) in enumerate(channels):
+        router.add_worker(worker, channel)
+
+    yield router
+
+    router.close()
+
+
+def send(router, request):
+    """Send a request to a router (and keep the client's connection)."""
+    client = socket.create_connection(router.listener.getsockname())
+    client.sendall(request)
+
+    return client
+
+
+def readable(sock):
+    """Check whether a socket is readable."""
+    with selectors.DefaultSelector() as selector:
+        selector.register(sock, selectors.EVENT_READ)
+
+        return bool(selector.select(0))
+
+
+def wait_for_worker(router, channels, request, timeout=5.0):
+    """Poll a router until a worker receives a connection (and a request)."""
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        router.poll(0.01)
+
+        for worker, (_, worker_channel) in enumerate(channels):
+            if worker_channel.fileno() != -1 and readable(worker_channel):
+                connection, received = receive_connection(worker_channel)
+                connection.close()
+
+                assert received == request
+
+                return worker
+
+    raise TimeoutError('no worker received the connection')
+
+
+def route(router, channels, request):
+    """Send a request and get the worker that received its connection."""
+    with send(router, request):
+        return wait_for_worker(router, channels, request)
+
+
+def receive_response(router, client, timeout=5.0):
+    """Poll a router until the client receives a response."""
+    client.setblocking(False)
+    deadline = time.monotonic() + timeout
+
+    while time.monotonic() < deadline:
+        router.poll(0.01)
+
+        try:
+            return client.recv(1024)
+        except BlockingIOError:
+            pass
+
+    raise TimeoutError('the client did not receive a response')
+
+
+@requires_unix_sockets
+def test_send_connection(connection, channels):
+    client, server_connection = connection
+    channel, worker_channel = channels[0]
+    request = webhook_http_request('session')
+
+    send_connection(channel, server_connection, request)
+    server_connection.close()
+    received, received_request = receive_connection(worker_channel)
+
+    with received:
+        received.sendall(b'response')
+
+    channel.close()
+
+    assert received_request == request
+    assert client.recv(8) == b'response'
+    assert receive_connection(worker_channel) is None
+
+
+@requires_unix_sockets
+def test_send_connection_partially(connection, mocker):
+    _, server_connection = connection
+    channel = mocker.Mock()
+    channel.sendmsg.return_value = 2
+
+    send_connection(channel, server_connection, b'request')
+
+    channel.sendall.assert_called_once_with(b'\x00\x07request')
+
+
+@requires_unix_sockets
+def test_receive_after_router_closed(connection, channels):
+    _, server_connection = connection
+    channel, worker_channel = channels[0]
+    request = webhook_http_request('session')
+
+    send_connection(channel, server_connection, request)
+    channel.close()
+    received, received_request = receive_connection(worker_channel)
+    received.close()
+
+    # The acknowledgement isn't sent (the router's socket is closed).
+    assert received_request == request
+    assert receive_connection(worker_channel) is None
+
+
+@requires_unix_sockets
+def test_receive_without_connection(channels):
+    channel, worker_channel = channels[0]
+    channel.sendall(b'\x00\x00\x00\x00')
+
+    with pytest.raises(OSError):
+        receive_connection(worker_channel)
+
+
+@requires_unix_sockets
+def test_receive_many_connections(connection, channels):
+    client, server_connection = connection
+    channel, worker_channel = channels[0]
+    channel.sendmsg(
+        [struct.pack('!I', 0)],
+        [(
+            socket.SOL_SOCKET,
+            socket.SCM_RIGHTS,
+            array.array('i', (server_connection.fileno(),) * 2)
+        )]
+    )
+    server_connection.close()
+
+    with pytest.raises(OSError):
+        receive_connection(worker_channel)
+
+    # The connections were closed.
+    assert client.recv(1) == b''
+
+
+@requires_unix_sockets
+def test_receive_truncated_request(connection, channels):
+    _, server_connection = connection
+    channel, worker_channel = channels[0]
+    channel.sendmsg(
+        [struct.pack('!I', 100), b'request'],
+        [(
+            socket.SOL_SOCKET,
+            socket.SCM_RIGHTS,
+            array.array('i', (server_connection.fileno(),))
+        )]
+    )
+    channel.close()
+
+    with pytest.raises(OSError):
+        receive_connection(worker_channel)
+
+
+@requires_unix_sockets
+def test_session_affinity(router, channels):
+    workers = {
+        session: route(router, channels, webhook_http_request(session))
+        for session in (f'sessions/{number}' for number in range(20))
+    }
+
+    assert set(workers.values()) == {0, 1}
+
+    for session, worker in workers.items():
+        assert route(router, channels, webhook_http_request(session)) \
+            == worker == router.ring.get_node(session)
+
+
+@requires_unix_sockets
+def test_round_robin(router, channels):
+    request = http_request()
+
+    workers = [route(router, channels, request) for _ in range(4)]
+
+    assert workers in ([0, 1, 0, 1], [1, 0, 1, 0])
+
+
+@requires_unix_sockets
+def test_remove_worker(router, channels):
+    request = webhook_http_request('session')
+    worker = route(router, channels, request)
+
+    router.remove_worker(worker)
+    router.remove_worker(worker)
+
+    # The worker sees the end of its socket.
+    assert receive_connection(channels[worker][1]) is None
+
+    channels[worker][1].close()
+
+    assert route(router, channels, request) == 1 - worker
+
+    # The replaced worker takes its sessions back.
+    channel, _ = channels[worker] = socket.socketpair()
+    router.add_worker(worker, channel)
+
+    assert route(router, channels, request) == worker
+
+
+def test_replace_worker(router, channels):
+    channel, worker_channel = socket.socketpair()
+
+    with worker_channel:
+        router.add_worker(0, channel)
+
+        assert channels[0][0].fileno() == -1
+
+
+@requires_unix_sockets
+def test_stopped_worker(router, channels):
+    request = webhook_http_request('session')
+    worker = route(router, channels, request)
+
+    channels[worker][1].close()
+
+    assert route(router, channels, request) == 1 - worker
+    assert worker not in router.ring
+
+
+@requires_unix_sockets
+def test_acknowledged_connection(router, channels):
+    request = webhook_http_request('session')
+
+    with send(router, request) as client:
+        wait_for_worker(router, channels, request)
+
+        # The router closes its copy of the connection.
+        assert receive_response(router, client) == b''
+
+
+def large_request(session):
+    """Encode an HTTP request larger than a small socket buffer."""
+    body = json.dumps({'session': session, 'padding': 'x' * 2 ** 16}).encode()
+
+    return http_request(body, **{'Content-Length': len(body)})
+
+
+def shrink_buffer(channel):
+    """Make the send buffer of a socket small."""
+    channel.setsockopt(socket.SOL_SOCKET, socket.SO_SNDBUF, 4096)
+
+
+def receive_in_thread(router, worker_channel, timeout=5.0):
+    """Poll a router while a worker receives a connection (in a thread)."""
+    received = []
+    thread = threading.Thread(
+        target=lambda: received.append(receive_connection(worker_channel))
+    )
+    thread.start()
+    deadline = time.monotonic() + timeout
+
+    while thread.is_alive() and time.monotonic() < deadline:
+        router.poll(0.01)
+
+    thread.join()
+    connection, request = received[0]
+    connection.close()
+
+    return request
+
+
+def wait_for_queue(router, worker, timeout=5.0):
+    """Poll a router until it queues a connection for a worker."""
+    deadline = time.monotonic() + timeout
+
+    while not router._workers[worker].queue:
+        assert time.monotonic() < deadline
+
+        router.poll(0.01)
+
+
+@requires_unix_sockets
+def test_slow_worker(router, channels):
+    request = large_request('session')
+    worker = router.ring.get_node('session')
+    other = next(
+        f'sessions/{number}' for number in range(100)
+        if router.ring.get_node(f'sessions/{number}') != worker
+    )
+    shrink_buffer(channels[worker][0])
+
+    with send(router, request):
+        wait_for_queue(router, worker)
+
+        # The other worker isn't held up by the slow one.
+        with send(router, webhook_http_request(other)):
+            assert receive_in_thread(router, channels[1 - worker][1]) \
+                == webhook_http_request(other)
+
+        assert receive_in_thread(router, channels[worker][1]) == request
+        assert not router._workers[worker].queue
+
+
+@requires_unix_sockets
+def test_replace_worker_with_pending(router, channels):
+    request = webhook_http_request('session')
+    worker = router.ring.get_node('session')
+    old_channel = channels[worker][1]
+    shrink_buffer(channels[worker][0])
+
+    with send(router, request), send(router, large_request('session')):
+        while len(router._workers[worker].sent) < 1:
+            router.poll(0.01)
+
+        wait_for_queue(router, worker)
+        channel, new_channel = channels[worker] = socket.socketpair()
+        router.add_worker(worker, channel)
+
+        # The previous worker handles the connection sent to it, and the
+        # new one gets the connection still to be sent.
+        connection, received = receive_connection(old_channel)
+        connection.close()
+
+        assert received == request
+        assert receive_in_thread(router, new_channel) \
+            == large_request('session')
+
+    old_channel.close()
+
+
+@requires_unix_sockets
+def test_stopped_worker_with_pending(router, channels):
+    request = webhook_http_request('session')
+    worker = router.ring.get_node('session')
+
+    with send(router, request):
+        while not router._workers[worker].sent:
+            router.poll(0.01)
+
+        # The worker stops without receiving the connection.
+        channels[worker][1].close()
+
+        assert wait_for_worker(router, channels, request) == 1 - worker
+
+
+@requires_unix_sockets
+def test_stopped_worker_after_acknowledging(router, channels):
+    request = webhook_http_request('session')
+    worker = router.ring.get_node('session')
+    worker_channel = channels[worker][1]
+
+    with send(router, request) as client, send(router, request):
+        while len(router._workers[worker].sent) < 2:
+            router.poll(0.01)
+
+        # The worker handles the first connection and stops (without
+        # receiving the second one), before the router reads its
+        # acknowledgement.
+        connection, _ = receive_connection(worker_channel)
+
+        with connection:
+            connection.sendall(b'HTTP/1.0 204 No Content\r\n\r\n')
+
+        worker_channel.close()
+        router.remove_worker(worker)
+
+        # Only the connection that wasn't acknowledged is sent again.
+        assert wait_for_worker(router, channels, request) == 1 - worker
+        assert not readable(channels[1 - worker][1])
+        assert client.recv(1024) == b'HTTP/1.0 204 No Content\r\n\r\n'
+        assert client.recv(1024) == b''
+
+
+@requires_unix_sockets
+def test_stopped_worker_before_sending(listener, connection):
+    _, server_connection = connection
+    client, _ = connection
+    channel, worker_channel = socket.socketpair()
+    worker_channel.close()
+    router = Router(listener)
+    router.add_worker(0, channel)
+
+    router._route(server_connection.dup(), http_request())
+
+    assert client.recv(1024).startswith(
+        b'HTTP/1.0 503 Service Unavailable\r\n'
+    )
+    assert len(router.ring) == 0
+
+    router.close()
+
+
+@requires_unix_sockets
+def test_no_workers(router, channels):
+    for _, worker_channel in channels:
+        worker_channel.close()
+
+    with send(router, http_request()) as client:
+        assert receive_response(router, client).startswith(
+            b'HTTP/1.0 503 Service Unavailable\r\n'
+        )
+
+
+@requires_unix_sockets
+def test_partial_request(router, channels):
+    request = webhook_http_request('session')
+
+    with send(router, request[:20]) as client:
+        router.poll(0.1)
+
+        assert not any(readable(channel) for _, channel in channels)
+
+        client.sendall(request[20:])
+
+        assert wait_for_worker(router, channels, request) in (0, 1)
+
+
+@pytest.mark.parametrize('request_, status', [
+    (http_request(**{'Transfer-Encoding': 'chunked'}), b'400 Bad Request'),
+    (http_request(b'x' * 100, **{'Content-Length': 100}),
+     b'413 Payload Too Large'),
+])
+def test_invalid_request(listener, request_, status):
+    router = Router(listener, max_request_size=100)
+
+    with send(router, request_) as client:
+        response = receive_response(router, client)
+
+    router.close()
+
+    assert response.startswith(b'HTTP/1.0 ' + status)
+
+
+def test_closed_connection(listener):
+    router = Router(listener)
+
+    with send(router, b'') as client:
+        client.shutdown(socket.SHUT_WR)
+
+        assert receive_response(router, client) == b''
+        assert len(router._selector.get_map()) == 1
+
+    router.close()
+
+
+def test_reset_connection(listener):
+    router = Router(listener)
+    client = send(router, b'POST')
+    router.poll(0.1)
+    client.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER,
+                      struct.pack('ii', 1, 0))
+    client.close()
+
+    while len(router._selector.get_map()) > 1:
+        router.poll(0.01)
+
+    router.close()
+
+
+def test_request_timeout(listener):
+    router = Router(listener, request_timeout=0)
+
+    with send(router, b'') as client:
+        assert receive_response(router, client) == b''
+
+    router.close()
+
+
+def test_spurious_wakeup(listener, connection):
+    router = Router(listener)
+    _, server_connection = connection
+    server_connection.setblocking(False)
+
+    router._receive(server_connection, (bytearray(), 0.0))
+
+    assert server_connection.fileno() != -1
+
+    router.close()
+
+
+def test_spurious_worker_wakeup(router):
+    worker = router._workers[0]
+
+    router._serve_worker(worker, selectors.EVENT_READ)
+
+    assert router._workers[0] is worker
+
+    # The events of a removed worker are ignored.
+    router.remove_worker(0)
+    router._serve_worker(worker, selectors.EVENT_READ)
+
+
+def test_respond_to_closed_connection(connection):
+    _, server_connection = connection
+    server_connection.shutdown(socket.SHUT_WR)
+
+    Router._respond(server_connection, 503)
+
+
+def test_close(listener, channels):
+    router = Router(listener)
+    router.add_worker(0, channels[0][0])
+    client = send(router, b'POST')
+    router.poll(0.1)
+
+    router.close()
+
+    assert listener.fileno() == -1
+    assert channels[0][0].fileno() == -1
+    assert len(router.ring) == 0
+
+    client.close()
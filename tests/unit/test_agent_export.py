@@ -0,0 +1,192 @@
+import json
+from zipfile import ZipFile
+
+import pytest
+
+from dialogflow_fulfillment.agent_export import AgentExport, EntityType, Intent
+from dialogflow_fulfillment.entities import EntityIndex
+
+
+@pytest.fixture
+def intent():
+    """Return a sample intent object (from an agent export)."""
+    return {
+        'name': 'Weather',
+        'contexts': [],
+        'responses': [{
+            'resetContexts': False,
+            'action': 'weather.get',
+            'affectedContexts': [],
+            'parameters': [
+                {
+                    'name': 'city',
+                    'required': False,
+                    'value': '$city',
+                    'defaultValue': '#WEATHER.city',
+                },
+                {'name': 'date', 'required': False, 'value': '#WEATHER.date'},
+                {'name': 'unit', 'required': False, 'value': '$unit'},
+            ],
+            'messages': [
+                {'type': '0', 'lang': 'en', 'speech': ['Sunny!', 'Rainy!']},
+                {'type': 0, 'lang': 'en', 'speech': 'Windy!',
+                 'platform': 'facebook'},
+                {'type': 1, 'lang': 'en', 'title': 'Weather',
+                 'subtitle': 'Today', 'imageUrl': 'https://weather.png',
+                 'buttons': [{'text': 'More', 'postback': 'more'}],
+                 'platform': 'google'},
+                {'type': 2, 'lang': 'en', 'title': 'More?',
+                 'replies': ['Yes', 'No']},
+                {'type': 3, 'lang': 'en', 'imageUrl': 'https://sun.png'},
+                {'type': 4, 'lang': 'en', 'payload': {'test': 'payload'}},
+                {'type': 'simple_response', 'lang': 'en'},
+                {'type': 0, 'lang': 'pt-br', 'speech': 'Ensolarado!'},
+            ],
+        }],
+        'webhookUsed': True,
+        'events': [{'name': 'WEATHER'}],
+    }
+
+
+@pytest.fixture
+def agent_zip(tmp_path, intent):
+    """Create a sample agent export (a ZIP file)."""
+    path = tmp_path / 'agent.zip'
+
+    with ZipFile(path, 'w') as archive:
+        archive.writestr('agent.json', json.dumps({}))
+        archive.writestr('intents/Weather.json', json.dumps(intent))
+        archive.writestr('intents/Weather_usersays_en.json', json.dumps([]))
+        archive.writestr('entities/unit.json', json.dumps({
+            'name': 'unit',
+            'isRegexp': False,
+        }))
+        archive.writestr('entities/unit_entries_en.json', json.dumps([
+            {'value': 'celsius', 'synonyms': ['celsius', 'C']},
+            {'value': 'fahrenheit', 'synonyms': ['fahrenheit', 'F']},
+        ]))
+        archive.writestr('entities/unit_entries_pt-br.json', json.dumps([
+            {'value': 'celsius', 'synonyms': ['graus celsius']},
+        ]))
+        archive.writestr('entities/zip.json', json.dumps({
+            'name': 'zip',
+            'isRegexp': True,
+        }))
+
+    return path
+
+
+def test_from_zip(agent_zip):
+    export = AgentExport.from_zip(agent_zip)
+
+    assert list(export.intents) == ['Weather']
+    assert export.get_event_intent('WEATHER') is export.intents['Weather']
+    assert export.get_event_intent('GOODBYE') is None
+    assert export.entity_types == {
+        'unit': EntityType(
+            name='unit',
+            entries={
+                'en': (
+                    ('celsius', ('celsius', 'C')),
+                    ('fahrenheit', ('fahrenheit', 'F')),
+                ),
+                'pt-br': (('celsius', ('graus celsius',)),),
+            }
+        ),
+        'zip': EntityType(name='zip', entries={}, is_regexp=True),
+    }
+
+
+def test_entity_index(agent_zip):
+    export = AgentExport.from_zip(agent_zip)
+
+    index = export.entity_index
+
+    assert isinstance(index, EntityIndex)
+    assert export.entity_index is index
+    assert index.normalize('unit', 'c', 'en-US') == 'celsius'
+
+
+def test_intent(intent):
+    weather = Intent._from_dict(intent)
+
+    assert weather.name == 'Weather'
+    assert weather.action == 'weather.get'
+    assert weather.events == ('WEATHER',)
+    assert weather.is_local
+
+
+def test_empty_intent():
+    intent = Intent._from_dict({'name': 'Empty'})
+
+    assert intent.action is None
+    assert intent.events == ()
+    assert intent.messages == {}
+    assert not intent.is_local
+
+
+@pytest.mark.parametrize('changes', [
+    {'contexts': ['some_context']},
+    {'webhookUsed': False},
+])
+def test_not_local_intent(intent, changes):
+    intent.update(changes)
+
+    assert not Intent._from_dict(intent).is_local
+
+
+@pytest.mark.parametrize('changes', [
+    {'affectedContexts': [{'name': 'some_context', 'lifespan': 1}]},
+    {'resetContexts': True},
+    {'parameters': [{'name': 'city', 'required': True}]},
+])
+def test_not_local_response(intent, changes):
+    intent['responses'][0].update(changes)
+
+    assert not Intent._from_dict(intent).is_local
+
+
+def test_get_parameters(intent):
+    weather = Intent._from_dict(intent)
+    event = {
+        'name': 'WEATHER',
+        'parameters': {'city': 'Lisbon', 'date': 'today', 'unit': 'C'},
+    }
+
+    assert weather.get_parameters(event) == {
+        'city': 'Lisbon',
+        'date': 'today',
+        'unit': '',
+    }
+
+
+def test_get_parameters_other_event(intent):
+    weather = Intent._from_dict(intent)
+
+    assert weather.get_parameters({'name': 'FORECAST'}) == {
+        'city': '',
+        'date': '',
+        'unit': '',
+    }
+
+
+def test_get_messages(intent):
+    weather = Intent._from_dict(intent)
+
+    assert weather.get_messages('en-US') == [
+        {'text': {'text': ['Sunny!']}},
+        {'text': {'text': ['Windy!']}, 'platform': 'FACEBOOK'},
+        {'card': {
+            'title': 'Weather',
+            'subtitle': 'Today',
+            'imageUri': 'https://weather.png',
+            'buttons': [{'text': 'More', 'postback': 'more'}],
+        }, 'platform': 'ACTIONS_ON_GOOGLE'},
+        {'quickReplies': {'title': 'More?', 'quickReplies': ['Yes', 'No']}},
+        {'image': {'imageUri': 'https://sun.png'}},
+        {'payload': {'test': 'payload'}},
+    ]
+    assert weather.get_messages('pt-BR') == [
+        {'text': {'text': ['Ensolarado!']}}
+    ]
+    assert weather.get_messages(None) == []
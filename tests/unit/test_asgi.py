@@ -0,0 +1,224 @@
+import asyncio
+import json
+import threading
+
+import pytest
+
+from dialogflow_fulfillment.adapters import ASGIAdapter
+from dialogflow_fulfillment.dispatcher import Dispatcher
+from dialogflow_fulfillment.executors import ExecutorPool, ExecutorPools
+from dialogflow_fulfillment.http_pool import HTTPPool
+from dialogflow_fulfillment.shedding import LoadShedder
+from dialogflow_fulfillment.tracing import Tracer
+
+
+def welcome_handler(agent):
+    agent.add('Hello!')
+
+
+@pytest.fixture
+def app():
+    """Return an ASGI application with a sample dispatcher."""
+    app = ASGIAdapter(Dispatcher({'Default Welcome Intent': welcome_handler}))
+
+    yield app
+
+    app.shutdown()
+
+
+def call(app, body=b'', method='POST', chunk_size=None):
+    """Call an ASGI application and get the status, headers and body."""
+    chunk_size = chunk_size or max(len(body), 1)
+    messages = [
+        {
+            'type': 'http.request',
+            'body': body[start:start + chunk_size],
+            'more_body': start + chunk_size < len(body),
+        }
+        for start in range(0, max(len(body), 1), chunk_size)
+    ]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {'type': 'http', 'method': method, 'path': '/'}
+    asyncio.run(app(scope, receive, send))
+
+    start, content = sent
+
+    assert start['type'] == 'http.response.start'
+    assert content['type'] == 'http.response.body'
+
+    return start['status'], dict(start['headers']), content['body']
+
+
+def test_post(app, webhook_request):
+    status, headers, content = call(
+        app,
+        json.dumps(webhook_request).encode(),
+        chunk_size=100
+    )
+
+    assert status == 200
+    assert headers[b'content-type'] == b'application/json'
+    assert headers[b'content-length'] == str(len(content)).encode()
+    assert json.loads(content)['fulfillmentMessages'] == [
+        {'text': {'text': ['Hello!']}}
+    ]
+
+
+def test_invalid_body(app):
+    status, _, content = call(app, b'this is not JSON')
+
+    assert status == 400
+    assert 'error' in json.loads(content)
+
+
+def test_handler_error(webhook_request):
+    def failing_handler(agent):
+        raise ValueError('secret')
+
+    app = ASGIAdapter(Dispatcher({'Default Welcome Intent': failing_handler}))
+
+    # The error isn't the client's (the server answers with a 500).
+    with pytest.raises(ValueError, match='secret'):
+        call(app, json.dumps(webhook_request).encode())
+
+    app.shutdown()
+
+
+def test_other_method(app):
+    status, headers, _ = call(app, method='GET')
+
+    assert status == 405
+    assert headers[b'allow'] == b'POST'
+
+
+def test_other_scope(app):
+    with pytest.raises(ValueError):
+        asyncio.run(app({'type': 'websocket'}, None, None))
+
+
+def test_lifespan(mocker):
+    http_pool = HTTPPool()
+    close = mocker.spy(http_pool, 'close')
+    dispatcher = Dispatcher()
+    shutdown = mocker.spy(dispatcher.executor_pools, 'shutdown')
+    app = ASGIAdapter(dispatcher, http_pool=http_pool)
+    messages = [{'type': 'lifespan.startup'}, {'type': 'lifespan.shutdown'}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message)
+
+        if message['type'] == 'lifespan.startup.complete':
+            assert app.started
+            assert dispatcher.http_pool is http_pool
+
+    asyncio.run(app({'type': 'lifespan'}, receive, send))
+
+    assert sent == [
+        {'type': 'lifespan.startup.complete'},
+        {'type': 'lifespan.shutdown.complete'},
+    ]
+    assert not app.started
+    close.assert_called_once_with()
+    shutdown.assert_called_once_with()
+
+
+def test_pools(webhook_request):
+    event = threading.Event()
+    threads = {}
+
+    def welcome_handler(agent):
+        threads['welcome'] = threading.current_thread().name
+        agent.add('Hello!')
+
+    def report_handler(agent):
+        threads['report'] = threading.current_thread().name
+        event.wait(5.0)
+
+    pools = ExecutorPools({'reports': ExecutorPool(1, max_queue=0)})
+    dispatcher = Dispatcher(
+        {'Default Welcome Intent': welcome_handler},
+        executor_pools=pools
+    )
+    dispatcher.register('Monthly Report', report_handler, pool='reports')
+    app = ASGIAdapter(dispatcher)
+    report_request = json.dumps({
+        **webhook_request,
+        'queryResult': {
+            **webhook_request['queryResult'],
+            'intent': {'displayName': 'Monthly Report'},
+        },
+    }).encode()
+
+    report = threading.Thread(target=call, args=(app, report_request))
+    report.start()
+
+    try:
+        while pools.pools['reports'].pending == 0:
+            event.wait(0.001)
+
+        # The reports pool is busy, but the other intents aren't held up.
+        status, _, _ = call(app, json.dumps(webhook_request).encode())
+
+        assert status == 200
+
+        status, _, content = call(app, report_request)
+
+        assert status == 503
+        assert 'reports' in json.loads(content)['error']
+    finally:
+        event.set()
+        report.join()
+        app.shutdown()
+
+    assert threads['report'].startswith('dialogflow-fulfillment-reports')
+    assert threads['welcome'].startswith('dialogflow-fulfillment-default')
+
+
+def test_tracing(webhook_request):
+    tracer = Tracer()
+    app = ASGIAdapter(
+        Dispatcher({'Default Welcome Intent': welcome_handler}, tracer=tracer)
+    )
+    body = json.dumps(webhook_request).encode()
+
+    call(app, body)
+    app.shutdown()
+    spans = {span.name: span for span in tracer.drain()}
+
+    assert spans['http request'].parent_id is None
+    assert spans['http request'].attributes == {'size': len(body)}
+    assert spans['dispatch'].parent_id == spans['http request'].span_id
+    assert spans['serialize'].parent_id == spans['http request'].span_id
+
+
+def test_shedding(app, webhook_request):
+    shedder = LoadShedder(1, text='Busy!')
+    app.shedder = shedder
+    body = json.dumps(webhook_request).encode()
+
+    status, _, content = call(app, body)
+
+    assert status == 200
+    assert json.loads(content)['fulfillmentMessages'] == [
+        {'text': {'text': ['Hello!']}}
+    ]
+    assert shedder.stats.in_flight == 0
+
+    shedder.acquire(body)
+    status, headers, content = call(app, body)
+
+    assert status == 200
+    assert headers[b'content-length'] == str(len(content)).encode()
+    assert content == shedder.fallback
+    assert shedder.stats.shed == 1
@@ -0,0 +1,217 @@
+import io
+import json
+import sys
+
+import pytest
+
+from dialogflow_fulfillment.__main__ import main
+from dialogflow_fulfillment.batch import (
+    ReplayReport,
+    Timing,
+    load_dispatcher,
+    replay,
+    replay_chunk,
+    split_file,
+)
+
+APP_MODULE = '''
+from dialogflow_fulfillment import Dispatcher
+
+dispatcher = Dispatcher()
+
+
+@dispatcher.register('Default Welcome Intent')
+def welcome(agent):
+    agent.add('Hello!')
+
+
+not_a_dispatcher = 'this is not a dispatcher'
+'''
+
+
+@pytest.fixture
+def app_module(tmp_path, monkeypatch):
+    """Create a sample module with a dispatcher."""
+    (tmp_path / 'replay_app.py').write_text(APP_MODULE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    yield 'replay_app'
+
+    sys.modules.pop('replay_app', None)
+
+
+@pytest.fixture
+def records_file(tmp_path, webhook_request):
+    """Create a JSONL file of records, a request and an invalid line."""
+    contexts = webhook_request['queryResult']['outputContexts']
+    expected = {
+        'fulfillmentMessages': [{'text': {'text': ['Hello!']}}],
+        'outputContexts': contexts,
+    }
+    changed = {
+        **expected,
+        'fulfillmentMessages': [{'text': {'text': ['Hi!']}}],
+    }
+    lines = [
+        {'timestamp': 0.0, 'request': webhook_request, 'response': expected},
+        {'timestamp': 1.0, 'request': webhook_request, 'response': changed},
+        webhook_request,
+    ]
+    path = tmp_path / 'records.jsonl'
+    content = ''.join(f'{json.dumps(line)}\n' for line in lines)
+    path.write_text(f'{content}\n{{"invalid"\n')
+
+    return path
+
+
+def test_load_dispatcher(app_module):
+    dispatcher = load_dispatcher(f'{app_module}:dispatcher')
+
+    assert dispatcher is sys.modules[app_module].dispatcher
+
+
+@pytest.mark.parametrize('target', ['replay_app', ':dispatcher'])
+def test_load_invalid_target(target):
+    with pytest.raises(ValueError):
+        load_dispatcher(target)
+
+
+def test_load_non_dispatcher(app_module):
+    with pytest.raises(ValueError):
+        load_dispatcher(f'{app_module}:not_a_dispatcher')
+
+
+def test_split_file(tmp_path):
+    path = tmp_path / 'records.jsonl'
+    path.write_bytes(b'x' * 10)
+
+    assert split_file(path, 4) == [(0, 4), (4, 8), (8, 10)]
+    assert split_file(path, 10) == [(0, 10)]
+
+
+def test_split_empty_file(tmp_path):
+    path = tmp_path / 'records.jsonl'
+    path.write_bytes(b'')
+
+    assert split_file(path, 4) == []
+
+
+@pytest.mark.parametrize('chunk_size', [1, 7, 100, 10 ** 6])
+def test_chunks_cover_each_line_once(app_module, records_file, chunk_size):
+    dispatcher = load_dispatcher(f'{app_module}:dispatcher')
+    results = [
+        replay_chunk(records_file, start, end, dispatcher)
+        for start, end in split_file(records_file, chunk_size)
+    ]
+
+    assert sum(result.records for result in results) == 4
+    assert sum(len(result.diffs) for result in results) == 2
+
+
+def test_replay(app_module, records_file):
+    diffs_file = io.StringIO()
+
+    report = replay(
+        f'{app_module}:dispatcher',
+        records_file,
+        diffs_file,
+        workers=0,
+        chunk_size=100
+    )
+    diffs = [json.loads(line) for line in diffs_file.getvalue().splitlines()]
+
+    assert (report.records, report.diffs, report.errors) == (4, 1, 1)
+    assert report.timings['Default Welcome Intent'].count == 3
+    assert diffs[0]['intent'] == 'Default Welcome Intent'
+    assert diffs[0]['expected']['fulfillmentMessages'] == [
+        {'text': {'text': ['Hi!']}}
+    ]
+    assert diffs[0]['actual']['fulfillmentMessages'] == [
+        {'text': {'text': ['Hello!']}}
+    ]
+    assert diffs[0]['offset'] == records_file.read_bytes().index(b'\n') + 1
+    assert 'error' in diffs[1]
+
+
+def test_replay_in_processes(app_module, records_file):
+    report = replay(
+        f'{app_module}:dispatcher',
+        records_file,
+        io.StringIO(),
+        workers=2,
+        chunk_size=100
+    )
+
+    assert (report.records, report.diffs, report.errors) == (4, 1, 1)
+
+
+def test_replay_compressed_file(app_module, tmp_path):
+    with pytest.raises(ValueError):
+        replay(
+            f'{app_module}:dispatcher',
+            tmp_path / 'records.jsonl.gz',
+            io.StringIO()
+        )
+
+
+def test_timing():
+    timing = Timing().add(0.1).add(0.3)
+
+    assert timing.count == 2
+    assert timing.mean == pytest.approx(0.2)
+    assert timing.max == 0.3
+    assert timing.merge(Timing(1, 0.5, 0.5)) == (3, pytest.approx(0.9), 0.5)
+    assert Timing().mean == 0.0
+
+
+def test_report_format():
+    report = ReplayReport()
+    report.timings = {
+        'slow': Timing(1, 0.2, 0.2),
+        'fast': Timing(2, 0.002, 0.001),
+    }
+
+    lines = report.format().splitlines()
+
+    assert lines[0] == 'records: 0, diffs: 0, errors: 0'
+    assert lines[3].startswith('slow')
+    assert lines[4].startswith('fast')
+    assert lines[4].split()[1:] == ['2', '1.000', '1.000']
+
+
+def test_main_replay(app_module, records_file, tmp_path, capsys, mocker):
+    mocker.patch('sys.path', list(sys.path))
+    diffs_path = tmp_path / 'diffs.jsonl'
+
+    status = main([
+        'replay',
+        f'{app_module}:dispatcher',
+        str(records_file),
+        '--diffs', str(diffs_path),
+        '--workers', '0',
+    ])
+
+    assert status == 1
+    assert len(diffs_path.read_text().splitlines()) == 2
+    assert capsys.readouterr().out.startswith('records: 4, diffs: 1')
+
+
+def test_main_replay_without_diffs(
+    app_module,
+    tmp_path,
+    webhook_request,
+    mocker
+):
+    mocker.patch('sys.path', list(sys.path))
+    records_path = tmp_path / 'requests.jsonl'
+    records_path.write_text(json.dumps(webhook_request) + '\n')
+
+    status = main([
+        'replay',
+        f'{app_module}:dispatcher',
+        str(records_path),
+        '--diffs', str(tmp_path / 'diffs.jsonl'),
+        '--workers', '0',
+    ])
+
+    assert status == 0
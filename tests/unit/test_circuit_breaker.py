@@ -0,0 +1,232 @@
+from types import SimpleNamespace
+
+import pytest
+
+from dialogflow_fulfillment import circuit_breaker
+from dialogflow_fulfillment.circuit_breaker import (
+    CLOSED,
+    HALF_OPEN,
+    OPEN,
+    CircuitBreaker,
+    CircuitBreakers,
+)
+from dialogflow_fulfillment.dispatcher import Dispatcher
+
+
+class Clock:
+    """A clock that only moves when it's told to."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def monotonic(self):
+        return self.now
+
+    def advance(self, seconds):
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Replace the clock of the breakers."""
+    clock = Clock()
+    monkeypatch.setattr(circuit_breaker, 'time',
+                        SimpleNamespace(monotonic=clock.monotonic))
+
+    return clock
+
+
+def trip(breaker):
+    """Record enough failed calls to open a breaker."""
+    for _ in range(breaker.min_calls):
+        breaker.record(0.0, failed=True)
+
+
+@pytest.mark.parametrize('options', [
+    {'failure_rate_threshold': 0},
+    {'failure_rate_threshold': 1.5},
+    {'slow_call_rate_threshold': -0.5},
+    {'min_calls': 0},
+    {'half_open_calls': 0},
+    {'buckets': 0},
+])
+def test_invalid_options(options):
+    with pytest.raises(ValueError):
+        CircuitBreaker(**options)
+
+    with pytest.raises(ValueError):
+        CircuitBreakers(**options)
+
+
+def test_failure_rate(clock):
+    breaker = CircuitBreaker(min_calls=4)
+
+    breaker.record(0.1)
+    breaker.record(0.1)
+    breaker.record(0.1, failed=True)
+
+    assert breaker.failure_rate == pytest.approx(1 / 3)
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+    breaker.record(0.1, failed=True)
+
+    assert breaker.state == OPEN
+    assert not breaker.allow()
+    assert breaker.failure_rate == 0.0
+
+
+def test_slow_call_rate(clock):
+    breaker = CircuitBreaker(min_calls=4, slow_call_duration=1.0,
+                             slow_call_rate_threshold=0.75)
+
+    for duration in (1.0, 2.0, 0.5):
+        breaker.record(duration)
+
+    assert breaker.slow_call_rate == pytest.approx(2 / 3)
+    assert breaker.state == CLOSED
+
+    breaker.record(1.5)
+
+    assert breaker.state == OPEN
+
+
+def test_rolling_window(clock):
+    breaker = CircuitBreaker(min_calls=3, window=10.0, buckets=10)
+
+    breaker.record(0.1, failed=True)
+    clock.advance(5.0)
+    breaker.record(0.1)
+
+    assert breaker.failure_rate == 0.5
+
+    # The first call leaves the window.
+    clock.advance(5.0)
+
+    assert breaker.failure_rate == 0.0
+
+    breaker.record(0.1)
+    breaker.record(0.1, failed=True)
+
+    assert breaker.failure_rate == pytest.approx(1 / 3)
+    assert breaker.state == CLOSED
+
+
+def test_half_open(clock):
+    breaker = CircuitBreaker(open_duration=30.0, half_open_calls=2)
+    trip(breaker)
+    clock.advance(29.0)
+
+    assert breaker.state == OPEN
+
+    clock.advance(1.0)
+
+    assert breaker.state == HALF_OPEN
+    assert breaker.allow()
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record(0.1)
+
+    assert breaker.state == HALF_OPEN
+
+    breaker.record(0.1)
+
+    assert breaker.state == CLOSED
+    assert breaker.allow()
+
+
+@pytest.mark.parametrize('duration, failed', [(0.1, True), (5.0, False)])
+def test_failed_probe(clock, duration, failed):
+    breaker = CircuitBreaker(open_duration=30.0)
+    trip(breaker)
+    clock.advance(30.0)
+
+    assert breaker.allow()
+
+    breaker.record(duration, failed)
+
+    assert breaker.state == OPEN
+
+    clock.advance(29.0)
+
+    assert not breaker.allow()
+
+
+def test_record_while_open(clock):
+    breaker = CircuitBreaker()
+    trip(breaker)
+
+    # A call that started before the breaker opened.
+    breaker.record(0.1)
+
+    assert breaker.state == OPEN
+    assert breaker.failure_rate == 0.0
+
+
+def test_reset(clock):
+    breaker = CircuitBreaker()
+    trip(breaker)
+
+    breaker.reset()
+
+    assert breaker.state == CLOSED
+
+
+def test_breakers(clock):
+    breakers = CircuitBreakers(min_calls=1)
+
+    assert breakers.get('Order Status') is breakers.get('Order Status')
+    assert breakers.get(None) is breakers.get('')
+
+    trip(breakers.get('Order Status'))
+
+    assert breakers.states == {'Order Status': OPEN, '': CLOSED}
+
+
+def failing_handler(agent):
+    raise ConnectionError('the orders backend is down')
+
+
+def fallback_handler(agent):
+    agent.add('Orders are unavailable.')
+
+
+@pytest.mark.parametrize('fallbacks, default_fallback, expected', [
+    ({'Default Welcome Intent': fallback_handler}, None,
+     [{'text': {'text': ['Orders are unavailable.']}}]),
+    ({}, fallback_handler, [{'text': {'text': ['Orders are unavailable.']}}]),
+    ({}, None, None),
+])
+def test_dispatcher(clock, webhook_request, fallbacks, default_fallback,
+                    expected):
+    breakers = CircuitBreakers(fallbacks, default_fallback, min_calls=2)
+    dispatcher = Dispatcher(
+        {'Default Welcome Intent': failing_handler},
+        circuit_breakers=breakers
+    )
+
+    for _ in range(2):
+        with pytest.raises(ConnectionError):
+            dispatcher.handle(webhook_request)
+
+    assert breakers.states == {'Default Welcome Intent': OPEN}
+
+    response = dispatcher.handle(webhook_request)
+
+    assert response.get('fulfillmentMessages') == expected
+
+
+def test_dispatcher_success(clock, webhook_request):
+    breakers = CircuitBreakers()
+    dispatcher = Dispatcher(
+        {'Default Welcome Intent': fallback_handler},
+        circuit_breakers=breakers
+    )
+
+    dispatcher.handle(webhook_request)
+
+    breaker = breakers.get('Default Welcome Intent')
+
+    assert breaker.state == CLOSED
+    assert breaker.failure_rate == 0.0
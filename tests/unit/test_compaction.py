@@ -0,0 +1,89 @@
+import pytest
+
+from dialogflow_fulfillment.compaction import (
+    deduplicate,
+    drop_optional_fields,
+    json_size,
+    merge_texts,
+    truncate,
+)
+from dialogflow_fulfillment.rich_responses import (
+    Card,
+    Image,
+    QuickReplies,
+    Text,
+)
+
+
+def as_dicts(messages):
+    return [message._as_dict() for message in messages]
+
+
+def test_json_size():
+    assert json_size({'a': [1, 'b']}) == len('{"a":[1,"b"]}')
+
+
+def test_merge_texts():
+    messages = [
+        Text('a'),
+        Text('b'),
+        Text(),
+        Image('https://test.url/image.jpg'),
+        Text('c', platform='SLACK'),
+        Text('d'),
+    ]
+
+    assert as_dicts(merge_texts(messages, 0)) == [
+        {'text': {'text': ['a\nb']}},
+        {'image': {'imageUri': 'https://test.url/image.jpg'}},
+        {'text': {'text': ['c']}, 'platform': 'SLACK'},
+        {'text': {'text': ['d']}},
+    ]
+
+
+def test_deduplicate():
+    messages = [Text('a'), QuickReplies('b', ['c']), Text('a'), Text('d')]
+
+    assert deduplicate(messages, 0) == [messages[0], messages[1], messages[3]]
+
+
+def test_drop_optional_fields(title, subtitle, image_url, buttons):
+    card = Card(title, subtitle, image_url, buttons)
+    text = Text('a')
+
+    compacted = drop_optional_fields(
+        [card, Card(title), QuickReplies(title, ['b']), text],
+        0
+    )
+
+    assert as_dicts(compacted) == [
+        {'card': {'title': title, 'buttons': buttons}},
+        {'card': {'title': title}},
+        {'quickReplies': {'quickReplies': ['b']}},
+        {'text': {'text': ['a']}},
+    ]
+    assert compacted[-1] is text
+    assert card.subtitle == subtitle
+
+
+def test_truncate_messages():
+    messages = [Text('a'), Text('b'), Text('c')]
+
+    assert truncate(messages, json_size(messages[-1]._as_dict()) + 2) == [
+        messages[0]
+    ]
+
+
+def test_truncate_text():
+    compacted = truncate([Text('a' * 100)], 10)
+
+    assert as_dicts(compacted) == [{'text': {'text': ['a' * 87 + '...']}}]
+
+
+@pytest.mark.parametrize('message', [Text('a'), Text()])
+def test_truncate_whole_text(message):
+    assert truncate([message], 10) == []
+
+
+def test_truncate_non_text():
+    assert truncate([Image('https://test.url/image.jpg')], 10) == []
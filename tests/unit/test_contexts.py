@@ -73,3 +73,33 @@ def test_set_parameters(session):
     context_api.set('__system_counters__', parameters={})
 
     assert context_api.get('__system_counters__')['parameters'] == {}
+
+
+def test_size(session):
+    context_api = Context([], session)
+
+    assert context_api.size == len('[]')
+
+    context_api.set('a', lifespan_count=1)
+    context_api.set('b', parameters={'c': 'd'})
+
+    assert context_api.size == len(
+        '[{"name":"a","lifespanCount":1},{"name":"b","parameters":{"c":"d"}}]'
+    )
+
+    context_api.set('a', lifespan_count=10)
+
+    assert context_api.size == len(
+        '[{"name":"a","lifespanCount":10},{"name":"b","parameters":{"c":"d"}}]'
+    )
+
+
+def test_iteration_is_independent(session):
+    context_api = Context([], session)
+    context_api.set('a')
+    context_api.set('b')
+
+    iterators = [iter(context_api), iter(context_api)]
+
+    assert [next(iterator)['name'] for iterator in iterators] == ['a', 'a']
+    assert [next(iterator)['name'] for iterator in iterators] == ['b', 'b']
@@ -0,0 +1,294 @@
+import asyncio
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from dialogflow_fulfillment.agent_export import AgentExport, EntityType, Intent
+from dialogflow_fulfillment.dispatcher import Dispatcher
+from dialogflow_fulfillment.executors import ExecutorPool, ExecutorPools
+from dialogflow_fulfillment.http_pool import HTTPPool
+
+
+def welcome_handler(agent):
+    agent.add('Hello!')
+
+
+def followup_handler(agent):
+    agent.add('Wait...')
+    agent.followup_event = {'name': 'WEATHER', 'parameters': {'city': 'Rio'}}
+
+
+def weather_handler(agent):
+    text = agent.console_messages[0].text
+
+    agent.add(f'{text} in {agent.parameters["city"]}')
+
+
+@pytest.fixture
+def agent_export():
+    """Return an agent export with an intent triggered by an event."""
+    return AgentExport([
+        Intent(
+            name='Weather',
+            action='weather.get',
+            events=('WEATHER',),
+            webhook_used=True,
+            input_contexts=(),
+            affected_contexts=(),
+            reset_contexts=False,
+            parameters=({'name': 'city', 'value': '#WEATHER.city'},),
+            messages={'en': ({'text': {'text': ['Sunny']}},)}
+        ),
+        Intent(
+            name='Forecast',
+            action=None,
+            events=('FORECAST',),
+            webhook_used=False,
+            input_contexts=(),
+            affected_contexts=(),
+            reset_contexts=False,
+            parameters=(),
+            messages={}
+        ),
+    ])
+
+
+def test_handlers(webhook_request):
+    dispatcher = Dispatcher({'Default Welcome Intent': welcome_handler})
+
+    assert dispatcher.handle(webhook_request)['fulfillmentMessages'] == [
+        {'text': {'text': ['Hello!']}}
+    ]
+
+
+def test_register_decorator(webhook_request):
+    dispatcher = Dispatcher()
+
+    @dispatcher.register('Default Welcome Intent')
+    def handler(agent):
+        agent.add('Hi!')
+
+    assert dispatcher.handlers == {'Default Welcome Intent': handler}
+    assert dispatcher(webhook_request)['fulfillmentMessages'] == [
+        {'text': {'text': ['Hi!']}}
+    ]
+
+
+def test_register_non_callable():
+    dispatcher = Dispatcher()
+
+    with pytest.raises(TypeError):
+        dispatcher.register('Default Welcome Intent', 'not a function')
+
+
+def test_register_pool():
+    pools = ExecutorPools({'reports': ExecutorPool(1)})
+    dispatcher = Dispatcher(executor_pools=pools)
+
+    dispatcher.register('Monthly Report', welcome_handler, pool='reports')
+
+    assert pools.intents == {'Monthly Report': 'reports'}
+
+    with pytest.raises(ValueError):
+        dispatcher.register('Order Status', welcome_handler, pool='orders')
+
+    assert 'Order Status' not in dispatcher.handlers
+
+
+def test_handle_async(webhook_request):
+    threads = []
+
+    def handler(agent):
+        threads.append(threading.current_thread().name)
+        agent.add('Hello!')
+
+    dispatcher = Dispatcher({'Default Welcome Intent': handler})
+
+    response = asyncio.run(
+        dispatcher.handle_async(json.dumps(webhook_request).encode())
+    )
+    dispatcher.executor_pools.shutdown()
+
+    assert response['fulfillmentMessages'] == [{'text': {'text': ['Hello!']}}]
+    assert threads[0].startswith('dialogflow-fulfillment-default')
+
+
+def test_handlers_are_read_only():
+    dispatcher = Dispatcher()
+
+    with pytest.raises(TypeError):
+        dispatcher.handlers['Default Welcome Intent'] = welcome_handler
+
+
+def test_default_handler(webhook_request):
+    dispatcher = Dispatcher(default_handler=welcome_handler)
+
+    assert dispatcher.handle(webhook_request)['fulfillmentMessages'] == [
+        {'text': {'text': ['Hello!']}}
+    ]
+
+
+def test_no_handler(webhook_request):
+    dispatcher = Dispatcher()
+
+    assert 'fulfillmentMessages' not in dispatcher.handle(webhook_request)
+
+
+def test_encoded_request(webhook_request):
+    dispatcher = Dispatcher({'Default Welcome Intent': welcome_handler})
+
+    response = dispatcher.handle(json.dumps(webhook_request).encode())
+
+    assert response == dispatcher.handle(webhook_request)
+
+
+def test_client_options(webhook_request):
+    dispatcher = Dispatcher(max_response_size=1000)
+
+    assert dispatcher.create_client(webhook_request).max_response_size == 1000
+
+
+@pytest.mark.parametrize('reuse_clients', [False, True])
+def test_http_pool(webhook_request, reuse_clients):
+    http_pool = HTTPPool()
+    pools = []
+    dispatcher = Dispatcher(
+        default_handler=lambda agent: pools.append(agent.http.pool),
+        reuse_clients=reuse_clients,
+        http_pool=http_pool
+    )
+
+    dispatcher.handle(webhook_request)
+    dispatcher.handle(json.dumps(webhook_request).encode())
+
+    assert pools == [http_pool, http_pool]
+
+
+def test_entity_index(webhook_request, agent_export):
+    export = AgentExport(
+        agent_export.intents.values(),
+        [EntityType('size', {'en': (('large', ('LG',)),)})]
+    )
+    dispatcher = Dispatcher(agent_export=export, reuse_clients=True)
+    webhook_request['queryResult']['parameters'] = {'size': 'lg'}
+    sizes = []
+
+    dispatcher.default_handler = lambda agent: sizes.append(
+        agent.parameters.as_entity('size', '@size')
+    )
+    dispatcher.handle(webhook_request)
+
+    assert sizes == ['large']
+    assert dispatcher.client_options['entity_index'] is export.entity_index
+
+
+def test_concurrent_requests(webhook_request):
+    event = {'name': 'event'}
+
+    def handler(agent):
+        agent.add(agent.session)
+        agent.followup_event = event
+
+    dispatcher = Dispatcher(default_handler=handler)
+    requests = [
+        {**webhook_request, 'session': str(index)} for index in range(100)
+    ]
+
+    with ThreadPoolExecutor(8) as executor:
+        responses = list(executor.map(dispatcher.handle, requests))
+
+    assert [
+        response['fulfillmentMessages'][0]['text']['text'][0]
+        for response in responses
+    ] == [str(index) for index in range(100)]
+    assert event == {'name': 'event'}
+
+
+def test_reuse_clients(webhook_request):
+    dispatcher = Dispatcher(
+        {'Default Welcome Intent': welcome_handler},
+        reuse_clients=True
+    )
+
+    responses = [dispatcher.handle(webhook_request) for _ in range(2)]
+
+    assert responses[0] == responses[1]
+    assert responses[0]['fulfillmentMessages'] == [
+        {'text': {'text': ['Hello!']}}
+    ]
+
+
+def test_local_followup(webhook_request, agent_export):
+    dispatcher = Dispatcher(
+        {
+            'Default Welcome Intent': followup_handler,
+            'Weather': weather_handler,
+        },
+        agent_export=agent_export
+    )
+
+    response = dispatcher.handle(webhook_request)
+
+    assert response['fulfillmentMessages'] == [
+        {'text': {'text': ['Sunny in Rio']}}
+    ]
+    assert 'followupEventInput' not in response
+
+
+def test_local_followup_chain_limit(webhook_request, agent_export):
+    intents = []
+
+    def chain_handler(agent):
+        intents.append(agent.intent)
+        agent.followup_event = 'WEATHER'
+
+    dispatcher = Dispatcher(
+        {'Default Welcome Intent': chain_handler, 'Weather': chain_handler},
+        agent_export=agent_export,
+        max_followups=2
+    )
+
+    response = dispatcher.handle(webhook_request)
+
+    assert intents == ['Default Welcome Intent', 'Weather', 'Weather']
+    assert response['followupEventInput']['name'] == 'WEATHER'
+
+
+@pytest.mark.parametrize('event', ['FORECAST', 'GOODBYE'])
+def test_remote_followup(webhook_request, agent_export, event):
+    def handler(agent):
+        agent.followup_event = event
+
+    dispatcher = Dispatcher(
+        {'Default Welcome Intent': handler, 'Forecast': weather_handler},
+        agent_export=agent_export
+    )
+
+    response = dispatcher.handle(webhook_request)
+
+    assert response['followupEventInput']['name'] == event
+
+
+def test_remote_followup_without_handler(webhook_request, agent_export):
+    dispatcher = Dispatcher(
+        {'Default Welcome Intent': followup_handler},
+        agent_export=agent_export
+    )
+
+    response = dispatcher.handle(webhook_request)
+
+    assert response['followupEventInput']['name'] == 'WEATHER'
+    assert response['fulfillmentMessages'] == [{'text': {'text': ['Wait...']}}]
+
+
+def test_followup_without_agent_export(webhook_request):
+    dispatcher = Dispatcher({
+        'Default Welcome Intent': followup_handler,
+        'Weather': weather_handler,
+    })
+
+    response = dispatcher.handle(webhook_request)
+
+    assert response['followupEventInput']['name'] == 'WEATHER'
@@ -0,0 +1,72 @@
+import pytest
+
+from dialogflow_fulfillment.agent_export import EntityType
+from dialogflow_fulfillment.entities import EntityIndex, normalize_synonym
+
+
+@pytest.fixture
+def index():
+    """Return an index of sample entity types."""
+    return EntityIndex([
+        EntityType('size', {
+            'en': (
+                ('large', ('large', 'LG', 'big')),
+                ('larger', ('larger', 'XL')),
+                ('small', ('small', 'sm', 'big')),
+            ),
+            'pt-br': (('large', ('grande',)),),
+        }),
+        EntityType('color', {'en': (('red', ()), ('light blue', ()))}),
+        EntityType('code', {'en': (('[0-9]+', ()),)}, is_regexp=True),
+    ])
+
+
+def test_normalize_synonym():
+    assert normalize_synonym('  Light   BLUE ') == 'light blue'
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('large', 'large'),
+    ('LG', 'large'),
+    (' lg ', 'large'),
+    ('xl', 'larger'),
+    ('big', 'large'),
+    ('huge', None),
+])
+def test_normalize(index, text, expected):
+    assert index.normalize('size', text, 'en') == expected
+
+
+def test_normalize_enumeration(index):
+    assert index.normalize('@color', 'Light  Blue', 'en') == 'light blue'
+
+
+@pytest.mark.parametrize('language, expected', [
+    ('pt-BR', 'large'),
+    ('en-US', None),
+    ('es', None),
+    (None, None),
+])
+def test_normalize_language(index, language, expected):
+    assert index.normalize('size', 'grande', language) == expected
+
+
+def test_unknown_entity_type(index):
+    with pytest.raises(ValueError):
+        index.normalize('weight', 'heavy', 'en')
+
+    with pytest.raises(ValueError):
+        index.complete('code', '1', 'en')
+
+
+def test_entity_types(index):
+    assert index.entity_types == {'size', 'color'}
+
+
+def test_complete(index):
+    assert index.complete('size', 'la', 'en') == ['large', 'larger']
+    assert index.complete('size', 'S', 'en') == ['small']
+    assert index.complete('size', '', 'en', limit=2) == ['large', 'larger']
+    assert index.complete('size', 'x', 'en') == ['larger']
+    assert index.complete('size', 'q', 'en') == []
+    assert index.complete('size', 'la', 'es') == []
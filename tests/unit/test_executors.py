@@ -0,0 +1,146 @@
+import asyncio
+import threading
+from contextvars import ContextVar
+
+import pytest
+
+from dialogflow_fulfillment.executors import (
+    ExecutorPool,
+    ExecutorPools,
+    PoolFullError,
+)
+
+variable = ContextVar('variable', default=None)
+
+
+@pytest.mark.parametrize('options', [
+    {'max_workers': 0},
+    {'max_queue': -1},
+])
+def test_invalid_limits(options):
+    with pytest.raises(ValueError):
+        ExecutorPool(**options)
+
+
+def test_submit():
+    pool = ExecutorPool(1, name='reports')
+    variable.set('caller')
+
+    future = pool.submit(lambda: (variable.get(),
+                                  threading.current_thread().name))
+
+    assert future.result()[0] == 'caller'
+    assert future.result()[1].startswith('dialogflow-fulfillment-reports')
+
+    pool.shutdown()
+
+    assert pool.pending == 0
+
+
+def test_queue_limit():
+    pool = ExecutorPool(1, max_queue=1)
+    event = threading.Event()
+
+    running = pool.submit(event.wait)
+    queued = pool.submit(event.wait)
+
+    with pytest.raises(PoolFullError, match="'default' is full"):
+        pool.submit(event.wait)
+
+    assert pool.pending == 2
+
+    event.set()
+    running.result()
+    queued.result()
+    pool.shutdown()
+
+    assert pool.pending == 0
+
+
+def test_default_max_workers(mocker):
+    mocker.patch('os.cpu_count', return_value=None)
+
+    assert ExecutorPool().max_workers == 5
+    assert ExecutorPool(2).max_workers == 2
+
+
+def test_submit_after_shutdown(mocker):
+    pool = ExecutorPool(1)
+    executor = pool._get_executor()
+    mocker.patch.object(executor, 'submit', side_effect=RuntimeError)
+
+    with pytest.raises(RuntimeError):
+        pool.submit(int)
+
+    assert pool.pending == 0
+
+    pool.shutdown()
+
+
+def test_run():
+    pool = ExecutorPool(1)
+
+    assert asyncio.run(pool.run(sum, [1, 2])) == 3
+
+    pool.shutdown()
+
+
+def test_restart():
+    pool = ExecutorPool(1)
+
+    pool.shutdown()
+    pool.submit(int).result()
+    pool.shutdown()
+
+    assert pool.submit(int).result() == 0
+
+    # A forked process starts its own threads (without the parent's calls).
+    pool._pid = -1
+    pool._pending = 5
+
+    assert pool.submit(int).result() == 0
+
+    pool.shutdown()
+
+    assert pool.pending == 0
+
+
+def test_pools():
+    reports = ExecutorPool(2, max_queue=8)
+    pools = ExecutorPools(
+        {'reports': reports},
+        intents={'Monthly Report': 'reports'}
+    )
+
+    assert reports.name == 'reports'
+    assert pools.get('Monthly Report') is reports
+    assert pools.get('Default Welcome Intent') is pools.pools['default']
+    assert pools.get(None) is pools.pools['default']
+    assert dict(pools.intents) == {'Monthly Report': 'reports'}
+
+    with pytest.raises(ValueError):
+        pools.assign('Order Status', 'orders')
+
+    with pytest.raises(TypeError):
+        pools.intents['Order Status'] = 'reports'
+
+
+@pytest.mark.parametrize('intents, expected', [
+    ({}, 'default'),
+    ({'Default Welcome Intent': 'fast'}, 'fast'),
+    ({'Order Status': 'fast'}, 'default'),
+])
+def test_select(webhook_request, intents, expected):
+    pools = ExecutorPools({'fast': ExecutorPool()}, intents)
+
+    assert pools.select(webhook_request) is pools.pools[expected]
+
+
+def test_shutdown(mocker):
+    pools = ExecutorPools({'reports': ExecutorPool()})
+    shutdowns = [mocker.spy(pool, 'shutdown') for pool in pools.pools.values()]
+
+    pools.shutdown(wait=False)
+
+    for shutdown in shutdowns:
+        shutdown.assert_called_once_with(False)
@@ -0,0 +1,52 @@
+import pytest
+
+from dialogflow_fulfillment.hashring import HashRing, stable_hash
+
+KEYS = [f'projects/p/agent/sessions/{number}' for number in range(1000)]
+
+
+def test_stable_hash():
+    assert stable_hash('session') == stable_hash('session')
+    assert stable_hash('session') != stable_hash('other session')
+    assert 0 <= stable_hash('session') < 2 ** 64
+
+
+def test_get_node():
+    ring = HashRing(range(4))
+
+    nodes = [ring.get_node(key) for key in KEYS]
+
+    assert nodes == [ring.get_node(key) for key in KEYS]
+    assert all(150 < nodes.count(node) < 350 for node in range(4))
+
+
+def test_remove_node():
+    ring = HashRing(range(4))
+    before = {key: ring.get_node(key) for key in KEYS}
+
+    ring.remove(2)
+    after = {key: ring.get_node(key) for key in KEYS}
+
+    assert 2 not in ring
+    assert len(ring) == 3
+    assert 2 not in after.values()
+    assert all(after[key] == node for key, node in before.items()
+               if node != 2)
+
+
+def test_add_node_back():
+    ring = HashRing(range(4))
+    before = {key: ring.get_node(key) for key in KEYS}
+
+    ring.remove(1)
+    ring.remove(1)
+    ring.add(1)
+    ring.add(1)
+
+    assert ring.nodes == [0, 2, 3, 1]
+    assert {key: ring.get_node(key) for key in KEYS} == before
+
+
+def test_empty_ring():
+    with pytest.raises(LookupError):
+        HashRing().get_node('session')
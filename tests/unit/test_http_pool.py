@@ -0,0 +1,290 @@
+import json
+import os
+import socket
+import threading
+import time
+from http.client import HTTPSConnection
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from dialogflow_fulfillment.http_pool import HTTPPool, HTTPSession
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    """A handler of a stub API (with keep-alive connections)."""
+
+    protocol_version = 'HTTP/1.1'
+
+    # The headers and the body are written separately.
+    disable_nagle_algorithm = True
+
+    def do_GET(self):
+        """Respond to a GET request."""
+        self.server.client_ports.append(self.client_address[1])
+
+        if self.path == '/slow':
+            time.sleep(0.5)
+        elif self.path == '/hangup':
+            self.close_connection = True
+
+            return
+
+        body = json.dumps({'path': self.path}).encode()
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+
+        if self.path == '/close':
+            self.send_header('Connection', 'close')
+
+        self.end_headers()
+        self.wfile.write(body)
+
+        if self.path == '/drop':
+            # Close the connection without telling the client.
+            self.close_connection = True
+
+    def do_POST(self):
+        """Echo the body of a POST request."""
+        self.server.client_ports.append(self.client_address[1])
+        body = self.rfile.read(int(self.headers['Content-Length']))
+
+        self.send_response(201)
+        self.send_header('Content-Type', self.headers['Content-Type'])
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Skip logging."""
+
+
+@pytest.fixture
+def server():
+    """Start a stub API (on a free port)."""
+    server = ThreadingHTTPServer(('127.0.0.1', 0), StubHandler)
+    server.daemon_threads = True
+    server.client_ports = []
+    thread = threading.Thread(
+        target=server.serve_forever,
+        args=(0.01,),
+        daemon=True
+    )
+    thread.start()
+
+    yield server
+
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def url(server):
+    """Get the URL of the stub API."""
+    return 'http://127.0.0.1:{}'.format(server.server_address[1])
+
+
+def test_request(url):
+    with HTTPPool() as pool:
+        response = pool.request('GET', f'{url}/orders?id=1')
+
+    assert response.status == 200
+    assert response.headers['content-type'] == 'application/json'
+    assert response.json() == {'path': '/orders?id=1'}
+
+
+def test_request_json(url):
+    pool = HTTPPool()
+
+    response = pool.request('POST', url, json={'id': 1})
+
+    assert response.status == 201
+    assert response.headers['Content-Type'] == 'application/json'
+    assert response.json() == {'id': 1}
+
+
+def test_keep_alive(server, url):
+    pool = HTTPPool()
+
+    for _ in range(3):
+        pool.request('GET', f'{url}/orders')
+
+    assert len(set(server.client_ports)) == 1
+    assert pool.metrics.connections_opened == 1
+    assert pool.metrics.connections_reused == 2
+    assert pool.metrics.idle_connections == 1
+
+
+def test_connection_close(server, url):
+    pool = HTTPPool()
+
+    pool.request('GET', f'{url}/close')
+    pool.request('GET', f'{url}/orders')
+
+    assert len(set(server.client_ports)) == 2
+    assert pool.metrics.connections_reused == 0
+
+
+def test_max_idle_time(server, url):
+    pool = HTTPPool(max_idle_time=0)
+
+    pool.request('GET', f'{url}/orders')
+    pool.request('GET', f'{url}/orders')
+
+    assert pool.metrics.connections_opened == 2
+
+
+def test_stale_connection_retried(server, url):
+    pool = HTTPPool()
+
+    pool.request('GET', f'{url}/drop')
+    response = pool.request('GET', f'{url}/orders')
+
+    assert response.status == 200
+    assert pool.metrics.connections_opened == 2
+    assert pool.metrics.errors == 0
+
+
+def test_stale_connection_not_retried(server, url):
+    pool = HTTPPool()
+
+    pool.request('GET', f'{url}/drop')
+
+    with pytest.raises(ConnectionError):
+        pool.request('POST', url, json={})
+
+    assert pool.metrics.errors == 1
+
+
+def test_new_connection_not_retried(url):
+    pool = HTTPPool()
+
+    with pytest.raises(ConnectionError):
+        pool.request('GET', f'{url}/hangup')
+
+    assert pool.metrics.connections_opened == 1
+
+
+def test_connection_refused():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        port = sock.getsockname()[1]
+
+    pool = HTTPPool()
+
+    with pytest.raises(OSError):
+        pool.request('GET', f'http://127.0.0.1:{port}/')
+
+    assert pool.metrics.errors == 1
+    assert pool.metrics.idle_connections == 0
+
+
+def test_timeout(url):
+    pool = HTTPPool(timeout=0.05)
+
+    with pytest.raises(TimeoutError):
+        pool.request('GET', f'{url}/slow')
+
+    assert pool.metrics.timeouts == 1
+    assert pool.metrics.errors == 1
+    assert pool.metrics.idle_connections == 0
+
+
+def test_deadline(url):
+    pool = HTTPPool()
+
+    with pytest.raises(TimeoutError):
+        pool.request('GET', f'{url}/slow', deadline=time.monotonic() + 0.05)
+
+    with pytest.raises(TimeoutError):
+        pool.request('GET', f'{url}/orders', deadline=time.monotonic() - 1)
+
+
+def test_expired_exchange():
+    pool = HTTPPool()
+    key = ('http', '127.0.0.1', 80)
+    host = pool._get_host(key)
+    connection, _ = pool._get_connection(key, host)
+
+    with pytest.raises(TimeoutError):
+        pool._exchange(connection, host, 'GET', '/', None, {}, 0.0)
+
+
+def test_max_connections_per_host(url):
+    pool = HTTPPool(max_connections_per_host=1)
+    thread = threading.Thread(
+        target=pool.request,
+        args=('GET', f'{url}/slow')
+    )
+    thread.start()
+
+    # Wait for the slow request to take the only connection.
+    while not pool.metrics.requests:
+        time.sleep(0.001)
+
+    try:
+        with pytest.raises(TimeoutError):
+            pool.request('GET', f'{url}/orders', timeout=0.05)
+    finally:
+        thread.join()
+
+    assert pool.request('GET', f'{url}/orders').status == 200
+
+
+def test_invalid_url():
+    pool = HTTPPool()
+
+    with pytest.raises(ValueError):
+        pool.request('GET', 'ftp://127.0.0.1/file')
+
+    with pytest.raises(ValueError):
+        pool.request('GET', 'http:///orders')
+
+
+def test_https_connection():
+    pool = HTTPPool()
+
+    connection, reused = pool._get_connection(
+        ('https', 'example.com', 443),
+        pool._get_host(('https', 'example.com', 443))
+    )
+
+    assert isinstance(connection, HTTPSConnection)
+    assert not reused
+
+
+def test_close(url):
+    pool = HTTPPool()
+    pool.request('GET', url)
+
+    pool.close()
+
+    assert pool.metrics.idle_connections == 0
+    assert pool.request('GET', url).status == 200
+
+
+def test_fork(url, monkeypatch):
+    pool = HTTPPool()
+    pool.request('GET', url)
+
+    monkeypatch.setattr(os, 'getpid', lambda: -1)
+    pool.request('GET', url)
+
+    assert pool.metrics.connections_opened == 2
+
+
+def test_session(url):
+    pool = HTTPPool()
+    session = pool.session(time.monotonic() + 10)
+
+    assert isinstance(session, HTTPSession)
+    assert session.get(f'{url}/orders').json() == {'path': '/orders'}
+    assert session.post(url, json=[1]).json() == [1]
+    assert session.request('GET', url, timeout=1.0).status == 200
+
+    session.deadline = time.monotonic() - 1
+
+    with pytest.raises(TimeoutError):
+        session.get(url)
@@ -0,0 +1,20 @@
+import pytest
+
+import dialogflow_fulfillment
+
+
+def test_lazy_import():
+    from dialogflow_fulfillment.webhook_client import WebhookClient
+
+    assert dialogflow_fulfillment.WebhookClient is WebhookClient
+
+
+def test_unknown_name():
+    with pytest.raises(AttributeError):
+        dialogflow_fulfillment.UnknownName
+
+
+def test_dir():
+    names = dir(dialogflow_fulfillment)
+
+    assert set(dialogflow_fulfillment.__all__) <= set(names)
@@ -0,0 +1,192 @@
+from datetime import date, datetime, time, timedelta, timezone
+
+import pytest
+
+from dialogflow_fulfillment.agent_export import EntityType
+from dialogflow_fulfillment.entities import EntityIndex
+from dialogflow_fulfillment.parameters import Parameters, Quantity
+
+TIMEZONE = timezone(timedelta(hours=-3))
+
+
+def test_mapping():
+    parameters = Parameters({'color': 'red'})
+
+    assert parameters == {'color': 'red'}
+    assert isinstance(parameters, dict)
+
+
+def test_empty():
+    assert Parameters() == {}
+
+
+@pytest.mark.parametrize('locale, value, expected', [
+    ('en', 2, 2),
+    ('en', 1.5, 1.5),
+    ('en', '42', 42),
+    ('en', '-1,234.5', -1234.5),
+    ('en-US', '1,234', 1234),
+    ('pt-BR', '1.234,5', 1234.5),
+    ('de', '0,25', 0.25),
+    (None, '3.0', 3.0),
+])
+def test_as_number(locale, value, expected):
+    parameters = Parameters({'number': value}, locale)
+
+    assert parameters.as_number('number') == expected
+
+
+@pytest.mark.parametrize('value', ['abc', '1.2.3', True])
+def test_as_number_invalid(value):
+    parameters = Parameters({'number': value}, 'en')
+
+    with pytest.raises(ValueError):
+        parameters.as_number('number')
+
+
+@pytest.mark.parametrize('value', [None, '', []])
+def test_default(value):
+    parameters = Parameters({'number': value})
+
+    assert parameters.as_number('number', default=0) == 0
+    assert parameters.as_number('missing') is None
+
+
+@pytest.mark.parametrize('value', [
+    '2023-01-19T12:00:00-03:00',
+    {'date_time': '2023-01-19T12:00:00-03:00'},
+    '2023-01-19T15:00:00Z',
+])
+def test_as_datetime(value):
+    parameters = Parameters({'when': value})
+
+    assert parameters.as_datetime('when') == datetime(
+        2023, 1, 19, 12, tzinfo=TIMEZONE
+    )
+
+
+@pytest.mark.parametrize('value', [42, {'foo': 'bar'}, 'tomorrow'])
+def test_as_datetime_invalid(value):
+    parameters = Parameters({'when': value})
+
+    with pytest.raises(ValueError):
+        parameters.as_datetime('when')
+
+
+def test_as_date_and_time():
+    parameters = Parameters({'when': '2023-01-19T12:00:00-03:00'})
+
+    assert parameters.as_date('when') == date(2023, 1, 19)
+    assert parameters.as_time('when') == time(12, tzinfo=TIMEZONE)
+
+
+@pytest.mark.parametrize('value', [
+    {
+        'startDate': '2023-01-19T12:00:00-03:00',
+        'endDate': '2023-01-20T12:00:00-03:00',
+    },
+    {
+        'startDateTime': '2023-01-19T12:00:00-03:00',
+        'endDateTime': '2023-01-20T12:00:00-03:00',
+    },
+])
+def test_as_period(value):
+    parameters = Parameters({'period': value})
+
+    assert parameters.as_period('period') == (
+        datetime(2023, 1, 19, 12, tzinfo=TIMEZONE),
+        datetime(2023, 1, 20, 12, tzinfo=TIMEZONE),
+    )
+
+
+@pytest.mark.parametrize('value', ['2023-01-19', {'startDate': '2023'}])
+def test_as_period_invalid(value):
+    parameters = Parameters({'period': value})
+
+    with pytest.raises(ValueError):
+        parameters.as_period('period')
+
+
+@pytest.mark.parametrize('value, expected', [
+    ({'amount': 10, 'currency': 'USD'}, Quantity(10, 'USD')),
+    ({'amount': '2,5', 'unit': 'kg'}, Quantity(2.5, 'kg')),
+])
+def test_as_quantity(value, expected):
+    parameters = Parameters({'quantity': value}, 'pt-BR')
+
+    assert parameters.as_quantity('quantity') == expected
+
+
+@pytest.mark.parametrize('value', [10, {'currency': 'USD'}])
+def test_as_quantity_invalid(value):
+    parameters = Parameters({'quantity': value})
+
+    with pytest.raises(ValueError):
+        parameters.as_quantity('quantity')
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('red', ['red']),
+    (['red', 'blue'], ['red', 'blue']),
+])
+def test_as_list(value, expected):
+    parameters = Parameters({'colors': value})
+
+    assert parameters.as_list('colors') == expected
+
+
+def test_conversion_is_memoized():
+    parameters = Parameters({'when': '2023-01-19T12:00:00-03:00'})
+
+    assert parameters.as_datetime('when') is parameters.as_datetime('when')
+
+
+def test_memoized_conversion_is_invalidated():
+    parameters = Parameters({'number': '1'})
+
+    assert parameters.as_number('number') == 1
+
+    parameters['number'] = '2'
+
+    assert parameters.as_number('number') == 2
+
+
+@pytest.fixture
+def entity_index():
+    """Return an index of a sample entity type."""
+    return EntityIndex([
+        EntityType('size', {
+            'en': (('large', ('large', 'LG')), ('small', ('small', 'SM'))),
+        }),
+    ])
+
+
+@pytest.mark.parametrize('value, expected', [
+    ('lg', 'large'),
+    ('Small', 'small'),
+    (['LG', 'sm'], ['large', 'small']),
+])
+def test_as_entity(entity_index, value, expected):
+    parameters = Parameters({'size.original': value}, 'en-US', entity_index)
+
+    assert parameters.as_entity('size.original', '@size') == expected
+
+
+def test_as_entity_default(entity_index):
+    parameters = Parameters({'size': ''}, 'en', entity_index)
+
+    assert parameters.as_entity('size', 'size', 'medium') == 'medium'
+
+
+def test_as_entity_invalid(entity_index):
+    parameters = Parameters({'size': 'huge'}, 'en', entity_index)
+
+    with pytest.raises(ValueError):
+        parameters.as_entity('size', 'size')
+
+
+def test_as_entity_without_index():
+    parameters = Parameters({'size': 'LG'}, 'en')
+
+    with pytest.raises(RuntimeError):
+        parameters.as_entity('size', 'size')
@@ -0,0 +1,59 @@
+import json
+from threading import Thread
+
+from dialogflow_fulfillment.pool import ClientPool
+
+
+def test_reuse_client(webhook_request):
+    pool = ClientPool(max_response_size=1000)
+
+    with pool.client(webhook_request) as agent:
+        agent.add('this is a text')
+
+    with pool.client(json.dumps(webhook_request).encode()) as another_agent:
+        assert another_agent is agent
+        assert another_agent.max_response_size == 1000
+        assert 'fulfillmentMessages' not in another_agent.response
+
+
+def test_nested_clients(webhook_request):
+    pool = ClientPool()
+
+    with pool.client(webhook_request) as agent:
+        with pool.client(webhook_request) as another_agent:
+            assert another_agent is not agent
+
+
+def test_size(webhook_request):
+    pool = ClientPool(size=1)
+    agents = [pool.acquire(webhook_request), pool.acquire(webhook_request)]
+
+    for agent in agents:
+        pool.release(agent)
+
+    assert pool._free_clients == agents[:1]
+
+
+def test_clients_per_thread(webhook_request):
+    pool = ClientPool()
+    agents = []
+
+    def handle():
+        with pool.client(webhook_request) as agent:
+            agents.append(agent)
+
+    handle()
+
+    thread = Thread(target=handle)
+    thread.start()
+    thread.join()
+
+    assert agents[0] is not agents[1]
+
+
+def test_create_encoded_request_client(webhook_request):
+    pool = ClientPool()
+
+    agent = pool.acquire(json.dumps(webhook_request).encode())
+
+    assert agent.session == webhook_request['session']
@@ -0,0 +1,228 @@
+import threading
+import tracemalloc
+
+import pytest
+
+from dialogflow_fulfillment import profiling
+from dialogflow_fulfillment.dispatcher import Dispatcher
+from dialogflow_fulfillment.profiling import (
+    AllocationProfiler,
+    IntentAllocations,
+    allocation_budget,
+)
+
+# The objects kept by the (leaky) handler.
+LEAKED = []
+
+
+def allocate(size):
+    """Allocate (and free) a block of memory."""
+    return len(bytearray(size))
+
+
+def leak(size):
+    """Allocate a block of memory that's kept."""
+    LEAKED.append(bytearray(size))
+
+
+@pytest.fixture(autouse=True)
+def clear_leaked():
+    """Free the leaked objects."""
+    yield
+
+    LEAKED.clear()
+
+
+@pytest.fixture
+def tracing():
+    """Trace the allocations (as if someone else started the tracing)."""
+    tracemalloc.start()
+
+    yield
+
+    tracemalloc.stop()
+
+
+@pytest.mark.parametrize('sample_rate', [-0.1, 1.1])
+def test_invalid_sample_rate(sample_rate):
+    with pytest.raises(ValueError):
+        AllocationProfiler(sample_rate=sample_rate)
+
+
+@pytest.mark.parametrize('sample_rate, expected', [(0.0, False), (1.0, True)])
+def test_sample(sample_rate, expected):
+    assert AllocationProfiler(sample_rate=sample_rate).sample() is expected
+
+
+def test_profile():
+    profiler = AllocationProfiler(top=3)
+
+    with profiler.profile('Leak') as sample:
+        allocate(10 ** 6)
+        leak(10 ** 5)
+
+    assert sample.profiled
+    assert sample.intent == 'Leak'
+    assert sample.peak >= 10 ** 6
+    assert 10 ** 5 <= sample.net < 2 * 10 ** 5
+    assert sample.sites[0].filename == __file__
+    assert sample.sites[0].size >= 10 ** 5
+    assert len(sample.sites) <= 3
+    assert not tracemalloc.is_tracing()
+
+
+def test_profile_while_tracing(tracing):
+    profiler = AllocationProfiler()
+    allocate(10 ** 6)
+
+    with profiler.profile() as sample:
+        leak(10 ** 5)
+
+    assert sample.profiled
+    assert sample.peak < 10 ** 6
+    assert 10 ** 5 <= sample.net < 2 * 10 ** 5
+    assert sample.sites[0].filename == __file__
+    assert tracemalloc.is_tracing()
+
+
+def test_profile_while_tracing_without_peak(tracing, monkeypatch):
+    monkeypatch.setattr(profiling, '_RESETS_PEAK', False)
+    profiler = AllocationProfiler()
+
+    with profiler.profile() as sample:
+        leak(10 ** 5)
+
+    assert sample.peak == sample.net
+
+
+def test_profile_error():
+    profiler = AllocationProfiler()
+
+    with pytest.raises(ZeroDivisionError):
+        with profiler.profile('Error'):
+            1 / 0
+
+    assert profiler.stats == {}
+    assert not tracemalloc.is_tracing()
+
+
+def test_concurrent_profiles():
+    profiler = AllocationProfiler()
+    started = threading.Event()
+    done = threading.Event()
+
+    def profile():
+        with profiler.profile('Slow'):
+            started.set()
+            done.wait()
+
+    thread = threading.Thread(target=profile)
+    thread.start()
+    started.wait()
+
+    with profiler.profile('Fast') as sample:
+        pass
+
+    done.set()
+    thread.join()
+
+    assert not sample.profiled
+    assert list(profiler.stats) == ['Slow']
+
+
+def test_stats():
+    profiler = AllocationProfiler(top=1)
+
+    for size in (10 ** 5, 2 * 10 ** 5):
+        with profiler.profile('Leak'):
+            leak(size)
+
+    with profiler.profile():
+        pass
+
+    stats = profiler.stats
+
+    assert set(stats) == {'Leak', ''}
+    assert stats['Leak'].samples == 2
+    assert stats['Leak'].max_peak >= 2 * 10 ** 5
+    assert stats['Leak'].mean_net >= 1.5 * 10 ** 5
+    assert len(stats['Leak'].sites) == 1
+    assert stats['Leak'].sites[0].size >= 3 * 10 ** 5
+    assert IntentAllocations().mean_net == 0.0
+
+    profiler.reset()
+
+    assert profiler.stats == {}
+
+
+def test_format():
+    profiler = AllocationProfiler()
+    profiler._stats = {
+        'Small': (1, 10, 512, {}),
+        'Large': (2, 3 * 2 ** 20, 5 * 2 ** 30, {
+            ('handlers.py', 7): [2048, 2],
+        }),
+    }
+
+    lines = profiler.format().splitlines()
+
+    assert lines[0].split() == ['intent', 'samples', 'max', 'peak', 'mean',
+                                'net']
+    assert lines[1].split() == ['Large', '2', '5.0', 'GiB', '1.5', 'MiB']
+    assert lines[2] == '  handlers.py:7: 2.0 KiB in 2 blocks'
+    assert lines[3].split() == ['Small', '1', '512', 'B', '10', 'B']
+
+
+def test_dispatcher(webhook_request):
+    profiler = AllocationProfiler()
+    dispatcher = Dispatcher(profiler=profiler)
+    dispatcher.register(
+        webhook_request['queryResult']['intent']['displayName'],
+        lambda agent: leak(10 ** 5)
+    )
+
+    dispatcher.handle(webhook_request)
+
+    intent = webhook_request['queryResult']['intent']['displayName']
+    stats = profiler.stats[intent]
+
+    assert stats.samples == 1
+    assert stats.total_net >= 10 ** 5
+    assert (__file__, leak.__code__.co_firstlineno + 2) in [
+        (site.filename, site.lineno) for site in stats.sites
+    ]
+
+
+def test_dispatcher_not_sampled(webhook_request):
+    profiler = AllocationProfiler(sample_rate=0.0)
+    dispatcher = Dispatcher(profiler=profiler, reuse_clients=True)
+
+    dispatcher.handle(webhook_request)
+
+    assert profiler.stats == {}
+
+
+def test_allocation_budget():
+    with allocation_budget(max_peak=10 ** 6, max_net=10 ** 5) as sample:
+        allocate(10 ** 5)
+
+    assert sample.profiled
+
+
+@pytest.mark.parametrize('budget, message', [
+    ({'max_peak': 10 ** 5}, 'peak of '),
+    ({'max_net': 10 ** 4}, 'net of '),
+])
+def test_allocation_budget_exceeded(budget, message):
+    with pytest.raises(AssertionError) as error:
+        with allocation_budget(**budget):
+            allocate(10 ** 6)
+            leak(10 ** 5)
+
+    assert message in str(error.value)
+    assert f'{__file__}:' in str(error.value)
+
+
+def test_allocation_budget_fixture(allocation_budget):
+    with allocation_budget(max_peak=10 ** 6):
+        allocate(10 ** 5)
@@ -0,0 +1,215 @@
+import pytest
+
+json_format = pytest.importorskip('google.protobuf.json_format')
+
+from dialogflow_fulfillment import proto  # noqa: E402
+from dialogflow_fulfillment.rich_responses import (  # noqa: E402
+    Card,
+    Image,
+    Payload,
+    QuickReplies,
+    RichResponse,
+    Text,
+)
+from dialogflow_fulfillment.webhook_client import WebhookClient  # noqa: E402
+
+
+@pytest.fixture
+def message(webhook_request):
+    """Return a sample webhook request message."""
+    request = {
+        **webhook_request,
+        'originalDetectIntentRequest': {
+            'source': 'facebook',
+            'payload': {'data': {'sender': {'id': '1234'}}},
+        },
+    }
+
+    return json_format.ParseDict(request, proto.WebhookRequest())
+
+
+def test_from_proto(webhook_request, message):
+    agent = WebhookClient.from_proto(message)
+    expected = WebhookClient({
+        **webhook_request,
+        'originalDetectIntentRequest': {
+            'source': 'facebook',
+            'payload': {'data': {'sender': {'id': '1234'}}},
+        },
+    })
+
+    for name in ('intent', 'action', 'locale', 'parameters', 'contexts',
+                 'query', 'session', 'request_source', 'platform',
+                 'original_request'):
+        assert getattr(agent, name) == getattr(expected, name)
+
+    assert [message._as_dict() for message in agent.console_messages] == \
+        [message._as_dict() for message in expected.console_messages]
+
+
+def test_from_proto_empty():
+    agent = WebhookClient.from_proto(proto.WebhookRequest())
+
+    assert agent.intent is None
+    assert agent.session == ''
+    assert agent.original_request == {}
+
+
+def test_from_proto_partial():
+    message = proto.WebhookRequest()
+    message.query_result.query_text = 'Hi'
+    message.original_detect_intent_request.source = 'slack'
+
+    agent = WebhookClient.from_proto(message)
+
+    assert agent.query == 'Hi'
+    assert agent.intent is None
+    assert agent.platform == 'SLACK'
+    assert agent.original_request == {'source': 'slack'}
+
+
+def test_from_proto_unsupported_message():
+    message = proto.WebhookRequest()
+    message.query_result.fulfillment_messages.add()
+
+    with pytest.raises(TypeError):
+        WebhookClient.from_proto(message)
+
+
+def test_from_serialized_message(message):
+    serialized = message.SerializeToString()
+
+    agent = WebhookClient.from_proto(
+        proto.WebhookRequest.FromString(serialized)
+    )
+
+    assert agent.intent == 'Default Welcome Intent'
+
+
+def test_response_proto(webhook_request):
+    agent = WebhookClient(webhook_request)
+    agent.add([
+        Text('Hi!'),
+        Text(),
+        Image('https://test.url/image.jpg'),
+        Image(),
+        QuickReplies('Choose one', ['Yes', 'No']),
+        QuickReplies(),
+        Card('Title', 'Subtitle', 'https://test.url/image.jpg',
+             [{'text': 'Open', 'postback': 'https://test.url'}]),
+        Card(),
+        Payload({'rich': {'items': [1, 2.5, None, True]}}),
+        Payload(),
+    ])
+    agent.context.set('weather', 2, {'city': 'Rio'})
+    agent.context.set('no-parameters', 1)
+    agent.followup_event = {'name': 'WEATHER', 'parameters': {'city': 'Rio'}}
+
+    message = agent.response_proto()
+
+    assert isinstance(message, proto.WebhookResponse)
+    assert json_format.MessageToDict(message) == agent.response
+
+
+def test_response_proto_platform(webhook_request):
+    agent = WebhookClient({
+        **webhook_request,
+        'originalDetectIntentRequest': {'source': 'slack'},
+    })
+    agent.add([Text('Hi!', platform='SLACK'), Text('Hello!')])
+    agent.followup_event = 'WEATHER'
+
+    message = agent.response_proto()
+
+    assert message.source == 'slack'
+    assert len(message.fulfillment_messages) == 1
+    assert message.fulfillment_messages[0].platform == \
+        proto.Intent.Message.Platform.Value('SLACK')
+    assert message.followup_event_input.language_code == 'en'
+    assert proto.message_to_dict(message.fulfillment_messages[0]) == \
+        {'text': {'text': ['Hi!']}, 'platform': 'SLACK'}
+
+
+def test_response_proto_fills_message(webhook_request):
+    agent = WebhookClient(webhook_request)
+    agent.add('Hi!')
+    message = proto.WebhookResponse()
+
+    assert agent.response_proto(message) is message
+    assert message.fulfillment_messages[0].text.text == ['Hi!']
+
+
+def test_unknown_platform():
+    with pytest.raises(ValueError):
+        Text('Hi!', platform='MASTODON')._to_proto(proto.Intent.Message())
+
+
+def test_unsupported_rich_response():
+    class Video(RichResponse):
+        @classmethod
+        def _from_dict(cls, message):
+            return cls()
+
+        def _build_dict(self):
+            return {'video': {}}
+
+    with pytest.raises(TypeError):
+        Video()._to_proto(proto.Intent.Message())
+
+
+@pytest.mark.parametrize('response', [
+    Text('Hi!', platform='FACEBOOK'),
+    Image('https://test.url/image.jpg'),
+    QuickReplies('Choose one', ['Yes', 'No'], platform='TELEGRAM'),
+    Card('Title', buttons=[{'text': 'Open'}]),
+    Payload({'items': [{'id': 1}]}, platform='ACTIONS_ON_GOOGLE'),
+])
+def test_message_to_dict(response):
+    message = proto.Intent.Message()
+    response._to_proto(message)
+
+    assert proto.message_to_dict(message) == response._as_dict()
+
+
+def test_message_to_dict_unknown_platform():
+    message = proto.Intent.Message(platform=42)
+    message.text.text.append('Hi!')
+
+    assert proto.message_to_dict(message)['platform'] == '42'
+
+
+def test_struct_to_dict():
+    struct = proto.WebhookRequest().query_result.parameters
+    struct.update({
+        'number': 1,
+        'float': 1.5,
+        'text': 'a',
+        'flag': False,
+        'empty': None,
+        'nested': {'list': [1, {'a': []}]},
+    })
+
+    assert proto.struct_to_dict(struct) == {
+        'number': 1,
+        'float': 1.5,
+        'text': 'a',
+        'flag': False,
+        'empty': None,
+        'nested': {'list': [1, {'a': []}]},
+    }
+    assert isinstance(proto.struct_to_dict(struct)['number'], int)
+
+
+def test_context_to_dict():
+    context = proto.WebhookResponse().output_contexts.add(name='weather')
+
+    assert proto.context_to_dict(context) == {'name': 'weather'}
+
+    context.lifespan_count = 2
+    context.parameters.update({'city': 'Rio'})
+
+    assert proto.context_to_dict(context) == {
+        'name': 'weather',
+        'lifespanCount': 2,
+        'parameters': {'city': 'Rio'},
+    }
@@ -0,0 +1,193 @@
+import json
+
+import pytest
+
+from dialogflow_fulfillment.raw_json import RawJSON, get_intent, select_fields
+
+WELCOME_REQUEST = json.dumps({
+    'responseId': '1',
+    'queryResult': {'intent': {'displayName': 'Welcome'}},
+}).encode()
+
+
+def decode_all(fields):
+    return {key: value.decode() for key, value in fields.items()}
+
+
+def test_select_fields():
+    fields = select_fields(
+        b' { "a" : 1 , "b": "x\\"}[", "c": [{"d": ["]"]}, {}], "e": null } ',
+        ('a', 'b', 'c', 'e')
+    )
+
+    assert decode_all(fields) == {
+        'a': 1,
+        'b': 'x"}[',
+        'c': [{'d': [']']}, {}],
+        'e': None,
+    }
+
+
+def test_select_some_fields():
+    fields = select_fields(b'{"a": 1, "b": [2], "c": {"d": 3}}', ('c',))
+
+    assert decode_all(fields) == {'c': {'d': 3}}
+
+
+def test_select_from_empty_object():
+    assert select_fields(b'{ }', ('a',)) == {}
+
+
+def test_select_from_memoryview():
+    buf = bytearray(b'{"a": {"b": 1}}')
+
+    fields = select_fields(memoryview(buf), ('a',))
+
+    assert fields['a'].decode() == {'b': 1}
+
+
+def test_select_from_non_byte_memoryview():
+    buf = memoryview(b'{"a": 1}').cast('c')
+
+    assert select_fields(buf, ('a',))['a'].decode() == 1
+
+
+def test_skip_unrequested_container():
+    buf = b'{"a": 1, "big": {"x": "}"}, "b": "\\"", "c": -1.5e3}'
+
+    fields = select_fields(buf, ('a', 'b', 'c'))
+
+    assert decode_all(fields) == {'a': 1, 'b': '"', 'c': -1.5e3}
+
+
+def test_skip_unrequested_container_after_requested_fields():
+    fields = select_fields(b'{"a": 1, "big": [1, 2', ('a',))
+
+    assert decode_all(fields) == {'a': 1}
+
+
+def test_lazy_field():
+    buf = b'{"a": 1, "lazy": {"x": [1, 2]}, "b": "2"}'
+
+    fields = select_fields(buf, ('a', 'lazy', 'b'), lazy=('lazy',))
+
+    assert not fields['lazy']._exact
+    assert decode_all(fields) == {'a': 1, 'lazy': {'x': [1, 2]}, 'b': '2'}
+
+
+@pytest.mark.parametrize('buf, expected', [
+    (b'{"lazy": {"x": 1}, "b": [2]}', {'lazy': {'x': 1}, 'b': [2]}),
+    (b'{"lazy": {"x": 1}, "b": {"c": 2}}', {'lazy': {'x': 1}, 'b': {'c': 2}}),
+    (b'{"lazy": {"x": 1}}  ', {'lazy': {'x': 1}}),
+    (b'{"lazy": {"x": 1}, "b": 2, "c": "3"}', {'lazy': {'x': 1}, 'b': 2}),
+    (b'{"lazy": {"x": 1}, "b": 2, "c": true}', {'lazy': {'x': 1}, 'b': 2}),
+    (b'{"lazy": {"x": 1}, "c": "\\\\", "b": 2}', {'lazy': {'x': 1}, 'b': 2}),
+    (b'{"lazy": {"x": 1}, "c": *, "b": 2}', {'lazy': {'x': 1}, 'b': 2}),
+    (b'{"lazy": {"x": 1} , "b" : 2 }', {'lazy': {'x': 1}, 'b': 2}),
+    (
+        json.dumps({'lazy': {'x': 1}, 'b': 2, 'k' * 5000: 3}).encode(),
+        {'lazy': {'x': 1}, 'b': 2}
+    ),
+])
+def test_lazy_field_fallback(buf, expected):
+    fields = select_fields(buf, ('lazy', 'b'), lazy=('lazy',))
+
+    assert decode_all(fields) == expected
+
+
+@pytest.mark.parametrize('buf', [
+    b'{"lazy": {"x": 1}, "b": 2 ',
+    b'{"lazy": {"x": 1}, "b" 2}',
+    b'{"lazy": {"x": 1}, b": 2}',
+    b'{"lazy": {"x": 1}, "b": 2 "c": 3}',
+    b'{"lazy": {"x": 1}, "b": 2, c": 3}',
+    b'{"lazy": {"x": 1}, b: 2}',
+])
+def test_lazy_field_malformed_end(buf):
+    with pytest.raises(ValueError):
+        select_fields(buf, ('lazy', 'b'), lazy=('lazy',))
+
+
+def test_lazy_field_beyond_tail_window():
+    buf = json.dumps({'lazy': {'x': 1}, 'b': 'x' * 5000}).encode()
+
+    fields = select_fields(buf, ('lazy', 'b'), lazy=('lazy',))
+
+    assert decode_all(fields) == json.loads(buf)
+
+
+def test_lazy_field_with_escaped_quote():
+    buf = b'{"lazy": {"x": 1}, "b": "\\\"}"}'
+
+    fields = select_fields(buf, ('lazy', 'b'), lazy=('lazy',))
+
+    assert decode_all(fields) == json.loads(buf)
+
+
+@pytest.mark.parametrize('buf', [
+    b'',
+    b'[]',
+    b'{"a" 1}',
+    b'{1: 1}',
+    b'{"a": 1 "b": 2}',
+    b'{"a": }',
+    b'{"a": [1, 2}',
+    b'{"a": [1, 2',
+    b'{"a": "unterminated}',
+    b'{} garbage',
+    b'{"a": 1} garbage',
+    b'{"a": 1}}',
+])
+def test_select_from_malformed_object(buf):
+    with pytest.raises(ValueError):
+        select_fields(buf, ('a', 'b'))
+
+
+def test_decode_is_cached():
+    raw = RawJSON(b'{"a": [1, 2]}')
+
+    assert raw.decode() is raw.decode()
+
+
+def test_decode_inexact():
+    raw = RawJSON(b'{"a": [1, 2]}, "b": 3}', exact=False)
+
+    assert raw.decode() == {'a': [1, 2]}
+
+
+def test_get_field():
+    raw = RawJSON(b'{"source": "google", "payload": {"big": [1, 2, 3]}}')
+
+    assert raw.get('source') == 'google'
+    assert raw.get('version', 'default') == 'default'
+
+
+def test_get_field_inexact():
+    raw = RawJSON(
+        b'{"payload": {"big": [1]}, "source": "google"}, "source": "x"}',
+        exact=False
+    )
+
+    assert raw.get('source') == 'google'
+
+
+def test_get_field_after_decode():
+    raw = RawJSON(b'{"source": "google"}')
+
+    raw.decode()
+
+    assert raw.get('source') == 'google'
+
+
+@pytest.mark.parametrize('request_, expected', [
+    ({'queryResult': {'intent': {'displayName': 'Welcome'}}}, 'Welcome'),
+    (WELCOME_REQUEST, 'Welcome'),
+    (bytearray(WELCOME_REQUEST), 'Welcome'),
+    ({}, None),
+    (b'{"responseId": "1"}', None),
+    (b'[]', None),
+    (b'{"queryResult": {"intent": "Welcome"}}', None),
+    (b'{"queryResult": {"intent": {"displayName": 1}}}', None),
+])
+def test_get_intent(request_, expected):
+    assert get_intent(request_) == expected
@@ -0,0 +1,175 @@
+import gzip
+import json
+from queue import Full
+
+import pytest
+
+from dialogflow_fulfillment.dispatcher import Dispatcher
+from dialogflow_fulfillment.recorder import Recorder
+
+
+def read_records(directory, pattern='*.jsonl.gz', opener=gzip.open):
+    """Read the records of the files in a directory."""
+    records = []
+
+    for path in sorted(directory.glob(pattern)):
+        with opener(path, 'rt') as file:
+            records.extend(json.loads(line) for line in file)
+
+    return records
+
+
+def test_record(tmp_path, webhook_request):
+    with Recorder(tmp_path) as recorder:
+        assert recorder.record(webhook_request, {'fulfillmentMessages': []})
+        assert recorder.record(json.dumps(webhook_request), {})
+        assert recorder.record(json.dumps(webhook_request).encode(), {})
+
+    records = read_records(tmp_path)
+
+    assert recorder.written == 3
+    assert recorder.dropped == 0
+    assert [record['request'] for record in records] == [webhook_request] * 3
+    assert records[0]['response'] == {'fulfillmentMessages': []}
+    assert isinstance(records[0]['timestamp'], float)
+
+
+def test_uncompressed(tmp_path, webhook_request):
+    with Recorder(tmp_path, compress=False, prefix='traffic') as recorder:
+        recorder.record(webhook_request, {})
+
+    records = read_records(tmp_path, 'traffic-*.jsonl', open)
+
+    assert [record['request'] for record in records] == [webhook_request]
+
+
+def test_rotation(tmp_path, webhook_request):
+    with Recorder(tmp_path, batch_size=1, max_file_size=1) as recorder:
+        for _ in range(3):
+            recorder.record(webhook_request, {})
+
+    assert len(list(tmp_path.glob('*.jsonl.gz'))) == 3
+    assert len(read_records(tmp_path)) == 3
+
+
+def test_batches(tmp_path, webhook_request):
+    with Recorder(tmp_path, batch_size=1) as recorder:
+        for _ in range(3):
+            recorder.record(webhook_request, {})
+
+    assert len(list(tmp_path.glob('*.jsonl.gz'))) == 1
+    assert len(read_records(tmp_path)) == 3
+
+
+def test_full_queue(tmp_path, webhook_request, mocker):
+    with Recorder(tmp_path) as recorder:
+        mocker.patch.object(recorder._queue, 'put_nowait', side_effect=Full)
+
+        assert not recorder.record(webhook_request, {})
+
+    assert recorder.dropped == 1
+    assert recorder.written == 0
+
+
+def test_invalid_record(tmp_path, webhook_request):
+    with Recorder(tmp_path) as recorder:
+        recorder.record(b'this is not JSON', {})
+        recorder.record(webhook_request, {})
+
+    assert recorder.dropped == 1
+    assert recorder.written == 1
+
+
+def test_flush_interval(tmp_path, webhook_request):
+    with Recorder(tmp_path, flush_interval=0) as recorder:
+        recorder.record(webhook_request, {})
+
+        while not recorder.written:
+            pass
+
+        assert len(list(tmp_path.glob('*.jsonl.gz'))) == 1
+
+
+def test_forked_process(tmp_path, webhook_request):
+    recorder = Recorder(tmp_path)
+    queue, thread = recorder._queue, recorder._thread
+
+    # Simulate that the process was forked (without the writer thread).
+    recorder._pid = -1
+    recorder.record(webhook_request, {})
+    recorder.close()
+
+    assert recorder._thread is not thread
+    assert recorder.written == 1
+
+    queue.put(None)
+    thread.join()
+
+
+def test_close_at_exit(tmp_path, webhook_request, mocker):
+    register = mocker.patch('atexit.register')
+    recorder = Recorder(tmp_path)
+    recorder.record(webhook_request, {})
+
+    close, reference = register.call_args[0]
+    close(reference)
+    close(lambda: None)
+
+    assert not recorder._thread.is_alive()
+    assert len(read_records(tmp_path)) == 1
+
+
+def test_close_twice(tmp_path):
+    recorder = Recorder(tmp_path)
+
+    recorder.close()
+    recorder.close()
+
+    assert not recorder._thread.is_alive()
+
+
+@pytest.mark.parametrize('sample_rate', [-0.1, 1.1])
+def test_invalid_sample_rate(tmp_path, sample_rate):
+    with pytest.raises(ValueError):
+        Recorder(tmp_path, sample_rate=sample_rate)
+
+
+def test_sample(tmp_path):
+    with Recorder(tmp_path, sample_rate=0) as recorder:
+        assert not recorder.sample()
+
+    with Recorder(tmp_path, sample_rate=1) as recorder:
+        assert recorder.sample()
+
+
+def test_dispatcher(tmp_path, webhook_request):
+    def handler(agent):
+        agent.add('Hello!')
+        agent.context.set('some_context', lifespan_count=10)
+
+    with Recorder(tmp_path) as recorder:
+        dispatcher = Dispatcher(
+            {'Default Welcome Intent': handler},
+            recorder=recorder
+        )
+        original_request = json.loads(json.dumps(webhook_request))
+
+        dict_response = dispatcher.handle(webhook_request)
+        bytes_response = dispatcher.handle(
+            bytearray(json.dumps(original_request).encode())
+        )
+
+    records = read_records(tmp_path)
+
+    assert [record['request'] for record in records] == [original_request] * 2
+    assert [record['response'] for record in records] == [
+        json.loads(json.dumps(dict_response)),
+        json.loads(json.dumps(bytes_response)),
+    ]
+
+
+def test_dispatcher_not_sampled(tmp_path, webhook_request):
+    with Recorder(tmp_path, sample_rate=0) as recorder:
+        Dispatcher(recorder=recorder).handle(webhook_request)
+
+    assert recorder.written == 0
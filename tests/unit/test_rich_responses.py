@@ -61,6 +61,28 @@ class TestPayload:
 
         assert payload_obj._as_dict() == {'payload': payload}
 
+    def test_mutable_as_dict_copies_payload(self, payload):
+        payload_obj = Payload(payload)
+
+        message = payload_obj._as_dict()
+        payload['test key 3'] = 'test value 3'
+
+        assert message['payload'] is not payload
+        assert payload_obj._as_dict() == {'payload': payload}
+
+    def test_immutable(self, payload):
+        payload_obj = Payload(payload, immutable=True)
+
+        with pytest.raises(AttributeError):
+            payload_obj.payload = {}
+
+        assert payload_obj.frozen
+        assert payload_obj._as_dict()['payload'] is payload
+        assert payload_obj._as_dict() is payload_obj._as_dict()
+
+    def test_immutable_empty_params(self):
+        assert Payload(immutable=True)._as_dict() == {'payload': {}}
+
 
 class TestImage:
     def test_empty_params(self):
@@ -139,3 +161,81 @@ class TestRichResponse:
     def test_instantiation(self):
         with pytest.raises(TypeError):
             RichResponse()
+
+
+class TestPlatform:
+    def test_non_string(self):
+        with pytest.raises(TypeError):
+            Text('this is a text', platform=['this is not a string'])
+
+    @pytest.mark.parametrize('response, message', [
+        (Text('text', platform='SLACK'), {'text': {'text': ['text']}}),
+        (Image(platform='SLACK'), {'image': {}}),
+        (Card(platform='SLACK'), {'card': {}}),
+        (Payload(platform='SLACK'), {'payload': {}}),
+        (QuickReplies(platform='SLACK'), {'quickReplies': {}}),
+    ])
+    def test_as_dict(self, response, message):
+        assert response._as_dict() == {**message, 'platform': 'SLACK'}
+
+    @pytest.mark.parametrize('message', [
+        {'text': {'text': ['text']}},
+        {'image': {}},
+        {'card': {}},
+        {'payload': {}},
+        {'quickReplies': {}},
+    ])
+    def test_from_dict(self, message):
+        response = RichResponse._from_dict({**message, 'platform': 'SLACK'})
+
+        assert response.platform == 'SLACK'
+
+
+class TestCachedDict:
+    @pytest.mark.parametrize('response', [
+        Text('text'),
+        Image('https://test.url/image.jpg'),
+        Card(title='title'),
+        QuickReplies(quick_replies=['reply']),
+    ])
+    def test_cached(self, response):
+        assert response._as_dict() is response._as_dict()
+
+    def test_invalidated_by_setters(self, title, subtitle):
+        card = Card(title=title)
+        message = card._as_dict()
+
+        card.subtitle = subtitle
+
+        assert card._as_dict() is not message
+        assert card._as_dict() == {
+            'card': {'title': title, 'subtitle': subtitle}
+        }
+        assert message == {'card': {'title': title}}
+
+    def test_invalidated_by_platform(self, text):
+        text_obj = Text(text)
+        text_obj._as_dict()
+
+        text_obj.platform = 'SLACK'
+
+        assert text_obj._as_dict()['platform'] == 'SLACK'
+
+
+class TestFrozen:
+    def test_mutable(self):
+        text = Text('this is a text')
+
+        text.text = 'this is another text'
+
+        assert not text.frozen
+        assert text.text == 'this is another text'
+
+    def test_immutable(self):
+        text = Text('this is a text')._freeze()
+
+        with pytest.raises(AttributeError):
+            text.text = 'this is another text'
+
+        assert text.frozen
+        assert text.text == 'this is a text'
@@ -0,0 +1,243 @@
+import gc
+import socket
+import struct
+import sys
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer
+
+import pytest
+
+from dialogflow_fulfillment.__main__ import main
+from dialogflow_fulfillment.adapters import WSGIAdapter
+from dialogflow_fulfillment.affinity import send_connection
+from dialogflow_fulfillment.server import (
+    Server,
+    create_socket,
+    handle_forwarded,
+    load_app,
+)
+
+APP_MODULE = '''
+from dialogflow_fulfillment import Dispatcher
+
+dispatcher = Dispatcher()
+warmed_up = []
+
+
+def app(environ, start_response):
+    pass
+
+
+def warmup():
+    warmed_up.append(True)
+
+
+not_callable = 'this is not callable'
+'''
+
+
+@pytest.fixture
+def app_module(tmp_path, monkeypatch):
+    """Create a sample module with a dispatcher (and a warmup function)."""
+    (tmp_path / 'webhook_app.py').write_text(APP_MODULE)
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    yield 'webhook_app'
+
+    sys.modules.pop('webhook_app', None)
+    gc.unfreeze()
+
+
+def test_load_dispatcher(app_module):
+    app = load_app(f'{app_module}:dispatcher')
+
+    assert isinstance(app, WSGIAdapter)
+    assert app.dispatcher is sys.modules[app_module].dispatcher
+
+
+def test_load_application(app_module):
+    assert load_app(f'{app_module}:app') is sys.modules[app_module].app
+
+
+@pytest.mark.parametrize('target', ['webhook_app', ':dispatcher'])
+def test_load_invalid_target(target):
+    with pytest.raises(ValueError):
+        load_app(target)
+
+
+def test_load_non_callable(app_module):
+    with pytest.raises(ValueError):
+        load_app(f'{app_module}:not_callable')
+
+
+def test_create_socket():
+    with create_socket('127.0.0.1', 0, backlog=1) as sock:
+        port = sock.getsockname()[1]
+
+        with socket.create_connection(('127.0.0.1', port)):
+            pass
+
+    assert port
+
+
+@pytest.mark.skipif(
+    not hasattr(socket, 'SO_REUSEPORT'),
+    reason='requires SO_REUSEPORT'
+)
+def test_create_socket_reuse_port():
+    with create_socket('127.0.0.1', 0, reuse_port=True) as sock:
+        port = sock.getsockname()[1]
+
+        with create_socket('127.0.0.1', port, reuse_port=True) as other:
+            assert other.getsockname()[1] == port
+
+
+def test_create_socket_ipv6():
+    if not socket.has_ipv6:
+        pytest.skip('requires IPv6')
+
+    try:
+        sock = create_socket('::1', 0)
+    except OSError:
+        pytest.skip('requires an IPv6 loopback address')
+
+    with sock:
+        assert sock.family == socket.AF_INET6
+
+
+@pytest.fixture
+def wsgi_server():
+    """Create a WSGI server (without a socket) of an echo application."""
+    def echo(environ, start_response):
+        length = int(environ['CONTENT_LENGTH'])
+        start_response('200 OK', [('Content-Length', str(length))])
+
+        return [environ['wsgi.input'].read(length)]
+
+    server = WSGIServer(('127.0.0.1', 8000), WSGIRequestHandler,
+                        bind_and_activate=False)
+    server.socket.close()
+    server.server_name = '127.0.0.1'
+    server.server_port = 8000
+    server.setup_environ()
+    server.set_app(echo)
+
+    return server
+
+
+requires_unix_sockets = pytest.mark.skipif(
+    not hasattr(socket.socket, 'sendmsg') or not hasattr(socket, 'AF_UNIX'),
+    reason='passing connections requires Unix sockets'
+)
+
+
+@pytest.fixture
+def forward():
+    """Forward the request of a new connection to a worker's socket."""
+    listener = create_socket('127.0.0.1', 0, backlog=1)
+    channel, worker_channel = socket.socketpair()
+    clients = []
+
+    def forward(request):
+        client = socket.create_connection(listener.getsockname())
+        clients.append(client)
+        connection, _ = listener.accept()
+
+        with connection:
+            send_connection(channel, connection, request)
+
+        return client, worker_channel
+
+    yield forward
+
+    for sock in (listener, channel, worker_channel, *clients):
+        sock.close()
+
+
+@requires_unix_sockets
+def test_handle_forwarded(wsgi_server, forward):
+    client, worker_channel = forward(
+        b'POST / HTTP/1.1\r\nContent-Length: 5\r\n\r\nHello'
+    )
+
+    assert handle_forwarded(wsgi_server, worker_channel)
+
+    response = client.makefile('rb').read()
+
+    assert response.startswith(b'HTTP/1.0 200 OK\r\n')
+    assert response.endswith(b'\r\n\r\nHello')
+
+
+@requires_unix_sockets
+def test_handle_forwarded_without_client(wsgi_server, forward):
+    client, worker_channel = forward(b'GET / HTTP/1.1\r\n\r\n')
+
+    # Reset the connection.
+    client.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER,
+                      struct.pack('ii', 1, 0))
+    client.close()
+
+    assert handle_forwarded(wsgi_server, worker_channel)
+
+
+@requires_unix_sockets
+def test_handle_forwarded_closed(wsgi_server):
+    channel, worker_channel = socket.socketpair()
+    channel.close()
+
+    with worker_channel:
+        assert not handle_forwarded(wsgi_server, worker_channel)
+
+
+def test_preload(app_module):
+    server = Server(f'{app_module}:dispatcher')
+
+    app = server.preload()
+    module = sys.modules[app_module]
+
+    assert server.app is app
+    assert module.warmed_up == [True]
+    assert gc.get_freeze_count() > 0
+
+    reloaded_app = server.preload()
+
+    assert reloaded_app.dispatcher is not app.dispatcher
+    assert sys.modules[app_module] is not module
+
+
+def test_preload_without_warmup(app_module, tmp_path):
+    (tmp_path / 'other_app.py').write_text('app = print\n')
+    server = Server('other_app:app')
+
+    try:
+        assert server.preload() is print
+    finally:
+        sys.modules.pop('other_app', None)
+
+
+def test_workers(mocker):
+    mocker.patch('os.cpu_count', return_value=None)
+
+    assert Server('webhook_app:dispatcher').workers == 1
+    assert Server('webhook_app:dispatcher', workers=3).workers == 3
+
+
+def test_main_serve(mocker):
+    server = mocker.patch('dialogflow_fulfillment.__main__.Server')
+    mocker.patch('sys.path', list(sys.path))
+
+    main(['serve', 'webhook_app:dispatcher', '--workers', '2', '--port', '0'])
+
+    server.assert_called_once_with(
+        'webhook_app:dispatcher',
+        host='127.0.0.1',
+        port=0,
+        workers=2,
+        backlog=1024,
+        affinity=False
+    )
+    server.return_value.run.assert_called_once_with()
+
+
+def test_main_without_command():
+    with pytest.raises(SystemExit):
+        main([])
@@ -0,0 +1,175 @@
+import json
+from types import SimpleNamespace
+
+import pytest
+
+from dialogflow_fulfillment.adapters import ServerlessAdapter
+from dialogflow_fulfillment.dispatcher import Dispatcher
+from dialogflow_fulfillment.shedding import LoadShedder
+from dialogflow_fulfillment.tracing import Tracer
+from dialogflow_fulfillment.webhook_client import WebhookClient
+
+
+def welcome_handler(agent):
+    agent.add('Hello!')
+
+
+def failing_handler(agent):
+    raise KeyError('number')
+
+
+def create_request(body=b'', method='POST'):
+    """Create an HTTP request (as given by the Functions Framework)."""
+    return SimpleNamespace(method=method, get_data=lambda: body)
+
+
+@pytest.fixture
+def webhook():
+    """Return a serverless function with a sample dispatcher."""
+    return ServerlessAdapter(
+        Dispatcher({'Default Welcome Intent': welcome_handler})
+    )
+
+
+def test_post(webhook, webhook_request):
+    body, status, headers = webhook(
+        create_request(json.dumps(webhook_request).encode())
+    )
+
+    assert status == 200
+    assert headers == {'Content-Type': 'application/json'}
+    assert json.loads(body)['fulfillmentMessages'] == [
+        {'text': {'text': ['Hello!']}}
+    ]
+
+
+def test_invalid_body(webhook):
+    body, status, _ = webhook(create_request(b'this is not JSON'))
+
+    assert status == 400
+    assert 'error' in json.loads(body)
+
+
+def test_handler_error(webhook_request):
+    def failing_handler(agent):
+        raise ValueError('secret')
+
+    webhook = ServerlessAdapter(
+        Dispatcher({'Default Welcome Intent': failing_handler})
+    )
+
+    # The error isn't the client's (the framework answers with a 500).
+    with pytest.raises(ValueError, match='secret'):
+        webhook(create_request(json.dumps(webhook_request).encode()))
+
+
+@pytest.mark.parametrize('method', ['GET', 'HEAD'])
+def test_ping(webhook, mocker, method):
+    create_client = mocker.spy(webhook.dispatcher, 'create_client')
+
+    assert webhook(create_request(method=method)) == (b'', 204, {})
+    create_client.assert_not_called()
+
+
+def test_other_method(webhook):
+    _, status, _ = webhook(create_request(method='PUT'))
+
+    assert status == 405
+
+
+def test_warmup():
+    calls = []
+    dispatcher = Dispatcher({
+        'Default Welcome Intent': lambda agent: calls.append(agent),
+        'Failing Intent': failing_handler,
+    })
+    webhook = ServerlessAdapter(dispatcher)
+
+    errors = webhook.warmup(language_code='pt-BR')
+
+    assert list(errors) == ['Failing Intent']
+    assert isinstance(errors['Failing Intent'], KeyError)
+    assert calls[0].intent == 'Default Welcome Intent'
+    assert calls[0].http_pool is webhook.http_pool
+    assert webhook.started
+    assert calls[0].locale == 'pt-BR'
+    assert calls[0].session == ServerlessAdapter.WARMUP_SESSION
+
+
+def test_warmup_skips_dispatcher(mocker):
+    dispatcher = Dispatcher(
+        {'Default Welcome Intent': welcome_handler},
+        recorder=mocker.Mock(),
+        profiler=mocker.Mock(),
+        circuit_breakers=mocker.Mock()
+    )
+    handle = mocker.spy(dispatcher, 'handle')
+
+    assert ServerlessAdapter(dispatcher).warmup() == {}
+
+    handle.assert_not_called()
+    dispatcher.recorder.record.assert_not_called()
+    dispatcher.profiler.profile.assert_not_called()
+    dispatcher.circuit_breakers.call.assert_not_called()
+
+
+def test_warmup_requests(webhook, webhook_request):
+    webhook.warmup_requests = {'Default Welcome Intent': webhook_request}
+
+    assert webhook.warmup() == {}
+
+    intent_id = webhook_request['queryResult']['intent']['name']
+
+    assert intent_id in WebhookClient._console_messages_cache
+
+
+def test_startup_on_first_request(webhook, webhook_request):
+    webhook(create_request(method='GET'))
+
+    assert not webhook.started
+
+    for _ in range(2):
+        webhook(create_request(json.dumps(webhook_request).encode()))
+
+    assert webhook.started
+    assert webhook.dispatcher.http_pool is webhook.http_pool
+
+
+def test_tracing(webhook_request):
+    tracer = Tracer()
+    webhook = ServerlessAdapter(
+        Dispatcher({'Default Welcome Intent': welcome_handler}, tracer=tracer)
+    )
+
+    webhook(create_request(json.dumps(webhook_request).encode()))
+    spans = {span.name: span for span in tracer.drain()}
+
+    assert spans['http request'].parent_id is None
+    assert spans['dispatch'].parent_id == spans['http request'].span_id
+    assert spans['serialize'].parent_id == spans['http request'].span_id
+
+
+def test_shedding(webhook_request):
+    shedder = LoadShedder(1, text='Busy!')
+    webhook = ServerlessAdapter(
+        Dispatcher({'Default Welcome Intent': welcome_handler}),
+        shedder=shedder
+    )
+    request = create_request(json.dumps(webhook_request).encode())
+
+    body, status, _ = webhook(request)
+
+    assert status == 200
+    assert json.loads(body)['fulfillmentMessages'] == [
+        {'text': {'text': ['Hello!']}}
+    ]
+    assert shedder.stats.in_flight == 0
+
+    shedder.acquire(request.get_data())
+    body, status, headers = webhook(request)
+
+    assert (body, status, headers) == (
+        shedder.fallback,
+        200,
+        {'Content-Type': 'application/json'},
+    )
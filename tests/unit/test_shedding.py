@@ -0,0 +1,342 @@
+import asyncio
+import json
+import threading
+import time
+
+import pytest
+
+from dialogflow_fulfillment import shedding
+from dialogflow_fulfillment.shedding import LoadShedder, SheddingStats
+
+
+def create_request(intent):
+    """Create an encoded webhook request of an intent."""
+    return json.dumps({
+        'responseId': '1',
+        'queryResult': {'intent': {'displayName': intent}},
+    }).encode()
+
+
+def wait_for(condition, timeout=5.0):
+    """Wait until a condition holds."""
+    deadline = time.monotonic() + timeout
+
+    while not condition():
+        if time.monotonic() > deadline:
+            raise TimeoutError('the condition did not hold in time')
+
+        time.sleep(0.001)
+
+
+class Request(threading.Thread):
+    """A request that acquires a shedder in another thread."""
+
+    def __init__(self, shedder, intent):
+        super().__init__()
+
+        self.shedder = shedder
+        self.request = create_request(intent)
+        self.admitted = None
+
+    def run(self):
+        self.admitted = self.shedder.acquire(self.request)
+
+
+def start(shedder, intent):
+    """Start a request (and wait until it's queued)."""
+    queued = shedder.stats.queued
+    request = Request(shedder, intent)
+    request.start()
+
+    wait_for(lambda: shedder.stats.queued > queued)
+
+    return request
+
+
+@pytest.mark.parametrize('options', [
+    {'max_concurrency': 0},
+    {'max_concurrency': 1, 'max_queue': -1},
+])
+def test_invalid_limits(options):
+    with pytest.raises(ValueError):
+        LoadShedder(**options)
+
+
+@pytest.mark.parametrize('options, expected', [
+    ({}, {}),
+    ({'text': 'Busy!'},
+     {'fulfillmentMessages': [{'text': {'text': ['Busy!']}}]}),
+    ({'followup_event': 'BUSY', 'language_code': 'pt-BR'},
+     {'followupEventInput': {'name': 'BUSY', 'languageCode': 'pt-BR'}}),
+    ({'followup_event': {'name': 'BUSY', 'parameters': {'retry': 1}}},
+     {'followupEventInput': {
+         'languageCode': 'en',
+         'name': 'BUSY',
+         'parameters': {'retry': 1},
+     }}),
+])
+def test_fallback(options, expected):
+    fallback = LoadShedder(1, **options).fallback
+
+    assert isinstance(fallback, bytes)
+    assert json.loads(fallback) == expected
+
+
+def test_acquire():
+    shedder = LoadShedder(2)
+
+    assert shedder.acquire(create_request('Welcome'))
+    assert shedder.acquire({})
+    assert not shedder.acquire(create_request('Welcome'))
+    assert not shedder.acquire(b'not JSON')
+    assert shedder.stats == SheddingStats(
+        admitted=2,
+        shed=2,
+        shed_by_intent={'Welcome': 1, '': 1},
+        in_flight=2,
+        queued=0
+    )
+
+    shedder.release()
+
+    assert shedder.acquire(create_request('Welcome'))
+
+    shedder.reset()
+
+    assert shedder.stats == SheddingStats(0, 0, {}, 2, 0)
+
+
+def test_queue():
+    shedder = LoadShedder(1, max_queue=1)
+
+    assert shedder.acquire(create_request('Welcome'))
+
+    request = start(shedder, 'Order Status')
+
+    assert not shedder.acquire(create_request('Order Status'))
+
+    shedder.release()
+    request.join()
+
+    assert request.admitted
+    assert shedder.stats == SheddingStats(2, 1, {'Order Status': 1}, 1, 0)
+
+
+def test_queue_timeout():
+    shedder = LoadShedder(1, max_queue=1, queue_timeout=0.01)
+
+    assert shedder.acquire(create_request('Welcome'))
+    assert not shedder.acquire(create_request('Order Status'))
+    assert shedder.stats == SheddingStats(1, 1, {'Order Status': 1}, 1, 0)
+
+
+def test_admitted_after_timeout(monkeypatch):
+    shedder = LoadShedder(1, max_queue=1, queue_timeout=0.01)
+
+    class Event(threading.Event):
+        def wait(self, timeout=None):
+            # The request is admitted right after it timed out.
+            shedder.release()
+
+            return False
+
+    monkeypatch.setattr(shedding, 'Event', Event)
+
+    assert shedder.acquire(create_request('Welcome'))
+    assert shedder.acquire(create_request('Order Status'))
+    assert shedder.stats == SheddingStats(2, 0, {}, 1, 0)
+
+
+def test_acquire_async():
+    shedder = LoadShedder(1, max_queue=1, queue_timeout=0.01)
+
+    async def acquire():
+        assert await shedder.acquire_async(create_request('Welcome'))
+        assert not await shedder.acquire_async(create_request('Order Status'))
+
+        asyncio.get_running_loop().call_later(0.01, shedder.release)
+
+        task = asyncio.ensure_future(
+            shedder.acquire_async(create_request('Checkout'))
+        )
+
+        # The queue is full (and the request is shed without waiting).
+        await asyncio.sleep(0)
+        assert not await shedder.acquire_async(create_request('Welcome'))
+
+        shedder.queue_timeout = 5.0
+
+        assert await task
+
+    asyncio.run(acquire())
+
+    assert shedder.stats == SheddingStats(
+        admitted=2,
+        shed=2,
+        shed_by_intent={'Order Status': 1, 'Welcome': 1},
+        in_flight=1,
+        queued=0
+    )
+
+
+def test_acquire_async_released_in_thread():
+    shedder = LoadShedder(1, max_queue=1)
+
+    async def acquire():
+        task = asyncio.ensure_future(
+            shedder.acquire_async(create_request('Order Status'))
+        )
+        await asyncio.sleep(0)
+
+        thread = threading.Thread(target=shedder.release)
+        thread.start()
+
+        assert await task
+
+        thread.join()
+
+    assert shedder.acquire(create_request('Welcome'))
+
+    asyncio.run(acquire())
+
+    assert shedder.stats == SheddingStats(2, 0, {}, 1, 0)
+
+
+def test_acquire_async_cancelled():
+    shedder = LoadShedder(1, max_queue=1)
+
+    async def acquire():
+        task = asyncio.ensure_future(
+            shedder.acquire_async(create_request('Order Status'))
+        )
+        await asyncio.sleep(0)
+
+        assert shedder.stats.queued == 1
+
+        task.cancel()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    assert shedder.acquire(create_request('Welcome'))
+
+    asyncio.run(acquire())
+
+    # The request left the queue (without being counted as shed).
+    assert shedder.stats == SheddingStats(1, 0, {}, 1, 0)
+
+
+def test_acquire_async_cancelled_after_evicted():
+    shedder = LoadShedder(1, max_queue=1, priorities={'Checkout': 10})
+    high = Request(shedder, 'Checkout')
+
+    async def acquire():
+        task = asyncio.ensure_future(
+            shedder.acquire_async(create_request('Order Status'))
+        )
+        await asyncio.sleep(0)
+
+        # The task is cancelled, but the request is evicted before the task
+        # wakes up.
+        task.cancel()
+        high.start()
+        wait_for(lambda: shedder.stats.shed == 1)
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    assert shedder.acquire(create_request('Welcome'))
+
+    asyncio.run(acquire())
+    shedder.release()
+    high.join()
+
+    assert high.admitted
+    assert shedder.stats == SheddingStats(2, 1, {'Order Status': 1}, 1, 0)
+
+
+def test_acquire_async_cancelled_after_admitted():
+    shedder = LoadShedder(1, max_queue=1)
+
+    async def acquire():
+        task = asyncio.ensure_future(
+            shedder.acquire_async(create_request('Order Status'))
+        )
+        await asyncio.sleep(0)
+
+        # The task is cancelled, but the request is admitted before the task
+        # wakes up.
+        task.cancel()
+        shedder.release()
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        # The request released its turn.
+        assert shedder.stats.in_flight == 0
+
+        await asyncio.sleep(0)
+
+    assert shedder.acquire(create_request('Welcome'))
+
+    asyncio.run(acquire())
+
+    assert shedder.stats == SheddingStats(2, 0, {}, 0, 0)
+
+
+def test_admitted_while_decoding(monkeypatch):
+    shedder = LoadShedder(1)
+
+    def get_intent(request):
+        # The request in flight ends while the intent is decoded.
+        shedder.release()
+
+        return None
+
+    monkeypatch.setattr(shedding, 'get_intent', get_intent)
+
+    assert shedder.acquire(create_request('Welcome'))
+    assert shedder.acquire(create_request('Order Status'))
+    assert shedder.stats == SheddingStats(2, 0, {}, 1, 0)
+
+
+def test_priorities():
+    shedder = LoadShedder(1, max_queue=2, priorities={'Checkout': 10})
+
+    assert shedder.acquire(create_request('Welcome'))
+
+    low = start(shedder, 'Order Status')
+    high = start(shedder, 'Checkout')
+
+    shedder.release()
+    high.join()
+
+    assert high.admitted
+    assert low.is_alive()
+
+    shedder.release()
+    low.join()
+
+    assert low.admitted
+
+
+def test_eviction():
+    shedder = LoadShedder(1, max_queue=1, priorities={'Checkout': 10})
+
+    assert shedder.acquire(create_request('Welcome'))
+
+    low = start(shedder, 'Order Status')
+    high = Request(shedder, 'Checkout')
+    high.start()
+    low.join()
+
+    assert not low.admitted
+
+    # Requests with the same priority don't evict each other.
+    assert not shedder.acquire(create_request('Checkout'))
+
+    shedder.release()
+    high.join()
+
+    assert high.admitted
+    assert shedder.stats.shed_by_intent == {'Order Status': 1, 'Checkout': 1}
@@ -0,0 +1,266 @@
+import json
+import os
+import threading
+import time
+import weakref
+
+import pytest
+
+from dialogflow_fulfillment import tracing
+from dialogflow_fulfillment.dispatcher import Dispatcher
+from dialogflow_fulfillment.tracing import (
+    NULL_SPAN,
+    Tracer,
+    current_span,
+    propagate,
+)
+from dialogflow_fulfillment.webhook_client import WebhookClient
+
+
+def gather_handler(agent):
+    def call():
+        with agent.span('call'):
+            return current_span()
+
+    span, = agent.gather(call)
+
+    agent.add(span.name)
+
+
+@pytest.fixture
+def path(tmp_path):
+    """Return the path of a file of spans (of the current process)."""
+    return tmp_path / 'traces-{pid}.jsonl'
+
+
+def read_spans(path):
+    """Read the export requests of a file of spans (of this process)."""
+    path = str(path).replace('{pid}', str(os.getpid()))
+
+    with open(path, encoding='utf-8') as file:
+        return [json.loads(line) for line in file]
+
+
+def test_span():
+    tracer = Tracer()
+
+    with tracer.span('request', size=10) as parent:
+        with tracer.span('handler') as child:
+            assert current_span() is child
+
+        assert current_span() is parent
+
+    assert current_span() is None
+    assert tracer.drain() == [child, parent]
+    assert child.trace_id == parent.trace_id
+    assert child.parent_id == parent.span_id
+    assert parent.parent_id is None
+    assert parent.attributes == {'size': 10}
+    assert parent.duration >= child.duration >= 0
+    assert tracer.drain() == []
+
+
+def test_span_error():
+    tracer = Tracer()
+
+    with pytest.raises(ValueError):
+        with tracer.span('handler'):
+            raise ValueError('invalid parameter')
+
+    span, = tracer.drain()
+
+    assert span.error == 'ValueError: invalid parameter'
+    assert span._to_otlp()['status'] == {
+        'code': 2,
+        'message': 'ValueError: invalid parameter',
+    }
+    assert current_span() is None
+
+
+def test_propagate():
+    tracer = Tracer()
+    results = {}
+
+    def run(key):
+        results[key] = current_span()
+
+    with tracer.span('request') as span:
+        threads = [
+            threading.Thread(target=run, args=('unbound',)),
+            threading.Thread(target=propagate(run), args=('bound',)),
+        ]
+
+        for thread in threads:
+            thread.start()
+            thread.join()
+
+    assert results == {'unbound': None, 'bound': span}
+
+
+def test_capacity():
+    tracer = Tracer(capacity=2)
+
+    for name in ('first', 'second', 'third'):
+        with tracer.span(name):
+            pass
+
+    assert [span.name for span in tracer.drain()] == ['second', 'third']
+
+
+def test_null_span():
+    with NULL_SPAN as span:
+        span.set_attribute('orders', 2)
+
+    assert span is NULL_SPAN
+
+
+def test_export(path):
+    tracer = Tracer(path, export_interval=60, service_name='orders')
+
+    assert tracer.export() == 0
+
+    with tracer.span('request', size=10, cached=False):
+        with tracer.span('handler', intent=None, ratio=0.5, user='1'):
+            pass
+
+    tracer.close()
+
+    request, = read_spans(path)
+    resource_spans, = request['resourceSpans']
+    scope_spans, = resource_spans['scopeSpans']
+    child, parent = scope_spans['spans']
+
+    assert resource_spans['resource']['attributes'] == [
+        {'key': 'service.name', 'value': {'stringValue': 'orders'}},
+        {'key': 'process.pid', 'value': {'intValue': str(os.getpid())}},
+    ]
+    assert scope_spans['scope'] == {'name': 'dialogflow_fulfillment'}
+    assert parent['name'] == 'request'
+    assert parent['kind'] == 1
+    assert 'parentSpanId' not in parent
+    assert 'status' not in parent
+    assert parent['attributes'] == [
+        {'key': 'size', 'value': {'intValue': '10'}},
+        {'key': 'cached', 'value': {'boolValue': False}},
+    ]
+    assert child['traceId'] == parent['traceId']
+    assert len(child['traceId']) == 32
+    assert child['parentSpanId'] == parent['spanId']
+    assert len(child['spanId']) == 16
+    assert child['attributes'] == [
+        {'key': 'ratio', 'value': {'doubleValue': 0.5}},
+        {'key': 'user', 'value': {'stringValue': '1'}},
+    ]
+    assert int(parent['startTimeUnixNano']) \
+        <= int(child['startTimeUnixNano']) \
+        <= int(child['endTimeUnixNano']) \
+        <= int(parent['endTimeUnixNano'])
+
+
+def test_export_without_path():
+    tracer = Tracer()
+
+    with tracer.span('request'):
+        pass
+
+    assert tracer.export() == 0
+    assert len(tracer.spans) == 0
+
+    tracer.close()
+
+
+def test_export_periodically(path):
+    with Tracer(path, export_interval=0.01) as tracer:
+        with tracer.span('request'):
+            pass
+
+        deadline = time.monotonic() + 5
+
+        while tracer.spans and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    assert not tracer._thread.is_alive()
+    assert len(read_spans(path)) == 1
+
+
+def test_restart_export(path):
+    tracer = Tracer(path, export_interval=60)
+    thread = tracer._thread
+
+    with tracer.span('request'):
+        pass
+
+    # As in a forked process (where the export thread doesn't run).
+    tracing._restart_export(weakref.ref(tracer))
+
+    assert len(tracer.spans) == 0
+    assert tracer._thread is not thread
+    assert tracer._thread.is_alive()
+
+    tracer.close()
+    thread = tracer._thread
+    tracing._restart_export(weakref.ref(tracer))
+    tracing._restart_export(lambda: None)
+
+    assert tracer._thread is thread
+    assert not thread.is_alive()
+
+
+def test_without_fork_hooks(monkeypatch, path):
+    monkeypatch.delattr(os, 'register_at_fork', raising=False)
+
+    Tracer(path).close()
+
+
+def test_dispatcher(webhook_request):
+    tracer = Tracer()
+    dispatcher = Dispatcher(
+        {'Default Welcome Intent': gather_handler},
+        tracer=tracer
+    )
+
+    response = dispatcher.handle(webhook_request)
+    spans = {span.name: span for span in tracer.drain()}
+
+    assert response['fulfillmentMessages'] == [{'text': {'text': ['call']}}]
+    assert set(spans) == {
+        'dispatch', 'parse', 'handler', 'gather', 'call', 'response',
+    }
+    assert len({span.trace_id for span in spans.values()}) == 1
+    assert spans['dispatch'].parent_id is None
+    assert spans['dispatch'].attributes == {
+        'intent': 'Default Welcome Intent',
+        'session': webhook_request['session'],
+    }
+    assert spans['handler'].attributes == {'intent': 'Default Welcome Intent'}
+
+    for name, parent in [
+        ('parse', 'dispatch'),
+        ('handler', 'dispatch'),
+        ('gather', 'handler'),
+        ('call', 'gather'),
+        ('response', 'dispatch'),
+    ]:
+        assert spans[name].parent_id == spans[parent].span_id
+
+
+def test_dispatcher_with_reused_clients(webhook_request):
+    tracer = Tracer()
+    dispatcher = Dispatcher(
+        {'Default Welcome Intent': gather_handler},
+        reuse_clients=True,
+        tracer=tracer
+    )
+
+    for _ in range(2):
+        dispatcher.handle(webhook_request)
+
+    names = [span.name for span in tracer.drain()]
+
+    assert names.count('handler') == names.count('call') == 2
+
+
+def test_client_without_tracer(webhook_request):
+    agent = WebhookClient(webhook_request)
+
+    assert agent.span('backend') is NULL_SPAN
@@ -0,0 +1,207 @@
+import copy
+import json
+from io import BytesIO
+
+import pytest
+
+from dialogflow_fulfillment.adapters import WSGIAdapter
+from dialogflow_fulfillment.dispatcher import Dispatcher
+from dialogflow_fulfillment.raw_json import RawJSON
+from dialogflow_fulfillment.validation import (
+    ValidationError,
+    compile_validator,
+    format_path,
+    validate_webhook_request,
+)
+from dialogflow_fulfillment.webhook_client import WebhookClient
+
+
+def updated(request, path, value):
+    """Copy a request with a value replaced (or removed, if it's None)."""
+    request = copy.deepcopy(request)
+    parent = request
+
+    for part in path[:-1]:
+        parent = parent[part]
+
+    if value is None:
+        del parent[path[-1]]
+    else:
+        parent[path[-1]] = value
+
+    return request
+
+
+def test_valid_request(webhook_request):
+    validate_webhook_request(webhook_request)
+
+
+def test_lazy_request(webhook_request):
+    request = updated(webhook_request, ('originalDetectIntentRequest',),
+                      RawJSON(b'{"payload": {}}'))
+
+    validate_webhook_request(request)
+    validate_webhook_request(RawJSON(b'{}'))
+
+
+@pytest.mark.parametrize('path, value, expected', [
+    (('session',), None, '$.session: is missing'),
+    (('session',), 1, '$.session: must be a string'),
+    (('queryResult',), [], '$.queryResult: must be an object'),
+    (('queryResult', 'intentDetectionConfidence'), True,
+     '$.queryResult.intentDetectionConfidence: must be a number'),
+    (('queryResult', 'allRequiredParamsPresent'), 'true',
+     '$.queryResult.allRequiredParamsPresent: must be a boolean'),
+    (('queryResult', 'outputContexts'), {},
+     '$.queryResult.outputContexts: must be an array'),
+    (('queryResult', 'outputContexts', 0), 'context',
+     '$.queryResult.outputContexts[0]: must be an object'),
+    (('queryResult', 'outputContexts', 0, 'name'), None,
+     '$.queryResult.outputContexts[0].name: is missing'),
+    (('queryResult', 'outputContexts', 0, 'lifespanCount'), 1.5,
+     '$.queryResult.outputContexts[0].lifespanCount: must be an integer'),
+    (('queryResult', 'fulfillmentMessages', 2, 'platform'), 0,
+     '$.queryResult.fulfillmentMessages[2].platform: must be a string'),
+    (('queryResult', 'intent', 'displayName'), ['Welcome'],
+     '$.queryResult.intent.displayName: must be a string'),
+    (('originalDetectIntentRequest', 'payload'), 'payload',
+     '$.originalDetectIntentRequest.payload: must be an object'),
+])
+def test_invalid_request(webhook_request, path, value, expected):
+    request = updated(webhook_request, path, value)
+
+    with pytest.raises(ValidationError) as error:
+        validate_webhook_request(request)
+
+    assert str(error.value) == expected
+    assert error.value.path == path
+    assert error.value.message == expected.partition(': ')[2]
+
+
+def test_invalid_root():
+    with pytest.raises(ValidationError, match=r'^\$: must be an object$'):
+        validate_webhook_request([])
+
+
+def test_format_path():
+    assert format_path(()) == '$'
+    assert format_path(('queryResult', 'outputContexts', 0, 'name')) \
+        == '$.queryResult.outputContexts[0].name'
+
+
+def test_compile_validator():
+    validate = compile_validator({
+        'title': 'Order',
+        'type': 'object',
+        'required': ['id', 'status'],
+        'properties': {
+            'id': {},
+            'status': {'enum': ['open', 'closed']},
+            'customer': {
+                'type': ['object', 'null'],
+                'properties': {'name': {'type': 'string'}},
+            },
+            'total': {'type': ['number', 'null']},
+            'items': {'items': {'type': 'string'}},
+            'tags': {'type': 'array', 'items': {}},
+            'notes': {'description': 'Anything.'},
+            'lines': {
+                'type': ['array', 'object'],
+                'items': {'type': 'object'},
+            },
+        },
+    }, 'validate_order')
+
+    validate({'id': 1, 'status': 'open', 'total': None, 'items': ['a'],
+              'lines': [{}], 'customer': None})
+    validate({'id': 1, 'status': 'closed', 'total': 1, 'items': 'abc',
+              'lines': {}, 'tags': [1], 'customer': {'name': 'Ann'}})
+
+    assert validate.__name__ == 'validate_order'
+    assert validate.source.startswith('def validate_order(value):')
+
+    for order, expected in [
+        ({'status': 'open'}, '$.id: is missing'),
+        ({'id': 1}, '$.status: is missing'),
+        ({'id': 1, 'status': 'lost'}, '$.status: has an unexpected value'),
+        ({'id': 1, 'status': 'open', 'total': '1'},
+         '$.total: must be a number or null'),
+        ({'id': 1, 'status': 'open', 'items': [1]},
+         '$.items[0]: must be a string'),
+        ({'id': 1, 'status': 'open', 'lines': 'line'},
+         '$.lines: must be an array or an object'),
+        ({'id': 1, 'status': 'open', 'lines': [1]},
+         '$.lines[0]: must be an object'),
+        ({'id': 1, 'status': 'open', 'customer': {'name': 1}},
+         '$.customer.name: must be a string'),
+    ]:
+        with pytest.raises(ValidationError) as error:
+            validate(order)
+
+        assert str(error.value) == expected
+
+
+def test_compile_required_without_properties():
+    validate = compile_validator({'required': ['id']})
+
+    validate({'id': None})
+    validate([])
+
+    with pytest.raises(ValidationError, match=r'^\$\.id: is missing$'):
+        validate({})
+
+
+def test_compile_empty_schema():
+    validate = compile_validator({})
+
+    validate(object())
+
+    assert validate.source == 'def validate(value):\n    pass'
+
+
+@pytest.mark.parametrize('schema', [
+    {'type': 'object', 'minProperties': 1},
+    {'properties': {'id': {'type': 'uuid'}}},
+])
+def test_compile_unsupported_schema(schema):
+    with pytest.raises(ValueError):
+        compile_validator(schema)
+
+
+def test_client(webhook_request):
+    invalid_request = updated(webhook_request, ('session',), 1)
+
+    with pytest.raises(ValidationError):
+        WebhookClient(invalid_request, validate_request=True)
+
+    agent = WebhookClient(webhook_request, validate_request=True)
+
+    with pytest.raises(ValidationError):
+        agent.reset(invalid_request)
+
+    agent.reset(json.dumps(webhook_request).encode())
+
+    # The requests aren't validated by default.
+    WebhookClient(invalid_request).reset(invalid_request)
+
+
+def test_adapter(webhook_request):
+    app = WSGIAdapter(Dispatcher(reuse_clients=True, validate_request=True))
+    body = json.dumps(
+        updated(webhook_request, ('queryResult', 'outputContexts'), 'none')
+    ).encode()
+    started = []
+
+    content = b''.join(app(
+        {
+            'REQUEST_METHOD': 'POST',
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.input': BytesIO(body),
+        },
+        lambda *args: started.extend(args)
+    ))
+
+    assert started[0] == '400 Bad Request'
+    assert json.loads(content) == {
+        'error': '$.queryResult.outputContexts: must be an array',
+    }
@@ -1,7 +1,16 @@
+import os
+import time
+from contextvars import ContextVar
+from threading import Event
+
 import pytest
 
+from dialogflow_fulfillment.http_pool import HTTPPool
+from dialogflow_fulfillment.rich_responses import Payload
 from dialogflow_fulfillment.webhook_client import WebhookClient
 
+user = ContextVar('user')
+
 
 def test_non_dict():
     with pytest.raises(TypeError):
@@ -15,3 +24,227 @@ def test_non_callable_handler(webhook_request):
 
     with pytest.raises(TypeError):
         agent.handle_request(handler)
+
+
+def test_from_bytes_non_bytes():
+    with pytest.raises(TypeError):
+        WebhookClient.from_bytes('this is not bytes')
+
+
+def test_reset_non_dict(webhook_request):
+    agent = WebhookClient(webhook_request)
+
+    with pytest.raises(TypeError):
+        agent.reset('this is not a dict')
+
+
+def test_console_messages_cache(webhook_request):
+    agent = WebhookClient(webhook_request)
+    another_agent = WebhookClient(webhook_request)
+
+    assert isinstance(agent.console_messages, tuple)
+    assert agent.console_messages[0] is another_agent.console_messages[0]
+    assert agent.console_messages[0].frozen
+
+
+def test_console_messages_cache_invalidation(webhook_request):
+    agent = WebhookClient(webhook_request)
+
+    webhook_request['queryResult']['fulfillmentMessages'] = [
+        {'text': {'text': ['this is another text']}}
+    ]
+    another_agent = WebhookClient(webhook_request)
+
+    assert agent.console_messages[0] is not another_agent.console_messages[0]
+    assert another_agent.console_messages[0].text == 'this is another text'
+
+
+def test_console_messages_cache_invalidation_in_place(webhook_request):
+    WebhookClient(webhook_request)
+
+    message = webhook_request['queryResult']['fulfillmentMessages'][0]
+    message['text']['text'] = ['this is another text']
+    another_agent = WebhookClient(webhook_request)
+
+    assert another_agent.console_messages[0].text == 'this is another text'
+
+
+def test_console_messages_cache_size(webhook_request, monkeypatch):
+    monkeypatch.setattr(WebhookClient, 'console_messages_cache_size', 1)
+
+    intent = webhook_request['queryResult']['intent']
+    intent_id = intent['name']
+
+    agent = WebhookClient(webhook_request)
+    intent['name'] = f'{intent_id}-another'
+    WebhookClient(webhook_request)
+    intent['name'] = intent_id
+    another_agent = WebhookClient(webhook_request)
+
+    assert len(WebhookClient._console_messages_cache) == 1
+    assert agent.console_messages[0] is not another_agent.console_messages[0]
+
+
+def test_add_console_messages(webhook_request):
+    agent = WebhookClient(webhook_request)
+    agent.add(agent.console_messages)
+
+    assert agent.response['fulfillmentMessages'] == \
+        webhook_request['queryResult']['fulfillmentMessages']
+
+
+def test_response_doesnt_share_console_messages(webhook_request):
+    agent = WebhookClient(webhook_request)
+    agent.add(agent.console_messages[0])
+    agent.response['fulfillmentMessages'][0]['text']['text'].append('x')
+
+    another_agent = WebhookClient(webhook_request)
+    another_agent.add(another_agent.console_messages[0])
+
+    assert another_agent.response['fulfillmentMessages'] == [
+        {'text': {'text': [agent.console_messages[0].text]}}
+    ]
+
+
+def test_response_immutable_payload(webhook_request):
+    content = {'items': [{'id': 1}]}
+    agent = WebhookClient(webhook_request)
+    agent.add([Payload(content, immutable=True), Payload(content)])
+    messages = agent.response['fulfillmentMessages']
+
+    assert messages[0]['payload'] is content
+    assert messages[1]['payload'] is not content
+    assert messages[1]['payload'] == content
+
+
+def test_console_messages_without_intent_id(webhook_request):
+    del webhook_request['queryResult']['intent']['name']
+
+    agent = WebhookClient(webhook_request)
+    another_agent = WebhookClient(webhook_request)
+
+    assert agent.console_messages[0] is not another_agent.console_messages[0]
+
+
+def test_deadline(webhook_request):
+    started = time.monotonic()
+    agent = WebhookClient(webhook_request, request_timeout=2.0)
+
+    assert started + 2.0 <= agent.deadline <= time.monotonic() + 2.0
+    assert 0 < agent.remaining_time <= 2.0
+
+    agent.deadline = time.monotonic() - 1
+
+    assert agent.remaining_time == 0.0
+
+
+def test_deadline_reset(webhook_request):
+    agent = WebhookClient(webhook_request)
+    agent.deadline = 0.0
+
+    agent.reset(webhook_request)
+
+    assert agent.deadline > time.monotonic()
+
+
+def test_gather(webhook_request):
+    agent = WebhookClient(webhook_request)
+    user.set('alice')
+
+    results = agent.gather(lambda: 1, lambda: None, lambda: user.get())
+
+    assert results == [1, None, 'alice']
+
+
+def test_gather_runs_concurrently(webhook_request):
+    agent = WebhookClient(webhook_request)
+    barrier = Event()
+
+    # The first function only returns if the second one runs meanwhile.
+    results = agent.gather(
+        lambda: barrier.wait(timeout=1.0),
+        barrier.set
+    )
+
+    assert results == [True, None]
+
+
+def test_gather_raises(webhook_request):
+    agent = WebhookClient(webhook_request)
+
+    def fail(error):
+        raise error
+
+    with pytest.raises(KeyError):
+        agent.gather(lambda: 1, lambda: fail(KeyError()),
+                     lambda: fail(ValueError()))
+
+
+def test_gather_return_exceptions(webhook_request):
+    agent = WebhookClient(webhook_request)
+    error = ValueError('this is an error')
+
+    def fail():
+        raise error
+
+    assert agent.gather(lambda: 1, fail, return_exceptions=True) == [1, error]
+
+
+def test_gather_timeout(webhook_request):
+    agent = WebhookClient(webhook_request)
+    release = Event()
+
+    try:
+        with pytest.raises(TimeoutError):
+            agent.gather(lambda: 1, release.wait, timeout=0.01)
+
+        results = agent.gather(
+            lambda: 1,
+            release.wait,
+            timeout=0.01,
+            return_exceptions=True
+        )
+    finally:
+        release.set()
+
+    assert results[0] == 1
+    assert isinstance(results[1], TimeoutError)
+
+
+def test_gather_respects_deadline(webhook_request):
+    agent = WebhookClient(webhook_request, request_timeout=0.01)
+    release = Event()
+
+    try:
+        with pytest.raises(TimeoutError):
+            agent.gather(release.wait, timeout=10.0)
+    finally:
+        release.set()
+
+
+def test_gather_executor_after_fork(webhook_request, monkeypatch):
+    agent = WebhookClient(webhook_request)
+    executor = agent._get_gather_executor()
+
+    assert agent._get_gather_executor() is executor
+
+    monkeypatch.setattr(os, 'getpid', lambda: -1)
+
+    assert agent._get_gather_executor() is not executor
+
+
+def test_http(webhook_request):
+    http_pool = HTTPPool()
+    agent = WebhookClient(webhook_request, http_pool=http_pool)
+
+    session = agent.http
+
+    assert session.pool is http_pool
+    assert session.deadline == agent.deadline
+
+
+def test_http_without_pool(webhook_request):
+    agent = WebhookClient(webhook_request)
+
+    with pytest.raises(RuntimeError):
+        agent.http
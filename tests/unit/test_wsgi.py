@@ -0,0 +1,160 @@
+import json
+from io import BytesIO, StringIO
+from wsgiref.handlers import SimpleHandler
+from wsgiref.util import setup_testing_defaults
+
+import pytest
+
+from dialogflow_fulfillment.adapters import WSGIAdapter
+from dialogflow_fulfillment.dispatcher import Dispatcher
+from dialogflow_fulfillment.http_pool import HTTPPool
+from dialogflow_fulfillment.shedding import LoadShedder
+from dialogflow_fulfillment.tracing import Tracer
+
+
+def welcome_handler(agent):
+    agent.add('Hello!')
+
+
+@pytest.fixture
+def app():
+    """Return a WSGI application with a sample dispatcher."""
+    return WSGIAdapter(Dispatcher({'Default Welcome Intent': welcome_handler}))
+
+
+def call(app, body=b'', method='POST'):
+    """Call a WSGI application and get the status, headers and body."""
+    environ = {
+        'REQUEST_METHOD': method,
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': BytesIO(body),
+    }
+    setup_testing_defaults(environ)
+    started = []
+
+    content = b''.join(app(environ, lambda *args: started.extend(args)))
+
+    return started[0], dict(started[1]), content
+
+
+def test_post(app, webhook_request):
+    status, headers, content = call(app, json.dumps(webhook_request).encode())
+
+    assert status == '200 OK'
+    assert headers['Content-Type'] == 'application/json'
+    assert headers['Content-Length'] == str(len(content))
+    assert json.loads(content)['fulfillmentMessages'] == [
+        {'text': {'text': ['Hello!']}}
+    ]
+
+
+def test_invalid_body(app):
+    status, _, content = call(app, b'this is not JSON')
+
+    assert status == '400 Bad Request'
+    assert 'error' in json.loads(content)
+
+
+def test_handler_error(webhook_request):
+    def failing_handler(agent):
+        raise ValueError('secret')
+
+    app = WSGIAdapter(Dispatcher({'Default Welcome Intent': failing_handler}))
+    body = json.dumps(webhook_request).encode()
+    environ = {'REQUEST_METHOD': 'POST', 'CONTENT_LENGTH': str(len(body))}
+    setup_testing_defaults(environ)
+    output = BytesIO()
+
+    # The error isn't the client's: the server answers with a 500 response
+    # (and logs the error).
+    SimpleHandler(BytesIO(body), output, StringIO(), environ).run(app)
+
+    assert b' 500 Internal Server Error' in output.getvalue()
+    assert b'secret' not in output.getvalue()
+
+
+def test_other_method(app):
+    status, headers, _ = call(app, method='GET')
+
+    assert status == '405 Method Not Allowed'
+    assert headers['Allow'] == 'POST'
+
+
+def test_startup_on_first_request(app, webhook_request):
+    call(app, json.dumps(webhook_request).encode())
+    http_pool = app.http_pool
+
+    call(app, json.dumps(webhook_request).encode())
+
+    assert app.started
+    assert isinstance(http_pool, HTTPPool)
+    assert app.dispatcher.http_pool is http_pool
+    assert app.http_pool is http_pool
+
+
+def test_startup_keeps_dispatcher_pool():
+    http_pool = HTTPPool()
+    app = WSGIAdapter(Dispatcher(http_pool=http_pool))
+
+    app.startup()
+
+    assert app.http_pool is None
+    assert app.dispatcher.http_pool is http_pool
+
+    app.shutdown()
+
+    assert not app.started
+
+
+def test_shutdown(mocker):
+    http_pool = HTTPPool()
+    close = mocker.spy(http_pool, 'close')
+    app = WSGIAdapter(Dispatcher(), http_pool=http_pool)
+
+    app.startup()
+    app.startup()
+    app.shutdown()
+
+    assert app.dispatcher.http_pool is http_pool
+    close.assert_called_once_with()
+
+
+def test_tracing(webhook_request):
+    tracer = Tracer()
+    app = WSGIAdapter(
+        Dispatcher({'Default Welcome Intent': welcome_handler}, tracer=tracer)
+    )
+    body = json.dumps(webhook_request).encode()
+
+    call(app, body)
+    spans = {span.name: span for span in tracer.drain()}
+
+    assert spans['http request'].parent_id is None
+    assert spans['http request'].attributes == {'size': len(body)}
+    assert spans['dispatch'].parent_id == spans['http request'].span_id
+    assert spans['serialize'].parent_id == spans['http request'].span_id
+
+
+def test_shedding(webhook_request):
+    shedder = LoadShedder(1, text='Busy!')
+    app = WSGIAdapter(
+        Dispatcher({'Default Welcome Intent': welcome_handler}),
+        shedder=shedder
+    )
+    body = json.dumps(webhook_request).encode()
+
+    status, _, content = call(app, body)
+
+    assert status == '200 OK'
+    assert json.loads(content)['fulfillmentMessages'] == [
+        {'text': {'text': ['Hello!']}}
+    ]
+    assert shedder.stats.in_flight == 0
+
+    shedder.acquire(body)
+    status, headers, content = call(app, body)
+
+    assert status == '200 OK'
+    assert headers['Content-Length'] == str(len(content))
+    assert content == shedder.fallback
+    assert shedder.stats.shed == 1